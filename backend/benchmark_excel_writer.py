@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: consolidated ticket report throughput (rows/sec)
+
+Compares the previous writer (per-character cleaning of every value, fresh
+Font/Border/Alignment objects assigned to every cell) with ExcelReportWriter
+(column sanitization in one translate pass, NamedStyles registered once).
+Sanitization and the full build + save are timed separately on synthetic
+tickets; no database is needed.
+
+Usage:
+    python benchmark_excel_writer.py [--rows 20000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.reports.excel_writer import ExcelReportWriter, sanitize_column
+from modules.reports.monthly_reports import CONSOLIDATED_REPORT_COLUMNS
+
+TEXT_KEYS = ('ticket_number', 'client_name', 'subject', 'status', 'priority',
+             'technician_name', 'site_name', 'resolution_notes')
+
+
+def legacy_clean(value):
+    """The former _safe_clean_string"""
+    if value is None:
+        return "Sin información"
+    str_value = str(value).strip()
+    if not str_value:
+        return ""
+    if str_value.startswith('='):
+        str_value = str_value[1:]
+    if str_value.startswith(('+', '-', '@')):
+        str_value = ' ' + str_value
+    safe_chars = []
+    for char in str_value:
+        char_code = ord(char)
+        if 32 <= char_code <= 126 or char in 'áéíóúñüÁÉÍÓÚÑÜ¿¡':
+            safe_chars.append(char)
+        else:
+            safe_chars.append(' ')
+    cleaned = ' '.join(''.join(safe_chars).split())
+    if len(cleaned) > 200:
+        cleaned = cleaned[:200] + '...'
+    if cleaned and cleaned[0] in '=+-@':
+        cleaned = ' ' + cleaned
+    return cleaned
+
+
+def legacy_date(value, default='N/A'):
+    return value.strftime('%d/%m/%Y %H:%M') if value is not None else default
+
+
+def make_tickets(count, seed=1):
+    rng = random.Random(seed)
+    words = ['impresora', 'correo', 'red', 'acceso', 'contraseña', 'servidor', 'lentitud',
+             'VPN', 'respaldo', 'licencia', '¿urgente?', 'recepción', '=SUM(A1)', '\tadjunto\r\n']
+    start = datetime(2026, 9, 1)
+    tickets = []
+    for i in range(count):
+        created = start + timedelta(minutes=rng.randint(0, 43200))
+        tickets.append({
+            'ticket_number': f'TKT-{i:06d}',
+            'client_name': rng.choice(['Industrias del Norte', 'Café Olé', 'Grupo Ñandú', None]),
+            'subject': ' '.join(rng.choice(words) for _ in range(rng.randint(3, 10))),
+            'status': rng.choice(['abierto', 'en_proceso', 'resuelto', 'cerrado']),
+            'priority': rng.choice(['baja', 'media', 'alta', 'critica']),
+            'created_at': created,
+            'resolved_at': created + timedelta(hours=rng.randint(1, 72)) if rng.random() < 0.7 else None,
+            'technician_name': rng.choice(['Ana López', 'José Pérez', None]),
+            'site_name': rng.choice(['Matriz', 'Sucursal Centro', 'Bodega']),
+            'resolution_notes': ' '.join(rng.choice(words) for _ in range(rng.randint(0, 60))) or None,
+        })
+    return tickets
+
+
+def legacy_report(tickets, path):
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, Alignment, Border, Side
+
+    wb = Workbook()
+    ws = wb.active
+    data_font = Font(name='Arial', size=10)
+    center = Alignment(horizontal='center', vertical='center')
+    border = Border(left=Side(style='thin'), right=Side(style='thin'),
+                    top=Side(style='thin'), bottom=Side(style='thin'))
+    for row_idx, t in enumerate(tickets, 7):
+        row = [legacy_clean(t.get('ticket_number')), legacy_clean(t.get('client_name')),
+               legacy_clean(t.get('subject')), legacy_clean(t.get('status')),
+               legacy_clean(t.get('priority')), legacy_date(t.get('created_at')),
+               legacy_date(t.get('resolved_at'), 'Pendiente'), legacy_clean(t.get('technician_name')),
+               legacy_clean(t.get('site_name')), legacy_date(t.get('resolved_at'), 'Sin fecha'),
+               legacy_clean(t.get('resolution_notes') or 'Sin resolución')]
+        for col, value in enumerate(row, 1):
+            cell = ws.cell(row=row_idx, column=col, value=value)
+            cell.font = data_font
+            cell.border = border
+            if col in (1, 4, 5):
+                cell.alignment = center
+    wb.save(path)
+
+
+def writer_report(tickets, path):
+    writer = ExcelReportWriter('Reporte Consolidado', CONSOLIDATED_REPORT_COLUMNS)
+    writer.write_banner([('LANET SYSTEMS', 'report_title'), ('Benchmark', 'report_subtitle')])
+    writer.write_table(tickets)
+    writer.save(path)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Excel report throughput benchmark')
+    parser.add_argument('--rows', type=int, default=20000)
+    args = parser.parse_args()
+    tickets = make_tickets(args.rows)
+
+    print(f"🔧 Consolidated report throughput, {args.rows} tickets")
+    print("=" * 60)
+
+    legacy_clean_s = timed(lambda: [[legacy_clean(t.get(k)) for k in TEXT_KEYS] for t in tickets])
+    column_clean_s = timed(lambda: [sanitize_column([t.get(k) for t in tickets]) for k in TEXT_KEYS])
+    print(f"sanitize  legacy: {args.rows / legacy_clean_s:12,.0f} rows/s   "
+          f"column: {args.rows / column_clean_s:12,.0f} rows/s   "
+          f"speedup {legacy_clean_s / column_clean_s:.2f}x")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_s = timed(legacy_report, tickets, os.path.join(tmp, 'legacy.xlsx'))
+        writer_s = timed(writer_report, tickets, os.path.join(tmp, 'writer.xlsx'))
+        legacy_kb = os.path.getsize(os.path.join(tmp, 'legacy.xlsx')) / 1024
+        writer_kb = os.path.getsize(os.path.join(tmp, 'writer.xlsx')) / 1024
+
+    print(f"report    legacy: {args.rows / legacy_s:12,.0f} rows/s   "
+          f"writer: {args.rows / writer_s:12,.0f} rows/s   "
+          f"speedup {legacy_s / writer_s:.2f}x")
+    print(f"file size legacy: {legacy_kb:,.0f} KB   writer: {writer_kb:,.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: building and serializing large list responses
+
+Compares the previous path (a dict per row from RealDictCursor, copied by
+format_ticket_data, encoded by Flask's standard json provider) with the
+current one (row tuples projected by a cached row formatter, encoded by
+core.serialization, orjson when installed). Rows are synthetic tickets and
+assets with a nested specifications document; no database is needed.
+
+Usage:
+    python benchmark_json_serialization.py [--rows 1000] [--repeat 200]
+"""
+
+import os
+import sys
+import time
+import uuid
+import random
+import argparse
+import statistics
+from datetime import datetime, timedelta, timezone
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+from psycopg2.extras import RealDictRow
+
+from core.response import ResponseManager
+from core.serialization import ORJSON_AVAILABLE, FastJSONProvider, project_rows
+
+TICKET_COLUMNS = [
+    'ticket_id', 'ticket_number', 'client_id', 'site_id', 'asset_id', 'created_by', 'assigned_to',
+    'subject', 'description', 'affected_person', 'affected_person_phone', 'affected_person_contact',
+    'notification_email', 'additional_emails', 'priority', 'category_id', 'status', 'channel',
+    'is_email_originated', 'from_email', 'email_message_id', 'email_thread_id', 'approval_status',
+    'approved_by', 'approved_at', 'created_at', 'updated_at', 'assigned_at', 'resolved_at', 'closed_at',
+    'resolution_notes', 'client_name', 'site_name', 'category_name', 'created_by_name', 'assigned_to_name'
+]
+ASSET_COLUMNS = [
+    'asset_id', 'name', 'agent_status', 'last_seen', 'specifications', 'site_name', 'site_id',
+    'site_address', 'client_name', 'client_id', 'cpu_percent', 'memory_percent', 'disk_percent',
+    'last_heartbeat', 'connection_status'
+]
+
+
+def ticket_rows(count):
+    rng = random.Random(42)
+    now = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    rows = []
+    for i in range(count):
+        created = now - timedelta(minutes=rng.randint(0, 100_000))
+        rows.append((
+            uuid.uuid4(), f'TKT-{i:06d}', uuid.uuid4(), uuid.uuid4(), None, uuid.uuid4(), uuid.uuid4(),
+            f'Equipo sin conexión #{i}', 'La impresora del área de contabilidad no responde. ' * 4,
+            'María López', '', '5551234567', 'maria@cliente.example', ['jefe@cliente.example'],
+            rng.choice(['baja', 'media', 'alta', 'critica']), uuid.uuid4(), rng.choice(['nuevo', 'asignado']),
+            'portal', False, None, None, None, 'approved', None, None, created, created + timedelta(hours=1),
+            created + timedelta(minutes=5), None, None, None, 'Cliente Industrial SA', 'Planta Norte',
+            'Hardware', 'Ana Pérez', 'Carlos Ruiz'
+        ))
+    return rows
+
+
+def asset_rows(count):
+    rng = random.Random(7)
+    now = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    rows = []
+    for i in range(count):
+        specifications = {
+            'os': {'name': 'Windows 11 Pro', 'version': '23H2', 'build': 22631},
+            'cpu': {'model': 'Intel Core i5-1235U', 'cores': 10, 'threads': 12},
+            'memory_gb': 16, 'disks': [{'device': 'C:', 'size_gb': 476, 'free_gb': rng.randint(10, 400)}],
+            'network': [{'adapter': 'Ethernet', 'mac': f'00:1A:2B:3C:{i % 256:02X}:01', 'ipv4': f'10.0.{i % 250}.10'}]
+        }
+        seen = now - timedelta(seconds=rng.randint(0, 7200))
+        rows.append((
+            uuid.uuid4(), f'PC-{i:05d}', 'online', seen, specifications, 'Planta Norte', uuid.uuid4(),
+            'Av. Reforma 100', 'Cliente Industrial SA', uuid.uuid4(), rng.random() * 100, rng.random() * 100,
+            rng.random() * 100, seen, 'online'
+        ))
+    return rows
+
+
+def as_dict_rows(columns, rows):
+    """What RealDictCursor hands the previous path"""
+    dict_rows = []
+    for row in rows:
+        dict_row = RealDictRow()
+        for name, value in zip(columns, row):
+            dict_row[name] = value
+        dict_rows.append(dict_row)
+    return dict_rows
+
+
+def measure(fn, repeat):
+    fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON serialization microbenchmark')
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    legacy_app = Flask('legacy')
+    legacy_app.json = DefaultJSONProvider(legacy_app)
+    legacy_app.json.ensure_ascii = False
+    current_app_ = Flask('current')
+    current_app_.json = FastJSONProvider(current_app_)
+    current_app_.json.ensure_ascii = False
+    current_app_.json.compact = True
+    manager = ResponseManager()
+
+    tickets, assets = ticket_rows(args.rows), asset_rows(args.rows)
+
+    def legacy_tickets():
+        # The cursor builds the dicts, so their cost belongs to this path
+        formatted = [manager.format_ticket_data(ticket) for ticket in as_dict_rows(TICKET_COLUMNS, tickets)]
+        return jsonify({'success': True, 'data': {'tickets': formatted}}).get_data()
+
+    def current_tickets():
+        formatted = manager.format_ticket_rows(TICKET_COLUMNS, tickets)
+        return manager.success({'tickets': formatted})[0].get_data()
+
+    def legacy_assets():
+        return jsonify({'success': True, 'data': {'assets': as_dict_rows(ASSET_COLUMNS, assets)}}).get_data()
+
+    def current_assets():
+        return manager.success({'assets': project_rows(ASSET_COLUMNS, assets)})[0].get_data()
+
+    print(f"🔧 {args.rows:,}-row responses, median of {args.repeat} "
+          f"({'orjson' if ORJSON_AVAILABLE else 'orjson not installed, stdlib json'})")
+    print("=" * 60)
+    for name, legacy, current in (('tickets', legacy_tickets, current_tickets),
+                                  ('assets', legacy_assets, current_assets)):
+        with legacy_app.test_request_context():
+            legacy_ms, legacy_bytes = measure(legacy, args.repeat)
+        with current_app_.test_request_context():
+            current_ms, current_bytes = measure(current, args.repeat)
+        print(f"{name:8} previous {legacy_ms:8.2f} ms {legacy_bytes:>10,} B   "
+              f"current {current_ms:8.2f} ms {current_bytes:>10,} B   {legacy_ms / current_ms:5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: PDF data table rendering time by row count
+
+Compares the previous add_data_table (one Table holding every row, styles
+rebuilt per table) with the chunked LongTables of PDFReportFormatter on
+synthetic tickets; no database is needed.
+
+Usage:
+    python benchmark_pdf_report.py [--rows 500 2000 5000]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table
+
+from modules.reports.report_formatters import PDFReportFormatter, _cell_text, _pdf_styles
+
+COLUMNS = ['ticket_number', 'client_name', 'status', 'priority', 'created_at', 'technician_name']
+
+
+def make_tickets(count):
+    start = datetime(2026, 9, 1)
+    return [{
+        'ticket_number': f'TKT-{i:06d}',
+        'client_name': ['Industrias del Norte', 'Café Olé', 'Grupo Ñandú'][i % 3],
+        'status': ['abierto', 'en_proceso', 'resuelto', 'cerrado'][i % 4],
+        'priority': ['baja', 'media', 'alta', 'critica'][i % 4],
+        'created_at': start + timedelta(minutes=17 * i),
+        'technician_name': ['Ana López', 'José Pérez', None][i % 3],
+    } for i in range(count)]
+
+
+def legacy_pdf(tickets, path):
+    table_data = [[col.replace('_', ' ').title() for col in COLUMNS]]
+    table_data += [[_cell_text(row.get(col)) for col in COLUMNS] for row in tickets]
+    table = Table(table_data, colWidths=[6.5 * inch / len(COLUMNS)] * len(COLUMNS))
+    table.setStyle(_pdf_styles()['data_table'])
+    SimpleDocTemplate(path, pagesize=A4).build([table])
+
+
+def chunked_pdf(tickets, path):
+    formatter = PDFReportFormatter(path)
+    formatter.add_data_table(iter(tickets), 'Tickets', COLUMNS)
+    formatter.build()
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='PDF table rendering benchmark')
+    parser.add_argument('--rows', type=int, nargs='+', default=[500, 2000, 5000])
+    args = parser.parse_args()
+
+    print("🔧 PDF data table rendering")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.rows:
+            tickets = make_tickets(count)
+            legacy_s = timed(legacy_pdf, tickets, os.path.join(tmp, 'legacy.pdf'))
+            chunked_s = timed(chunked_pdf, tickets, os.path.join(tmp, 'chunked.pdf'))
+            print(f"{count:7,} rows   single Table: {legacy_s:7.2f} s   "
+                  f"LongTable chunks: {chunked_s:7.2f} s   speedup {legacy_s / chunked_s:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
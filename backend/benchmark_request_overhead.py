@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: per-request middleware overhead on a no-op endpoint
+
+Compares the previous before_request (stdout header dumps, JWT decoded by every
+decorator, eager RLS setup with a pool checkout and three round trips) with the
+current middleware (core/middleware.py). The database is replaced by a stub
+whose round trips cost --rtt-ms each, so no PostgreSQL is needed.
+
+Usage:
+    python benchmark_request_overhead.py [--requests 2000] [--rtt-ms 0.3]
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+import contextlib
+import statistics
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, request, g
+from flask_jwt_extended import JWTManager, create_access_token, jwt_required
+
+from core.auth import AuthManager, CachingJWTManager
+from core.middleware import register_request_hooks
+from core.response import ResponseManager
+from utils.security import require_role
+
+
+class StubDatabase:
+    """Mimics DatabaseManager RLS methods with a fixed cost per round trip"""
+
+    def __init__(self, rtt_seconds):
+        self.rtt = rtt_seconds
+        self.round_trips = 0
+        self.pending = None
+
+    def _round_trip(self):
+        self.round_trips += 1
+        if self.rtt:
+            end = time.perf_counter() + self.rtt
+            while time.perf_counter() < end:
+                pass
+
+    def set_rls_context(self, user_id, user_role, client_id=None, site_ids=None):
+        # Pool checkout + set_config for user, role, client (+ sites) + commit
+        for _ in range(3 + (1 if site_ids else 0)):
+            self._round_trip()
+
+    def defer_rls_context(self, user_id, user_role, client_id=None, site_ids=None):
+        self.pending = (user_id, user_role, client_id, site_ids)
+
+    def clear_rls_context(self):
+        self.pending = None
+
+
+def register_legacy_request_hooks(app):
+    """The before_request/after_request pair as it was before the lean middleware"""
+
+    @app.before_request
+    def before_request():
+        print("=" * 80, flush=True)
+        print(f"🔥 INCOMING REQUEST: {request.method} {request.url}", flush=True)
+        print(f"🔥 Headers: {dict(request.headers)}", flush=True)
+        print(f"🔥 Remote addr: {request.remote_addr}", flush=True)
+        print("=" * 80, flush=True)
+
+        g.start_time = datetime.utcnow()
+
+        if request.endpoint and request.endpoint.startswith('auth.'):
+            return
+
+        if request.headers.get('Authorization'):
+            try:
+                from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
+                verify_jwt_in_request()
+
+                user_id = get_jwt_identity()
+                claims = get_jwt()
+
+                if user_id and claims:
+                    app.db_manager.set_rls_context(
+                        user_id=user_id,
+                        user_role=claims.get('role'),
+                        client_id=claims.get('client_id'),
+                        site_ids=claims.get('site_ids', [])
+                    )
+                    g.current_user_id = user_id
+                    g.current_user_role = claims.get('role')
+                    g.current_client_id = claims.get('client_id')
+                    g.current_site_ids = claims.get('site_ids', [])
+            except Exception as e:
+                app.logger.warning(f"RLS context setup failed: {e}")
+
+    @app.after_request
+    def after_request(response):
+        response.headers['X-Content-Type-Options'] = 'nosniff'
+        response.headers['X-Frame-Options'] = 'DENY'
+        response.headers['X-XSS-Protection'] = '1; mode=block'
+        duration = datetime.utcnow() - g.start_time
+        app.logger.info(f"{request.method} {request.path} - {response.status_code} - {duration.total_seconds():.3f}s")
+        return response
+
+
+def build_app(legacy, rtt_seconds):
+    app = Flask(f"bench_{'legacy' if legacy else 'lean'}")
+    app.config['JWT_SECRET_KEY'] = 'benchmark-secret'
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = False
+
+    (JWTManager if legacy else CachingJWTManager)(app)
+    app.db_manager = StubDatabase(rtt_seconds)
+    app.auth_manager = AuthManager(app.db_manager)
+    app.response_manager = ResponseManager()
+
+    if legacy:
+        register_legacy_request_hooks(app)
+    else:
+        register_request_hooks(app)
+
+    @app.route('/noop')
+    @jwt_required()
+    @require_role(['superadmin', 'admin', 'technician'])
+    def noop():
+        return '', 204
+
+    with app.app_context():
+        token = create_access_token(
+            identity='00000000-0000-0000-0000-000000000001',
+            additional_claims={
+                'role': 'technician',
+                'client_id': None,
+                'site_ids': ['00000000-0000-0000-0000-0000000000aa'],
+                'name': 'Bench',
+                'email': 'bench@example.com'
+            }
+        )
+    return app, token
+
+
+def run(legacy, requests_count, rtt_seconds):
+    app, token = build_app(legacy, rtt_seconds)
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}', 'User-Agent': 'benchmark'}
+
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(50):
+            client.get('/noop', headers=headers)
+        app.db_manager.round_trips = 0
+        for _ in range(requests_count):
+            start = time.perf_counter()
+            response = client.get('/noop', headers=headers)
+            timings.append(time.perf_counter() - start)
+            assert response.status_code == 204, response.status_code
+
+    timings.sort()
+    return {
+        'variant': 'legacy' if legacy else 'lean',
+        'requests': requests_count,
+        'mean_us': statistics.mean(timings) * 1e6,
+        'p50_us': timings[len(timings) // 2] * 1e6,
+        'p95_us': timings[int(len(timings) * 0.95)] * 1e6,
+        'db_round_trips_per_request': app.db_manager.round_trips / requests_count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-request middleware overhead benchmark')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--rtt-ms', type=float, default=0.3, help='simulated database round trip')
+    args = parser.parse_args()
+
+    print("🔧 Per-request overhead on a no-op endpoint")
+    print("=" * 60)
+    results = [run(legacy, args.requests, args.rtt_ms / 1000.0) for legacy in (True, False)]
+    for r in results:
+        print(f"{r['variant']:>7}: mean {r['mean_us']:8.1f} µs  p50 {r['p50_us']:8.1f} µs  "
+              f"p95 {r['p95_us']:8.1f} µs  db round trips/request {r['db_round_trips_per_request']:.1f}")
+    print(f"speedup (mean): {results[0]['mean_us'] / results[1]['mean_us']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Helpdesk V3 - Audit Writer
+Asynchronous, batched writer for audit_log and ticket_activities rows
+"""
+
+import os
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime, date
+from decimal import Decimal
+from uuid import UUID
+from typing import Dict, List, Any, Tuple
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+class AuditWriter:
+    """Buffers audit rows in a bounded in-process queue and flushes them from a
+    background thread with multi-row INSERTs.
+
+    If the database is unreachable, pending rows are appended to a JSON-lines
+    spool file and replayed once inserts succeed again. The queue is drained on
+    interpreter shutdown.
+    """
+
+    # Only these tables may be written through the writer (table names are
+    # interpolated into SQL)
+    ALLOWED_TABLES = ('audit_log', 'ticket_activities')
+
+    # Minimum delay between attempts to replay the spool file
+    SPOOL_RETRY_SECONDS = 30
+
+    def __init__(self, db_manager, spool_dir: str, max_queue_size: int = 10000,
+                 batch_size: int = 500, flush_interval: float = 0.25):
+        self.db = db_manager
+        self.spool_path = os.path.join(spool_dir, 'audit_spool.jsonl')
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.logger = logging.getLogger(__name__)
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._spool_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._next_replay_at = 0.0
+
+        os.makedirs(spool_dir, exist_ok=True)
+
+    def enqueue(self, table: str, row: Dict[str, Any]) -> None:
+        """Queue a row for insertion; never blocks and never raises"""
+        try:
+            if table not in self.ALLOWED_TABLES:
+                raise ValueError(f"Table not allowed for audit writes: {table}")
+
+            self._ensure_started()
+            self._queue.put_nowait((table, row))
+        except queue.Full:
+            # Back-pressure: keep the event durable instead of blocking the request
+            self._spool([(table, row)])
+        except Exception as e:
+            self.logger.error(f"Failed to enqueue audit row for {table}: {e}")
+
+    @property
+    def backlog(self) -> int:
+        """Rows queued but not yet written"""
+        return self._queue.qsize()
+
+    def flush(self) -> int:
+        """Synchronously write everything currently queued; returns rows written"""
+        written = 0
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                break
+            written += self._write(batch)
+        return written
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop the background thread and flush remaining rows"""
+        atexit.unregister(self.shutdown)
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout)
+        try:
+            self.flush()
+        except Exception as e:
+            self.logger.error(f"Audit flush on shutdown failed: {e}")
+
+    def _ensure_started(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+            atexit.register(self.shutdown)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                batch = self._drain(self.batch_size, wait=self.flush_interval)
+                if batch:
+                    self._write(batch)
+                elif time.monotonic() >= self._next_replay_at and (
+                        os.path.exists(self.spool_path) or os.path.exists(self.spool_path + '.replay')):
+                    self._replay_spool()
+            except Exception as e:
+                self.logger.error(f"Audit writer loop error: {e}")
+
+    def _drain(self, limit: int, wait: float = None) -> List[Tuple[str, Dict]]:
+        """Collect up to ``limit`` rows, optionally waiting for the first one"""
+        batch = []
+        try:
+            if wait:
+                batch.append(self._queue.get(timeout=wait))
+            while len(batch) < limit:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _write(self, batch: List[Tuple[str, Dict]]) -> int:
+        """Insert a batch grouped by table and column set; spool it on connection failure"""
+        groups: Dict[Tuple[str, Tuple[str, ...]], List[Dict]] = {}
+        for table, row in batch:
+            groups.setdefault((table, tuple(sorted(row.keys()))), []).append(row)
+
+        written = 0
+        for (table, columns), rows in groups.items():
+            try:
+                written += self._insert_rows(table, columns, rows)
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                self.logger.warning(f"Database unavailable, spooling {len(rows)} {table} rows: {e}")
+                self._spool([(table, row) for row in rows])
+            except psycopg2.Error as e:
+                # A bad row (e.g. FK to a deleted ticket) must not sink the whole batch
+                self.logger.warning(f"Batch insert into {table} failed, retrying row by row: {e}")
+                written += self._insert_individually(table, columns, rows)
+        return written
+
+    def _insert_rows(self, table: str, columns: Tuple[str, ...], rows: List[Dict]) -> int:
+        values = [tuple(self._adapt(row.get(col)) for col in columns) for row in rows]
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s"
+
+        with self.db.get_connection() as conn:
+            with conn.cursor() as cur:
+                execute_values(cur, query, values, page_size=self.batch_size)
+            conn.commit()
+        return len(rows)
+
+    def _insert_individually(self, table: str, columns: Tuple[str, ...], rows: List[Dict]) -> int:
+        written = 0
+        for row in rows:
+            try:
+                written += self._insert_rows(table, columns, [row])
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                self._spool([(table, row)])
+            except psycopg2.Error as e:
+                self.logger.error(f"Dropping invalid {table} audit row: {e}")
+        return written
+
+    def _spool(self, items: List[Tuple[str, Dict]]) -> None:
+        try:
+            with self._spool_lock:
+                with open(self.spool_path, 'a', encoding='utf-8') as f:
+                    for table, row in items:
+                        f.write(json.dumps({'table': table, 'row': row}, default=self._json_default) + '\n')
+        except Exception as e:
+            self.logger.error(f"Failed to spool {len(items)} audit rows: {e}")
+
+    def _replay_spool(self) -> None:
+        """Move the spool aside and re-insert its rows"""
+        self._next_replay_at = time.monotonic() + self.SPOOL_RETRY_SECONDS
+        replay_path = self.spool_path + '.replay'
+
+        with self._spool_lock:
+            # A leftover .replay file means a previous replay was interrupted;
+            # merge the current spool into it instead of overwriting it
+            if os.path.exists(self.spool_path):
+                with open(self.spool_path, 'r', encoding='utf-8') as src, \
+                        open(replay_path, 'a', encoding='utf-8') as dst:
+                    dst.write(src.read())
+                os.remove(self.spool_path)
+
+        if not os.path.exists(replay_path):
+            return
+
+        # Byte offset of each line, so the file can be cut back as batches commit
+        items, offsets = [], []
+        with open(replay_path, 'rb') as f:
+            offset = 0
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    items.append((entry['table'], entry['row']))
+                    offsets.append(offset)
+                except (ValueError, KeyError):
+                    self.logger.warning("Skipping corrupt audit spool line")
+                offset += len(line)
+
+        # Work from the end of the file and truncate after each batch, so the
+        # file only ever holds rows not yet written or re-spooled; a crash or
+        # error part-way leaves the rest for the next replay. Rows that still
+        # cannot be written go back to the spool.
+        with open(replay_path, 'r+b') as f:
+            for end in range(len(items), 0, -self.batch_size):
+                start = max(end - self.batch_size, 0)
+                self._write(items[start:end])
+                f.truncate(offsets[start])
+                f.flush()
+                os.fsync(f.fileno())
+        os.remove(replay_path)
+
+        if items:
+            self.logger.info(f"Replayed {len(items)} spooled audit rows")
+
+    @staticmethod
+    def _adapt(value):
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, default=AuditWriter._json_default)
+        return value
+
+    @staticmethod
+    def _json_default(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, (UUID, Decimal)):
+            return str(value)
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def write_audit_row(table: str, row: Dict[str, Any], db_manager=None) -> None:
+    """Queue an audit row on the app's writer, or insert synchronously outside an app"""
+    from flask import current_app, has_app_context
+
+    writer = getattr(current_app, 'audit_writer', None) if has_app_context() else None
+    if writer is not None:
+        writer.enqueue(table, row)
+        return
+
+    db = db_manager or (current_app.db_manager if has_app_context() else None)
+    if db is None:
+        raise RuntimeError("No audit writer or database manager available")
+    db.execute_insert(table, row)
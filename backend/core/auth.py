@@ -7,17 +7,109 @@ Handles JWT tokens, password hashing, and user authentication
 
 import bcrypt
 import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from flask_jwt_extended import create_access_token, create_refresh_token
-from typing import Dict, Optional, List
+from flask_jwt_extended import JWTManager, create_access_token, create_refresh_token
+from typing import Any, Dict, Optional, List
 import logging
 
+
+class LRUCache:
+    """Small thread-safe LRU cache with optional per-entry TTL"""
+
+    def __init__(self, max_size: int = 4096, ttl_seconds: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, stored_at = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CachingJWTManager(JWTManager):
+    """JWTManager that memoizes verified token payloads
+
+    A request used to decode the same JWT several times (before_request plus
+    every stacked @jwt_required). Verified payloads are cached by the exact
+    encoded token string, and expiry is still checked on every hit.
+    """
+
+    def __init__(self, app=None, cache_size: int = 4096, add_context_processor: bool = False):
+        self._token_cache = LRUCache(max_size=cache_size)
+        super().__init__(app, add_context_processor=add_context_processor)
+
+    def _decode_jwt_from_config(self, encoded_token: str, csrf_value=None, allow_expired: bool = False) -> dict:
+        if csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        cached = self._token_cache.get(encoded_token)
+        if cached is not None:
+            exp = cached.get('exp')
+            if exp is None or exp > time.time():
+                return dict(cached)
+            self._token_cache.pop(encoded_token)
+
+        decoded = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        self._token_cache.set(encoded_token, decoded)
+        return dict(decoded)
+
 class AuthManager:
     """Centralized authentication management"""
     
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, principal_cache_size: int = 4096):
         self.db = db_manager
         self.logger = logging.getLogger(__name__)
+        self.principal_cache = LRUCache(max_size=principal_cache_size, ttl_seconds=3600)
+
+    def resolve_principal(self, user_id: str, claims: Dict) -> Dict:
+        """Resolve the request principal (role, client, sites) from verified JWT claims
+
+        Cached per token id (jti) so repeated requests with the same token reuse
+        the same principal dict.
+        """
+        cache_key = claims.get('jti') or f"{user_id}:{claims.get('iat')}"
+        principal = self.principal_cache.get(cache_key)
+        if principal is None:
+            principal = {
+                'user_id': user_id,
+                'role': claims.get('role'),
+                'client_id': claims.get('client_id'),
+                'site_ids': list(claims.get('site_ids') or []),
+                'name': claims.get('name'),
+                'email': claims.get('email')
+            }
+            self.principal_cache.set(cache_key, principal)
+        return principal
     
     def hash_password(self, password: str) -> str:
         """Hash a password using bcrypt"""
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Helpdesk V3 - Conditional GET
+ETag/Last-Modified handling for read endpoints, driven by cheap version keys
+(see migrations/add_change_counters.sql), with optional Redis body caching
+per RBAC scope
+"""
+
+import os
+import time
+import hashlib
+import logging
+from functools import wraps
+from collections import namedtuple
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+from flask import current_app, g, request
+from flask_jwt_extended import get_jwt, get_jwt_identity
+
+logger = logging.getLogger(__name__)
+
+CLIENT_ROLES = ('client_admin', 'solicitante')
+RESPONSE_CACHE_PREFIX = 'lanet:response:'
+# Lifetime of rendered bodies in Redis for endpoints that opt in; 0 disables
+RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', '300'))
+
+# A version key plus, when known, the time of the last change behind it
+Version = namedtuple('Version', ['key', 'last_modified'])
+
+
+def _principal() -> dict:
+    principal = getattr(g, 'principal', None)
+    if principal is not None:
+        return principal
+    claims = get_jwt()
+    return {'user_id': get_jwt_identity(), 'role': claims.get('role'),
+            'client_id': claims.get('client_id'), 'site_ids': claims.get('site_ids', [])}
+
+
+def rbac_scope(per_user: bool = False) -> str:
+    """What the caller may see: role, client and sites (and the user, if the view is personal)"""
+    principal = _principal()
+    parts = [principal.get('role') or '', str(principal.get('client_id') or ''),
+             ','.join(sorted(str(site) for site in principal.get('site_ids') or []))]
+    if per_user:
+        parts.append(str(principal.get('user_id') or ''))
+    return '|'.join(parts)
+
+
+def change_version(*resources: str, bucket_seconds: Optional[int] = None) -> Optional[Version]:
+    """Version of ``resources`` as visible to the caller
+
+    Client users get the counters of their own client, staff the sum over
+    all clients. ``bucket_seconds`` adds a time_bucket for views with
+    time-relative content. None when the counters are unavailable
+    (migration not applied), in which case the endpoint simply runs.
+    """
+    principal = _principal()
+    client_id = principal.get('client_id') if principal.get('role') in CLIENT_ROLES else None
+    query = """
+    SELECT resource, COALESCE(SUM(version), 0) AS version, MAX(updated_at) AS updated_at
+    FROM change_counters
+    WHERE resource = ANY(%s)
+    """ + (" AND client_id = %s" if client_id else "") + " GROUP BY resource"
+    params = (list(resources), client_id) if client_id else (list(resources),)
+
+    try:
+        rows = {row['resource']: row for row in current_app.db_manager.execute_query(query, params) or []}
+    except Exception as e:
+        logger.warning(f"Change counters unavailable: {e}")
+        return None
+
+    key = tuple(int(rows[name]['version']) if name in rows else 0 for name in resources)
+    if bucket_seconds:
+        # Last-Modified cannot express "stale after a while", so it is left out
+        return Version(key + (time_bucket(bucket_seconds),), None)
+    stamps = [row['updated_at'] for row in rows.values() if row['updated_at']]
+    return Version(key, max(stamps) if stamps else None)
+
+
+def time_bucket(seconds: int) -> int:
+    """Version component for views with time-relative content ("last 24h", "overdue")"""
+    return int(time.time() // seconds)
+
+
+def _not_modified(etag: str, last_modified: Optional[datetime]):
+    response = current_app.response_class(status=304)
+    return _with_validators(response, etag, last_modified)
+
+
+def _with_validators(response, etag: str, last_modified: Optional[datetime]):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Authorization')
+    return response
+
+
+def _unchanged_since(last_modified: Optional[datetime]) -> bool:
+    """If-Modified-Since check, at whole-second resolution as sent by clients
+
+    A change in the current second could still follow, so only versions at
+    least a second old are trusted.
+    """
+    since = request.if_modified_since
+    if since is None or last_modified is None or request.if_none_match:
+        return False
+    last_modified = last_modified.astimezone(timezone.utc).replace(microsecond=0)
+    return last_modified <= since and (datetime.now(timezone.utc) - last_modified).total_seconds() >= 1
+
+
+def conditional_get(version: Callable[..., Any], cache_ttl: int = 0, per_user: bool = False):
+    """Answer GETs with 304 when ``version`` says nothing changed
+
+    ``version`` receives the view's arguments and returns a cheap key (a
+    Version from change_version, or any repr-able value; None disables the
+    check for that request). The ETag hashes endpoint, path arguments,
+    query string, RBAC scope and key, so it is computed before the view runs
+    and never shared across tenants or resources. With ``cache_ttl`` and Redis, rendered 200 bodies are
+    stored under the ETag and served without calling the view. When no key
+    is available the ETag falls back to a hash of the rendered body.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if request.method != 'GET':
+                return f(*args, **kwargs)
+
+            try:
+                key = version(*args, **kwargs)
+            except Exception as e:
+                logger.warning(f"Version key failed for {request.endpoint}: {e}")
+                key = None
+
+            if key is None:
+                response = current_app.make_response(f(*args, **kwargs))
+                if response.status_code != 200 or response.direct_passthrough:
+                    return response
+                etag = hashlib.sha1(response.get_data()).hexdigest()
+                if request.if_none_match.contains(etag):
+                    return _not_modified(etag, None)
+                return _with_validators(response, etag, None)
+
+            last_modified = key.last_modified if isinstance(key, Version) else None
+            etag = hashlib.sha1(repr((
+                request.endpoint, sorted((request.view_args or {}).items()),
+                sorted(request.args.items(multi=True)), rbac_scope(per_user), key
+            )).encode('utf-8')).hexdigest()
+
+            if request.if_none_match.contains(etag) or _unchanged_since(last_modified):
+                return _not_modified(etag, last_modified)
+
+            redis_client = getattr(current_app, 'redis_client', None) if cache_ttl else None
+            if redis_client is not None:
+                try:
+                    body = redis_client.get(RESPONSE_CACHE_PREFIX + etag)
+                except Exception as e:
+                    logger.warning(f"Response cache read failed: {e}")
+                    body = None
+                if body is not None:
+                    response = current_app.response_class(body, mimetype='application/json')
+                    response.headers['X-Cache'] = 'HIT'
+                    return _with_validators(response, etag, last_modified)
+
+            response = current_app.make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            if redis_client is not None:
+                try:
+                    redis_client.setex(RESPONSE_CACHE_PREFIX + etag, cache_ttl, response.get_data())
+                except Exception as e:
+                    logger.warning(f"Response cache write failed: {e}")
+            return _with_validators(response, etag, last_modified)
+
+        return decorated_function
+    return decorator
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Helpdesk V3 - Configuration Cache
+Process-wide TTL cache for system_config and email_configurations with
+Redis pub/sub invalidation across workers
+"""
+
+import time
+import logging
+import threading
+from typing import Dict, List, Optional
+
+class ConfigCache:
+    """Caches configuration lookups that hot paths used to query on every call
+
+    - system_config is loaded as a whole table in one round trip and served
+      from memory until the TTL expires or it is invalidated.
+    - email_configurations rows are cached by config_id plus the default one.
+    - Decrypted secrets (SMTP/IMAP passwords) are memoized in process memory
+      only; they are never written to Redis or the database.
+
+    ``invalidate`` clears the local copy and publishes on a Redis channel so
+    every other worker drops its copy too.
+    """
+
+    SECTIONS = ('system', 'email', 'secrets')
+
+    def __init__(self, db_manager, redis_client=None, ttl_seconds: int = 60,
+                 channel: str = 'lanet:config:invalidate'):
+        self.db = db_manager
+        self.redis = redis_client
+        self.ttl = ttl_seconds
+        self.channel = channel
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.RLock()
+        self._system: Optional[Dict[str, str]] = None
+        self._system_loaded_at = 0.0
+        self._email: Dict[str, Dict] = {}
+        self._email_loaded_at: Dict[str, float] = {}
+        self._secrets: Dict[str, str] = {}
+        self._listener = None
+
+        if self.redis is not None:
+            self._start_listener()
+
+    # ------------------------------------------------------------------
+    # system_config
+    # ------------------------------------------------------------------
+
+    def get_system_config(self, config_key: str, default_value: str = None) -> Optional[str]:
+        """Get a raw system_config value"""
+        return self._get_system_table().get(config_key, default_value)
+
+    def get_system_int(self, config_key: str, default_value: int) -> int:
+        """Get a system_config value as int"""
+        value = self.get_system_config(config_key)
+        try:
+            return int(value) if value is not None else default_value
+        except (TypeError, ValueError):
+            return default_value
+
+    def get_system_bool(self, config_key: str, default_value: bool = False) -> bool:
+        """Get a system_config value as bool ('true'/'1'/'yes')"""
+        value = self.get_system_config(config_key)
+        if value is None:
+            return default_value
+        return str(value).strip().lower() in ('true', '1', 'yes', 'on')
+
+    def get_system_list(self, config_key: str, default_value: List[str] = None, separator: str = ',') -> List[str]:
+        """Get a comma-separated system_config value as a list"""
+        value = self.get_system_config(config_key)
+        if value is None:
+            return list(default_value or [])
+        return [item.strip() for item in str(value).split(separator) if item.strip()]
+
+    def get_system_prefix(self, prefix: str, strip_prefix: bool = True) -> Dict[str, str]:
+        """Get all system_config entries whose key starts with prefix"""
+        table = self._get_system_table()
+        return {
+            (key[len(prefix):] if strip_prefix else key): value
+            for key, value in table.items()
+            if key.startswith(prefix)
+        }
+
+    def _get_system_table(self) -> Dict[str, str]:
+        with self._lock:
+            if self._system is not None and time.monotonic() - self._system_loaded_at < self.ttl:
+                return self._system
+
+        rows = self.db.execute_query("SELECT config_key, config_value FROM system_config") or []
+        table = {row['config_key']: row['config_value'] for row in rows}
+
+        with self._lock:
+            self._system = table
+            self._system_loaded_at = time.monotonic()
+        return table
+
+    # ------------------------------------------------------------------
+    # email_configurations
+    # ------------------------------------------------------------------
+
+    def get_email_config(self, config_id: str = None) -> Optional[Dict]:
+        """Get an active email configuration by id, or the default one"""
+        cache_key = str(config_id) if config_id else 'default'
+
+        with self._lock:
+            loaded_at = self._email_loaded_at.get(cache_key)
+            if loaded_at is not None and time.monotonic() - loaded_at < self.ttl:
+                config = self._email.get(cache_key)
+                return dict(config) if config else None
+
+        if config_id:
+            config = self.db.execute_query(
+                "SELECT * FROM email_configurations WHERE config_id = %s AND is_active = true",
+                (config_id,),
+                fetch='one'
+            )
+        else:
+            config = self.db.execute_query(
+                """
+                SELECT * FROM email_configurations
+                WHERE is_default = true AND is_active = true
+                LIMIT 1
+                """,
+                fetch='one'
+            )
+
+        with self._lock:
+            self._email[cache_key] = dict(config) if config else None
+            self._email_loaded_at[cache_key] = time.monotonic()
+        return dict(config) if config else None
+
+    # ------------------------------------------------------------------
+    # Secrets
+    # ------------------------------------------------------------------
+
+    def get_secret(self, encrypted_value: str) -> str:
+        """Decrypt a stored secret once per process and keep the plaintext in memory"""
+        if not encrypted_value:
+            return ''
+
+        with self._lock:
+            if encrypted_value in self._secrets:
+                return self._secrets[encrypted_value]
+
+        from utils.security import SecurityUtils
+        plaintext = SecurityUtils.decrypt_password(encrypted_value)
+
+        with self._lock:
+            self._secrets[encrypted_value] = plaintext
+        return plaintext
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+
+    def invalidate(self, section: str = None, publish: bool = True) -> None:
+        """Drop cached entries locally (section: 'system', 'email', 'secrets' or all)"""
+        self._clear(section)
+
+        if publish and self.redis is not None:
+            try:
+                self.redis.publish(self.channel, section or 'all')
+            except Exception as e:
+                self.logger.warning(f"Config invalidation publish failed: {e}")
+
+    def _clear(self, section: str = None) -> None:
+        with self._lock:
+            if section in (None, 'all', 'system'):
+                self._system = None
+                self._system_loaded_at = 0.0
+            if section in (None, 'all', 'email'):
+                self._email.clear()
+                self._email_loaded_at.clear()
+                # Rotated passwords arrive with email config changes
+                self._secrets.clear()
+            if section == 'secrets':
+                self._secrets.clear()
+
+    def _start_listener(self) -> None:
+        """Subscribe to invalidation messages published by other workers"""
+        def handle_message(message):
+            data = message.get('data')
+            if isinstance(data, bytes):
+                data = data.decode('utf-8', errors='ignore')
+            self._clear(data if data in self.SECTIONS else None)
+
+        try:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{self.channel: handle_message})
+            self._listener = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        except Exception as e:
+            self.logger.warning(f"Config invalidation listener not started: {e}")
+            self._listener = None
+
+    def close(self) -> None:
+        """Stop the Redis listener thread"""
+        if self._listener is not None:
+            try:
+                self._listener.stop()
+            except Exception:
+                pass
+            self._listener = None
+
+
+def get_config_cache() -> Optional[ConfigCache]:
+    """Return the current app's ConfigCache, if one is configured"""
+    from flask import current_app, has_app_context
+
+    if not has_app_context():
+        return None
+    return getattr(current_app, 'config_cache', None)
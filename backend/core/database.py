@@ -6,19 +6,33 @@ Handles PostgreSQL connections, RLS context, and query execution
 """
 
 import psycopg2
+from psycopg2.extensions import cursor as TupleCursor
 from psycopg2.extras import RealDictCursor, Json
-from psycopg2.pool import ThreadedConnectionPool
+from psycopg2.pool import ThreadedConnectionPool, PoolError
 from contextlib import contextmanager
 import logging
-from typing import Dict, List, Any, Optional, Union
+import threading
+import time
+from typing import Dict, Iterator, List, Any, Optional, Tuple, Union
 import uuid
 
+from core.metrics import metrics, observe_query, POOL_WAIT, POOL_EXHAUSTED
+
+
 class DatabaseManager:
     """Centralized database management with RLS support"""
+
+    # Slow-query profiler (core.query_profiler.QueryProfiler), set by the app when enabled
+    profiler = None
     
     def __init__(self, database_url: str, min_connections: int = 1, max_connections: int = 20):
         self.database_url = database_url
         self.logger = logging.getLogger(__name__)
+
+        # Pending RLS context for the current request thread, applied lazily on
+        # the first connection checkout (see defer_rls_context)
+        self._local = threading.local()
+        self._rls_applied = {}
         
         try:
             # Create connection pool
@@ -38,7 +52,17 @@ class DatabaseManager:
         """Get a database connection from the pool"""
         conn = None
         try:
-            conn = self.pool.getconn()
+            if metrics.enabled:
+                started = time.perf_counter()
+                try:
+                    conn = self.pool.getconn()
+                except PoolError:
+                    POOL_EXHAUSTED.inc()
+                    raise
+                POOL_WAIT.observe(time.perf_counter() - started)
+            else:
+                conn = self.pool.getconn()
+            self._apply_pending_rls_context(conn)
             yield conn
         except Exception as e:
             if conn:
@@ -48,40 +72,104 @@ class DatabaseManager:
         finally:
             if conn:
                 self.pool.putconn(conn)
-    
+
+    @contextmanager
+    def _timed(self, query: str, params: Any = None, explainable: bool = False):
+        """Feed query metrics and the slow-query profiler while either is enabled"""
+        profiler = self.profiler
+        if not metrics.enabled and profiler is None:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            if metrics.enabled:
+                observe_query(query, started, failed=True)
+            raise
+        if metrics.enabled:
+            observe_query(query, started)
+        if profiler is not None:
+            profiler.observe(query, params, time.perf_counter() - started, explainable,
+                             getattr(self._local, 'rls_context', None))
+
+    def defer_rls_context(self, user_id: str, user_role: str, client_id: str = None, site_ids: List[str] = None):
+        """Record the RLS context for this request thread without touching the database
+
+        The context is applied on the first connection checkout that needs it, in
+        a single round trip, and skipped when the pooled connection already
+        carries the same context.
+        """
+        site_ids_str = ','.join(str(sid) for sid in site_ids) if site_ids else None
+        self._local.rls_context = (
+            str(user_id),
+            user_role,
+            str(client_id) if client_id else None,
+            site_ids_str
+        )
+
+    def clear_rls_context(self):
+        """Forget the pending RLS context for this request thread"""
+        self._local.rls_context = None
+
+    def _apply_pending_rls_context(self, conn):
+        context = getattr(self._local, 'rls_context', None)
+        if not context:
+            return
+
+        # Backend PID guards against a replaced connection reusing the same id()
+        marker = (conn.get_backend_pid(), context)
+        if self._rls_applied.get(id(conn)) == marker:
+            return
+
+        self._apply_rls_context(conn, *context)
+        self._rls_applied[id(conn)] = marker
+
+    def _apply_rls_context(self, conn, user_id: str, user_role: str, client_id: str = None, site_ids_str: str = None):
+        """Set all RLS session variables on a connection in one statement"""
+        settings = [('app.current_user_id', user_id), ('app.current_user_role', user_role)]
+        if client_id:
+            settings.append(('app.current_user_client_id', client_id))
+        if site_ids_str:
+            settings.append(('app.current_user_site_ids', site_ids_str))
+
+        query = "SELECT " + ", ".join("set_config(%s, %s, false)" for _ in settings)
+        params = tuple(value for pair in settings for value in pair)
+
+        with conn.cursor() as cur:
+            cur.execute(query, params)
+        conn.commit()
+
     def set_rls_context(self, user_id: str, user_role: str, client_id: str = None, site_ids: List[str] = None):
         """Set RLS context for the current session"""
         try:
-            with self.get_connection() as conn:
-                with conn.cursor() as cur:
-                    # Set user context
-                    cur.execute("SELECT set_config('app.current_user_id', %s, false)", (str(user_id),))
-                    cur.execute("SELECT set_config('app.current_user_role', %s, false)", (user_role,))
-                    
-                    # Set client context if provided
-                    if client_id:
-                        cur.execute("SELECT set_config('app.current_user_client_id', %s, false)", (str(client_id),))
-                    
-                    # Set site context if provided
-                    if site_ids:
-                        site_ids_str = ','.join(str(sid) for sid in site_ids)
-                        cur.execute("SELECT set_config('app.current_user_site_ids', %s, false)", (site_ids_str,))
-                    
-                    conn.commit()
-                    
+            self.defer_rls_context(user_id, user_role, client_id, site_ids)
+            with self.get_connection():
+                # Checking out a connection applies the pending context
+                pass
+
         except Exception as e:
             self.logger.error(f"Failed to set RLS context: {e}")
             raise
     
-    def execute_query(self, query: str, params: tuple = None, fetch: str = 'all') -> Union[List[Dict], Dict, None]:
-        """Execute a query and return results"""
+    def execute_query(self, query: str, params: tuple = None, fetch: str = 'all',
+                      commit: bool = None) -> Union[List[Dict], Dict, None]:
+        """Execute a query and return results
+
+        INSERT/UPDATE/DELETE statements are committed automatically; pass
+        commit=True for other statements with side effects (e.g. SELECT of a
+        function that writes).
+        """
         try:
-            with self.get_connection() as conn:
+            with self._timed(query, params, explainable=commit is not True), self.get_connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute(query, params)
 
                     # Check if this is a modifying query (INSERT, UPDATE, DELETE)
-                    is_modifying = query.strip().upper().startswith(('INSERT', 'UPDATE', 'DELETE'))
+                    if commit is None:
+                        is_modifying = query.strip().upper().startswith(('INSERT', 'UPDATE', 'DELETE'))
+                    else:
+                        is_modifying = commit
 
                     if fetch == 'all':
                         result = cur.fetchall()
@@ -103,6 +191,39 @@ class DatabaseManager:
             self.logger.error(f"Query execution failed: {query[:100]}... Error: {e}")
             raise
     
+    def execute_rows(self, query: str, params: tuple = None) -> Tuple[List[str], List[tuple]]:
+        """Run a SELECT and return (column names, row tuples)
+
+        Skips the dict per row of the default cursor; turn rows into response
+        dicts with core.serialization.project_rows.
+        """
+        try:
+            with self._timed(query, params, explainable=True), self.get_connection() as conn:
+                with conn.cursor(cursor_factory=TupleCursor) as cur:
+                    cur.execute(query, params)
+                    return [column.name for column in cur.description], cur.fetchall()
+
+        except Exception as e:
+            self.logger.error(f"Query execution failed: {query[:100]}... Error: {e}")
+            raise
+
+    def iter_query(self, query: str, params: tuple = None, batch_size: int = 1000) -> Iterator[Dict]:
+        """Yield the rows of a SELECT without loading the whole result
+
+        Rows come from a server-side cursor, batch_size per round trip. The
+        pooled connection is held until the iterator is exhausted or closed.
+        """
+        with self.get_connection() as conn:
+            try:
+                with conn.cursor(name=f"iter_{uuid.uuid4().hex}") as cur:
+                    cur.itersize = batch_size
+                    cur.execute(query, params)
+                    for row in cur:
+                        yield row
+            finally:
+                # Ends the read-only transaction the named cursor lived in
+                conn.rollback()
+
     def execute_insert(self, table: str, data: Dict[str, Any], returning: str = None) -> Optional[Dict]:
         """Execute an INSERT statement"""
         try:
@@ -116,7 +237,7 @@ class DatabaseManager:
             if returning:
                 query += f" RETURNING {returning}"
             
-            with self.get_connection() as conn:
+            with self._timed(query, values), self.get_connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute(query, values)
                     
@@ -146,7 +267,7 @@ class DatabaseManager:
             if where_params:
                 values.extend(where_params)
             
-            with self.get_connection() as conn:
+            with self._timed(query, values), self.get_connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute(query, values)
                     rows_affected = cur.rowcount
@@ -162,7 +283,7 @@ class DatabaseManager:
         try:
             query = f"DELETE FROM {table} WHERE {where_clause}"
             
-            with self.get_connection() as conn:
+            with self._timed(query, where_params), self.get_connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute(query, where_params)
                     rows_affected = cur.rowcount
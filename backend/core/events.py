@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Helpdesk V3 - Real-time Events
+Fans realtime_events rows (see migrations/add_realtime_events.sql) out to
+Server-Sent Events subscribers, filtered per client/site
+"""
+
+import time
+import queue
+import atexit
+import select
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from core.serialization import encode
+
+EVENT_CHANNEL = 'lanet_events'
+STAFF_ROLES = ('superadmin', 'admin', 'technician')
+CLIENT_ROLES = ('client_admin', 'solicitante')
+EVENT_COLUMNS = "event_id, event_type, client_id, site_id, staff_only, payload, created_at"
+
+
+def event_visible(event: Dict, principal: Dict) -> bool:
+    """Staff see everything; client users see non-internal events of their client
+    (solicitantes only those of their sites)"""
+    role = principal.get('role')
+    if role in STAFF_ROLES:
+        return True
+    if role not in CLIENT_ROLES or event['staff_only']:
+        return False
+    if str(event['client_id']) != str(principal.get('client_id')):
+        return False
+    if role == 'solicitante' and event['site_id'] is not None:
+        return str(event['site_id']) in {str(site) for site in principal.get('site_ids') or []}
+    return True
+
+
+def format_sse(event: Dict) -> bytes:
+    """One Server-Sent Events message; the id lets EventSource resume with Last-Event-ID"""
+    data = encode({
+        'event_id': event['event_id'],
+        'type': event['event_type'],
+        'client_id': event['client_id'],
+        'site_id': event['site_id'],
+        'payload': event['payload'],
+        'created_at': event['created_at']
+    })
+    return b'id: %d\nevent: %s\ndata: %s\n\n' % (event['event_id'], event['event_type'].encode('utf-8'), data)
+
+
+class Subscription:
+    """Bounded queue of the events one stream may see
+
+    A subscriber that falls behind is marked overflowed instead of blocking
+    the broker; its stream ends and the client resumes from its last id.
+    """
+
+    def __init__(self, principal: Dict, max_queue_size: int = 1000):
+        self.principal = principal
+        self.overflowed = False
+        self._queue = queue.Queue(maxsize=max_queue_size)
+
+    def offer(self, event: Dict) -> None:
+        if self.overflowed or not event_visible(event, self.principal):
+            return
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout: float) -> Optional[Dict]:
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBroker:
+    """One LISTEN connection per process, shared by all subscribers
+
+    NOTIFY lanet_events carries only the event id and is delivered on
+    commit, in commit order; the listener loads the rows of each wake-up in
+    one query and hands them to every subscription. After a lost connection
+    it catches up from the table. Streams replay missed events from the
+    table (replay) before switching to live ones.
+
+    Ids come from a sequence and are taken at insert, not at commit, so a
+    long transaction can commit event 104 after 105 was streamed. Catch-up
+    and replay therefore also cover the last ``lookback_seconds`` of events
+    below the resume id; the broker drops ids it already published and
+    clients de-duplicate by event_id.
+    """
+
+    def __init__(self, database_url: str, db_manager, replay_limit: int = 1000,
+                 max_queue_size: int = 1000, retention_hours: int = 24, prune_interval: float = 3600.0,
+                 lookback_seconds: int = 300, recent_ids_size: int = 10000,
+                 max_subscribers: Optional[int] = None):
+        self.database_url = database_url
+        self.db = db_manager
+        self.replay_limit = replay_limit
+        self.max_queue_size = max_queue_size
+        self.retention_hours = retention_hours
+        self.prune_interval = prune_interval
+        self.lookback_seconds = lookback_seconds
+        self.recent_ids_size = recent_ids_size
+        self.max_subscribers = max_subscribers
+        self.logger = logging.getLogger(__name__)
+
+        self._subscriptions = set()
+        self._recent_ids = OrderedDict()
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._last_id = None
+        self._next_prune_at = 0.0
+
+    def subscribe(self, principal: Dict) -> Optional[Subscription]:
+        """New subscription, or None when max_subscribers streams are already open
+
+        Each stream holds a worker thread while it is open, so the cap keeps
+        threads free for the REST API.
+        """
+        self._ensure_started()
+        subscription = Subscription(principal, self.max_queue_size)
+        with self._lock:
+            if self.max_subscribers is not None and len(self._subscriptions) >= self.max_subscribers:
+                return None
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def publish(self, events: List[Dict]) -> None:
+        """Hand events (realtime_events rows) not published before to every subscription"""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            fresh = []
+            for event in events:
+                if event['event_id'] in self._recent_ids:
+                    continue
+                self._recent_ids[event['event_id']] = None
+                fresh.append(event)
+            while len(self._recent_ids) > self.recent_ids_size:
+                self._recent_ids.popitem(last=False)
+
+        for event in fresh:
+            for subscription in subscriptions:
+                subscription.offer(event)
+        if fresh:
+            self._last_id = max([self._last_id or 0] + [event['event_id'] for event in fresh])
+
+    def replay(self, principal: Dict, last_event_id: int) -> Tuple[List[Dict], bool]:
+        """Events after last_event_id visible to principal, and whether that is all of them
+
+        Also returns the events of the look-back window below last_event_id,
+        which may have committed after it; callers skip ids already seen.
+        Not complete when more than replay_limit events are pending or the
+        ones right after last_event_id were already pruned; the client then
+        reloads its views instead of applying increments.
+        """
+        conditions = ["(event_id > %s OR created_at > NOW() - make_interval(secs => %s))"]
+        params: list = [last_event_id, self.lookback_seconds]
+        role = principal.get('role')
+        if role not in STAFF_ROLES:
+            conditions.append("NOT staff_only AND client_id = %s")
+            params.append(principal.get('client_id'))
+            if role == 'solicitante':
+                conditions.append("(site_id IS NULL OR site_id::text = ANY(%s))")
+                params.append([str(site) for site in principal.get('site_ids') or []])
+
+        query = f"""
+        SELECT {EVENT_COLUMNS}, (SELECT MIN(event_id) FROM realtime_events) AS oldest_event_id
+        FROM realtime_events
+        WHERE {' AND '.join(conditions)}
+        ORDER BY event_id
+        LIMIT %s
+        """
+        params.append(self.replay_limit + 1)
+        rows = self.db.execute_query(query, tuple(params)) or []
+
+        events = [row for row in rows if event_visible(row, principal)][:self.replay_limit]
+        if len(rows) > self.replay_limit:
+            return events, False
+        if rows:
+            oldest = rows[0]['oldest_event_id']
+        else:
+            oldest = (self.db.execute_query(
+                "SELECT MIN(event_id) AS oldest_event_id FROM realtime_events", fetch='one'
+            ) or {}).get('oldest_event_id')
+        return events, oldest is None or oldest <= last_event_id + 1
+
+    def latest_event_id(self) -> int:
+        row = self.db.execute_query("SELECT COALESCE(MAX(event_id), 0) AS last_id FROM realtime_events", fetch='one')
+        return row['last_id'] if row else 0
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        atexit.unregister(self.shutdown)
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def _ensure_started(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name='event-broker', daemon=True)
+            self._thread.start()
+            atexit.register(self.shutdown)
+
+    def _run(self):
+        backoff = 1.0
+        while not self._stop_event.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(self.database_url, cursor_factory=RealDictCursor)
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {EVENT_CHANNEL}")
+                self._catch_up(conn)
+                backoff = 1.0
+                self._listen(conn)
+            except Exception as e:
+                self.logger.error(f"Event listener error, reconnecting in {backoff:.0f}s: {e}")
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+    def _catch_up(self, conn):
+        """Publish what was written while not listening (nothing on first start)"""
+        with conn.cursor() as cur:
+            if self._last_id is None:
+                cur.execute("SELECT COALESCE(MAX(event_id), 0) AS last_id FROM realtime_events")
+                self._last_id = cur.fetchone()['last_id']
+                return
+            cur.execute(f"""
+                SELECT {EVENT_COLUMNS} FROM realtime_events
+                WHERE event_id > %s OR created_at > NOW() - make_interval(secs => %s)
+                ORDER BY event_id
+            """, (self._last_id, self.lookback_seconds))
+            self.publish(cur.fetchall())
+
+    def _listen(self, conn):
+        while not self._stop_event.is_set():
+            if time.monotonic() >= self._next_prune_at:
+                self._prune(conn)
+
+            if select.select([conn], [], [], 1.0) == ([], [], []):
+                continue
+            conn.poll()
+            event_ids = sorted({int(notify.payload) for notify in conn.notifies})
+            conn.notifies.clear()
+            if not event_ids:
+                continue
+
+            with conn.cursor() as cur:
+                cur.execute(f"SELECT {EVENT_COLUMNS} FROM realtime_events WHERE event_id = ANY(%s) ORDER BY event_id",
+                            (event_ids,))
+                self.publish(cur.fetchall())
+
+    def _prune(self, conn):
+        self._next_prune_at = time.monotonic() + self.prune_interval
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT prune_realtime_events(make_interval(hours => %s)) AS deleted",
+                            (self.retention_hours,))
+                deleted = cur.fetchone()['deleted']
+            if deleted:
+                self.logger.info(f"Pruned {deleted} realtime events")
+        except psycopg2.Error as e:
+            self.logger.warning(f"Realtime event pruning failed: {e}")
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Helpdesk V3 - Metrics
+In-process counters, gauges and histograms exported in the Prometheus text
+format at /metrics: request and query timings, connection pool usage, job
+stage durations and queue depths
+"""
+
+import os
+import re
+import time
+import logging
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from flask import Response, request
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+JOB_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0)
+
+# Label combinations kept per metric; further ones are folded into 'other'
+MAX_SERIES = 500
+
+FINGERPRINT_LENGTH = 120
+JOB_METRICS_KEY = 'lanet:metrics:job:{}'
+JOB_METRICS_TTL = 3600
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, documentation: str,
+                 labelnames: Sequence[str] = ()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Tuple[str, ...]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        if labels in self._series or len(self._series) < MAX_SERIES:
+            return labels
+        return ('other',) * len(labels)
+
+    def _labels(self, labels: Tuple[str, ...], extra: Sequence[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labelnames, labels)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = list(self._series.items())
+        for labels, value in sorted(series):
+            lines.extend(self._samples(labels, value))
+        return lines
+
+    def _samples(self, labels, value) -> List[str]:
+        return [f"{self.name}{self._labels(labels)} {_number(value)}"]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            key = self._key(labels)
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self._series[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            key = self._key(labels)
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts (+Inf last), sum, count
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels: str):
+        """Observe the duration of the block; a no-op while metrics are disabled"""
+        if not self.registry.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def _samples(self, labels, value) -> List[str]:
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += bucket_count
+            le = '+Inf' if bound == float('inf') else _number(bound)
+            lines.append(f"{self.name}_bucket{self._labels(labels, [('le', le)])} {cumulative}")
+        lines.append(f"{self.name}_sum{self._labels(labels)} {_number(total)}")
+        lines.append(f"{self.name}_count{self._labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide metric set
+
+    Instrumentation points check ``enabled`` before doing any work, so a
+    disabled registry costs one attribute lookup per call site. Collectors
+    run at scrape time to refresh gauges and may return extra exposition
+    text (e.g. metrics published by another process).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Optional[str]]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(self, name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(self, name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(self, name, documentation, labelnames, buckets))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def on_collect(self, collector: Callable[[], Optional[str]]):
+        self._collectors.append(collector)
+
+    def clear_collectors(self):
+        self._collectors = []
+
+    def render(self, metrics: Sequence[_Metric] = None, collect: bool = True) -> str:
+        """Exposition text for every metric with at least one sample"""
+        extra = []
+        if collect:
+            for collector in list(self._collectors):
+                try:
+                    text = collector()
+                    if text:
+                        extra.append(text.rstrip('\n'))
+                except Exception as e:
+                    logger.warning(f"Metrics collector failed: {e}")
+
+        lines = []
+        for metric in metrics or self._metrics:
+            if metric._series:
+                lines.extend(metric.render())
+        return '\n'.join(lines + extra) + '\n'
+
+
+metrics = MetricsRegistry()
+
+REQUEST_DURATION = metrics.histogram(
+    'lanet_http_request_duration_seconds', 'HTTP request duration by Flask endpoint',
+    ('endpoint', 'method', 'status'))
+QUERY_DURATION = metrics.histogram(
+    'lanet_db_query_duration_seconds', 'DatabaseManager statement duration by query fingerprint',
+    ('query',))
+QUERY_ERRORS = metrics.counter(
+    'lanet_db_query_errors_total', 'DatabaseManager statements that raised, by query fingerprint',
+    ('query',))
+POOL_WAIT = metrics.histogram(
+    'lanet_db_pool_wait_seconds', 'Time to check a connection out of the pool',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0))
+POOL_EXHAUSTED = metrics.counter(
+    'lanet_db_pool_exhausted_total', 'Checkouts refused because every pooled connection was in use')
+POOL_IN_USE = metrics.gauge('lanet_db_pool_connections_in_use', 'Pooled connections checked out')
+POOL_MAX = metrics.gauge('lanet_db_pool_connections_max', 'Pool size limit')
+QUEUE_DEPTH = metrics.gauge('lanet_queue_depth', 'Items waiting, by queue', ('queue',))
+JOB_STAGE_DURATION = metrics.histogram(
+    'lanet_job_stage_duration_seconds', 'Background job stage duration', ('job', 'stage'),
+    buckets=JOB_BUCKETS)
+JOB_RUNS = metrics.counter('lanet_job_runs_total', 'Background job runs by result', ('job', 'result'))
+
+JOB_METRICS = (JOB_STAGE_DURATION, JOB_RUNS)
+
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_VALUE_LISTS = re.compile(r'\?(?:\s*,\s*\?)+')
+_WHITESPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=2048)
+def normalize_query(query: str) -> str:
+    """Statement text with literals replaced by ? and whitespace collapsed
+
+    Inline literals (including those formatted into f-string queries) and
+    value lists of any length map to the same text.
+    """
+    text = _LITERALS.sub('?', query.replace('%s', '?'))
+    text = _VALUE_LISTS.sub('?', text)
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def query_fingerprint(query: str) -> str:
+    """normalize_query cut at FINGERPRINT_LENGTH characters, for metric labels"""
+    return normalize_query(query)[:FINGERPRINT_LENGTH]
+
+
+def observe_query(query: str, started: float, failed: bool = False):
+    """Record one DatabaseManager statement that started at perf_counter() ``started``"""
+    fingerprint = query_fingerprint(query)
+    QUERY_DURATION.observe(time.perf_counter() - started, fingerprint)
+    if failed:
+        QUERY_ERRORS.inc(fingerprint)
+
+
+class StageTimer:
+    """Times the consecutive stages of a background job
+
+    ``start`` closes the running stage and opens the next one, so a job only
+    needs one call per stage boundary plus ``finish`` at the end.
+    """
+
+    def __init__(self, job: str):
+        self.job = job
+        self._stage = None
+        self._started = 0.0
+
+    def start(self, stage: str):
+        self._close()
+        if metrics.enabled:
+            self._stage = stage
+            self._started = time.perf_counter()
+
+    def _close(self):
+        if self._stage is not None:
+            JOB_STAGE_DURATION.observe(time.perf_counter() - self._started, self.job, self._stage)
+            self._stage = None
+
+    def finish(self, result: str = 'success'):
+        self._close()
+        if metrics.enabled:
+            JOB_RUNS.inc(self.job, result)
+
+
+def publish_job_metrics(redis_client, job: str):
+    """Store this process's job metrics in Redis for the web workers' /metrics"""
+    if not metrics.enabled or redis_client is None:
+        return
+    try:
+        redis_client.setex(JOB_METRICS_KEY.format(job), JOB_METRICS_TTL,
+                           metrics.render(JOB_METRICS, collect=False))
+    except Exception as e:
+        logger.warning(f"Could not publish {job} metrics: {e}")
+
+
+def register_metrics(app, jobs: Sequence[str] = ('sla_monitor',)):
+    """Enable metrics from METRICS_ENABLED and expose them at /metrics
+
+    When METRICS_TOKEN is set, scrapes must send ``Authorization: Bearer <token>``.
+    Gauges are refreshed at scrape time from the app's pool, heartbeat cadence
+    controller, audit writer and email queue; job metrics are read from Redis.
+    """
+    metrics.enabled = os.getenv('METRICS_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    if not metrics.enabled:
+        return
+
+    token = os.getenv('METRICS_TOKEN')
+    metrics.clear_collectors()
+
+    def collect_pool():
+        pool = app.db_manager.pool
+        POOL_IN_USE.set(len(pool._used))
+        POOL_MAX.set(pool.maxconn)
+
+    def collect_queues():
+        QUEUE_DEPTH.set(app.cadence.in_flight, 'heartbeat_ingest')
+        QUEUE_DEPTH.set(app.audit_writer.backlog, 'audit_writer')
+        row = app.db_manager.execute_query(
+            "SELECT COUNT(*) AS count FROM email_queue WHERE status = 'pending'", fetch='one')
+        QUEUE_DEPTH.set(row['count'] if row else 0, 'email_queue')
+
+    def collect_jobs():
+        if app.redis_client is None:
+            return None
+        texts = app.redis_client.mget([JOB_METRICS_KEY.format(job) for job in jobs])
+        return '\n'.join(text.decode('utf-8') for text in texts if text)
+
+    metrics.on_collect(collect_pool)
+    metrics.on_collect(collect_queues)
+    metrics.on_collect(collect_jobs)
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        """Prometheus scrape endpoint (per worker process)"""
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            return app.response_manager.error('Unauthorized', 401)
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Helpdesk V3 - Request Middleware
+Lean per-request authentication context, sampled debug logging, timing and metrics
+"""
+
+import os
+import time
+import random
+import logging
+from flask import request, g
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
+
+from core.metrics import metrics, REQUEST_DURATION
+
+request_logger = logging.getLogger('lanet.requests')
+
+
+def register_request_hooks(app):
+    """Register before/after request hooks on the app
+
+    Per request this decodes the JWT once (verified payloads are memoized by
+    CachingJWTManager), resolves the principal through the AuthManager LRU and
+    only records the RLS context; the database is touched on first use.
+
+    Verbose request dumps go to the 'lanet.requests' logger at DEBUG level and
+    are sampled by REQUEST_DEBUG_SAMPLE_RATE (0.0 - 1.0, default 0).
+    """
+    request_logger.setLevel(os.getenv('REQUEST_LOG_LEVEL', 'INFO').upper())
+    debug_sample_rate = float(os.getenv('REQUEST_DEBUG_SAMPLE_RATE', '0'))
+
+    @app.before_request
+    def before_request():
+        """Set up request context and deferred RLS"""
+        g.start_time = time.perf_counter()
+
+        if debug_sample_rate > 0 and request_logger.isEnabledFor(logging.DEBUG) \
+                and random.random() < debug_sample_rate:
+            request_logger.debug(
+                "%s %s from %s (content-type=%s, content-length=%s, auth=%s)",
+                request.method, request.path, request.remote_addr,
+                request.content_type, request.content_length,
+                'yes' if request.headers.get('Authorization') else 'no'
+            )
+
+        # Skip RLS setup for auth endpoints
+        if request.endpoint and request.endpoint.startswith('auth.'):
+            return
+
+        # Set up principal and RLS context for authenticated requests
+        if not request.headers.get('Authorization'):
+            return
+
+        try:
+            verify_jwt_in_request()
+            user_id = get_jwt_identity()
+            claims = get_jwt()
+
+            if user_id and claims:
+                principal = app.auth_manager.resolve_principal(user_id, claims)
+
+                # Applied lazily by DatabaseManager on the first connection checkout
+                app.db_manager.defer_rls_context(
+                    user_id=principal['user_id'],
+                    user_role=principal['role'],
+                    client_id=principal['client_id'],
+                    site_ids=principal['site_ids']
+                )
+
+                # Store in g for easy access
+                g.principal = principal
+                g.current_user = principal
+                g.current_user_id = principal['user_id']
+                g.current_user_role = principal['role']
+                g.current_client_id = principal['client_id']
+                g.current_site_ids = principal['site_ids']
+
+        except Exception as e:
+            app.logger.warning(f"RLS context setup failed: {e}")
+
+    @app.after_request
+    def after_request(response):
+        """Log request and add security headers"""
+        # Add security headers
+        response.headers['X-Content-Type-Options'] = 'nosniff'
+        response.headers['X-Frame-Options'] = 'DENY'
+        response.headers['X-XSS-Protection'] = '1; mode=block'
+
+        # Log request
+        start_time = getattr(g, 'start_time', None)
+        if start_time is not None:
+            duration = time.perf_counter() - start_time
+            app.logger.info(f"{request.method} {request.path} - {response.status_code} - {duration:.3f}s")
+            if metrics.enabled:
+                REQUEST_DURATION.observe(duration, request.endpoint or 'unmatched',
+                                         request.method, str(response.status_code))
+
+        return response
+
+    @app.teardown_request
+    def teardown_request(error=None):
+        """Drop the pending RLS context so it never leaks into the next request"""
+        app.db_manager.clear_rls_context()
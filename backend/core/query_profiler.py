@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Helpdesk V3 - Query Profiler
+Opt-in slow-query capture with sampled EXPLAIN (ANALYZE, BUFFERS) plans and
+index suggestions derived from them
+"""
+
+import os
+import re
+import time
+import queue
+import random
+import logging
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import psycopg2
+
+from core.metrics import normalize_query
+
+# Only plain reads are re-run under EXPLAIN ANALYZE
+_EXPLAINABLE = re.compile(r'^\s*(SELECT|WITH)\b', re.IGNORECASE)
+
+# Column references in a plan Filter, e.g. "((status)::text = 'x'::text)" or "(t.due_at < now())"
+_FILTER_COLUMN = re.compile(
+    r'(?:\b[a-z_][a-z0-9_]*\.)?\b([a-z_][a-z0-9_]*)\)?(?:::[a-z ]+)?\)?\s*'
+    r'(= ANY|=|<>|!=|<=|>=|<|>|~~\*?|!~~\*?|IS NOT|IS)\s',
+    re.IGNORECASE
+)
+_NOT_COLUMNS = {
+    'text', 'integer', 'bigint', 'numeric', 'boolean', 'uuid', 'date', 'timestamp', 'interval',
+    'character', 'varying', 'zone', 'now', 'current_timestamp', 'current_date', 'null',
+    'true', 'false', 'and', 'or', 'not', 'any', 'lower', 'upper', 'coalesce'
+}
+_EQUALITY_OPERATORS = ('=', '= ANY', 'IS', 'IS NOT')
+
+
+def redact_params(params: Any) -> Any:
+    """Parameter types only: values (emails, tokens, names) never reach the buffer"""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: type(value).__name__ for key, value in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [type(value).__name__ for value in params]
+    return type(params).__name__
+
+
+def filter_columns(filter_text: str) -> List[str]:
+    """Columns compared in a plan Filter, equality comparisons first"""
+    equality, other = [], []
+    for column, operator in _FILTER_COLUMN.findall(filter_text):
+        column = column.lower()
+        if column in _NOT_COLUMNS or column in equality or column in other:
+            continue
+        (equality if operator.upper() in _EQUALITY_OPERATORS else other).append(column)
+    return equality + other
+
+
+def suggest_indexes(plan: Dict[str, Any], min_rows_removed: int = 1000) -> List[Dict[str, Any]]:
+    """Index candidates from an EXPLAIN (FORMAT JSON) plan
+
+    A sequential scan whose filter throws away at least ``min_rows_removed``
+    rows, and ten times more than it keeps, is a candidate for an index on
+    the filtered columns (equality columns first, then range columns).
+    """
+    suggestions = []
+    nodes = [plan.get('Plan', plan)]
+    while nodes:
+        node = nodes.pop()
+        nodes.extend(node.get('Plans', []))
+        if node.get('Node Type') != 'Seq Scan' or not node.get('Filter'):
+            continue
+
+        loops = node.get('Actual Loops', 1) or 1
+        removed = node.get('Rows Removed by Filter', 0) * loops
+        kept = node.get('Actual Rows', 0) * loops
+        columns = filter_columns(node['Filter'])
+        if removed < min_rows_removed or removed < 10 * max(kept, 1) or not columns:
+            continue
+
+        table = node.get('Relation Name')
+        suggestions.append({
+            'table': table,
+            'columns': columns,
+            'rows_removed': removed,
+            'rows_kept': kept,
+            'filter': node['Filter'],
+            'statement': f"CREATE INDEX CONCURRENTLY ON {table} ({', '.join(columns)});"
+        })
+    return suggestions
+
+
+class QueryProfiler:
+    """Records statements slower than a threshold and samples their plans
+
+    ``observe`` runs on the request thread and only appends to in-memory
+    structures: the last ``buffer_size`` slow executions (ring buffer) and
+    per-fingerprint totals. Sampled SELECTs are queued for a background
+    thread that re-runs them under EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)
+    on its own connection, inside a read-only transaction that is always
+    rolled back, with the caller's RLS context and a statement timeout.
+    Each fingerprint is explained at most once per ``explain_cooldown``.
+    """
+
+    def __init__(self, database_url: str, threshold_ms: float = 250, sample_rate: float = 0.2,
+                 buffer_size: int = 200, max_fingerprints: int = 500,
+                 explain_cooldown: float = 600, explain_timeout_ms: int = 10000):
+        self.database_url = database_url
+        self.threshold = threshold_ms / 1000.0
+        self.sample_rate = sample_rate
+        self.max_fingerprints = max_fingerprints
+        self.explain_cooldown = explain_cooldown
+        self.explain_timeout_ms = explain_timeout_ms
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=buffer_size)
+        self._stats: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._jobs = queue.Queue(maxsize=50)
+        self._thread = None
+        self._conn = None
+
+    @classmethod
+    def from_env(cls, database_url: str) -> Optional['QueryProfiler']:
+        """A profiler configured from QUERY_PROFILER_* variables, or None when disabled"""
+        if os.getenv('QUERY_PROFILER_ENABLED', 'false').lower() not in ('1', 'true', 'yes'):
+            return None
+        return cls(
+            database_url,
+            threshold_ms=float(os.getenv('QUERY_PROFILER_THRESHOLD_MS', '250')),
+            sample_rate=float(os.getenv('QUERY_PROFILER_EXPLAIN_RATE', '0.2')),
+            buffer_size=int(os.getenv('QUERY_PROFILER_BUFFER_SIZE', '200'))
+        )
+
+    # ------------------------------------------------------------------
+    # Capture (request threads)
+    # ------------------------------------------------------------------
+
+    def observe(self, query: str, params: Any, duration: float, explainable: bool = True,
+                rls_context: Optional[Tuple] = None) -> None:
+        """Record one execution; a no-op below the threshold"""
+        if duration < self.threshold:
+            return
+
+        fingerprint = normalize_query(query)
+        duration_ms = round(duration * 1000, 2)
+        now = time.time()
+        explain = False
+
+        with self._lock:
+            self._recent.append({
+                'fingerprint': fingerprint,
+                'duration_ms': duration_ms,
+                'params': redact_params(params),
+                'at': datetime.now(timezone.utc).isoformat()
+            })
+
+            stats = self._stats.get(fingerprint)
+            if stats is None:
+                stats = self._stats[fingerprint] = {
+                    'fingerprint': fingerprint, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                    'last_seen': None, 'explained_at': 0.0, 'plan': None, 'plan_error': None,
+                    'suggestions': []
+                }
+                if len(self._stats) > self.max_fingerprints:
+                    self._stats.popitem(last=False)
+            else:
+                self._stats.move_to_end(fingerprint)
+            stats['count'] += 1
+            stats['total_ms'] += duration_ms
+            stats['max_ms'] = max(stats['max_ms'], duration_ms)
+            stats['last_seen'] = now
+
+            if explainable and _EXPLAINABLE.match(query) and random.random() < self.sample_rate \
+                    and now - stats['explained_at'] >= self.explain_cooldown:
+                stats['explained_at'] = now
+                explain = True
+
+        if explain:
+            try:
+                self._jobs.put_nowait((fingerprint, query, params, rls_context))
+                self._ensure_worker()
+            except queue.Full:
+                pass
+
+    # ------------------------------------------------------------------
+    # EXPLAIN sampler (background thread)
+    # ------------------------------------------------------------------
+
+    def _ensure_worker(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='query-profiler', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            fingerprint, query, params, rls_context = job
+            try:
+                plan = self.explain(query, params, rls_context)
+                self._store_plan(fingerprint, plan, None)
+            except Exception as e:
+                self.logger.warning(f"EXPLAIN failed for {fingerprint[:80]}: {e}")
+                self._store_plan(fingerprint, None, str(e))
+                self._reset_connection()
+
+    def _connection(self):
+        if self._conn is None or self._conn.closed:
+            self._conn = psycopg2.connect(self.database_url)
+        return self._conn
+
+    def _reset_connection(self):
+        try:
+            if self._conn is not None:
+                self._conn.close()
+        except Exception:
+            pass
+        self._conn = None
+
+    def explain(self, query: str, params: Any = None, rls_context: Optional[Tuple] = None) -> Dict[str, Any]:
+        """EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) of one statement; nothing is committed"""
+        conn = self._connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SET TRANSACTION READ ONLY")
+                cur.execute("SELECT set_config('statement_timeout', %s, true)", (str(self.explain_timeout_ms),))
+                if rls_context:
+                    user_id, user_role, client_id, site_ids_str = rls_context
+                    # Same settings as DatabaseManager._apply_rls_context, local to this transaction
+                    settings = [('app.current_user_id', user_id), ('app.current_user_role', user_role)]
+                    if client_id:
+                        settings.append(('app.current_user_client_id', client_id))
+                    if site_ids_str:
+                        settings.append(('app.current_user_site_ids', site_ids_str))
+                    cur.execute("SELECT " + ", ".join("set_config(%s, %s, true)" for _ in settings),
+                                tuple(value for pair in settings for value in pair))
+                cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query, params)
+                return cur.fetchone()[0][0]
+        finally:
+            conn.rollback()
+
+    def _store_plan(self, fingerprint: str, plan: Optional[Dict], error: Optional[str]):
+        suggestions = suggest_indexes(plan) if plan else []
+        with self._lock:
+            stats = self._stats.get(fingerprint)
+            if stats is not None:
+                stats['plan'] = plan
+                stats['plan_error'] = error
+                stats['suggestions'] = suggestions
+
+    def close(self):
+        """Stop the sampler thread and close its connection"""
+        if self._thread and self._thread.is_alive():
+            self._jobs.put(None)
+            self._thread.join(5)
+        self._reset_connection()
+
+    # ------------------------------------------------------------------
+    # Reports
+    # ------------------------------------------------------------------
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Latest slow executions, newest first"""
+        with self._lock:
+            return list(self._recent)[::-1][:limit]
+
+    def top(self, limit: int = 20, include_plans: bool = False) -> List[Dict[str, Any]]:
+        """Fingerprints by total time spent above the threshold"""
+        with self._lock:
+            rows = [dict(stats) for stats in self._stats.values()]
+        rows.sort(key=lambda row: row['total_ms'], reverse=True)
+        for row in rows:
+            row['avg_ms'] = round(row['total_ms'] / row['count'], 2)
+            row['total_ms'] = round(row['total_ms'], 2)
+            row['explained'] = row['plan'] is not None
+            row.pop('explained_at')
+            if not include_plans:
+                row.pop('plan')
+        return rows[:limit]
+
+    def index_suggestions(self) -> List[Dict[str, Any]]:
+        """Index candidates across all explained fingerprints, weighted by slow time"""
+        merged: Dict[Tuple[str, Tuple[str, ...]], Dict[str, Any]] = {}
+        with self._lock:
+            explained = [(s['fingerprint'], s['total_ms'], s['suggestions']) for s in self._stats.values()]
+        for fingerprint, total_ms, suggestions in explained:
+            for suggestion in suggestions:
+                key = (suggestion['table'], tuple(suggestion['columns']))
+                entry = merged.setdefault(key, {
+                    'table': suggestion['table'], 'columns': suggestion['columns'],
+                    'statement': suggestion['statement'], 'slow_ms': 0.0,
+                    'rows_removed': 0, 'fingerprints': []
+                })
+                entry['slow_ms'] = round(entry['slow_ms'] + total_ms, 2)
+                entry['rows_removed'] = max(entry['rows_removed'], suggestion['rows_removed'])
+                entry['fingerprints'].append(fingerprint)
+        return sorted(merged.values(), key=lambda entry: entry['slow_ms'], reverse=True)
+
+    def clear(self):
+        with self._lock:
+            self._recent.clear()
+            self._stats.clear()
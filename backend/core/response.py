@@ -5,15 +5,32 @@ LANET Helpdesk V3 - Response Manager
 Standardized API response formatting
 """
 
-from flask import jsonify
-from typing import Any, Dict, Optional
+from flask import current_app
+from typing import Any, Dict, List, Optional, Sequence
 import logging
 
+from core.serialization import encode, project_rows
+
+
+def _map_affected_phone(ticket: Dict) -> Dict:
+    # If affected_person_phone is empty, use affected_person_contact
+    if not ticket.get('affected_person_phone') and ticket.get('affected_person_contact'):
+        ticket['affected_person_phone'] = ticket['affected_person_contact']
+    return ticket
+
+
 class ResponseManager:
     """Centralized response management for consistent API responses"""
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+
+    def _json(self, payload: Dict, status_code: int) -> tuple:
+        """Encode straight to bytes (see core.serialization), honoring the app's JSON settings"""
+        provider = current_app.json
+        pretty = provider.pretty() if hasattr(provider, 'pretty') else bool(current_app.debug)
+        body = encode(payload, getattr(provider, 'sort_keys', False), pretty, getattr(provider, 'ensure_ascii', False))
+        return current_app.response_class(body + b'\n', mimetype='application/json'), status_code
     
     def success(self, data: Any = None, message: str = None, status_code: int = 200) -> tuple:
         """Create a successful response"""
@@ -25,7 +42,7 @@ class ResponseManager:
         if message:
             response['message'] = message
             
-        return jsonify(response), status_code
+        return self._json(response, status_code)
     
     def error(self, message: str, status_code: int = 400, details: Dict = None) -> tuple:
         """Create an error response"""
@@ -43,7 +60,7 @@ class ResponseManager:
         elif status_code >= 400:
             self.logger.warning(f"Client error: {message}")
             
-        return jsonify(response), status_code
+        return self._json(response, status_code)
     
     def validation_error(self, errors: Dict[str, str]) -> tuple:
         """Create a validation error response"""
@@ -156,11 +173,7 @@ class ResponseManager:
         if not ticket:
             return None
 
-        safe_ticket = ticket.copy()
-
-        # Handle phone number mapping: if affected_person_phone is empty, use affected_person_contact
-        if not safe_ticket.get('affected_person_phone') and safe_ticket.get('affected_person_contact'):
-            safe_ticket['affected_person_phone'] = safe_ticket['affected_person_contact']
+        safe_ticket = _map_affected_phone(ticket.copy())
 
         # Convert datetime objects to ISO format
         datetime_fields = [
@@ -173,6 +186,14 @@ class ResponseManager:
 
         return safe_ticket
 
+    def format_ticket_rows(self, columns: Sequence[str], rows: List[tuple]) -> List[Dict]:
+        """Format ticket rows from DatabaseManager.execute_rows for API response
+
+        Same output as format_ticket_data; datetimes are left to the JSON
+        encoder, which writes the same ISO 8601 strings.
+        """
+        return project_rows(columns, rows, post=_map_affected_phone)
+
     def format_comment_data(self, comment: Dict) -> Dict:
         """Format comment data for API response"""
         if not comment:
@@ -180,10 +201,10 @@ class ResponseManager:
 
         safe_comment = comment.copy()
 
-        # Convert datetime objects to ISO format
+        # Convert datetime objects to ISO format (json_agg rows already carry strings)
         datetime_fields = ['created_at', 'updated_at']
         for field in datetime_fields:
-            if field in safe_comment and safe_comment[field]:
+            if hasattr(safe_comment.get(field), 'isoformat'):
                 safe_comment[field] = safe_comment[field].isoformat()
 
         return safe_comment
@@ -195,8 +216,8 @@ class ResponseManager:
 
         safe_activity = activity.copy()
 
-        # Convert datetime objects to ISO format
-        if 'created_at' in safe_activity and safe_activity['created_at']:
+        # Convert datetime objects to ISO format (json_agg rows already carry strings)
+        if hasattr(safe_activity.get('created_at'), 'isoformat'):
             safe_activity['created_at'] = safe_activity['created_at'].isoformat()
 
         return safe_activity
@@ -208,8 +229,8 @@ class ResponseManager:
 
         safe_attachment = attachment.copy()
 
-        # Convert datetime objects to ISO format
-        if 'created_at' in safe_attachment and safe_attachment['created_at']:
+        # Convert datetime objects to ISO format (json_agg rows already carry strings)
+        if hasattr(safe_attachment.get('created_at'), 'isoformat'):
             safe_attachment['created_at'] = safe_attachment['created_at'].isoformat()
 
         # Format file size for display
@@ -312,7 +333,7 @@ class ResponseManager:
             'last_escalation_at', 'created_at', 'updated_at'
         ]
         for field in datetime_fields:
-            if field in safe_tracking and safe_tracking[field]:
+            if hasattr(safe_tracking.get(field), 'isoformat'):
                 safe_tracking[field] = safe_tracking[field].isoformat()
 
         return safe_tracking
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Helpdesk V3 - JSON Serialization
+Fast JSON encoding (orjson when installed) and row projection from cursor tuples
+"""
+
+import json
+import uuid
+import decimal
+import dataclasses
+from datetime import date, datetime, time
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, Callable, Iterable, List, Optional, Sequence
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def _default(obj: Any) -> Any:
+    """Types JSON lacks; datetimes as ISO 8601 like the format_*_data helpers"""
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def encode(obj: Any, sort_keys: bool = False, indent: bool = False, ensure_ascii: bool = False) -> bytes:
+    """Serialize ``obj`` to UTF-8 JSON bytes
+
+    orjson handles datetime, date, UUID and dict subclasses (RealDictRow)
+    natively; anything it refuses (ensure_ascii, integers beyond 64 bits)
+    goes through the standard library with the same conversions.
+    """
+    if orjson is not None and not ensure_ascii:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=_default, option=option)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(
+        obj, default=_default, sort_keys=sort_keys, ensure_ascii=ensure_ascii,
+        indent=2 if indent else None, separators=None if indent else (',', ':')
+    ).encode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by encode(), so jsonify gets the fast path too"""
+
+    default = staticmethod(_default)
+
+    def pretty(self) -> bool:
+        return self.compact is False or (self.compact is None and self._app.debug)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if set(kwargs) - {'indent', 'separators'}:
+            return super().dumps(obj, **kwargs)
+        return encode(obj, self.sort_keys, bool(kwargs.get('indent')), self.ensure_ascii).decode('utf-8')
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = encode(obj, self.sort_keys, self.pretty(), self.ensure_ascii)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+@lru_cache(maxsize=256)
+def row_formatter(columns: Sequence[str], fields: Optional[Sequence[str]] = None,
+                  post: Optional[Callable[[dict], dict]] = None) -> Callable[[tuple], dict]:
+    """Function turning a cursor tuple into a dict of ``fields`` (default all columns)
+
+    Built once per row shape and cached, so a list response pays for the
+    column lookup once instead of copying every row dict field by field.
+    ``post`` adjusts each projected dict (derived fields); it must be a
+    module-level function for the cache to hit. Arguments must be tuples.
+    """
+    names = tuple(fields) if fields else tuple(columns)
+    index = {name: position for position, name in enumerate(columns)}
+    missing = [name for name in names if name not in index]
+    if missing:
+        raise ValueError(f"Unknown columns: {', '.join(missing)}")
+
+    positions = [index[name] for name in names]
+    if positions == list(range(len(columns))):
+        pick = None
+    elif len(positions) == 1:
+        getter = itemgetter(positions[0])
+        pick = lambda row: (getter(row),)
+    else:
+        pick = itemgetter(*positions)
+
+    if pick is None and post is None:
+        return lambda row: dict(zip(names, row))
+    if pick is None:
+        return lambda row: post(dict(zip(names, row)))
+    if post is None:
+        return lambda row: dict(zip(names, pick(row)))
+    return lambda row: post(dict(zip(names, pick(row))))
+
+
+def project_rows(columns: Sequence[str], rows: Iterable[tuple], fields: Optional[Sequence[str]] = None,
+                 post: Optional[Callable[[dict], dict]] = None) -> List[dict]:
+    """Dicts of ``fields`` for cursor tuples, e.g. from DatabaseManager.execute_rows"""
+    formatter = row_formatter(tuple(columns), tuple(fields) if fields else None, post)
+    return [formatter(row) for row in rows]
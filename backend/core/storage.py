@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Helpdesk V3 - Blob Store
+Content-addressed attachment storage with SHA-256 keys and deduplication
+"""
+
+import os
+import io
+import time
+import uuid
+import hashlib
+import logging
+from typing import Dict, List, Any, Optional, BinaryIO
+
+class BlobStore:
+    """Content-addressed file storage for ticket attachments
+
+    Every blob is stored once under ``<root>/<aa>/<bb>/<sha256>``. Reference
+    counts live in the ``file_blobs`` table and are maintained by triggers on
+    ``file_attachments`` (see migrations/add_content_addressed_attachments.sql),
+    so deleting attachment rows is enough to release a blob. Files are only
+    removed from disk by ``collect_garbage``.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    SHARD_LEVELS = 2
+    SHARD_WIDTH = 2
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        self.tmp_dir = os.path.join(root_dir, 'tmp')
+        self.logger = logging.getLogger(__name__)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def path_for(self, file_hash: str) -> str:
+        """Get the sharded on-disk path for a blob hash"""
+        if not file_hash or len(file_hash) != 64:
+            raise ValueError(f"Invalid blob hash: {file_hash}")
+
+        shards = [
+            file_hash[i * self.SHARD_WIDTH:(i + 1) * self.SHARD_WIDTH]
+            for i in range(self.SHARD_LEVELS)
+        ]
+        return os.path.join(self.root_dir, *shards, file_hash)
+
+    def exists(self, file_hash: str) -> bool:
+        """Check if a blob is present on disk"""
+        try:
+            return os.path.isfile(self.path_for(file_hash))
+        except ValueError:
+            return False
+
+    def store_stream(self, stream: BinaryIO, max_size: int = None) -> Dict[str, Any]:
+        """Store a file-like object, hashing while writing so it is never fully buffered
+
+        Returns a dict with file_hash, file_size, file_path and created (False when
+        the content was already stored and the upload was deduplicated).
+        Raises ValueError if the stream exceeds max_size.
+        """
+        hasher = hashlib.sha256()
+        file_size = 0
+        tmp_path = os.path.join(self.tmp_dir, f"{uuid.uuid4().hex}.part")
+
+        try:
+            with open(tmp_path, 'wb') as tmp_file:
+                while True:
+                    chunk = stream.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+
+                    file_size += len(chunk)
+                    if max_size is not None and file_size > max_size:
+                        raise ValueError(f"File size exceeds limit of {max_size} bytes")
+
+                    hasher.update(chunk)
+                    tmp_file.write(chunk)
+
+            file_hash = hasher.hexdigest()
+            final_path = self.path_for(file_hash)
+
+            if os.path.isfile(final_path):
+                # Duplicate content: keep the existing blob and refresh its mtime so
+                # the garbage collector's grace period starts over
+                os.remove(tmp_path)
+                os.utime(final_path, None)
+                created = False
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(tmp_path, final_path)
+                created = True
+
+            return {
+                'file_hash': file_hash,
+                'file_size': file_size,
+                'file_path': final_path,
+                'created': created
+            }
+
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def store_bytes(self, content: bytes, max_size: int = None) -> Dict[str, Any]:
+        """Store an in-memory payload (e.g. a decoded email attachment)"""
+        return self.store_stream(io.BytesIO(content or b''), max_size=max_size)
+
+    def open(self, file_hash: str) -> BinaryIO:
+        """Open a blob for reading"""
+        return open(self.path_for(file_hash), 'rb')
+
+    def resolve_path(self, file_hash: Optional[str], legacy_path: Optional[str]) -> Optional[str]:
+        """Resolve the readable path of an attachment, falling back to pre-blob paths"""
+        if file_hash and self.exists(file_hash):
+            return self.path_for(file_hash)
+        return legacy_path
+
+    def collect_garbage(self, db_manager, grace_period_minutes: int = 60, batch_size: int = 500) -> Dict[str, int]:
+        """Delete blobs whose reference count dropped to zero
+
+        A blob must have been unreferenced (and untouched on disk) for the grace
+        period before it is removed, so an upload that deduplicated against it a
+        moment ago keeps its file.
+        """
+        stats = {'blobs_deleted': 0, 'bytes_freed': 0, 'tmp_files_deleted': 0}
+        cutoff = time.time() - grace_period_minutes * 60
+
+        try:
+            candidates = db_manager.execute_query(
+                """
+                SELECT blob_hash, file_size FROM file_blobs
+                WHERE ref_count <= 0
+                  AND updated_at < NOW() - (%s * INTERVAL '1 minute')
+                ORDER BY updated_at
+                LIMIT %s
+                """,
+                (grace_period_minutes, batch_size)
+            ) or []
+
+            # Rows whose file was touched within the grace period stay until a
+            # later run, so a kept file never loses its row
+            expired = [blob['blob_hash'] for blob in candidates if self._expired(blob['blob_hash'], cutoff)]
+            deleted = []
+            if expired:
+                deleted = db_manager.execute_query(
+                    """
+                    DELETE FROM file_blobs
+                    WHERE blob_hash = ANY(%s)
+                      AND ref_count <= 0
+                      AND updated_at < NOW() - (%s * INTERVAL '1 minute')
+                    RETURNING blob_hash, file_size
+                    """,
+                    (expired, grace_period_minutes)
+                ) or []
+
+            for blob in deleted:
+                path = self.path_for(blob['blob_hash'])
+                try:
+                    # An upload deduplicating against the blob since the check
+                    # re-creates its row (file_blobs_add_ref), so keep the file
+                    if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        stats['blobs_deleted'] += 1
+                        stats['bytes_freed'] += blob['file_size'] or 0
+                except OSError as e:
+                    self.logger.warning(f"Could not delete blob {blob['blob_hash']}: {e}")
+
+            stats['tmp_files_deleted'] = self._cleanup_tmp_files(cutoff)
+
+            if stats['blobs_deleted'] or stats['tmp_files_deleted']:
+                self.logger.info(
+                    f"Blob GC: deleted {stats['blobs_deleted']} blobs "
+                    f"({stats['bytes_freed']} bytes), {stats['tmp_files_deleted']} stale temp files"
+                )
+            return stats
+
+        except Exception as e:
+            self.logger.error(f"Blob garbage collection failed: {e}")
+            return stats
+
+    def _expired(self, file_hash: str, cutoff: float) -> bool:
+        path = self.path_for(file_hash)
+        try:
+            return os.path.getmtime(path) < cutoff
+        except OSError:
+            # Already gone: only the row is left to delete
+            return True
+
+    def find_orphan_files(self, db_manager, batch_size: int = 1000) -> List[str]:
+        """Walk the store and return blob hashes that have no file_blobs row"""
+        orphans = []
+        batch = []
+
+        def flush(hashes):
+            if not hashes:
+                return
+            known = db_manager.execute_query(
+                "SELECT blob_hash FROM file_blobs WHERE blob_hash = ANY(%s)",
+                (hashes,)
+            ) or []
+            known_hashes = {row['blob_hash'] for row in known}
+            orphans.extend(h for h in hashes if h not in known_hashes)
+
+        for dirpath, dirnames, filenames in os.walk(self.root_dir):
+            if os.path.abspath(dirpath) == os.path.abspath(self.tmp_dir):
+                dirnames[:] = []
+                continue
+            for filename in filenames:
+                if len(filename) == 64:
+                    batch.append(filename)
+                if len(batch) >= batch_size:
+                    flush(batch)
+                    batch = []
+        flush(batch)
+
+        return orphans
+
+    def _cleanup_tmp_files(self, cutoff: float) -> int:
+        """Remove partial uploads left behind by interrupted writes"""
+        deleted = 0
+        try:
+            for filename in os.listdir(self.tmp_dir):
+                path = os.path.join(self.tmp_dir, filename)
+                if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    deleted += 1
+        except OSError as e:
+            self.logger.warning(f"Temp blob cleanup failed: {e}")
+        return deleted
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Helpdesk V3 - Heartbeat Time Series
+Partitioned raw heartbeats, latest-value table and 1h/1d rollups
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List
+
+import psycopg2
+
+class HeartbeatStore:
+    """Write and read path for asset heartbeat metrics
+
+    Raw heartbeats land in ``asset_heartbeats`` (daily UTC range partitions).
+    An insert trigger keeps ``asset_heartbeat_latest`` current, and
+    ``maintain`` rolls complete hours/days into ``asset_heartbeat_rollup_1h`` /
+    ``asset_heartbeat_rollup_1d`` and drops partitions past retention. The SQL
+    side lives in migrations/partition_asset_heartbeats.sql.
+    """
+
+    # Retention defaults, overridable through system_config
+    DEFAULT_RAW_RETENTION_DAYS = 7
+    DEFAULT_HOURLY_RETENTION_DAYS = 90
+    DEFAULT_DAILY_RETENTION_DAYS = 730
+    PARTITIONS_AHEAD_DAYS = 7
+
+    # Spans up to these limits are served from the finer granularity
+    RAW_MAX_SPAN = timedelta(hours=48)
+    HOURLY_MAX_SPAN = timedelta(days=31)
+
+    METRIC_COLUMNS = ('cpu', 'memory', 'disk')
+
+    def __init__(self, db_manager, config_cache=None):
+        self.db = db_manager
+        self.config_cache = config_cache
+        self.logger = logging.getLogger(__name__)
+        self._partitions_ensured_for = None
+
+    # ------------------------------------------------------------------
+    # Write path
+    # ------------------------------------------------------------------
+
+    def record(self, asset_id: str, cpu_usage: float = 0, memory_usage: float = 0,
+               disk_usage: float = 0, status: str = 'online', agent_version: str = None,
+               network_status: str = 'connected', system_uptime: int = None) -> None:
+        """Append one heartbeat sample (the latest-value table follows via trigger)"""
+        self._ensure_partitions_daily()
+
+        query = """
+        INSERT INTO asset_heartbeats (
+            asset_id, cpu_usage, memory_usage, disk_usage,
+            status, agent_version, network_status, system_uptime
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        params = (asset_id, cpu_usage, memory_usage, disk_usage,
+                  status, agent_version, network_status, system_uptime)
+
+        try:
+            self.db.execute_query(query, params, fetch='none')
+        except psycopg2.Error as e:
+            # Partition for today missing (maintenance never ran): create and retry once
+            if 'no partition of relation' not in str(e):
+                raise
+            self.ensure_partitions()
+            self.db.execute_query(query, params, fetch='none')
+
+    def record_batch(self, asset_id: str, samples: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Append late samples replayed from an agent's offline spool
+
+        Each sample carries ``recorded_at`` (aware datetime) plus cpu_usage /
+        memory_usage / disk_usage and optional status, agent_version and
+        system_uptime. Samples older than raw retention or from the future are
+        skipped. Rollup buckets already closed for this asset are recomputed.
+        Returns the samples that were stored.
+        """
+        now = datetime.now(timezone.utc)
+        oldest_allowed = now - timedelta(
+            days=self._retention('heartbeat_raw_retention_days', self.DEFAULT_RAW_RETENTION_DAYS)
+        )
+        accepted = [
+            s for s in samples
+            if s.get('recorded_at') and oldest_allowed <= s['recorded_at'] <= now + timedelta(minutes=5)
+        ]
+        if not accepted:
+            return []
+
+        earliest = min(s['recorded_at'] for s in accepted)
+        self.db.execute_query(
+            "SELECT heartbeat_ensure_partitions(%s, %s) as created",
+            (earliest.astimezone(timezone.utc).date(), now.date() + timedelta(days=self.PARTITIONS_AHEAD_DAYS)),
+            fetch='one',
+            commit=True
+        )
+
+        values = []
+        params: List[Any] = []
+        for sample in accepted:
+            values.append("(%s, %s, %s, %s, %s, %s, %s, %s, %s)")
+            params.extend([
+                asset_id, sample['recorded_at'],
+                sample.get('cpu_usage', 0), sample.get('memory_usage', 0), sample.get('disk_usage', 0),
+                sample.get('status', 'online'), sample.get('agent_version'),
+                sample.get('network_status', 'connected'), sample.get('system_uptime')
+            ])
+
+        self.db.execute_query(
+            f"""
+            INSERT INTO asset_heartbeats (
+                asset_id, created_at, cpu_usage, memory_usage, disk_usage,
+                status, agent_version, network_status, system_uptime
+            ) VALUES {', '.join(values)}
+            """,
+            tuple(params),
+            fetch='none'
+        )
+
+        # Buckets behind the rollup watermark are not revisited by maintain()
+        self.db.execute_query(
+            "SELECT heartbeat_rollup_asset(%s, %s) as rollup_rows",
+            (asset_id, earliest),
+            fetch='one',
+            commit=True
+        )
+        return accepted
+
+    def _ensure_partitions_daily(self) -> None:
+        today = datetime.now(timezone.utc).date()
+        if self._partitions_ensured_for == today:
+            return
+        try:
+            self.ensure_partitions()
+        except Exception as e:
+            self.logger.warning(f"Heartbeat partition check failed: {e}")
+
+    def ensure_partitions(self, days_ahead: int = None) -> int:
+        """Create missing daily partitions from yesterday to days_ahead days out"""
+        today = datetime.now(timezone.utc).date()
+        ahead = self.PARTITIONS_AHEAD_DAYS if days_ahead is None else days_ahead
+
+        result = self.db.execute_query(
+            "SELECT heartbeat_ensure_partitions(%s, %s) as created",
+            (today - timedelta(days=1), today + timedelta(days=ahead)),
+            fetch='one',
+            commit=True
+        )
+        self._partitions_ensured_for = today
+        return result['created'] if result else 0
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def maintain(self) -> Dict[str, int]:
+        """Create upcoming partitions, roll up complete buckets and apply retention"""
+        created = self.ensure_partitions()
+
+        rollup = self.db.execute_query(
+            "SELECT heartbeat_rollup() as rollup_rows", fetch='one', commit=True
+        )
+
+        dropped = self.db.execute_query(
+            "SELECT heartbeat_apply_retention(%s, %s, %s) as dropped",
+            (
+                self._retention('heartbeat_raw_retention_days', self.DEFAULT_RAW_RETENTION_DAYS),
+                self._retention('heartbeat_hourly_retention_days', self.DEFAULT_HOURLY_RETENTION_DAYS),
+                self._retention('heartbeat_daily_retention_days', self.DEFAULT_DAILY_RETENTION_DAYS),
+            ),
+            fetch='one',
+            commit=True
+        )
+
+        return {
+            'partitions_created': created,
+            'rollup_rows': rollup['rollup_rows'] if rollup else 0,
+            'partitions_dropped': dropped['dropped'] if dropped else 0
+        }
+
+    def _retention(self, config_key: str, default_days: int) -> int:
+        if self.config_cache is None:
+            return default_days
+        return max(1, self.config_cache.get_system_int(config_key, default_days))
+
+    # ------------------------------------------------------------------
+    # Read path
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def choose_granularity(cls, start: datetime, end: datetime) -> str:
+        """Pick 'raw', '1h' or '1d' for a time range"""
+        span = end - start
+        if span <= cls.RAW_MAX_SPAN:
+            return 'raw'
+        if span <= cls.HOURLY_MAX_SPAN:
+            return '1h'
+        return '1d'
+
+    def get_metrics_history(self, asset_id: str, start: datetime, end: datetime = None,
+                            granularity: str = None) -> Dict[str, Any]:
+        """CPU/memory/disk history for an asset at the granularity that fits the range
+
+        Rolled-up buckets are read up to the rollup watermark; the still-open
+        tail (current hour or day) is aggregated from raw heartbeats.
+        """
+        end = end or datetime.now(timezone.utc)
+        granularity = granularity or self.choose_granularity(start, end)
+
+        if granularity == 'raw':
+            points = self.db.execute_query(
+                """
+                SELECT created_at as bucket_start, 1 as samples,
+                       cpu_usage as cpu_avg, memory_usage as memory_avg, disk_usage as disk_avg
+                FROM asset_heartbeats
+                WHERE asset_id = %s AND created_at >= %s AND created_at < %s
+                ORDER BY created_at
+                """,
+                (asset_id, start, end)
+            )
+            return {'granularity': 'raw', 'points': points or []}
+
+        if granularity not in ('1h', '1d'):
+            raise ValueError(f"Invalid granularity: {granularity}")
+
+        unit = 'hour' if granularity == '1h' else 'day'
+        rollup_table = f"asset_heartbeat_rollup_{granularity}"
+        aggregates = ', '.join(
+            f"MIN({m}_usage) as {m}_min, AVG({m}_usage)::DECIMAL(5,2) as {m}_avg, MAX({m}_usage) as {m}_max"
+            for m in self.METRIC_COLUMNS
+        )
+        columns = ', '.join(f"{m}_min, {m}_avg, {m}_max" for m in self.METRIC_COLUMNS)
+
+        query = f"""
+        WITH watermark AS (
+            SELECT COALESCE(
+                (SELECT rolled_up_to FROM heartbeat_rollup_state WHERE granularity = %s),
+                '-infinity'::timestamptz
+            ) as rolled_up_to
+        )
+        SELECT bucket_start, samples, {columns}
+        FROM {rollup_table}, watermark
+        WHERE asset_id = %s AND bucket_start >= %s AND bucket_start < %s
+          AND bucket_start < watermark.rolled_up_to
+        UNION ALL
+        SELECT date_trunc('{unit}', created_at, 'UTC') as bucket_start, COUNT(*) as samples, {aggregates}
+        FROM asset_heartbeats, watermark
+        WHERE asset_id = %s AND created_at >= GREATEST(%s, watermark.rolled_up_to) AND created_at < %s
+        GROUP BY 1
+        ORDER BY bucket_start
+        """
+
+        points = self.db.execute_query(
+            query,
+            (granularity, asset_id, start, end, asset_id, start, end)
+        )
+        return {'granularity': granularity, 'points': points or []}
+
@@ -8,6 +8,7 @@ import sys
 sys.path.append(os.path.dirname(__file__))
 
 from modules.reports.monthly_reports import MonthlyReportsService
+from modules.reports.excel_writer import format_date, sanitize_value
 from datetime import datetime
 import logging
 
@@ -80,9 +81,9 @@ def diagnose_data():
             print(f"\nTicket {i+1}: {ticket.get('ticket_number', 'Unknown')}")
             for field, value in ticket.items():
                 if field in ['created_at', 'resolved_at']:
-                    cleaned = service._excel_safe_date(value)
+                    cleaned = format_date(value)
                 else:
-                    cleaned = service._excel_safe_string(value)
+                    cleaned = sanitize_value(value)
                 print(f"  {field}: {repr(cleaned)[:60]}")
         
 
@@ -9,6 +9,7 @@ import time
 import logging
 from datetime import datetime
 from app import create_app
+from core.metrics import StageTimer, publish_job_metrics
 
 def run_sla_monitor():
     """Main SLA monitoring job"""
@@ -17,6 +18,7 @@ def run_sla_monitor():
     with app.app_context():
         logger = logging.getLogger('sla_monitor')
         logger.info("Starting SLA monitor job")
+        stages = StageTimer('sla_monitor')
         
         try:
             from modules.sla.service import sla_service
@@ -24,6 +26,7 @@ def run_sla_monitor():
             from modules.email.service import email_service
             
             # 1. Check for SLA breaches
+            stages.start('breaches')
             logger.info("Checking for SLA breaches...")
             breaches = sla_service.check_sla_breaches()
             
@@ -47,6 +50,7 @@ def run_sla_monitor():
                 logger.info("No NEW SLA breaches found")
             
             # 2. Check for SLA warnings (2 hours before breach)
+            stages.start('warnings')
             logger.info("Checking for SLA warnings...")
             warnings = sla_service.check_sla_warnings(2)
 
@@ -74,6 +78,7 @@ def run_sla_monitor():
                 logger.info("No SLA warnings found")
             
             # 3. Process escalations
+            stages.start('escalations')
             logger.info("Processing escalations...")
             escalated = sla_service.process_escalations()
             
@@ -83,6 +88,7 @@ def run_sla_monitor():
                 logger.info("No tickets escalated")
             
             # 4. Send notifications for new tickets and comments
+            stages.start('notifications')
             logger.info("Checking for new ticket notifications...")
             try:
                 new_notifications = notifications_service.process_pending_notifications()
@@ -94,6 +100,7 @@ def run_sla_monitor():
                 logger.error(f"Error processing new notifications: {e}")
 
             # 5. Process email queue
+            stages.start('email_queue')
             logger.info("Processing email queue...")
             processed_emails = email_service.process_email_queue(20)
 
@@ -103,6 +110,7 @@ def run_sla_monitor():
                 logger.info("No emails in queue to process")
             
             # 6. Check for incoming emails (optional - skip if IMAP not configured)
+            stages.start('incoming_email')
             logger.info("Checking for incoming emails...")
             try:
                 config = email_service.get_default_config()
@@ -130,6 +138,7 @@ def run_sla_monitor():
                 logger.info("Continuing SLA monitoring without email processing")
 
             # 7. Process scheduled reports
+            stages.start('scheduled_reports')
             logger.info("Processing scheduled reports...")
             try:
                 from modules.reports.scheduler import report_scheduler
@@ -144,12 +153,71 @@ def run_sla_monitor():
                 logger.warning(f"Error processing scheduled reports (non-critical): {e}")
                 logger.info("Continuing SLA monitoring without report processing")
 
+            # 8. Reclaim attachment blobs no longer referenced by any ticket
+            stages.start('blob_gc')
+            logger.info("Collecting unreferenced attachment blobs...")
+            try:
+                gc_stats = app.blob_store.collect_garbage(app.db_manager)
+                if gc_stats['blobs_deleted'] > 0:
+                    logger.info(f"Deleted {gc_stats['blobs_deleted']} blobs ({gc_stats['bytes_freed']} bytes)")
+                else:
+                    logger.info("No attachment blobs to collect")
+
+            except Exception as e:
+                logger.warning(f"Error collecting attachment blobs (non-critical): {e}")
+
+            # 9. Heartbeat time series: upcoming partitions, rollups, retention
+            stages.start('heartbeat_maintenance')
+            logger.info("Maintaining heartbeat time series...")
+            try:
+                ts_stats = app.heartbeat_store.maintain()
+                logger.info(
+                    f"Heartbeats: {ts_stats['rollup_rows']} rollup rows, "
+                    f"{ts_stats['partitions_created']} partitions created, "
+                    f"{ts_stats['partitions_dropped']} dropped"
+                )
+
+            except Exception as e:
+                logger.warning(f"Error maintaining heartbeat time series (non-critical): {e}")
+
+            # 10. Age assets without recent heartbeats to warning/offline
+            stages.start('fleet_sweep')
+            try:
+                from modules.assets.service import FleetStatusService
+                changed = FleetStatusService(app.db_manager).sweep()
+                if changed > 0:
+                    logger.info(f"Fleet status: {changed} assets changed status")
+
+            except Exception as e:
+                logger.warning(f"Error sweeping fleet status (non-critical): {e}")
+
+            # 11. Drop software catalog products no asset reports any more
+            stages.start('software_catalog')
+            try:
+                from modules.assets.service import SoftwareCatalogService
+                pruned = SoftwareCatalogService(app.db_manager).prune()
+                if pruned > 0:
+                    logger.info(f"Software catalog: pruned {pruned} unused products")
+
+            except Exception as e:
+                logger.warning(f"Error pruning software catalog (non-critical): {e}")
+
+            stages.finish()
             logger.info("SLA monitor job completed successfully")
             
         except Exception as e:
+            stages.finish('failure')
             logger.error(f"SLA monitor job failed: {e}")
             raise
 
+        finally:
+            publish_job_metrics(app.redis_client, 'sla_monitor')
+            # Each cycle builds a fresh app; drain its audit queue before discarding it
+            app.audit_writer.shutdown()
+            app.config_cache.close()
+            if app.db_manager.profiler is not None:
+                app.db_manager.profiler.close()
+
 def run_continuous_monitor(interval_minutes=3):
     """Run SLA monitor continuously"""
     logger = logging.getLogger('sla_monitor')
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Helpdesk V3 - Email Throughput
+Drains a synthetic email queue through EmailService into the fake SMTP server
+and polls the fake IMAP mailbox through the email-to-ticket path
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+from .fake_mail import FakeIMAPServer, FakeSMTPServer
+from .seed import SEED_DOMAIN
+from .stats import LatencyRecorder
+
+CONFIG_NAME = 'loadtest'
+
+
+def _create_config(app, smtp: FakeSMTPServer, imap: FakeIMAPServer, client_id: Optional[str]) -> str:
+    from utils.security import SecurityUtils
+
+    app.db_manager.execute_query("DELETE FROM email_configurations WHERE name = %s", (CONFIG_NAME,),
+                                 fetch='none')
+    password = SecurityUtils.encrypt_password('loadtest')
+    row = app.db_manager.execute_insert('email_configurations', {
+        'name': CONFIG_NAME,
+        'description': 'Fake SMTP/IMAP servers of benchmark_suite.py',
+        'smtp_host': smtp.address[0], 'smtp_port': smtp.address[1],
+        'smtp_username': f'soporte@{SEED_DOMAIN}', 'smtp_password_encrypted': password,
+        'smtp_use_tls': False, 'smtp_use_ssl': False,
+        'imap_host': imap.address[0], 'imap_port': imap.address[1],
+        'imap_username': f'soporte@{SEED_DOMAIN}', 'imap_password_encrypted': password,
+        'imap_use_ssl': False, 'imap_folder': 'INBOX',
+        'enable_email_to_ticket': True, 'default_client_id': client_id,
+        'is_active': True, 'is_default': False
+    }, returning='config_id')
+    return str(row['config_id'])
+
+
+def _cleanup(app, config_id: str):
+    for query in ("DELETE FROM email_queue WHERE config_id = %s",
+                  "DELETE FROM email_processing_log WHERE config_id = %s",
+                  "DELETE FROM email_configurations WHERE config_id = %s"):
+        app.db_manager.execute_query(query, (config_id,), fetch='none')
+
+
+def run_email_benchmark(app, recorder: LatencyRecorder, outbound: int = 1000, inbound: int = 200,
+                        batch_size: int = 20, client_id: Optional[str] = None,
+                        client_email: Optional[str] = None, smtp_delay: float = 0.0) -> Dict[str, Any]:
+    """Outbound: ``process_email_queue(batch_size)`` until ``outbound`` queued
+    emails are sent, as the SLA monitor calls it (email.outbound, rows =
+    messages). Inbound: ``check_incoming_emails`` + ``process_incoming_email``
+    over ``inbound`` messages from ``client_email`` (email.imap_poll and
+    email.to_ticket). The temporary email configuration is removed afterwards.
+    """
+    from modules.email.service import EmailService
+
+    with FakeSMTPServer(delay=smtp_delay) as smtp, FakeIMAPServer() as imap, app.app_context():
+        config_id = _create_config(app, smtp, imap, client_id)
+        service = EmailService()
+        try:
+            app.db_manager.execute_query(f"""
+                INSERT INTO email_queue (config_id, to_email, subject, body_text, priority)
+                SELECT %s, 'destino' || g || '@{SEED_DOMAIN}', 'Ticket actualizado #' || g,
+                       'El estado de su ticket ha cambiado.', 1 + g %% 10
+                FROM generate_series(1, %s) g
+            """, (config_id, outbound), fetch='none')
+
+            sent = 0
+            while sent < outbound:
+                started = time.perf_counter()
+                processed = service.process_email_queue(batch_size)
+                recorder.record('email.outbound', time.perf_counter() - started, rows=processed)
+                if not processed:
+                    break
+                sent += processed
+
+            imap.deliver_many(inbound, from_email=client_email or f'usuario@{SEED_DOMAIN}',
+                              to_email=f'soporte@{SEED_DOMAIN}')
+            config = service.get_config_by_id(config_id)
+            tickets = 0
+            while True:
+                started = time.perf_counter()
+                emails = service.check_incoming_emails(config_id)
+                recorder.record('email.imap_poll', time.perf_counter() - started, rows=len(emails))
+                if not emails:
+                    break
+                for email_data in emails:
+                    started = time.perf_counter()
+                    ticket_id = service.process_incoming_email(email_data, config)
+                    recorder.record('email.to_ticket', time.perf_counter() - started, ok=ticket_id is not None)
+                    tickets += 1 if ticket_id else 0
+        finally:
+            _cleanup(app, config_id)
+
+        return {
+            'outbound_queued': outbound,
+            'outbound_sent': sent,
+            'smtp_received': smtp.count,
+            'inbound_delivered': inbound,
+            'inbound_fetched': imap.fetched,
+            'tickets_from_email': tickets
+        }
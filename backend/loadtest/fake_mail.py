@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Helpdesk V3 - Fake Mail Servers
+Local SMTP and IMAP stand-ins for load tests: just enough of each protocol
+for smtplib/imaplib as used by EmailService, plain TCP, no TLS
+"""
+
+import re
+import time
+import socketserver
+import threading
+from email.message import EmailMessage
+from email.utils import make_msgid
+from typing import List, Optional
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _MailServer:
+    """Runs a handler class on a background thread; usable as a context manager"""
+
+    handler = None
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, delay: float = 0.0):
+        self.delay = delay
+        self._server = _ThreadingServer((host, port), self.handler)
+        self._server.mail = self
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def address(self):
+        return self._server.server_address
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name=type(self).__name__,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+
+    def reply(self, line: str):
+        self.wfile.write(line.encode('utf-8') + b'\r\n')
+
+    def handle(self):
+        server = self.server.mail
+        self.reply('220 loadtest ESMTP ready')
+        pending_login = 0
+        envelope = {'from': None, 'to': []}
+
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode('utf-8', errors='replace').rstrip('\r\n')
+
+            if pending_login:
+                pending_login -= 1
+                self.reply('334 UGFzc3dvcmQ6' if pending_login else '235 2.7.0 Authentication successful')
+                continue
+
+            command = line[:4].upper()
+            if command == 'EHLO':
+                self.reply('250-loadtest')
+                self.reply('250-AUTH PLAIN LOGIN')
+                self.reply('250 8BITMIME')
+            elif command == 'HELO':
+                self.reply('250 loadtest')
+            elif command == 'AUTH':
+                if line.upper().startswith('AUTH LOGIN'):
+                    pending_login = 2
+                    self.reply('334 VXNlcm5hbWU6')
+                else:
+                    self.reply('235 2.7.0 Authentication successful')
+            elif command == 'MAIL':
+                envelope = {'from': line[10:].strip(), 'to': []}
+                self.reply('250 OK')
+            elif command == 'RCPT':
+                envelope['to'].append(line[8:].strip())
+                self.reply('250 OK')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b'.\r\n', b'.\n'):
+                        break
+                    lines.append(data[1:] if data.startswith(b'..') else data)
+                if server.delay:
+                    time.sleep(server.delay)
+                server.received(envelope, b''.join(lines))
+                self.reply('250 OK queued')
+            elif command in ('RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class FakeSMTPServer(_MailServer):
+    """Accepts any credentials and recipient, keeps what it receives in memory"""
+
+    handler = _SMTPHandler
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, delay: float = 0.0):
+        super().__init__(host, port, delay)
+        self.messages: List[dict] = []
+
+    def received(self, envelope: dict, data: bytes):
+        with self._lock:
+            self.messages.append({'from': envelope['from'], 'to': list(envelope['to']), 'size': len(data)})
+
+    @property
+    def count(self) -> int:
+        with self._lock:
+            return len(self.messages)
+
+
+_IMAP_COMMAND = re.compile(r'^(\S+) (?:UID )?(\S+)(?: (.*))?$', re.IGNORECASE)
+
+
+class _IMAPHandler(socketserver.StreamRequestHandler):
+
+    def reply(self, line):
+        self.wfile.write((line.encode('utf-8') if isinstance(line, str) else line) + b'\r\n')
+
+    def handle(self):
+        mailbox = self.server.mail
+        self.reply('* OK [CAPABILITY IMAP4rev1 AUTH=PLAIN] loadtest IMAP ready')
+
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            match = _IMAP_COMMAND.match(raw.decode('utf-8', errors='replace').rstrip('\r\n'))
+            if not match:
+                self.reply('* BAD Invalid command')
+                continue
+            tag, command, args = match.group(1), match.group(2).upper(), match.group(3) or ''
+
+            if command == 'CAPABILITY':
+                self.reply('* CAPABILITY IMAP4rev1 AUTH=PLAIN')
+            elif command == 'SELECT' or command == 'EXAMINE':
+                self.reply(f'* {mailbox.exists} EXISTS')
+                self.reply('* 0 RECENT')
+            elif command == 'SEARCH':
+                ids = mailbox.search(unseen='UNSEEN' in args.upper())
+                self.reply('* SEARCH' + ''.join(f' {i}' for i in ids))
+            elif command == 'FETCH':
+                if mailbox.delay:
+                    time.sleep(mailbox.delay)
+                for number in _message_set(args.split(' ', 1)[0], mailbox.exists):
+                    data = mailbox.fetch(number)
+                    if data is not None:
+                        self.reply(f'* {number} FETCH (RFC822 {{{len(data)}}}'.encode('utf-8'))
+                        self.wfile.write(data)
+                        self.reply(')')
+            elif command == 'STORE':
+                number_set, _, flags = args.partition(' ')
+                for number in _message_set(number_set, mailbox.exists):
+                    mailbox.store(number, flags)
+                    self.reply(f'* {number} FETCH (FLAGS ({mailbox.flags(number)}))')
+            elif command == 'EXPUNGE':
+                for number in mailbox.expunge():
+                    self.reply(f'* {number} EXPUNGE')
+            elif command == 'LOGOUT':
+                self.reply('* BYE loadtest IMAP closing')
+                self.reply(f'{tag} OK LOGOUT completed')
+                return
+            elif command not in ('LOGIN', 'AUTHENTICATE', 'NOOP', 'CLOSE', 'CHECK'):
+                self.reply(f'{tag} BAD Unsupported command {command}')
+                continue
+            self.reply(f'{tag} OK {command} completed')
+
+
+def _message_set(spec: str, exists: int) -> List[int]:
+    numbers = []
+    for part in spec.split(','):
+        start, _, end = part.partition(':')
+        first = exists if start == '*' else int(start)
+        last = first if not end else (exists if end == '*' else int(end))
+        numbers.extend(range(first, last + 1))
+    return numbers
+
+
+class FakeIMAPServer(_MailServer):
+    """A single in-memory mailbox, addressed by sequence number
+
+    ``fetch`` sets \\Seen like a real RFC822 fetch, so repeated
+    ``SEARCH UNSEEN`` polls drain the mailbox the way a live inbox would.
+    """
+
+    handler = _IMAPHandler
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, delay: float = 0.0):
+        super().__init__(host, port, delay)
+        self._messages: List[bytes] = []
+        self._flags: List[set] = []
+        self.fetched = 0
+
+    def deliver(self, message: bytes):
+        with self._lock:
+            self._messages.append(message)
+            self._flags.append(set())
+
+    def deliver_many(self, count: int, from_email: str = 'usuario@cliente.example',
+                     to_email: str = 'soporte@loadtest.example', body_size: int = 2000,
+                     subject_prefix: Optional[str] = None):
+        body = ('Equipo sin conexión a la red desde esta mañana. ' * (body_size // 48 + 1))[:body_size]
+        for i in range(count):
+            msg = EmailMessage()
+            msg['From'] = from_email
+            msg['To'] = to_email
+            msg['Subject'] = f"{subject_prefix or ''}Falla de red #{i}".strip()
+            msg['Message-ID'] = make_msgid(domain='loadtest.example')
+            msg.set_content(body)
+            self.deliver(msg.as_bytes())
+
+    @property
+    def exists(self) -> int:
+        with self._lock:
+            return len(self._messages)
+
+    def search(self, unseen: bool = False) -> List[int]:
+        with self._lock:
+            return [i + 1 for i, flags in enumerate(self._flags) if not (unseen and '\\Seen' in flags)]
+
+    def fetch(self, number: int) -> Optional[bytes]:
+        with self._lock:
+            if not 0 < number <= len(self._messages):
+                return None
+            self._flags[number - 1].add('\\Seen')
+            self.fetched += 1
+            return self._messages[number - 1]
+
+    def store(self, number: int, flags: str):
+        mode, _, values = flags.partition(' ')
+        names = set(values.strip('()').split())
+        with self._lock:
+            if not 0 < number <= len(self._flags):
+                return
+            if mode.upper().startswith('-'):
+                self._flags[number - 1] -= names
+            else:
+                self._flags[number - 1] |= names
+
+    def flags(self, number: int) -> str:
+        with self._lock:
+            return ' '.join(sorted(self._flags[number - 1])) if 0 < number <= len(self._flags) else ''
+
+    def expunge(self) -> List[int]:
+        removed = []
+        with self._lock:
+            for index in range(len(self._messages) - 1, -1, -1):
+                if '\\Deleted' in self._flags[index]:
+                    del self._messages[index]
+                    del self._flags[index]
+                    removed.append(index + 1)
+        return removed
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Helpdesk V3 - HTTP Load Driver
+Simulated agents posting TIER 1/TIER 2 heartbeats alongside technicians
+browsing the dashboard, against a running backend
+"""
+
+import json
+import time
+import random
+import threading
+import http.client
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .stats import LatencyRecorder
+
+# Technician dashboard traffic: (subsystem, path), picked uniformly per page view
+TECHNICIAN_PAGES = (
+    ('dashboard.stats', '/api/dashboard/stats'),
+    ('dashboard.recent_activity', '/api/dashboard/recent-activity'),
+    ('dashboard.charts', '/api/dashboard/charts'),
+    ('tickets.list', '/api/tickets/?page=1&per_page=20'),
+)
+
+
+class _Client:
+    """One keep-alive connection per load thread, reopened after errors"""
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.https = parts.scheme == 'https'
+        self.timeout = timeout
+        self.conn = None
+
+    def request(self, method: str, path: str, body: Optional[Dict] = None,
+                headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        if self.conn is None:
+            factory = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            self.conn = factory(self.host, self.port, timeout=self.timeout)
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        send_headers = {'Content-Type': 'application/json'} if payload is not None else {}
+        send_headers.update(headers or {})
+        try:
+            self.conn.request(method, path, body=payload, headers=send_headers)
+            response = self.conn.getresponse()
+            return response.status, dict(response.getheaders()), response.read()
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def tier1_payload(asset_id: str, rng: random.Random) -> Dict[str, Any]:
+    return {
+        'asset_id': asset_id,
+        'heartbeat_type': 'status',
+        'status': {
+            'agent_status': 'online',
+            'cpu_percent': round(rng.uniform(1, 95), 1),
+            'memory_percent': round(rng.uniform(20, 90), 1),
+            'disk_percent': round(rng.uniform(30, 95), 1),
+            'agent_version': '3.0.0'
+        }
+    }
+
+
+def tier2_payload(asset_id: str, rng: random.Random, software_count: int = 120) -> Dict[str, Any]:
+    payload = tier1_payload(asset_id, rng)
+    payload['heartbeat_type'] = 'full'
+    payload['hardware_inventory'] = {
+        'cpu': {'name': 'Intel(R) Core(TM) i5-10400 CPU @ 2.90GHz', 'cores': 6, 'threads': 12},
+        'memory': {'total_gb': 16},
+        'disks': [{
+            'model': 'Samsung SSD 870 EVO 500GB', 'size_gb': 465, 'health_status': 'Healthy',
+            'smart_status': 'OK', 'interface_type': 'SATA'
+        }],
+        'network': [{'name': 'Ethernet', 'mac': f'00:1A:2B:{rng.randrange(256):02X}:{rng.randrange(256):02X}:01'}]
+    }
+    payload['software_inventory'] = [
+        {'name': f'Aplicación {i}', 'version': f'{i % 7}.{i % 13}.0', 'publisher': 'Proveedor SA de CV'}
+        for i in range(software_count)
+    ]
+    return payload
+
+
+def _agent_worker(base_url: str, assets: List[str], deadline: float, interval: float,
+                  tier2_ratio: float, recorder: LatencyRecorder, seed: int):
+    """Cycles through its share of the fleet, one heartbeat per asset every ``interval`` seconds"""
+    rng = random.Random(seed)
+    client = _Client(base_url)
+    spacing = interval / len(assets) if interval else 0.0
+    next_at = time.perf_counter()
+    index = 0
+    try:
+        while time.perf_counter() < deadline:
+            if spacing:
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_at += spacing
+
+            asset_id = assets[index % len(assets)]
+            index += 1
+            full = rng.random() < tier2_ratio
+            body = tier2_payload(asset_id, rng) if full else tier1_payload(asset_id, rng)
+            subsystem = 'heartbeat.tier2' if full else 'heartbeat.tier1'
+
+            started = time.perf_counter()
+            try:
+                status, _, _ = client.request('POST', '/api/agents/heartbeat', body)
+            except Exception:
+                recorder.record(subsystem, time.perf_counter() - started, ok=False)
+                continue
+            elapsed = time.perf_counter() - started
+            if status == 503:
+                # Shed by the cadence controller: tracked apart from failures
+                recorder.record('heartbeat.shed', elapsed)
+            else:
+                recorder.record(subsystem, elapsed, ok=status == 200)
+    finally:
+        client.close()
+
+
+def _technician_worker(base_url: str, email: str, password: str, deadline: float, think_time: float,
+                       recorder: LatencyRecorder, seed: int):
+    """Logs in once, then opens dashboard pages with ``think_time`` seconds between them"""
+    rng = random.Random(seed)
+    client = _Client(base_url)
+    try:
+        started = time.perf_counter()
+        try:
+            status, _, body = client.request('POST', '/api/auth/login', {'email': email, 'password': password})
+        except Exception:
+            status, body = 0, b''
+        recorder.record('auth.login', time.perf_counter() - started, ok=status == 200)
+        if status != 200:
+            return
+        headers = {'Authorization': 'Bearer ' + json.loads(body)['data']['access_token']}
+
+        while time.perf_counter() < deadline:
+            subsystem, path = rng.choice(TECHNICIAN_PAGES)
+            started = time.perf_counter()
+            try:
+                status, _, _ = client.request('GET', path, headers=headers)
+            except Exception:
+                status = 0
+            recorder.record(subsystem, time.perf_counter() - started, ok=status == 200)
+            if think_time:
+                time.sleep(rng.uniform(0.5, 1.5) * think_time)
+    finally:
+        client.close()
+
+
+def run_http_load(base_url: str, assets: List[str], technicians: List[str], password: str,
+                  recorder: LatencyRecorder, duration: float = 60.0, agents: int = 2000,
+                  agent_threads: int = 32, interval: float = 60.0, tier2_ratio: float = 0.05,
+                  technician_count: int = 20, think_time: float = 2.0) -> Dict[str, Any]:
+    """Drive heartbeats and dashboard traffic for ``duration`` seconds
+
+    ``agents`` simulated agents (asset ids reused round-robin when the fleet
+    is smaller) are shared by ``agent_threads`` threads; each agent sends one
+    heartbeat per ``interval`` seconds (0 = as fast as possible), TIER 2 with
+    probability ``tier2_ratio``. Technicians run one thread each.
+    """
+    if not assets:
+        raise ValueError('No seeded assets: run the seed step first')
+    fleet = [assets[i % len(assets)] for i in range(agents)]
+    agent_threads = max(1, min(agent_threads, agents))
+    deadline = time.perf_counter() + duration
+
+    threads = [
+        threading.Thread(target=_agent_worker, name=f'agent-{i}', daemon=True, args=(
+            base_url, fleet[i::agent_threads], deadline, interval, tier2_ratio, recorder, i))
+        for i in range(agent_threads)
+    ]
+    threads += [
+        threading.Thread(target=_technician_worker, name=f'technician-{i}', daemon=True, args=(
+            base_url, technicians[i % len(technicians)], password, deadline, think_time, recorder, 10_000 + i))
+        for i in range(technician_count if technicians else 0)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(duration + 60)
+
+    return {
+        'agents': agents,
+        'agent_threads': agent_threads,
+        'interval_s': interval,
+        'tier2_ratio': tier2_ratio,
+        'technicians': technician_count if technicians else 0,
+        'duration_s': duration
+    }
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Helpdesk V3 - Synthetic Fleet Seeding
+Bulk-generates clients, sites, technicians, assets, tickets and heartbeats
+with server-side INSERT ... SELECT generate_series, in committed batches
+"""
+
+import time
+from typing import Any, Callable, Dict, Optional
+
+import bcrypt
+import psycopg2
+
+from .stats import LatencyRecorder
+
+# Every seeded client/user uses this domain and every seeded ticket the LT-
+# prefix, so a purge never touches real data
+SEED_DOMAIN = 'loadtest.example'
+TICKET_PREFIX = 'LT-'
+TECHNICIAN_PASSWORD = 'LoadTest123!'
+
+
+def _timed(conn, recorder: Optional[LatencyRecorder], subsystem: str, query: str, params=None) -> int:
+    started = time.perf_counter()
+    with conn.cursor() as cur:
+        cur.execute(query, params)
+        rows = cur.rowcount
+    conn.commit()
+    if recorder is not None:
+        recorder.add_rows(subsystem, max(rows, 0), time.perf_counter() - started)
+    return rows
+
+
+def _batched(conn, recorder, subsystem: str, query: str, total: int, batch_size: int,
+             params: Dict[str, Any], progress: Optional[Callable[[str, int, int], None]] = None) -> int:
+    """Runs ``query`` once per [lo, hi] slice of 1..total, one commit per slice"""
+    inserted = 0
+    for lo in range(1, total + 1, batch_size):
+        hi = min(lo + batch_size - 1, total)
+        inserted += _timed(conn, recorder, subsystem, query, dict(params, lo=lo, hi=hi))
+        if progress:
+            progress(subsystem, inserted, total)
+    return inserted
+
+
+def purge_fleet(database_url: str) -> Dict[str, int]:
+    """Delete everything a previous seed or load run created"""
+    like = f'%@{SEED_DOMAIN}'
+    deleted = {}
+    conn = psycopg2.connect(database_url)
+    try:
+        with conn.cursor() as cur:
+            for table, query in (
+                ('email_queue', "DELETE FROM email_queue WHERE config_id IN "
+                                "(SELECT config_id FROM email_configurations WHERE name = 'loadtest')"),
+                ('email_processing_log', "DELETE FROM email_processing_log WHERE config_id IN "
+                                         "(SELECT config_id FROM email_configurations WHERE name = 'loadtest')"),
+                ('email_configurations', "DELETE FROM email_configurations WHERE name = 'loadtest'"),
+                # Tickets, sites, assets and their heartbeats cascade from clients
+                ('clients', "DELETE FROM clients WHERE email LIKE %s"),
+                ('users', "DELETE FROM users WHERE email LIKE %s"),
+            ):
+                cur.execute(query, (like,) if '%s' in query else None)
+                deleted[table] = cur.rowcount
+        conn.commit()
+    finally:
+        conn.close()
+    return deleted
+
+
+def seed_fleet(database_url: str, clients: int = 50, sites_per_client: int = 4, assets_per_site: int = 25,
+               technicians: int = 20, tickets: int = 1_000_000, heartbeats: int = 1_000_000,
+               days: int = 7, batch_size: int = 50_000, recorder: Optional[LatencyRecorder] = None,
+               progress: Optional[Callable[[str, int, int], None]] = None) -> Dict[str, int]:
+    """Seed a synthetic fleet, replacing any earlier one
+
+    Tickets and heartbeats are spread over the last ``days`` days and across
+    all seeded sites/assets; triggers stay enabled, so ticket audit rows and
+    the heartbeat latest-value table are maintained as in production.
+    Insert timings land in ``recorder`` as seed.<table> subsystems.
+    """
+    purge_fleet(database_url)
+    like = f'%@{SEED_DOMAIN}'
+    password_hash = bcrypt.hashpw(TECHNICIAN_PASSWORD.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    counts = {}
+
+    conn = psycopg2.connect(database_url)
+    try:
+        counts['clients'] = _timed(conn, recorder, 'seed.clients', f"""
+            INSERT INTO clients (name, email, rfc, phone, city, state)
+            SELECT 'LT Cliente ' || g, 'cliente' || g || '@{SEED_DOMAIN}',
+                   'LTC' || lpad(g::text, 6, '0') || 'A01', '5550000000', 'Ciudad de México', 'CDMX'
+            FROM generate_series(1, %s) g
+        """, (clients,))
+
+        counts['sites'] = _timed(conn, recorder, 'seed.sites', """
+            INSERT INTO sites (client_id, name, address, city, state, postal_code)
+            SELECT c.client_id, 'Sitio ' || s, 'Av. Reforma ' || s, 'Ciudad de México', 'CDMX',
+                   lpad((10000 + s)::text, 5, '0')
+            FROM clients c CROSS JOIN generate_series(1, %s) s
+            WHERE c.email LIKE %s
+        """, (sites_per_client, like))
+
+        counts['technicians'] = _timed(conn, recorder, 'seed.users', f"""
+            INSERT INTO users (name, email, password_hash, role)
+            SELECT 'Técnico LT ' || g, 'tecnico' || g || '@{SEED_DOMAIN}', %s, 'technician'
+            FROM generate_series(1, %s) g
+        """, (password_hash, technicians))
+
+        counts['assets'] = _timed(conn, recorder, 'seed.assets', """
+            INSERT INTO assets (client_id, site_id, asset_type, name, status, agent_status)
+            SELECT s.client_id, s.site_id, (ARRAY['desktop', 'laptop', 'server']::asset_type[])[1 + a %% 3],
+                   'LT-PC-' || left(s.site_id::text, 8) || '-' || a, 'active', 'online'
+            FROM sites s JOIN clients c ON c.client_id = s.client_id
+            CROSS JOIN generate_series(1, %s) a
+            WHERE c.email LIKE %s
+        """, (assets_per_site, like))
+
+        with conn.cursor() as cur:
+            # Numbered lookup tables so each generated row maps to a site/asset/technician by modulo
+            cur.execute("""
+                CREATE TEMP TABLE lt_sites AS
+                SELECT row_number() OVER (ORDER BY s.site_id) AS n, s.site_id, s.client_id
+                FROM sites s JOIN clients c ON c.client_id = s.client_id WHERE c.email LIKE %s
+            """, (like,))
+            cur.execute("""
+                CREATE TEMP TABLE lt_assets AS
+                SELECT row_number() OVER (ORDER BY a.asset_id) AS n, a.asset_id
+                FROM assets a JOIN clients c ON c.client_id = a.client_id WHERE c.email LIKE %s
+            """, (like,))
+            cur.execute("""
+                CREATE TEMP TABLE lt_technicians AS
+                SELECT row_number() OVER (ORDER BY user_id) AS n, user_id
+                FROM users WHERE email LIKE %s AND role = 'technician'
+            """, (like,))
+        conn.commit()
+
+        site_count = counts['sites'] or 1
+        asset_count = counts['assets'] or 1
+        technician_count = counts['technicians'] or 1
+        minutes = days * 1440
+
+        counts['tickets'] = _batched(conn, recorder, 'seed.tickets', f"""
+            INSERT INTO tickets (ticket_number, client_id, site_id, created_by, assigned_to, subject,
+                                 description, affected_person, affected_person_contact, priority, status,
+                                 channel, created_at)
+            SELECT '{TICKET_PREFIX}' || lpad(g::text, 9, '0'), s.client_id, s.site_id, t.user_id, t.user_id,
+                   'Ticket de carga ' || g, 'Generado por benchmark_suite.py', 'Usuario ' || g,
+                   'usuario' || g || '@{SEED_DOMAIN}',
+                   (ARRAY['baja', 'media', 'alta', 'critica']::ticket_priority[])[1 + g %% 4],
+                   (ARRAY['nuevo', 'asignado', 'en_proceso', 'espera_cliente', 'resuelto',
+                          'cerrado']::ticket_status[])[1 + g %% 6],
+                   'portal', NOW() - (g %% %(minutes)s) * INTERVAL '1 minute'
+            FROM generate_series(%(lo)s, %(hi)s) g
+            JOIN lt_sites s ON s.n = 1 + g %% %(sites)s
+            JOIN lt_technicians t ON t.n = 1 + g %% %(technicians)s
+        """, tickets, batch_size, {'minutes': minutes, 'sites': site_count, 'technicians': technician_count},
+            progress)
+
+        with conn.cursor() as cur:
+            # Daily partitions exist only once partition_asset_heartbeats.sql has run
+            cur.execute("SELECT to_regproc('heartbeat_ensure_partitions') IS NOT NULL AS partitioned")
+            if cur.fetchone()[0]:
+                cur.execute("SELECT heartbeat_ensure_partitions((NOW() - %s * INTERVAL '1 day')::date, "
+                            "(NOW() + INTERVAL '1 day')::date)", (days,))
+        conn.commit()
+
+        counts['heartbeats'] = _batched(conn, recorder, 'seed.heartbeats', """
+            INSERT INTO asset_heartbeats (asset_id, created_at, cpu_usage, memory_usage, disk_usage,
+                                          network_status, agent_version, system_uptime, status)
+            SELECT a.asset_id, NOW() - (g %% %(seconds)s) * INTERVAL '1 second',
+                   (g * 7) %% 100, (g * 13) %% 100, 40 + (g %% 50), 'connected', '3.0.0', g %% 864000, 'online'
+            FROM generate_series(%(lo)s, %(hi)s) g
+            JOIN lt_assets a ON a.n = 1 + g %% %(assets)s
+        """, heartbeats, batch_size, {'seconds': days * 86400, 'assets': asset_count}, progress)
+
+        with conn.cursor() as cur:
+            for table in ('clients', 'sites', 'users', 'assets', 'tickets', 'asset_heartbeats'):
+                cur.execute(f"ANALYZE {table}")
+        conn.commit()
+    finally:
+        conn.close()
+    return counts
+
+
+def load_fleet(database_url: str, max_assets: int = 100_000) -> Dict[str, Any]:
+    """Asset ids, technician emails and a client email of the seeded fleet, for the load phase"""
+    like = f'%@{SEED_DOMAIN}'
+    conn = psycopg2.connect(database_url)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT a.asset_id::text FROM assets a JOIN clients c ON c.client_id = a.client_id
+                WHERE c.email LIKE %s ORDER BY a.asset_id LIMIT %s
+            """, (like, max_assets))
+            assets = [row[0] for row in cur.fetchall()]
+            cur.execute("SELECT email FROM users WHERE email LIKE %s AND role = 'technician' ORDER BY email",
+                        (like,))
+            technicians = [row[0] for row in cur.fetchall()]
+            cur.execute("SELECT client_id::text, email FROM clients WHERE email LIKE %s ORDER BY email LIMIT 1",
+                        (like,))
+            client = cur.fetchone()
+    finally:
+        conn.close()
+    return {
+        'assets': assets,
+        'technicians': technicians,
+        'client_id': client[0] if client else None,
+        'client_email': client[1] if client else None
+    }
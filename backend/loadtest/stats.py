@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Helpdesk V3 - Load Test Statistics
+Latency samples per subsystem, percentile summaries and run-to-run comparison
+"""
+
+import json
+import time
+import threading
+import subprocess
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of already sorted samples"""
+    if not samples:
+        return 0.0
+    rank = (len(samples) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(samples) - 1)
+    return samples[low] + (samples[high] - samples[low]) * (rank - low)
+
+
+class LatencyRecorder:
+    """Thread-safe latency and row counts, keyed by subsystem
+
+    ``record`` is called from every load thread; ``elapsed`` for a subsystem
+    runs from its first to its last sample, so rows/sec reflects the time it
+    was actually under load.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = {}
+        self._errors: Dict[str, int] = {}
+        self._rows: Dict[str, int] = {}
+        self._window: Dict[str, List[float]] = {}
+
+    def record(self, subsystem: str, seconds: float, ok: bool = True, rows: int = 1):
+        now = time.perf_counter()
+        with self._lock:
+            self._samples.setdefault(subsystem, []).append(seconds)
+            if ok:
+                self._rows[subsystem] = self._rows.get(subsystem, 0) + rows
+            else:
+                self._errors[subsystem] = self._errors.get(subsystem, 0) + 1
+            window = self._window.setdefault(subsystem, [now - seconds, now])
+            window[1] = now
+
+    def add_rows(self, subsystem: str, rows: int, seconds: float):
+        """Bulk work measured as a whole (seeding, queue drains): one sample"""
+        self.record(subsystem, seconds, rows=rows)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            subsystems = {name: sorted(samples) for name, samples in self._samples.items()}
+            errors = dict(self._errors)
+            rows = dict(self._rows)
+            windows = {name: tuple(window) for name, window in self._window.items()}
+
+        result = {}
+        for name, samples in sorted(subsystems.items()):
+            elapsed = max(windows[name][1] - windows[name][0], 1e-9)
+            entry = {
+                'requests': len(samples),
+                'errors': errors.get(name, 0),
+                'rows': rows.get(name, 0),
+                'elapsed_s': round(elapsed, 3),
+                'rows_per_sec': round(rows.get(name, 0) / elapsed, 1),
+                'max_ms': round(samples[-1] * 1000, 2)
+            }
+            for pct in PERCENTILES:
+                entry[f'p{pct}_ms'] = round(percentile(samples, pct) * 1000, 2)
+            result[name] = entry
+        return result
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def build_report(recorder: LatencyRecorder, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'commit': git_commit(),
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'parameters': parameters,
+        'subsystems': recorder.summary()
+    }
+
+
+def write_report(report: Dict[str, Any], path: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any],
+                    tolerance: float = 0.10) -> List[Dict[str, Any]]:
+    """Per-subsystem deltas between two reports
+
+    A subsystem regresses when p95 latency grows, or rows/sec drops, by more
+    than ``tolerance`` (a fraction), or when it starts returning errors.
+    """
+    rows = []
+    base_subsystems = baseline.get('subsystems', {})
+    for name, cur in sorted(current.get('subsystems', {}).items()):
+        base = base_subsystems.get(name)
+        if base is None:
+            rows.append({'subsystem': name, 'status': 'new'})
+            continue
+
+        def change(key):
+            return (cur[key] - base[key]) / base[key] if base[key] else 0.0
+
+        p95_change = change('p95_ms')
+        throughput_change = change('rows_per_sec')
+        regressed = p95_change > tolerance or throughput_change < -tolerance \
+            or (cur['errors'] > 0 and base['errors'] == 0)
+        rows.append({
+            'subsystem': name,
+            'status': 'regressed' if regressed else 'ok',
+            'p95_ms': (base['p95_ms'], cur['p95_ms']),
+            'p95_change': round(p95_change, 3),
+            'rows_per_sec': (base['rows_per_sec'], cur['rows_per_sec']),
+            'rows_per_sec_change': round(throughput_change, 3),
+            'errors': (base['errors'], cur['errors'])
+        })
+    for name in sorted(set(base_subsystems) - set(current.get('subsystems', {}))):
+        rows.append({'subsystem': name, 'status': 'missing'})
+    return rows
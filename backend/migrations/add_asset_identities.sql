@@ -0,0 +1,219 @@
+-- Migration: Indexed asset identities for agent registration
+-- Date: 2026-10-19
+-- Purpose: Match registering agents to existing assets through a dedicated
+--          asset_identities table (fingerprint, MAC set, hardware serials)
+--          instead of unindexed lookups on specifications JSON. An exact
+--          fingerprint wins; otherwise two of {computer name, a shared MAC,
+--          a shared serial} must agree, so a NIC swap or a rename does not
+--          create a duplicate asset. register_agent_asset() validates the
+--          token, matches or creates the asset, records the identity and
+--          logs the token usage in one transaction and one round trip.
+
+BEGIN;
+
+-- =====================================================
+-- 1. Table
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS asset_identities (
+    asset_id UUID PRIMARY KEY REFERENCES assets(asset_id) ON DELETE CASCADE,
+    client_id UUID NOT NULL REFERENCES clients(client_id) ON DELETE CASCADE,
+    hardware_fingerprint VARCHAR(64) NOT NULL,
+    computer_name VARCHAR(255) NOT NULL DEFAULT '',
+    mac_addresses TEXT[] NOT NULL DEFAULT '{}',
+    serials TEXT[] NOT NULL DEFAULT '{}',
+    matched_by VARCHAR(20),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_asset_identities_fingerprint
+    ON asset_identities(client_id, hardware_fingerprint);
+CREATE INDEX IF NOT EXISTS idx_asset_identities_macs
+    ON asset_identities USING GIN (mac_addresses);
+CREATE INDEX IF NOT EXISTS idx_asset_identities_serials
+    ON asset_identities USING GIN (serials);
+CREATE INDEX IF NOT EXISTS idx_asset_identities_name
+    ON asset_identities(client_id, lower(computer_name));
+
+-- =====================================================
+-- 2. Registration
+-- =====================================================
+
+-- p_mac_addresses / p_serials must already be normalized (upper case,
+-- colon-separated MACs; placeholder serials removed) by the caller.
+CREATE OR REPLACE FUNCTION register_agent_asset(
+    p_token_value VARCHAR(50),
+    p_computer_name VARCHAR(255),
+    p_fingerprint VARCHAR(64),
+    p_mac_addresses TEXT[],
+    p_serials TEXT[],
+    p_specifications JSONB,
+    p_ip_address VARCHAR(45),
+    p_user_agent TEXT,
+    p_hardware_info JSONB
+)
+RETURNS TABLE (
+    is_valid BOOLEAN,
+    error_message TEXT,
+    asset_id UUID,
+    client_id UUID,
+    site_id UUID,
+    client_name VARCHAR(255),
+    site_name VARCHAR(255),
+    existing_asset BOOLEAN,
+    matched_by VARCHAR(20)
+) AS $$
+DECLARE
+    v_token RECORD;
+    v_asset_id UUID;
+    v_matched_by VARCHAR(20);
+    v_name VARCHAR(255) := COALESCE(NULLIF(btrim(p_computer_name), ''), 'Unknown');
+    v_macs TEXT[] := COALESCE(p_mac_addresses, '{}');
+    v_serials TEXT[] := COALESCE(p_serials, '{}');
+BEGIN
+    SELECT * INTO v_token FROM validate_agent_token(p_token_value);
+
+    IF NOT v_token.is_valid THEN
+        IF v_token.token_id IS NOT NULL THEN
+            INSERT INTO agent_token_usage_history
+                (token_id, ip_address, user_agent, computer_name, hardware_fingerprint,
+                 registration_successful, asset_id, error_message)
+            VALUES (v_token.token_id, p_ip_address::inet, p_user_agent, v_name,
+                    p_hardware_info::text, false, NULL, v_token.error_message);
+        END IF;
+        RETURN QUERY SELECT false, v_token.error_message, NULL::UUID, NULL::UUID, NULL::UUID,
+            NULL::VARCHAR(255), NULL::VARCHAR(255), false, NULL::VARCHAR(20);
+        RETURN;
+    END IF;
+
+    -- Concurrent installs of the same machine (retries, reinstalls) serialize here
+    PERFORM pg_advisory_xact_lock(hashtext('asset_identity:' || v_token.client_id::text || ':' || lower(v_name)));
+
+    -- 1. Exact fingerprint
+    SELECT i.asset_id INTO v_asset_id
+    FROM asset_identities i
+    JOIN assets a ON a.asset_id = i.asset_id AND a.status = 'active'
+    WHERE i.client_id = v_token.client_id AND i.hardware_fingerprint = p_fingerprint;
+
+    IF FOUND THEN
+        v_matched_by := 'fingerprint';
+    ELSE
+        -- 2. Two of name / MAC / serial agree; known, disjoint serials mean different hardware.
+        --    Identities without serials (older agents, backfilled rows) also match on name alone.
+        SELECT c.asset_id INTO v_asset_id
+        FROM (
+            SELECT i.asset_id, a.last_seen,
+                   (i.mac_addresses && v_macs) AS mac_match,
+                   (i.serials && v_serials) AS serial_match,
+                   (lower(i.computer_name) = lower(v_name)) AS name_match,
+                   (cardinality(i.serials) > 0 AND cardinality(v_serials) > 0
+                        AND NOT (i.serials && v_serials)) AS serial_conflict,
+                   cardinality(i.serials) = 0 AS serials_unknown
+            FROM asset_identities i
+            JOIN assets a ON a.asset_id = i.asset_id AND a.status = 'active'
+            WHERE i.client_id = v_token.client_id
+              AND (i.mac_addresses && v_macs
+                   OR i.serials && v_serials
+                   OR lower(i.computer_name) = lower(v_name))
+        ) c
+        WHERE NOT c.serial_conflict
+          AND (c.mac_match::int + c.serial_match::int + c.name_match::int >= 2
+               OR (c.name_match AND c.serials_unknown))
+        ORDER BY c.serial_match DESC, c.mac_match DESC, c.last_seen DESC NULLS LAST
+        LIMIT 1;
+
+        IF FOUND THEN
+            v_matched_by := 'components';
+        ELSE
+            -- 3. Legacy assets registered before identities existed
+            SELECT a.asset_id INTO v_asset_id
+            FROM assets a
+            WHERE a.client_id = v_token.client_id
+              AND a.name = v_name || ' (Agent)'
+              AND a.status = 'active'
+              AND NOT EXISTS (SELECT 1 FROM asset_identities i WHERE i.asset_id = a.asset_id)
+            ORDER BY a.last_seen DESC NULLS LAST
+            LIMIT 1;
+
+            IF FOUND THEN
+                v_matched_by := 'name';
+            END IF;
+        END IF;
+    END IF;
+
+    IF v_asset_id IS NOT NULL THEN
+        UPDATE assets a
+        SET agent_status = 'online',
+            last_seen = NOW(),
+            specifications = COALESCE(a.specifications, '{}'::jsonb) || p_specifications
+                || jsonb_build_object('last_registration_date', NOW()),
+            updated_at = NOW()
+        WHERE a.asset_id = v_asset_id;
+    ELSE
+        INSERT INTO assets (client_id, site_id, name, asset_type, status, agent_status, last_seen, specifications)
+        VALUES (v_token.client_id, v_token.site_id, v_name || ' (Agent)', 'desktop', 'active', 'online', NOW(),
+                p_specifications || jsonb_build_object('registration_date', NOW()))
+        RETURNING assets.asset_id INTO v_asset_id;
+    END IF;
+
+    -- A retired asset may still hold this fingerprint
+    DELETE FROM asset_identities i
+    WHERE i.client_id = v_token.client_id AND i.hardware_fingerprint = p_fingerprint
+      AND i.asset_id <> v_asset_id;
+
+    INSERT INTO asset_identities AS i
+        (asset_id, client_id, hardware_fingerprint, computer_name, mac_addresses, serials, matched_by)
+    VALUES (v_asset_id, v_token.client_id, p_fingerprint, v_name, v_macs, v_serials, v_matched_by)
+    -- Constraint by name: asset_id is also an output column of this function
+    ON CONFLICT ON CONSTRAINT asset_identities_pkey DO UPDATE SET
+        client_id = EXCLUDED.client_id,
+        hardware_fingerprint = EXCLUDED.hardware_fingerprint,
+        computer_name = EXCLUDED.computer_name,
+        mac_addresses = EXCLUDED.mac_addresses,
+        -- Keep known serials when an agent cannot read them this time
+        serials = CASE WHEN cardinality(EXCLUDED.serials) > 0 THEN EXCLUDED.serials ELSE i.serials END,
+        matched_by = EXCLUDED.matched_by,
+        updated_at = NOW();
+
+    UPDATE agent_installation_tokens
+    SET usage_count = usage_count + 1, last_used_at = NOW()
+    WHERE token_id = v_token.token_id;
+
+    INSERT INTO agent_token_usage_history
+        (token_id, ip_address, user_agent, computer_name, hardware_fingerprint,
+         registration_successful, asset_id, error_message)
+    VALUES (v_token.token_id, p_ip_address::inet, p_user_agent, v_name,
+            p_hardware_info::text, true, v_asset_id, NULL);
+
+    RETURN QUERY SELECT true, NULL::TEXT, v_asset_id, v_token.client_id, v_token.site_id,
+        v_token.client_name, v_token.site_name, v_matched_by IS NOT NULL, v_matched_by;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =====================================================
+-- 3. Backfill from agent-registered assets
+-- =====================================================
+
+INSERT INTO asset_identities (asset_id, client_id, hardware_fingerprint, computer_name, mac_addresses, matched_by)
+SELECT DISTINCT ON (a.client_id, a.specifications->>'hardware_fingerprint')
+    a.asset_id,
+    a.client_id,
+    a.specifications->>'hardware_fingerprint',
+    regexp_replace(a.name, ' \(Agent\)$', ''),
+    COALESCE(ARRAY(
+        SELECT DISTINCT upper(replace(n->>'mac_address', '-', ':'))
+        FROM jsonb_array_elements(
+            CASE WHEN jsonb_typeof(a.specifications->'network_interfaces') = 'array'
+                 THEN a.specifications->'network_interfaces' ELSE '[]'::jsonb END
+        ) n
+        WHERE COALESCE(n->>'mac_address', '') NOT IN ('', '00:00:00:00:00:00', '00-00-00-00-00-00')
+    ), '{}'),
+    'backfill'
+FROM assets a
+WHERE a.status = 'active'
+  AND COALESCE(a.specifications->>'hardware_fingerprint', '') <> ''
+ORDER BY a.client_id, a.specifications->>'hardware_fingerprint', a.last_seen DESC NULLS LAST
+ON CONFLICT DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,123 @@
+-- Migration: Per-tenant change counters for conditional GET
+-- Date: 2026-10-19
+-- Purpose: Give read endpoints a cheap version key. Every insert, update or
+--          delete on a tracked table bumps the counter of its resource for
+--          the affected client, in the same transaction, so a rolled back
+--          write never changes a version. core/conditional.py turns the
+--          counters into ETags and answers 304 without running the
+--          endpoint's queries.
+--          Resources: tickets (tickets, comments, attachments, activities,
+--          SLA tracking, resolutions), clients, sites and users.
+--          Rows without a client (staff users, orphaned rows) count under
+--          the all-zero client id. Updates that change nothing but
+--          bookkeeping columns (users.last_login on every login) are skipped.
+
+BEGIN;
+
+-- =====================================================
+-- 1. Table
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS change_counters (
+    resource VARCHAR(50) NOT NULL,
+    client_id UUID NOT NULL DEFAULT '00000000-0000-0000-0000-000000000000',
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (resource, client_id)
+);
+
+-- =====================================================
+-- 2. Functions
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION bump_change_counter(p_resource TEXT, p_client_id UUID)
+RETURNS VOID AS $$
+    INSERT INTO change_counters (resource, client_id, version, updated_at)
+    VALUES (p_resource, COALESCE(p_client_id, '00000000-0000-0000-0000-000000000000'), 1, NOW())
+    ON CONFLICT (resource, client_id) DO UPDATE
+    SET version = change_counters.version + 1, updated_at = NOW();
+$$ LANGUAGE sql;
+
+-- Client of a row: its own client_id, or that of its ticket (directly or
+-- through the comment an attachment belongs to)
+CREATE OR REPLACE FUNCTION change_counter_client(p_row JSONB)
+RETURNS UUID AS $$
+    SELECT COALESCE(
+        (p_row->>'client_id')::UUID,
+        (SELECT t.client_id FROM tickets t WHERE t.ticket_id = (p_row->>'ticket_id')::UUID),
+        (SELECT t.client_id FROM ticket_comments tc JOIN tickets t ON t.ticket_id = tc.ticket_id
+         WHERE tc.comment_id = (p_row->>'comment_id')::UUID)
+    );
+$$ LANGUAGE sql STABLE;
+
+-- TG_ARGV[0]: resource name
+-- TG_ARGV[1]: comma-separated columns whose changes alone do not count
+CREATE OR REPLACE FUNCTION change_counter_trigger()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_old UUID;
+    v_new UUID;
+    v_ignored TEXT[];
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        v_ignored := string_to_array(COALESCE(TG_ARGV[1], ''), ',');
+        IF (to_jsonb(NEW) - v_ignored) = (to_jsonb(OLD) - v_ignored) THEN
+            RETURN NULL;
+        END IF;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        v_old := change_counter_client(to_jsonb(OLD));
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        v_new := change_counter_client(to_jsonb(NEW));
+    END IF;
+
+    IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND v_old IS DISTINCT FROM v_new) THEN
+        PERFORM bump_change_counter(TG_ARGV[0], v_old);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM bump_change_counter(TG_ARGV[0], v_new);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =====================================================
+-- 3. Triggers
+-- =====================================================
+
+DO $$
+DECLARE
+    v_table TEXT;
+    v_resource TEXT;
+    v_ignored TEXT;
+BEGIN
+    FOR v_table, v_resource, v_ignored IN
+        SELECT * FROM (VALUES
+            ('tickets', 'tickets', ''),
+            ('ticket_comments', 'tickets', ''),
+            ('file_attachments', 'tickets', ''),
+            ('ticket_activities', 'tickets', ''),
+            ('sla_tracking', 'tickets', ''),
+            ('ticket_resolutions', 'tickets', ''),
+            ('clients', 'clients', ''),
+            ('sites', 'sites', ''),
+            -- Every login stamps last_login; that must not invalidate staff ETags
+            ('users', 'users', 'last_login,updated_at')
+        ) AS tracked(table_name, resource, ignored_columns)
+    LOOP
+        -- ticket_resolutions and sla_tracking are created by other migrations
+        IF to_regclass(v_table) IS NOT NULL THEN
+            EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_change_counter ON %I', v_table, v_table);
+            EXECUTE format(
+                'CREATE TRIGGER trg_%s_change_counter AFTER INSERT OR UPDATE OR DELETE ON %I '
+                'FOR EACH ROW EXECUTE FUNCTION change_counter_trigger(%L, %L)',
+                v_table, v_table, v_resource, v_ignored
+            );
+        END IF;
+    END LOOP;
+END;
+$$;
+
+COMMIT;
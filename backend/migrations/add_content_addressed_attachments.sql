@@ -0,0 +1,83 @@
+-- Migration: Content-addressed attachment storage
+-- Date: 2026-10-19
+-- Purpose: Deduplicate attachment files by SHA-256 and track blob reference counts
+
+-- One row per stored blob (uploads/blobs/<aa>/<bb>/<sha256>)
+CREATE TABLE IF NOT EXISTS file_blobs (
+    blob_hash VARCHAR(64) PRIMARY KEY,
+    file_size BIGINT NOT NULL DEFAULT 0,
+    ref_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Garbage collector scans unreferenced blobs oldest first
+CREATE INDEX IF NOT EXISTS idx_file_blobs_unreferenced
+    ON file_blobs(updated_at) WHERE ref_count <= 0;
+
+CREATE INDEX IF NOT EXISTS idx_file_attachments_file_hash
+    ON file_attachments(file_hash) WHERE file_hash IS NOT NULL;
+
+-- Keep file_blobs.ref_count in sync with file_attachments rows
+CREATE OR REPLACE FUNCTION file_blobs_add_ref(p_hash VARCHAR, p_size BIGINT)
+RETURNS VOID AS $$
+BEGIN
+    IF p_hash IS NULL THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO file_blobs (blob_hash, file_size, ref_count)
+    VALUES (p_hash, COALESCE(p_size, 0), 1)
+    ON CONFLICT (blob_hash) DO UPDATE
+        SET ref_count = file_blobs.ref_count + 1,
+            updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION file_blobs_release_ref(p_hash VARCHAR)
+RETURNS VOID AS $$
+BEGIN
+    IF p_hash IS NULL THEN
+        RETURN;
+    END IF;
+
+    UPDATE file_blobs
+    SET ref_count = GREATEST(ref_count - 1, 0),
+        updated_at = NOW()
+    WHERE blob_hash = p_hash;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION file_attachments_blob_refcount()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM file_blobs_add_ref(NEW.file_hash, NEW.file_size);
+        RETURN NEW;
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM file_blobs_release_ref(OLD.file_hash);
+        RETURN OLD;
+    ELSIF TG_OP = 'UPDATE' AND NEW.file_hash IS DISTINCT FROM OLD.file_hash THEN
+        PERFORM file_blobs_release_ref(OLD.file_hash);
+        PERFORM file_blobs_add_ref(NEW.file_hash, NEW.file_size);
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_file_attachments_blob_refcount ON file_attachments;
+CREATE TRIGGER trigger_file_attachments_blob_refcount
+    AFTER INSERT OR DELETE OR UPDATE OF file_hash ON file_attachments
+    FOR EACH ROW
+    EXECUTE FUNCTION file_attachments_blob_refcount();
+
+-- Seed reference counts for attachments that already carry a hash
+INSERT INTO file_blobs (blob_hash, file_size, ref_count)
+SELECT file_hash, MAX(file_size), COUNT(*)
+FROM file_attachments
+WHERE file_hash IS NOT NULL
+GROUP BY file_hash
+ON CONFLICT (blob_hash) DO UPDATE SET ref_count = EXCLUDED.ref_count;
+
+COMMENT ON TABLE file_blobs IS 'Content-addressed attachment blobs; ref_count maintained by triggers on file_attachments';
+COMMENT ON COLUMN file_blobs.ref_count IS 'Number of file_attachments rows pointing at this blob; 0 means eligible for garbage collection';
@@ -0,0 +1,42 @@
+-- Migration: Client/site/user directory search and statistics indexes
+-- Date: 2026-10-19
+-- Purpose: Trigram indexes for ILIKE '%term%' search and partial indexes for
+--          the per-client/per-site counters used by the directory listings
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Substring search (ILIKE '%term%') on the directory listings
+CREATE INDEX IF NOT EXISTS idx_clients_name_trgm
+    ON clients USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_clients_email_trgm
+    ON clients USING gin (email gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_clients_rfc_trgm
+    ON clients USING gin (rfc gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_users_name_trgm
+    ON users USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_email_trgm
+    ON users USING gin (email gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_sites_name_trgm
+    ON sites USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_sites_city_trgm
+    ON sites USING gin (city gin_trgm_ops);
+
+-- Ordered pagination over active rows
+CREATE INDEX IF NOT EXISTS idx_clients_active_name
+    ON clients(name) WHERE is_active = true;
+CREATE INDEX IF NOT EXISTS idx_users_active_name
+    ON users(name) WHERE is_active = true;
+
+-- Counters aggregated per client / per site
+CREATE INDEX IF NOT EXISTS idx_sites_client_active
+    ON sites(client_id) WHERE is_active = true;
+CREATE INDEX IF NOT EXISTS idx_users_client_active
+    ON users(client_id) WHERE is_active = true;
+CREATE INDEX IF NOT EXISTS idx_tickets_client_status
+    ON tickets(client_id, status);
+
+ANALYZE clients;
+ANALYZE users;
+ANALYZE sites;
@@ -0,0 +1,248 @@
+-- Migration: Precomputed fleet status counters
+-- Date: 2026-10-19
+-- Purpose: Keep per-client online/warning/offline asset counts incrementally
+--          and record status transitions as a change feed.
+--          Heartbeats (asset_heartbeat_latest) move assets to 'online';
+--          fleet_status_sweep() ages them to 'warning' (20 min) and
+--          'offline' (1 hour), matching the technician dashboard thresholds.
+-- Requires: migrations/partition_asset_heartbeats.sql
+
+BEGIN;
+
+-- =====================================================
+-- 1. Tables
+-- =====================================================
+
+-- Current connection status of every active asset
+CREATE TABLE IF NOT EXISTS asset_fleet_status (
+    asset_id UUID PRIMARY KEY REFERENCES assets(asset_id) ON DELETE CASCADE,
+    client_id UUID NOT NULL,
+    connection_status VARCHAR(10) NOT NULL DEFAULT 'offline'
+        CHECK (connection_status IN ('online', 'warning', 'offline')),
+    last_seen TIMESTAMP WITH TIME ZONE,
+    status_changed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- The sweeper only looks at assets that can still age out
+CREATE INDEX IF NOT EXISTS idx_asset_fleet_status_sweep
+    ON asset_fleet_status(last_seen) WHERE connection_status <> 'offline';
+CREATE INDEX IF NOT EXISTS idx_asset_fleet_status_status_seen
+    ON asset_fleet_status(connection_status, last_seen DESC);
+
+-- One row per client; the dashboard reads only this table
+CREATE TABLE IF NOT EXISTS client_fleet_counters (
+    client_id UUID PRIMARY KEY REFERENCES clients(client_id) ON DELETE CASCADE,
+    total_assets INTEGER NOT NULL DEFAULT 0,
+    online_assets INTEGER NOT NULL DEFAULT 0,
+    warning_assets INTEGER NOT NULL DEFAULT 0,
+    offline_assets INTEGER NOT NULL DEFAULT 0,
+    last_update TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Change feed of status transitions (drives alerts)
+CREATE TABLE IF NOT EXISTS asset_status_transitions (
+    transition_id BIGSERIAL PRIMARY KEY,
+    asset_id UUID NOT NULL,
+    client_id UUID NOT NULL,
+    from_status VARCHAR(10),
+    to_status VARCHAR(10) NOT NULL,
+    last_seen TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_asset_status_transitions_created
+    ON asset_status_transitions(created_at);
+
+-- =====================================================
+-- 2. Counter maintenance
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION fleet_counter_add(p_client_id UUID, p_status VARCHAR, p_delta INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO client_fleet_counters (client_id) VALUES (p_client_id)
+    ON CONFLICT (client_id) DO NOTHING;
+
+    UPDATE client_fleet_counters SET
+        total_assets = total_assets + p_delta,
+        online_assets = online_assets + CASE WHEN p_status = 'online' THEN p_delta ELSE 0 END,
+        warning_assets = warning_assets + CASE WHEN p_status = 'warning' THEN p_delta ELSE 0 END,
+        offline_assets = offline_assets + CASE WHEN p_status = 'offline' THEN p_delta ELSE 0 END,
+        updated_at = NOW()
+    WHERE client_id = p_client_id;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION asset_fleet_status_counters()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM fleet_counter_add(NEW.client_id, NEW.connection_status, 1);
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM fleet_counter_add(OLD.client_id, OLD.connection_status, -1);
+    ELSIF OLD.client_id IS DISTINCT FROM NEW.client_id
+          OR OLD.connection_status IS DISTINCT FROM NEW.connection_status THEN
+        PERFORM fleet_counter_add(OLD.client_id, OLD.connection_status, -1);
+        PERFORM fleet_counter_add(NEW.client_id, NEW.connection_status, 1);
+
+        IF OLD.connection_status IS DISTINCT FROM NEW.connection_status THEN
+            INSERT INTO asset_status_transitions (asset_id, client_id, from_status, to_status, last_seen)
+            VALUES (NEW.asset_id, NEW.client_id, OLD.connection_status, NEW.connection_status, NEW.last_seen);
+        END IF;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_asset_fleet_status_counters ON asset_fleet_status;
+CREATE TRIGGER trg_asset_fleet_status_counters
+    AFTER INSERT OR DELETE OR UPDATE OF connection_status, client_id ON asset_fleet_status
+    FOR EACH ROW
+    EXECUTE FUNCTION asset_fleet_status_counters();
+
+-- =====================================================
+-- 3. Inputs: asset lifecycle and heartbeats
+-- =====================================================
+
+-- Only active assets are tracked; moving between clients moves the count
+CREATE OR REPLACE FUNCTION assets_fleet_membership()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.status = 'active' THEN
+        INSERT INTO asset_fleet_status (asset_id, client_id, connection_status, last_seen)
+        VALUES (NEW.asset_id, NEW.client_id, 'offline', NULL)
+        ON CONFLICT (asset_id) DO UPDATE SET client_id = EXCLUDED.client_id
+        WHERE asset_fleet_status.client_id IS DISTINCT FROM EXCLUDED.client_id;
+    ELSE
+        DELETE FROM asset_fleet_status WHERE asset_id = NEW.asset_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_assets_fleet_membership ON assets;
+CREATE TRIGGER trg_assets_fleet_membership
+    AFTER INSERT OR UPDATE OF status, client_id ON assets
+    FOR EACH ROW
+    EXECUTE FUNCTION assets_fleet_membership();
+
+-- A heartbeat makes the asset online; last_update is bumped at most once a minute per client
+CREATE OR REPLACE FUNCTION asset_heartbeat_fleet_online()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_client_id UUID;
+BEGIN
+    UPDATE asset_fleet_status SET
+        last_seen = NEW.last_heartbeat,
+        connection_status = 'online',
+        status_changed_at = CASE WHEN connection_status = 'online' THEN status_changed_at ELSE NOW() END
+    WHERE asset_id = NEW.asset_id
+      AND (last_seen IS NULL OR last_seen < NEW.last_heartbeat)
+    RETURNING client_id INTO v_client_id;
+
+    IF v_client_id IS NOT NULL THEN
+        UPDATE client_fleet_counters SET last_update = NEW.last_heartbeat
+        WHERE client_id = v_client_id
+          AND (last_update IS NULL OR last_update < NEW.last_heartbeat - INTERVAL '1 minute');
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_asset_heartbeat_fleet_online ON asset_heartbeat_latest;
+CREATE TRIGGER trg_asset_heartbeat_fleet_online
+    AFTER INSERT OR UPDATE OF last_heartbeat ON asset_heartbeat_latest
+    FOR EACH ROW
+    EXECUTE FUNCTION asset_heartbeat_fleet_online();
+
+-- =====================================================
+-- 4. Sweeper and rebuild
+-- =====================================================
+
+-- Age assets whose last heartbeat crossed a threshold; returns rows changed
+CREATE OR REPLACE FUNCTION fleet_status_sweep(
+    p_warning_after INTERVAL DEFAULT INTERVAL '20 minutes',
+    p_offline_after INTERVAL DEFAULT INTERVAL '1 hour',
+    p_feed_retention INTERVAL DEFAULT INTERVAL '30 days'
+)
+RETURNS INTEGER AS $$
+DECLARE
+    v_changed INTEGER := 0;
+    v_count INTEGER;
+BEGIN
+    UPDATE asset_fleet_status SET connection_status = 'offline', status_changed_at = NOW()
+    WHERE connection_status <> 'offline'
+      AND (last_seen IS NULL OR last_seen < NOW() - p_offline_after);
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    v_changed := v_changed + v_count;
+
+    UPDATE asset_fleet_status SET connection_status = 'warning', status_changed_at = NOW()
+    WHERE connection_status = 'online'
+      AND last_seen < NOW() - p_warning_after;
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    v_changed := v_changed + v_count;
+
+    DELETE FROM asset_status_transitions WHERE created_at < NOW() - p_feed_retention;
+
+    RETURN v_changed;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recompute everything from source tables (seeding and repair)
+CREATE OR REPLACE FUNCTION fleet_status_rebuild(
+    p_warning_after INTERVAL DEFAULT INTERVAL '20 minutes',
+    p_offline_after INTERVAL DEFAULT INTERVAL '1 hour'
+)
+RETURNS INTEGER AS $$
+DECLARE
+    v_assets INTEGER;
+BEGIN
+    ALTER TABLE asset_fleet_status DISABLE TRIGGER trg_asset_fleet_status_counters;
+
+    DELETE FROM asset_fleet_status;
+
+    INSERT INTO asset_fleet_status (asset_id, client_id, connection_status, last_seen)
+    SELECT
+        a.asset_id,
+        a.client_id,
+        CASE
+            WHEN COALESCE(h.last_heartbeat, st.last_seen) > NOW() - p_warning_after THEN 'online'
+            WHEN COALESCE(h.last_heartbeat, st.last_seen) > NOW() - p_offline_after THEN 'warning'
+            ELSE 'offline'
+        END,
+        COALESCE(h.last_heartbeat, st.last_seen)
+    FROM assets a
+    LEFT JOIN assets_status_optimized st ON a.asset_id = st.asset_id
+    LEFT JOIN asset_heartbeat_latest h ON a.asset_id = h.asset_id
+    WHERE a.status = 'active';
+    GET DIAGNOSTICS v_assets = ROW_COUNT;
+
+    ALTER TABLE asset_fleet_status ENABLE TRIGGER trg_asset_fleet_status_counters;
+
+    DELETE FROM client_fleet_counters;
+
+    INSERT INTO client_fleet_counters (
+        client_id, total_assets, online_assets, warning_assets, offline_assets, last_update
+    )
+    SELECT
+        f.client_id,
+        COUNT(*),
+        COUNT(*) FILTER (WHERE f.connection_status = 'online'),
+        COUNT(*) FILTER (WHERE f.connection_status = 'warning'),
+        COUNT(*) FILTER (WHERE f.connection_status = 'offline'),
+        MAX(COALESCE(f.last_seen, a.last_seen))
+    FROM asset_fleet_status f
+    JOIN assets a ON a.asset_id = f.asset_id
+    GROUP BY f.client_id;
+
+    RETURN v_assets;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT fleet_status_rebuild();
+
+COMMIT;
@@ -0,0 +1,94 @@
+-- Migration: Late heartbeat backfill from agent offline spools
+-- Date: 2026-10-19
+-- Purpose: Agents spool heartbeat samples and tickets while the server is
+--          unreachable and replay them later. Heartbeats arrive in batches
+--          (POST /api/agents/heartbeat/batch); samples older than the rollup
+--          lookback would otherwise never reach the 1h / 1d rollups, so
+--          heartbeat_rollup_asset() recomputes the affected buckets of one
+--          asset. agent_ticket_receipts makes replayed tickets idempotent.
+-- Requires: migrations/partition_asset_heartbeats.sql
+
+BEGIN;
+
+-- Recompute one asset's rolled-up buckets from p_from up to the rollup watermarks
+CREATE OR REPLACE FUNCTION heartbeat_rollup_asset(p_asset_id UUID, p_from TIMESTAMP WITH TIME ZONE)
+RETURNS INTEGER AS $$
+DECLARE
+    v_hour_start TIMESTAMP WITH TIME ZONE := date_trunc('hour', p_from, 'UTC');
+    v_day_start TIMESTAMP WITH TIME ZONE := date_trunc('day', p_from, 'UTC');
+    v_hour_end TIMESTAMP WITH TIME ZONE;
+    v_day_end TIMESTAMP WITH TIME ZONE;
+    v_rows INTEGER := 0;
+    v_count INTEGER;
+BEGIN
+    SELECT rolled_up_to INTO v_hour_end FROM heartbeat_rollup_state WHERE granularity = '1h';
+    SELECT rolled_up_to INTO v_day_end FROM heartbeat_rollup_state WHERE granularity = '1d';
+
+    -- Buckets past the watermarks are picked up by the regular heartbeat_rollup()
+    IF v_hour_end IS NULL OR v_hour_start >= v_hour_end THEN
+        RETURN 0;
+    END IF;
+
+    INSERT INTO asset_heartbeat_rollup_1h (
+        asset_id, bucket_start, samples,
+        cpu_min, cpu_avg, cpu_max,
+        memory_min, memory_avg, memory_max,
+        disk_min, disk_avg, disk_max
+    )
+    SELECT
+        asset_id, date_trunc('hour', created_at, 'UTC'), COUNT(*),
+        MIN(cpu_usage), AVG(cpu_usage), MAX(cpu_usage),
+        MIN(memory_usage), AVG(memory_usage), MAX(memory_usage),
+        MIN(disk_usage), AVG(disk_usage), MAX(disk_usage)
+    FROM asset_heartbeats
+    WHERE asset_id = p_asset_id AND created_at >= v_hour_start AND created_at < v_hour_end
+    GROUP BY 1, 2
+    ON CONFLICT (asset_id, bucket_start) DO UPDATE SET
+        samples = EXCLUDED.samples,
+        cpu_min = EXCLUDED.cpu_min, cpu_avg = EXCLUDED.cpu_avg, cpu_max = EXCLUDED.cpu_max,
+        memory_min = EXCLUDED.memory_min, memory_avg = EXCLUDED.memory_avg, memory_max = EXCLUDED.memory_max,
+        disk_min = EXCLUDED.disk_min, disk_avg = EXCLUDED.disk_avg, disk_max = EXCLUDED.disk_max;
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    v_rows := v_rows + v_count;
+
+    IF v_day_end IS NOT NULL AND v_day_start < v_day_end THEN
+        INSERT INTO asset_heartbeat_rollup_1d (
+            asset_id, bucket_start, samples,
+            cpu_min, cpu_avg, cpu_max,
+            memory_min, memory_avg, memory_max,
+            disk_min, disk_avg, disk_max
+        )
+        SELECT
+            asset_id, date_trunc('day', bucket_start, 'UTC'), SUM(samples),
+            MIN(cpu_min), SUM(cpu_avg * samples) / NULLIF(SUM(samples), 0), MAX(cpu_max),
+            MIN(memory_min), SUM(memory_avg * samples) / NULLIF(SUM(samples), 0), MAX(memory_max),
+            MIN(disk_min), SUM(disk_avg * samples) / NULLIF(SUM(samples), 0), MAX(disk_max)
+        FROM asset_heartbeat_rollup_1h
+        WHERE asset_id = p_asset_id AND bucket_start >= v_day_start AND bucket_start < v_day_end
+        GROUP BY 1, 2
+        ON CONFLICT (asset_id, bucket_start) DO UPDATE SET
+            samples = EXCLUDED.samples,
+            cpu_min = EXCLUDED.cpu_min, cpu_avg = EXCLUDED.cpu_avg, cpu_max = EXCLUDED.cpu_max,
+            memory_min = EXCLUDED.memory_min, memory_avg = EXCLUDED.memory_avg, memory_max = EXCLUDED.memory_max,
+            disk_min = EXCLUDED.disk_min, disk_avg = EXCLUDED.disk_avg, disk_max = EXCLUDED.disk_max;
+        GET DIAGNOSTICS v_count = ROW_COUNT;
+        v_rows := v_rows + v_count;
+    END IF;
+
+    RETURN v_rows;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Replayed tickets carry the agent's spool_id; a retry returns the original ticket
+CREATE TABLE IF NOT EXISTS agent_ticket_receipts (
+    spool_id UUID PRIMARY KEY,
+    asset_id UUID NOT NULL REFERENCES assets(asset_id) ON DELETE CASCADE,
+    ticket_id UUID NOT NULL,
+    ticket_number VARCHAR(50),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_agent_ticket_receipts_created
+    ON agent_ticket_receipts(created_at);
+
+COMMIT;
@@ -0,0 +1,22 @@
+-- Migration: Per-section agent inventory store
+-- Date: 2026-10-19
+-- Purpose: TIER 2 heartbeats upload only the inventory sections that changed
+--          (hardware, disks, bitlocker, software), either in full or as a JSON
+--          diff against the last acknowledged version. The server keeps each
+--          section as canonical JSON plus its hash; a diff whose base hash
+--          does not match is answered with 409 and a resync request.
+--          See modules/agents/inventory_sync.py.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS asset_inventory_sections (
+    asset_id UUID NOT NULL REFERENCES assets(asset_id) ON DELETE CASCADE,
+    section VARCHAR(20) NOT NULL
+        CHECK (section IN ('hardware', 'disks', 'bitlocker', 'software')),
+    data TEXT NOT NULL,
+    data_hash VARCHAR(32) NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (asset_id, section)
+);
+
+COMMIT;
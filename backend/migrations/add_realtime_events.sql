@@ -0,0 +1,161 @@
+-- Migration: Real-time event feed for Server-Sent Events
+-- Date: 2026-10-19
+-- Purpose: Record ticket, comment, SLA breach and asset status changes in
+--          realtime_events and wake listeners with NOTIFY lanet_events
+--          (payload: event_id). core/events.py fans the events out over
+--          /api/events/stream. Clients resume with Last-Event-ID from this
+--          table. Triggers cover every writer (ticket service, email
+--          pipeline, SLA monitor, heartbeat sweeper), and a rolled back
+--          write emits nothing because NOTIFY is delivered on commit.
+
+BEGIN;
+
+-- =====================================================
+-- 1. Table
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS realtime_events (
+    event_id BIGSERIAL PRIMARY KEY,
+    event_type VARCHAR(40) NOT NULL,
+    client_id UUID,
+    site_id UUID,
+    -- Internal comments and SLA breaches never reach client users
+    staff_only BOOLEAN NOT NULL DEFAULT false,
+    payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_realtime_events_created
+    ON realtime_events(created_at);
+
+-- =====================================================
+-- 2. Functions
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION publish_realtime_event(
+    p_event_type TEXT, p_client_id UUID, p_site_id UUID, p_staff_only BOOLEAN, p_payload JSONB
+) RETURNS BIGINT AS $$
+DECLARE
+    v_event_id BIGINT;
+BEGIN
+    INSERT INTO realtime_events (event_type, client_id, site_id, staff_only, payload)
+    VALUES (p_event_type, p_client_id, p_site_id, p_staff_only, p_payload)
+    RETURNING event_id INTO v_event_id;
+
+    -- Only the id: NOTIFY payloads are capped at 8000 bytes
+    PERFORM pg_notify('lanet_events', v_event_id::TEXT);
+    RETURN v_event_id;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION realtime_ticket_event()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM publish_realtime_event('ticket.created', NEW.client_id, NEW.site_id, false, jsonb_build_object(
+            'ticket_id', NEW.ticket_id, 'ticket_number', NEW.ticket_number, 'subject', LEFT(NEW.subject, 200),
+            'status', NEW.status, 'priority', NEW.priority, 'assigned_to', NEW.assigned_to
+        ));
+    ELSIF NEW.status IS DISTINCT FROM OLD.status OR NEW.priority IS DISTINCT FROM OLD.priority
+            OR NEW.assigned_to IS DISTINCT FROM OLD.assigned_to THEN
+        PERFORM publish_realtime_event('ticket.updated', NEW.client_id, NEW.site_id, false, jsonb_build_object(
+            'ticket_id', NEW.ticket_id, 'ticket_number', NEW.ticket_number,
+            'status', NEW.status, 'priority', NEW.priority, 'assigned_to', NEW.assigned_to
+        ));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION realtime_comment_event()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM publish_realtime_event('ticket.comment', t.client_id, t.site_id, COALESCE(NEW.is_internal, false),
+        jsonb_build_object('ticket_id', t.ticket_id, 'ticket_number', t.ticket_number,
+                           'comment_id', NEW.comment_id, 'user_id', NEW.user_id))
+    FROM tickets t
+    WHERE t.ticket_id = NEW.ticket_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION realtime_sla_event()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_kind TEXT;
+BEGIN
+    IF NEW.response_breached_at IS NOT NULL AND OLD.response_breached_at IS NULL THEN
+        v_kind := 'response';
+    ELSIF NEW.resolution_breached_at IS NOT NULL AND OLD.resolution_breached_at IS NULL THEN
+        v_kind := 'resolution';
+    ELSE
+        RETURN NULL;
+    END IF;
+
+    PERFORM publish_realtime_event('sla.breach', t.client_id, t.site_id, true,
+        jsonb_build_object('ticket_id', t.ticket_id, 'ticket_number', t.ticket_number, 'breach', v_kind,
+                           'priority', t.priority))
+    FROM tickets t
+    WHERE t.ticket_id = NEW.ticket_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION realtime_asset_status_event()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM publish_realtime_event('asset.status', NEW.client_id, a.site_id, false,
+        jsonb_build_object('asset_id', NEW.asset_id, 'asset_name', a.name, 'from_status', NEW.from_status,
+                           'to_status', NEW.to_status, 'last_seen', NEW.last_seen))
+    FROM assets a
+    WHERE a.asset_id = NEW.asset_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Events older than the retention window can no longer be resumed from
+CREATE OR REPLACE FUNCTION prune_realtime_events(p_retention INTERVAL DEFAULT INTERVAL '24 hours')
+RETURNS INTEGER AS $$
+DECLARE
+    v_deleted INTEGER;
+BEGIN
+    DELETE FROM realtime_events WHERE created_at < NOW() - p_retention;
+    GET DIAGNOSTICS v_deleted = ROW_COUNT;
+    RETURN v_deleted;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =====================================================
+-- 3. Triggers
+-- =====================================================
+
+DROP TRIGGER IF EXISTS trg_tickets_realtime ON tickets;
+CREATE TRIGGER trg_tickets_realtime
+    AFTER INSERT OR UPDATE ON tickets
+    FOR EACH ROW EXECUTE FUNCTION realtime_ticket_event();
+
+DROP TRIGGER IF EXISTS trg_ticket_comments_realtime ON ticket_comments;
+CREATE TRIGGER trg_ticket_comments_realtime
+    AFTER INSERT ON ticket_comments
+    FOR EACH ROW EXECUTE FUNCTION realtime_comment_event();
+
+-- sla_tracking and asset_status_transitions (add_fleet_status_counters.sql)
+-- may not exist yet
+DO $$
+BEGIN
+    IF to_regclass('sla_tracking') IS NOT NULL THEN
+        DROP TRIGGER IF EXISTS trg_sla_tracking_realtime ON sla_tracking;
+        CREATE TRIGGER trg_sla_tracking_realtime
+            AFTER UPDATE ON sla_tracking
+            FOR EACH ROW EXECUTE FUNCTION realtime_sla_event();
+    END IF;
+    IF to_regclass('asset_status_transitions') IS NOT NULL THEN
+        DROP TRIGGER IF EXISTS trg_asset_status_transitions_realtime ON asset_status_transitions;
+        CREATE TRIGGER trg_asset_status_transitions_realtime
+            AFTER INSERT ON asset_status_transitions
+            FOR EACH ROW EXECUTE FUNCTION realtime_asset_status_event();
+    END IF;
+END;
+$$;
+
+COMMIT;
@@ -0,0 +1,158 @@
+-- Migration: Normalized software catalog
+-- Date: 2026-10-19
+-- Purpose: Intern installed software (name/vendor/version) into a
+--          software_products dictionary and keep a compact per-asset
+--          membership table, so "which assets run product X version Y"
+--          is an indexed lookup instead of a scan of every asset's
+--          software_summary JSON. Agents' inventories are applied as
+--          deltas by software_sync_asset(); unchanged inventories are
+--          skipped by hash.
+
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- =====================================================
+-- 1. Tables
+-- =====================================================
+
+-- One row per distinct (name, vendor, version); vendor/version '' when unknown
+CREATE TABLE IF NOT EXISTS software_products (
+    product_id SERIAL PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    vendor VARCHAR(255) NOT NULL DEFAULT '',
+    version VARCHAR(100) NOT NULL DEFAULT '',
+    normalized_name VARCHAR(255) GENERATED ALWAYS AS (lower(name)) STORED,
+    first_seen TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE (normalized_name, vendor, version)
+);
+
+CREATE INDEX IF NOT EXISTS idx_software_products_name_trgm
+    ON software_products USING GIN (normalized_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_software_products_vendor
+    ON software_products(lower(vendor));
+
+-- Asset membership: two integer-sized keys per installed product
+CREATE TABLE IF NOT EXISTS asset_software (
+    asset_id UUID NOT NULL REFERENCES assets(asset_id) ON DELETE CASCADE,
+    product_id INTEGER NOT NULL REFERENCES software_products(product_id) ON DELETE CASCADE,
+    first_seen TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (asset_id, product_id)
+);
+
+-- product -> assets (the PK already serves asset -> products)
+CREATE INDEX IF NOT EXISTS idx_asset_software_product
+    ON asset_software(product_id, asset_id);
+
+-- Hash of the last inventory applied per asset (skip unchanged reports)
+CREATE TABLE IF NOT EXISTS asset_software_state (
+    asset_id UUID PRIMARY KEY REFERENCES assets(asset_id) ON DELETE CASCADE,
+    inventory_hash VARCHAR(32) NOT NULL,
+    product_count INTEGER NOT NULL DEFAULT 0,
+    synced_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    reported_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- =====================================================
+-- 2. Delta sync
+-- =====================================================
+
+-- Apply an agent's installed_programs list ([{name, version, publisher|vendor}])
+-- to asset_software. Returns changed = false when the inventory is unchanged.
+CREATE OR REPLACE FUNCTION software_sync_asset(p_asset_id UUID, p_programs JSONB)
+RETURNS TABLE (changed BOOLEAN, added INTEGER, removed INTEGER, product_count INTEGER) AS $$
+DECLARE
+    v_hash VARCHAR(32) := md5(COALESCE(p_programs, '[]'::jsonb)::text);
+    v_ids INTEGER[];
+    v_added INTEGER;
+    v_removed INTEGER;
+    v_count INTEGER;
+BEGIN
+    UPDATE asset_software_state s SET reported_at = NOW()
+    WHERE s.asset_id = p_asset_id AND s.inventory_hash = v_hash
+    RETURNING s.product_count INTO v_count;
+
+    IF FOUND THEN
+        RETURN QUERY SELECT false, 0, 0, v_count;
+        RETURN;
+    END IF;
+
+    CREATE TEMP TABLE IF NOT EXISTS software_sync_items (
+        name VARCHAR(255), vendor VARCHAR(255), version VARCHAR(100)
+    ) ON COMMIT DROP;
+    TRUNCATE software_sync_items;
+
+    INSERT INTO software_sync_items (name, vendor, version)
+    SELECT DISTINCT ON (lower(n.name), n.vendor, n.version) n.name, n.vendor, n.version
+    FROM (
+        SELECT
+            left(btrim(regexp_replace(p->>'name', '\s+', ' ', 'g')), 255) as name,
+            left(COALESCE(NULLIF(NULLIF(btrim(COALESCE(p->>'vendor', p->>'publisher')), ''), 'Unknown'), ''), 255) as vendor,
+            left(COALESCE(NULLIF(NULLIF(btrim(p->>'version'), ''), 'Unknown'), ''), 100) as version
+        FROM jsonb_array_elements(
+            CASE WHEN jsonb_typeof(p_programs) = 'array' THEN p_programs ELSE '[]'::jsonb END
+        ) p
+        WHERE jsonb_typeof(p) = 'object'
+    ) n
+    WHERE n.name IS NOT NULL AND n.name <> '';
+
+    INSERT INTO software_products (name, vendor, version)
+    SELECT i.name, i.vendor, i.version FROM software_sync_items i
+    ON CONFLICT (normalized_name, vendor, version) DO NOTHING;
+
+    SELECT COALESCE(array_agg(sp.product_id), '{}') INTO v_ids
+    FROM software_sync_items i
+    JOIN software_products sp
+      ON sp.normalized_name = lower(i.name) AND sp.vendor = i.vendor AND sp.version = i.version;
+
+    DELETE FROM asset_software a
+    WHERE a.asset_id = p_asset_id AND NOT (a.product_id = ANY(v_ids));
+    GET DIAGNOSTICS v_removed = ROW_COUNT;
+
+    INSERT INTO asset_software (asset_id, product_id)
+    SELECT p_asset_id, unnest(v_ids)
+    ON CONFLICT DO NOTHING;
+    GET DIAGNOSTICS v_added = ROW_COUNT;
+
+    v_count := cardinality(v_ids);
+
+    INSERT INTO asset_software_state AS s (asset_id, inventory_hash, product_count, synced_at, reported_at)
+    VALUES (p_asset_id, v_hash, v_count, NOW(), NOW())
+    ON CONFLICT (asset_id) DO UPDATE SET
+        inventory_hash = EXCLUDED.inventory_hash,
+        product_count = EXCLUDED.product_count,
+        synced_at = EXCLUDED.synced_at,
+        reported_at = EXCLUDED.reported_at;
+
+    RETURN QUERY SELECT true, v_added, v_removed, v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Drop products no asset reports any more; returns rows deleted
+CREATE OR REPLACE FUNCTION software_prune_products()
+RETURNS INTEGER AS $$
+DECLARE
+    v_deleted INTEGER;
+BEGIN
+    DELETE FROM software_products sp
+    WHERE NOT EXISTS (SELECT 1 FROM asset_software a WHERE a.product_id = sp.product_id)
+      AND sp.first_seen < NOW() - INTERVAL '1 day';
+    GET DIAGNOSTICS v_deleted = ROW_COUNT;
+    RETURN v_deleted;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =====================================================
+-- 3. Backfill from the latest inventory snapshot of each asset
+-- =====================================================
+
+SELECT software_sync_asset(latest.asset_id, latest.software_summary->'installed_programs')
+FROM (
+    SELECT DISTINCT ON (s.asset_id) s.asset_id, s.software_summary
+    FROM assets_inventory_snapshots s
+    JOIN assets a ON a.asset_id = s.asset_id
+    ORDER BY s.asset_id, s.version DESC, s.created_at DESC
+) latest
+WHERE jsonb_typeof(latest.software_summary->'installed_programs') = 'array';
+
+COMMIT;
@@ -0,0 +1,363 @@
+-- Migration: Time-partitioned asset heartbeats with retention and downsampling
+-- Date: 2026-10-19
+-- Purpose: Daily range partitions for asset_heartbeats, a trigger-maintained
+--          latest-value table, and 1-hour / 1-day CPU/memory/disk rollups.
+--          Maintenance (partition creation, rollups, retention) is driven by
+--          core/timeseries.py HeartbeatStore.maintain() from the SLA monitor job.
+-- Requires: PostgreSQL 14 (row triggers on partitioned tables, 3-arg date_trunc)
+
+BEGIN;
+
+-- =====================================================
+-- 1. Move the unpartitioned table aside
+-- =====================================================
+
+DROP VIEW IF EXISTS asset_latest_heartbeat;
+DROP FUNCTION IF EXISTS cleanup_old_heartbeats();
+
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_class
+        WHERE relname = 'asset_heartbeats' AND relkind = 'r'
+    ) THEN
+        ALTER TABLE asset_heartbeats RENAME TO asset_heartbeats_legacy;
+        ALTER INDEX IF EXISTS idx_asset_heartbeats_asset_id RENAME TO idx_asset_heartbeats_legacy_asset_id;
+        ALTER INDEX IF EXISTS idx_asset_heartbeats_created_at RENAME TO idx_asset_heartbeats_legacy_created_at;
+        ALTER INDEX IF EXISTS idx_asset_heartbeats_asset_created RENAME TO idx_asset_heartbeats_legacy_asset_created;
+    END IF;
+END $$;
+
+-- =====================================================
+-- 2. Partitioned raw heartbeats (one partition per UTC day)
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS asset_heartbeats (
+    heartbeat_id UUID NOT NULL DEFAULT gen_random_uuid(),
+    asset_id UUID NOT NULL REFERENCES assets(asset_id) ON DELETE CASCADE,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    cpu_usage DECIMAL(5,2),
+    memory_usage DECIMAL(5,2),
+    disk_usage DECIMAL(5,2),
+    network_status VARCHAR(20) DEFAULT 'connected',
+    agent_version VARCHAR(50),
+    system_uptime BIGINT,
+    status VARCHAR(20) DEFAULT 'online',
+    PRIMARY KEY (heartbeat_id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE INDEX IF NOT EXISTS idx_asset_heartbeats_asset_created
+    ON asset_heartbeats(asset_id, created_at DESC);
+
+-- Create missing daily partitions asset_heartbeats_pYYYYMMDD for [p_from, p_to]
+CREATE OR REPLACE FUNCTION heartbeat_ensure_partitions(p_from DATE, p_to DATE)
+RETURNS INTEGER AS $$
+DECLARE
+    v_day DATE := p_from;
+    v_name TEXT;
+    v_created INTEGER := 0;
+BEGIN
+    WHILE v_day <= p_to LOOP
+        v_name := 'asset_heartbeats_p' || to_char(v_day, 'YYYYMMDD');
+        IF to_regclass(v_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF asset_heartbeats FOR VALUES FROM (%L) TO (%L)',
+                v_name,
+                v_day::timestamp AT TIME ZONE 'UTC',
+                (v_day + 1)::timestamp AT TIME ZONE 'UTC'
+            );
+            v_created := v_created + 1;
+        END IF;
+        v_day := v_day + 1;
+    END LOOP;
+    RETURN v_created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =====================================================
+-- 3. Latest value per asset, kept current on insert
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS asset_heartbeat_latest (
+    asset_id UUID PRIMARY KEY REFERENCES assets(asset_id) ON DELETE CASCADE,
+    last_heartbeat TIMESTAMP WITH TIME ZONE NOT NULL,
+    cpu_usage DECIMAL(5,2),
+    memory_usage DECIMAL(5,2),
+    disk_usage DECIMAL(5,2),
+    network_status VARCHAR(20),
+    agent_version VARCHAR(50),
+    system_uptime BIGINT,
+    status VARCHAR(20)
+);
+
+CREATE INDEX IF NOT EXISTS idx_asset_heartbeat_latest_last
+    ON asset_heartbeat_latest(last_heartbeat);
+
+CREATE OR REPLACE FUNCTION asset_heartbeat_latest_upsert()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO asset_heartbeat_latest (
+        asset_id, last_heartbeat, cpu_usage, memory_usage, disk_usage,
+        network_status, agent_version, system_uptime, status
+    ) VALUES (
+        NEW.asset_id, NEW.created_at, NEW.cpu_usage, NEW.memory_usage, NEW.disk_usage,
+        NEW.network_status, NEW.agent_version, NEW.system_uptime, NEW.status
+    )
+    ON CONFLICT (asset_id) DO UPDATE SET
+        last_heartbeat = EXCLUDED.last_heartbeat,
+        cpu_usage = EXCLUDED.cpu_usage,
+        memory_usage = EXCLUDED.memory_usage,
+        disk_usage = EXCLUDED.disk_usage,
+        network_status = EXCLUDED.network_status,
+        agent_version = EXCLUDED.agent_version,
+        system_uptime = EXCLUDED.system_uptime,
+        status = EXCLUDED.status
+    -- Late (replayed) heartbeats never overwrite a newer value
+    WHERE asset_heartbeat_latest.last_heartbeat <= EXCLUDED.last_heartbeat;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_asset_heartbeats_latest ON asset_heartbeats;
+CREATE TRIGGER trg_asset_heartbeats_latest
+    AFTER INSERT ON asset_heartbeats
+    FOR EACH ROW
+    EXECUTE FUNCTION asset_heartbeat_latest_upsert();
+
+-- Same shape as the previous DISTINCT ON view; now a primary key lookup
+CREATE OR REPLACE VIEW asset_latest_heartbeat AS
+SELECT
+    asset_id,
+    last_heartbeat,
+    cpu_usage,
+    memory_usage,
+    disk_usage,
+    status,
+    EXTRACT(EPOCH FROM (NOW() - last_heartbeat))/60 as minutes_since_heartbeat
+FROM asset_heartbeat_latest;
+
+-- =====================================================
+-- 4. Downsampled series (1 hour and 1 day, UTC buckets)
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS asset_heartbeat_rollup_1h (
+    asset_id UUID NOT NULL REFERENCES assets(asset_id) ON DELETE CASCADE,
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    samples INTEGER NOT NULL,
+    cpu_min DECIMAL(5,2), cpu_avg DECIMAL(5,2), cpu_max DECIMAL(5,2),
+    memory_min DECIMAL(5,2), memory_avg DECIMAL(5,2), memory_max DECIMAL(5,2),
+    disk_min DECIMAL(5,2), disk_avg DECIMAL(5,2), disk_max DECIMAL(5,2),
+    PRIMARY KEY (asset_id, bucket_start)
+);
+
+CREATE TABLE IF NOT EXISTS asset_heartbeat_rollup_1d (
+    asset_id UUID NOT NULL REFERENCES assets(asset_id) ON DELETE CASCADE,
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    samples INTEGER NOT NULL,
+    cpu_min DECIMAL(5,2), cpu_avg DECIMAL(5,2), cpu_max DECIMAL(5,2),
+    memory_min DECIMAL(5,2), memory_avg DECIMAL(5,2), memory_max DECIMAL(5,2),
+    disk_min DECIMAL(5,2), disk_avg DECIMAL(5,2), disk_max DECIMAL(5,2),
+    PRIMARY KEY (asset_id, bucket_start)
+);
+
+CREATE INDEX IF NOT EXISTS idx_asset_heartbeat_rollup_1h_bucket
+    ON asset_heartbeat_rollup_1h(bucket_start);
+CREATE INDEX IF NOT EXISTS idx_asset_heartbeat_rollup_1d_bucket
+    ON asset_heartbeat_rollup_1d(bucket_start);
+
+-- Watermarks: buckets before rolled_up_to are complete in the rollup table
+CREATE TABLE IF NOT EXISTS heartbeat_rollup_state (
+    granularity VARCHAR(10) PRIMARY KEY,
+    rolled_up_to TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+-- Roll complete hours/days forward. The last p_lookback of hours is always
+-- recomputed so heartbeats replayed late by offline agents are folded in.
+CREATE OR REPLACE FUNCTION heartbeat_rollup(p_lookback INTERVAL DEFAULT INTERVAL '6 hours')
+RETURNS INTEGER AS $$
+DECLARE
+    v_hour_end TIMESTAMP WITH TIME ZONE := date_trunc('hour', NOW(), 'UTC');
+    v_day_end TIMESTAMP WITH TIME ZONE := date_trunc('day', NOW(), 'UTC');
+    v_hour_start TIMESTAMP WITH TIME ZONE;
+    v_day_start TIMESTAMP WITH TIME ZONE;
+    v_rows INTEGER := 0;
+    v_count INTEGER;
+BEGIN
+    SELECT rolled_up_to INTO v_hour_start FROM heartbeat_rollup_state WHERE granularity = '1h';
+    v_hour_start := LEAST(COALESCE(v_hour_start, '-infinity'), v_hour_end - p_lookback);
+
+    INSERT INTO asset_heartbeat_rollup_1h (
+        asset_id, bucket_start, samples,
+        cpu_min, cpu_avg, cpu_max,
+        memory_min, memory_avg, memory_max,
+        disk_min, disk_avg, disk_max
+    )
+    SELECT
+        asset_id, date_trunc('hour', created_at, 'UTC'), COUNT(*),
+        MIN(cpu_usage), AVG(cpu_usage), MAX(cpu_usage),
+        MIN(memory_usage), AVG(memory_usage), MAX(memory_usage),
+        MIN(disk_usage), AVG(disk_usage), MAX(disk_usage)
+    FROM asset_heartbeats
+    WHERE created_at >= v_hour_start AND created_at < v_hour_end
+    GROUP BY 1, 2
+    ON CONFLICT (asset_id, bucket_start) DO UPDATE SET
+        samples = EXCLUDED.samples,
+        cpu_min = EXCLUDED.cpu_min, cpu_avg = EXCLUDED.cpu_avg, cpu_max = EXCLUDED.cpu_max,
+        memory_min = EXCLUDED.memory_min, memory_avg = EXCLUDED.memory_avg, memory_max = EXCLUDED.memory_max,
+        disk_min = EXCLUDED.disk_min, disk_avg = EXCLUDED.disk_avg, disk_max = EXCLUDED.disk_max;
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    v_rows := v_rows + v_count;
+
+    INSERT INTO heartbeat_rollup_state (granularity, rolled_up_to) VALUES ('1h', v_hour_end)
+    ON CONFLICT (granularity) DO UPDATE SET rolled_up_to = EXCLUDED.rolled_up_to;
+
+    -- Every day touched by the hourly pass is recomputed from the hourly rows
+    SELECT rolled_up_to INTO v_day_start FROM heartbeat_rollup_state WHERE granularity = '1d';
+    v_day_start := LEAST(COALESCE(v_day_start, '-infinity'), date_trunc('day', v_hour_start, 'UTC'));
+
+    INSERT INTO asset_heartbeat_rollup_1d (
+        asset_id, bucket_start, samples,
+        cpu_min, cpu_avg, cpu_max,
+        memory_min, memory_avg, memory_max,
+        disk_min, disk_avg, disk_max
+    )
+    SELECT
+        asset_id, date_trunc('day', bucket_start, 'UTC'), SUM(samples),
+        MIN(cpu_min), SUM(cpu_avg * samples) / NULLIF(SUM(samples), 0), MAX(cpu_max),
+        MIN(memory_min), SUM(memory_avg * samples) / NULLIF(SUM(samples), 0), MAX(memory_max),
+        MIN(disk_min), SUM(disk_avg * samples) / NULLIF(SUM(samples), 0), MAX(disk_max)
+    FROM asset_heartbeat_rollup_1h
+    WHERE bucket_start >= v_day_start AND bucket_start < v_day_end
+    GROUP BY 1, 2
+    ON CONFLICT (asset_id, bucket_start) DO UPDATE SET
+        samples = EXCLUDED.samples,
+        cpu_min = EXCLUDED.cpu_min, cpu_avg = EXCLUDED.cpu_avg, cpu_max = EXCLUDED.cpu_max,
+        memory_min = EXCLUDED.memory_min, memory_avg = EXCLUDED.memory_avg, memory_max = EXCLUDED.memory_max,
+        disk_min = EXCLUDED.disk_min, disk_avg = EXCLUDED.disk_avg, disk_max = EXCLUDED.disk_max;
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    v_rows := v_rows + v_count;
+
+    INSERT INTO heartbeat_rollup_state (granularity, rolled_up_to) VALUES ('1d', v_day_end)
+    ON CONFLICT (granularity) DO UPDATE SET rolled_up_to = EXCLUDED.rolled_up_to;
+
+    RETURN v_rows;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =====================================================
+-- 5. Retention
+-- =====================================================
+
+-- Drop raw partitions older than p_raw_days (only once they are rolled up)
+-- and prune rollups past their own retention. Returns dropped partitions.
+CREATE OR REPLACE FUNCTION heartbeat_apply_retention(
+    p_raw_days INTEGER,
+    p_hourly_days INTEGER,
+    p_daily_days INTEGER
+)
+RETURNS INTEGER AS $$
+DECLARE
+    v_cutoff TIMESTAMP WITH TIME ZONE := date_trunc('day', NOW(), 'UTC') - make_interval(days => p_raw_days);
+    v_rolled_up_to TIMESTAMP WITH TIME ZONE;
+    v_partition RECORD;
+    v_dropped INTEGER := 0;
+BEGIN
+    SELECT rolled_up_to INTO v_rolled_up_to FROM heartbeat_rollup_state WHERE granularity = '1h';
+    v_cutoff := LEAST(v_cutoff, COALESCE(v_rolled_up_to, '-infinity'));
+
+    FOR v_partition IN
+        SELECT c.relname,
+               (to_date(substring(c.relname FROM '(\d{8})$'), 'YYYYMMDD') + 1)::timestamp AT TIME ZONE 'UTC' AS upper_bound
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = 'asset_heartbeats'
+          AND c.relname ~ '^asset_heartbeats_p\d{8}$'
+    LOOP
+        IF v_partition.upper_bound <= v_cutoff THEN
+            EXECUTE format('DROP TABLE IF EXISTS %I', v_partition.relname);
+            v_dropped := v_dropped + 1;
+        END IF;
+    END LOOP;
+
+    DELETE FROM asset_heartbeat_rollup_1h
+    WHERE bucket_start < NOW() - make_interval(days => p_hourly_days);
+
+    DELETE FROM asset_heartbeat_rollup_1d
+    WHERE bucket_start < NOW() - make_interval(days => p_daily_days);
+
+    RETURN v_dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =====================================================
+-- 6. Carry over recent history, roll up the rest and seed the derived tables
+-- =====================================================
+
+SELECT heartbeat_ensure_partitions((NOW() AT TIME ZONE 'UTC')::date - 7, (NOW() AT TIME ZONE 'UTC')::date + 7);
+
+DO $$
+BEGIN
+    IF to_regclass('asset_heartbeats_legacy') IS NOT NULL THEN
+        -- The last 7 days are carried over as raw heartbeats
+        INSERT INTO asset_heartbeats (
+            heartbeat_id, asset_id, created_at, cpu_usage, memory_usage, disk_usage,
+            network_status, agent_version, system_uptime, status
+        )
+        SELECT heartbeat_id, asset_id, created_at, cpu_usage, memory_usage, disk_usage,
+               network_status, agent_version, system_uptime, status
+        FROM asset_heartbeats_legacy
+        WHERE asset_id IS NOT NULL
+          AND created_at >= ((NOW() AT TIME ZONE 'UTC')::date - 7)::timestamp AT TIME ZONE 'UTC'
+          AND created_at < ((NOW() AT TIME ZONE 'UTC')::date + 8)::timestamp AT TIME ZONE 'UTC';
+
+        -- Older history is not copied raw; fold it into the rollups (up to the
+        -- 730-day daily retention) before the legacy table goes. Rows before
+        -- the copy cutoff cover whole UTC days, so no bucket overlaps the
+        -- copied raw rows. heartbeat_apply_retention later prunes hourly
+        -- buckets past their 90 days.
+        INSERT INTO asset_heartbeat_rollup_1h (
+            asset_id, bucket_start, samples,
+            cpu_min, cpu_avg, cpu_max,
+            memory_min, memory_avg, memory_max,
+            disk_min, disk_avg, disk_max
+        )
+        SELECT
+            l.asset_id, date_trunc('hour', l.created_at, 'UTC'), COUNT(*),
+            MIN(l.cpu_usage), AVG(l.cpu_usage), MAX(l.cpu_usage),
+            MIN(l.memory_usage), AVG(l.memory_usage), MAX(l.memory_usage),
+            MIN(l.disk_usage), AVG(l.disk_usage), MAX(l.disk_usage)
+        FROM asset_heartbeats_legacy l
+        JOIN assets a ON a.asset_id = l.asset_id
+        WHERE l.created_at >= date_trunc('day', NOW(), 'UTC') - INTERVAL '730 days'
+          AND l.created_at < ((NOW() AT TIME ZONE 'UTC')::date - 7)::timestamp AT TIME ZONE 'UTC'
+        GROUP BY 1, 2
+        ON CONFLICT (asset_id, bucket_start) DO NOTHING;
+
+        INSERT INTO asset_heartbeat_rollup_1d (
+            asset_id, bucket_start, samples,
+            cpu_min, cpu_avg, cpu_max,
+            memory_min, memory_avg, memory_max,
+            disk_min, disk_avg, disk_max
+        )
+        SELECT
+            asset_id, date_trunc('day', bucket_start, 'UTC'), SUM(samples),
+            MIN(cpu_min), SUM(cpu_avg * samples) / NULLIF(SUM(samples), 0), MAX(cpu_max),
+            MIN(memory_min), SUM(memory_avg * samples) / NULLIF(SUM(samples), 0), MAX(memory_max),
+            MIN(disk_min), SUM(disk_avg * samples) / NULLIF(SUM(samples), 0), MAX(disk_max)
+        FROM asset_heartbeat_rollup_1h
+        WHERE bucket_start < ((NOW() AT TIME ZONE 'UTC')::date - 7)::timestamp AT TIME ZONE 'UTC'
+        GROUP BY 1, 2
+        ON CONFLICT (asset_id, bucket_start) DO NOTHING;
+
+        DROP TABLE asset_heartbeats_legacy;
+    END IF;
+END $$;
+
+SELECT heartbeat_rollup(INTERVAL '8 days');
+
+COMMIT;
+
+ANALYZE asset_heartbeats;
+ANALYZE asset_heartbeat_latest;
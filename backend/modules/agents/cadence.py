@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Helpdesk V3 - Agent Heartbeat Cadence
+Per-asset heartbeat / inventory intervals and ingest load shedding
+"""
+
+import time
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+
+class CadenceController:
+    """Decides when each agent should report next
+
+    - The fleet-wide heartbeat rate is kept near ``agent_ingest_target_rate``
+      per second: larger fleets get longer intervals.
+    - Assets near a resource threshold report faster; quiet ones slower.
+    - Ingest pressure (heartbeat requests in flight in this worker, or the
+      database pool filling up) stretches intervals, and past saturation
+      requests are shed with a Retry-After (TIER 2 first).
+    - Every interval carries a deterministic per-asset jitter so agents that
+      booted together drift apart and stay apart.
+
+    Tunables are read from system_config through the config cache.
+    """
+
+    DEFAULTS = {
+        'agent_heartbeat_min_interval': 300,
+        'agent_heartbeat_max_interval': 1800,
+        'agent_heartbeat_alert_interval': 120,
+        'agent_ingest_target_rate': 20,
+        'agent_full_inventory_interval': 86400,
+        'agent_ingest_max_in_flight': 16,
+        'agent_shed_retry_after': 60
+    }
+
+    # Resource thresholds (percent) matching the agent's monitoring defaults
+    ALERT_THRESHOLD = 90
+    STABLE_LIMITS = {'cpu': 50, 'memory': 75, 'disk': 85}
+
+    # Share of max in-flight at which TIER 2 / all heartbeats are shed
+    SHED_FULL_AT = 0.8
+    SHED_ALL_AT = 1.0
+    JITTER = 0.1
+
+    def __init__(self, db_manager, config_cache=None, fleet_ttl: int = 60):
+        self.db = db_manager
+        self.config_cache = config_cache
+        self.fleet_ttl = fleet_ttl
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._fleet_size = 0
+        self._fleet_loaded_at = 0.0
+
+    def _setting(self, key: str) -> int:
+        default = self.DEFAULTS[key]
+        if self.config_cache is None:
+            return default
+        return max(1, self.config_cache.get_system_int(key, default))
+
+    # ------------------------------------------------------------------
+    # Load signals
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def track(self):
+        """Count a heartbeat request as in flight while it is processed"""
+        with self._lock:
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    @property
+    def in_flight(self) -> int:
+        """Heartbeat requests this worker is processing right now"""
+        return self._in_flight
+
+    def pressure(self) -> float:
+        """Ingest pressure of this worker; 1.0 means saturated"""
+        with self._lock:
+            in_flight = self._in_flight
+        pressure = in_flight / self._setting('agent_ingest_max_in_flight')
+
+        pool = getattr(self.db, 'pool', None)
+        used = getattr(pool, '_used', None)
+        max_connections = getattr(pool, 'maxconn', None)
+        if used is not None and max_connections:
+            pressure = max(pressure, len(used) / max_connections)
+        return pressure
+
+    def fleet_size(self) -> int:
+        """Assets currently online or warning (cached for ``fleet_ttl`` seconds)"""
+        now = time.monotonic()
+        if now - self._fleet_loaded_at < self.fleet_ttl:
+            return self._fleet_size
+        try:
+            row = self.db.execute_query(
+                "SELECT COALESCE(SUM(online_assets + warning_assets), 0) AS active FROM client_fleet_counters",
+                fetch='one'
+            )
+            self._fleet_size = int(row['active']) if row else 0
+        except Exception as e:
+            self.logger.warning(f"Could not read fleet size: {e}")
+        self._fleet_loaded_at = now
+        return self._fleet_size
+
+    # ------------------------------------------------------------------
+    # Decisions
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def jitter_fraction(asset_id: str, salt: str) -> float:
+        """Stable value in [0, 1) for an asset"""
+        digest = hashlib.md5(f'{salt}:{asset_id}'.encode('utf-8')).hexdigest()
+        return int(digest[:8], 16) / 0x100000000
+
+    def _jittered(self, seconds: float, asset_id: str, salt: str) -> int:
+        spread = 1 + self.JITTER * (2 * self.jitter_fraction(asset_id, salt) - 1)
+        return int(round(seconds * spread))
+
+    def shed(self, asset_id: str, heartbeat_type: str) -> Optional[int]:
+        """Seconds the agent should back off, or None to accept the heartbeat"""
+        pressure = self.pressure()
+        limit = self.SHED_ALL_AT if heartbeat_type == 'status' else self.SHED_FULL_AT
+        if pressure <= limit:
+            return None
+        retry_after = self._setting('agent_shed_retry_after')
+        return int(retry_after * (1 + self.jitter_fraction(asset_id, 'retry')))
+
+    @classmethod
+    def health(cls, status: Dict[str, Any]) -> str:
+        """'alerting', 'stable' or 'normal' from a heartbeat status (TIER 1 or TIER 2 keys)"""
+        status = status or {}
+
+        def metric(name):
+            value = status.get(f'{name}_usage', status.get(f'{name}_percent'))
+            try:
+                return float(value) if value is not None else None
+            except (TypeError, ValueError):
+                return None
+
+        values = {name: metric(name) for name in cls.STABLE_LIMITS}
+        if any(v is not None and v >= cls.ALERT_THRESHOLD for v in values.values()):
+            return 'alerting'
+        if all(v is not None and v < cls.STABLE_LIMITS[name] for name, v in values.items()):
+            return 'stable'
+        return 'normal'
+
+    def plan(self, asset_id: str, status: Dict[str, Any] = None) -> Dict[str, int]:
+        """next_heartbeat / next_full_inventory (seconds) for this asset"""
+        health = self.health(status)
+        min_interval = self._setting('agent_heartbeat_min_interval')
+        max_interval = self._setting('agent_heartbeat_max_interval')
+
+        if health == 'alerting':
+            interval = self._setting('agent_heartbeat_alert_interval')
+        else:
+            interval = max(min_interval, self.fleet_size() / self._setting('agent_ingest_target_rate'))
+            if health == 'stable':
+                interval *= 2
+            # Stretch up to 2x as the worker approaches saturation
+            interval *= 1 + 2 * min(0.5, max(0.0, self.pressure() - 0.5))
+            interval = min(max_interval, interval)
+
+        return {
+            'next_heartbeat': self._jittered(interval, asset_id, 'heartbeat'),
+            'next_full_inventory': self._jittered(
+                self._setting('agent_full_inventory_interval'), asset_id, 'inventory'
+            )
+        }
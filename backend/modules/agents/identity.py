@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Helpdesk V3 - Agent Asset Identity
+Normalized identity components used to match registering agents to assets
+"""
+
+import re
+from typing import Dict, Any, List, Tuple
+
+# Firmware placeholders that many boards report instead of a real serial
+PLACEHOLDER_SERIALS = {
+    '', '0', 'NONE', 'NULL', 'N/A', 'NA', 'UNKNOWN', 'DEFAULT STRING',
+    'TO BE FILLED BY O.E.M.', 'SYSTEM SERIAL NUMBER', 'BASE BOARD SERIAL NUMBER',
+    'CHASSIS SERIAL NUMBER', 'NOT APPLICABLE', 'NOT SPECIFIED', '123456789',
+    '00000000-0000-0000-0000-000000000000', 'FFFFFFFF-FFFF-FFFF-FFFF-FFFFFFFFFFFF',
+    '03000200-0400-0500-0006-000700080009'
+}
+
+_MAC_HEX = re.compile(r'^[0-9A-F]{12}$')
+
+
+def normalize_mac(value: Any) -> str:
+    """AA:BB:CC:DD:EE:FF, or '' for missing, malformed and all-zero addresses"""
+    digits = re.sub(r'[^0-9A-Fa-f]', '', str(value or '')).upper()
+    if not _MAC_HEX.match(digits) or digits == '000000000000':
+        return ''
+    return ':'.join(digits[i:i + 2] for i in range(0, 12, 2))
+
+
+def normalize_serial(kind: str, value: Any) -> str:
+    """'kind:VALUE', or '' for placeholders; the kind keeps BIOS and board serials apart"""
+    serial = ' '.join(str(value or '').split()).upper()
+    if serial in PLACEHOLDER_SERIALS or len(set(serial)) == 1:
+        return ''
+    return f'{kind}:{serial}'
+
+
+def identity_components(hardware_info: Dict[str, Any]) -> Tuple[str, List[str], List[str]]:
+    """(computer name, sorted MAC addresses, sorted serials) from a registration payload
+
+    Serials come from ``hardware_info['serials']`` ({'bios': ..., 'board': ...,
+    'system_uuid': ...}); older agents do not send them.
+    """
+    computer_name = (hardware_info.get('computer_name') or '').strip()
+
+    macs = set()
+    for interface in hardware_info.get('network_interfaces') or []:
+        if isinstance(interface, dict):
+            mac = normalize_mac(interface.get('mac_address'))
+            if mac:
+                macs.add(mac)
+
+    serials = set()
+    reported = hardware_info.get('serials')
+    if isinstance(reported, dict):
+        for kind, value in reported.items():
+            serial = normalize_serial(kind, value)
+            if serial:
+                serials.add(serial)
+
+    return computer_name, sorted(macs), sorted(serials)
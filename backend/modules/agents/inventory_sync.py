@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Helpdesk V3 - Agent Inventory Sync
+Per-section hashes and JSON diffs for TIER 2 inventory uploads
+"""
+
+import copy
+import json
+import hashlib
+import logging
+from typing import Dict, List, Any, Tuple
+
+# Sections the agent tracks independently; hardware excludes disks and bitlocker
+SECTIONS = ('hardware', 'disks', 'bitlocker', 'software')
+PROTOCOL_VERSION = 1
+
+
+def canonical_json(data: Any) -> str:
+    """Serialization both sides hash; must match the agent's core/inventory_sync.py"""
+    return json.dumps(data, sort_keys=True, separators=(',', ':'))
+
+
+def section_hash(data: Any) -> str:
+    return hashlib.md5(canonical_json(data).encode('utf-8')).hexdigest()
+
+
+def apply_ops(document: Any, ops: List[List[Any]]) -> Any:
+    """Apply ['set', path, value] / ['del', path] operations to a copy of document
+
+    Objects are diffed key by key; any other value (lists included) is replaced
+    whole. An empty path replaces the document.
+    """
+    result = copy.deepcopy(document)
+    for op in ops:
+        if not isinstance(op, list) or len(op) < 2 or not isinstance(op[1], list):
+            raise ValueError(f'Malformed diff operation: {op!r}')
+        action, path = op[0], op[1]
+
+        if not path:
+            if action != 'set' or len(op) != 3:
+                raise ValueError('Only set may target the document root')
+            result = copy.deepcopy(op[2])
+            continue
+
+        parent = result
+        for key in path[:-1]:
+            if not isinstance(parent, dict):
+                raise ValueError(f'Diff path {path!r} does not address an object')
+            parent = parent.setdefault(key, {})
+        if not isinstance(parent, dict):
+            raise ValueError(f'Diff path {path!r} does not address an object')
+
+        if action == 'set' and len(op) == 3:
+            parent[path[-1]] = op[2]
+        elif action == 'del':
+            parent.pop(path[-1], None)
+        else:
+            raise ValueError(f'Unknown diff operation: {action!r}')
+    return result
+
+
+def merge_sections(sections: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Rebuild the legacy hardware_inventory / software_inventory payloads"""
+    hardware = dict(sections.get('hardware') or {})
+    if sections.get('disks') is not None:
+        hardware['disks'] = sections['disks']
+    if sections.get('bitlocker') is not None:
+        hardware['bitlocker'] = sections['bitlocker']
+    return hardware, sections.get('software') or {}
+
+
+class InventoryResyncRequired(Exception):
+    """The agent's view of stored sections diverged; it must resend them in full"""
+
+    def __init__(self, sections: List[str]):
+        super().__init__(f"Inventory resync required for: {', '.join(sections)}")
+        self.sections = sections
+
+
+class InventorySyncService:
+    """Apply negotiated inventory uploads to the per-section store
+
+    The agent sends ``{'protocol', 'hashes': {section: hash}, 'sections':
+    {section: {'mode': 'full', 'data': ...} | {'mode': 'diff', 'base': hash,
+    'ops': [...]}}}`` with only changed sections present. Stored sections live
+    in ``asset_inventory_sections`` as canonical JSON so hashes are stable.
+    """
+
+    def __init__(self, db_manager):
+        self.db = db_manager
+        self.logger = logging.getLogger(__name__)
+
+    def get_sections(self, asset_id: str) -> Dict[str, Dict[str, Any]]:
+        rows = self.db.execute_query(
+            "SELECT section, data, data_hash FROM asset_inventory_sections WHERE asset_id = %s",
+            (asset_id,)
+        ) or []
+        return {
+            row['section']: {'data': json.loads(row['data']), 'hash': row['data_hash']}
+            for row in rows
+        }
+
+    def apply(self, asset_id: str, sync: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply an upload; returns changed section names and the merged inventories
+
+        Raises InventoryResyncRequired (nothing is written) when a diff's base or
+        a claimed hash does not match what the server holds, and ValueError for
+        malformed uploads.
+        """
+        if not isinstance(sync, dict) or sync.get('protocol') != PROTOCOL_VERSION:
+            raise ValueError('Unsupported inventory sync protocol')
+
+        claimed = sync.get('hashes') or {}
+        uploads = sync.get('sections') or {}
+        if not isinstance(claimed, dict) or not isinstance(uploads, dict):
+            raise ValueError('Malformed inventory sync payload')
+        unknown = (set(claimed) | set(uploads)) - set(SECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown inventory sections: {', '.join(sorted(unknown))}")
+
+        stored = self.get_sections(asset_id)
+        resync = []
+        updated = {}
+
+        for section in SECTIONS:
+            upload = uploads.get(section)
+            current = stored.get(section)
+
+            if upload is None:
+                # Unchanged on the agent: our copy must carry the same hash
+                if section in claimed and (current is None or current['hash'] != claimed[section]):
+                    resync.append(section)
+                continue
+
+            mode = upload.get('mode') if isinstance(upload, dict) else None
+            if mode == 'full':
+                data = upload.get('data')
+            elif mode == 'diff':
+                if current is None or current['hash'] != upload.get('base'):
+                    resync.append(section)
+                    continue
+                data = apply_ops(current['data'], upload.get('ops') or [])
+            else:
+                raise ValueError(f'Invalid mode for section {section}')
+
+            data_hash = section_hash(data)
+            if section in claimed and claimed[section] != data_hash:
+                resync.append(section)
+                continue
+            updated[section] = {'data': data, 'hash': data_hash}
+
+        if resync:
+            raise InventoryResyncRequired(resync)
+
+        for section, entry in updated.items():
+            self.db.execute_query(
+                """
+                INSERT INTO asset_inventory_sections (asset_id, section, data, data_hash, updated_at)
+                VALUES (%s, %s, %s, %s, NOW())
+                ON CONFLICT (asset_id, section) DO UPDATE SET
+                    data = EXCLUDED.data,
+                    data_hash = EXCLUDED.data_hash,
+                    updated_at = EXCLUDED.updated_at
+                """,
+                (asset_id, section, canonical_json(entry['data']), entry['hash']),
+                fetch='none'
+            )
+
+        merged = {section: entry['data'] for section, entry in stored.items()}
+        merged.update({section: entry['data'] for section, entry in updated.items()})
+        hardware_inventory, software_inventory = merge_sections(merged)
+
+        return {
+            'changed': sorted(updated),
+            'hashes': {section: (updated.get(section) or stored.get(section) or {}).get('hash')
+                       for section in SECTIONS if section in updated or section in stored},
+            'hardware_inventory': hardware_inventory,
+            'software_inventory': software_inventory
+        }
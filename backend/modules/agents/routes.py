@@ -5,9 +5,15 @@ LANET Helpdesk V3 - Agents Routes
 API endpoints for agent installation tokens and agent registration
 """
 
+import json
+import zlib
+from functools import wraps
+from datetime import datetime, timezone
 from flask import Blueprint, request, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, decode_token
 from .service import AgentsService
+from .inventory_sync import InventorySyncService, InventoryResyncRequired
+from modules.assets.service import SoftwareCatalogService
 
 agents_bp = Blueprint('agents', __name__)
 
@@ -237,11 +243,76 @@ def register_agent_with_token():
 # AGENT COMMUNICATION ENDPOINTS
 # =====================================================
 
+# Decompressed request bodies larger than this are refused
+MAX_AGENT_BODY_BYTES = 32 * 1024 * 1024
+MAX_BATCH_HEARTBEATS = 1000
+
+def _agent_json_body():
+    """JSON body of an agent request, honouring ``Content-Encoding: gzip``"""
+    encoding = (request.headers.get('Content-Encoding') or '').lower()
+    if encoding in ('', 'identity'):
+        return request.get_json(silent=True)
+    if encoding != 'gzip':
+        raise ValueError(f'Unsupported Content-Encoding: {encoding}')
+
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    raw = decompressor.decompress(request.get_data(), MAX_AGENT_BODY_BYTES)
+    if decompressor.unconsumed_tail:
+        raise ValueError('Request body too large')
+    return json.loads(raw)
+
+def _agent_token_asset_id():
+    """Asset id bound to the agent JWT in the Authorization header, or None
+
+    Agents have no way to renew the token issued at registration, so expiry is
+    not enforced; the signature and the agent claims are.
+    """
+    auth_header = request.headers.get('Authorization') or ''
+    if not auth_header.startswith('Bearer '):
+        return None
+    try:
+        claims = decode_token(auth_header[len('Bearer '):].strip(), allow_expired=True)
+    except Exception:
+        return None
+    if claims.get('type') != 'agent' or not claims.get('asset_id'):
+        return None
+    return str(claims['asset_id'])
+
+def _track_ingest(f):
+    """Count the request towards heartbeat ingest pressure while it runs"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        with current_app.cadence.track():
+            return f(*args, **kwargs)
+    return decorated
+
+def _shed_response(retry_after):
+    """503 telling the agent to back off for ``retry_after`` seconds"""
+    response, status_code = current_app.response_manager.error(
+        'Heartbeat ingest saturated, retry later', 503, details={'retry_after': retry_after}
+    )
+    response.headers['Retry-After'] = str(retry_after)
+    return response, status_code
+
 @agents_bp.route('/heartbeat', methods=['POST'])
+@_track_ingest
 def agent_heartbeat():
-    """Agent heartbeat endpoint with tiered data support (agent authentication required)"""
+    """Agent heartbeat endpoint with tiered data support (agent authentication required)
+
+    TIER 2 inventory arrives either as full hardware_inventory /
+    software_inventory, or as ``inventory_sync`` carrying only the changed
+    sections (full or diffed, usually gzip-encoded). A sync that does not match
+    the stored sections is refused with 409 and ``details.resync``.
+
+    ``next_heartbeat`` / ``next_full_inventory`` in the response come from the
+    cadence controller; under saturation the request is refused with 503 and
+    ``Retry-After`` (TIER 2 is shed before TIER 1).
+    """
     try:
-        data = request.get_json()
+        try:
+            data = _agent_json_body()
+        except ValueError as e:
+            return current_app.response_manager.bad_request(str(e))
         if not data:
             return current_app.response_manager.bad_request('Request body required')
 
@@ -250,10 +321,34 @@ def agent_heartbeat():
         heartbeat_type = data.get('heartbeat_type', 'full')  # 'status' or 'full'
         hardware_inventory = data.get('hardware_inventory')
         software_inventory = data.get('software_inventory')
+        inventory_sync = data.get('inventory_sync')
+        inventory_hashes = None
 
         if not asset_id:
             return current_app.response_manager.bad_request('asset_id field required')
 
+        retry_after = current_app.cadence.shed(asset_id, heartbeat_type)
+        if retry_after is not None:
+            current_app.logger.warning(f"Shedding {heartbeat_type} heartbeat from {asset_id} ({retry_after}s)")
+            return _shed_response(retry_after)
+
+        # Negotiated inventory: apply before anything is recorded so a 409 retry is clean
+        if inventory_sync is not None:
+            try:
+                sync_result = InventorySyncService(current_app.db_manager).apply(asset_id, inventory_sync)
+            except InventoryResyncRequired as e:
+                return current_app.response_manager.error(str(e), 409, details={'resync': e.sections})
+            except ValueError as e:
+                return current_app.response_manager.bad_request(str(e))
+
+            inventory_hashes = sync_result['hashes']
+            if sync_result['changed']:
+                current_app.logger.info(f"Inventory sections changed for {asset_id}: {sync_result['changed']}")
+                hardware_inventory = sync_result['hardware_inventory']
+                software_inventory = sync_result['software_inventory']
+            else:
+                hardware_inventory = software_inventory = None
+
         current_app.logger.info(f"Received {heartbeat_type} heartbeat from asset {asset_id}")
 
         # Handle tiered heartbeat processing
@@ -292,32 +387,19 @@ def agent_heartbeat():
                 fetch='none'
             )
 
-            # NUEVO: Registrar heartbeat en tabla asset_heartbeats
-            heartbeat_insert_query = """
-            INSERT INTO asset_heartbeats (
-                asset_id, cpu_usage, memory_usage, disk_usage,
-                status, agent_version, network_status
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """
-
-            current_app.db_manager.execute_query(
-                heartbeat_insert_query,
-                (
-                    asset_id,
-                    status.get('cpu_percent', 0),
-                    status.get('memory_percent', 0),
-                    status.get('disk_percent', 0),
-                    status.get('agent_status', 'online'),
-                    status.get('agent_version', '1.0.0'),
-                    'connected'
-                ),
-                fetch='none'
+            # Time-series sample (partitioned; latest value kept by trigger)
+            current_app.heartbeat_store.record(
+                asset_id,
+                cpu_usage=status.get('cpu_percent', 0),
+                memory_usage=status.get('memory_percent', 0),
+                disk_usage=status.get('disk_percent', 0),
+                status=status.get('agent_status', 'online'),
+                agent_version=status.get('agent_version', '1.0.0')
             )
 
-            # Return shorter interval for status heartbeats
             return current_app.response_manager.success({
                 'status': 'ok',
-                'next_heartbeat': 300  # 5 minutes for status heartbeats
+                **current_app.cadence.plan(asset_id, status)
             })
 
         else:
@@ -368,27 +450,15 @@ def agent_heartbeat():
                 fetch='none'
             )
 
-            # NUEVO: Registrar heartbeat completo en tabla asset_heartbeats
-            heartbeat_insert_query = """
-            INSERT INTO asset_heartbeats (
-                asset_id, cpu_usage, memory_usage, disk_usage,
-                status, agent_version, network_status, system_uptime
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """
-
-            current_app.db_manager.execute_query(
-                heartbeat_insert_query,
-                (
-                    asset_id,
-                    status.get('cpu_usage', 0),
-                    status.get('memory_usage', 0),
-                    status.get('disk_usage', 0),
-                    status.get('agent_status', 'online'),
-                    status.get('agent_version', '1.0.0'),
-                    'connected',
-                    status.get('uptime', 0)
-                ),
-                fetch='none'
+            # Time-series sample (partitioned; latest value kept by trigger)
+            current_app.heartbeat_store.record(
+                asset_id,
+                cpu_usage=status.get('cpu_usage', 0),
+                memory_usage=status.get('memory_usage', 0),
+                disk_usage=status.get('disk_usage', 0),
+                status=status.get('agent_status', 'online'),
+                agent_version=status.get('agent_version', '1.0.0'),
+                system_uptime=status.get('uptime', 0)
             )
 
             # Update inventory if provided
@@ -440,6 +510,18 @@ def agent_heartbeat():
 
                 current_app.logger.info(f"SAVED TO DB: Hardware inventory saved successfully for {asset_id}")
 
+                # Keep the fleet-wide software catalog in step (delta, skipped when unchanged)
+                if software_inventory:
+                    try:
+                        sync = SoftwareCatalogService(current_app.db_manager).sync_asset(asset_id, software_inventory)
+                        if sync and sync['changed']:
+                            current_app.logger.info(
+                                f"Software catalog updated for {asset_id}: "
+                                f"+{sync['added']} -{sync['removed']} ({sync['product_count']} products)"
+                            )
+                    except Exception as e:
+                        current_app.logger.error(f"Error syncing software catalog for asset {asset_id}: {e}")
+
                 # Process BitLocker data if present
                 if hardware_inventory and 'bitlocker' in hardware_inventory:
                     try:
@@ -617,37 +699,128 @@ def agent_heartbeat():
                     except Exception as e:
                         current_app.logger.error(f"Error processing BitLocker data for asset {asset_id}: {e}")
 
-                # Also update main assets table for backward compatibility
-                update_data = {'system_metrics': status}
-                if hardware_inventory:
-                    update_data['hardware_info'] = hardware_inventory
-                if software_inventory:
-                    update_data['software_info'] = software_inventory
-
-                legacy_update_query = """
-                UPDATE assets
-                SET last_seen = NOW(),
-                    agent_status = 'online',
-                    specifications = COALESCE(specifications, '{}')::jsonb || %s::jsonb
-                WHERE asset_id = %s
-                """
+            # Keep liveness and system metrics on the assets row current on every
+            # full heartbeat, also when no inventory section changed
+            update_data = {'system_metrics': status}
+            if hardware_inventory:
+                update_data['hardware_info'] = hardware_inventory
+            if software_inventory:
+                update_data['software_info'] = software_inventory
+
+            legacy_update_query = """
+            UPDATE assets
+            SET last_seen = NOW(),
+                agent_status = 'online',
+                specifications = COALESCE(specifications, '{}')::jsonb || %s::jsonb
+            WHERE asset_id = %s
+            """
 
-                current_app.db_manager.execute_query(
-                    legacy_update_query,
-                    (json.dumps(update_data), asset_id),
-                    fetch='none'
-                )
+            current_app.db_manager.execute_query(
+                legacy_update_query,
+                (json.dumps(update_data), asset_id),
+                fetch='none'
+            )
 
-            # Return normal interval for all heartbeats (15 minutes)
-            return current_app.response_manager.success({
+            response_data = {
                 'status': 'ok',
-                'next_heartbeat': 900  # 15 minutes for all heartbeats
-            })
+                **current_app.cadence.plan(asset_id, status)
+            }
+            if inventory_hashes is not None:
+                response_data['inventory_hashes'] = inventory_hashes
+            return current_app.response_manager.success(response_data)
 
     except Exception as e:
         current_app.logger.error(f"Error processing heartbeat: {e}")
         return current_app.response_manager.server_error('Failed to process heartbeat')
 
+@agents_bp.route('/heartbeat/batch', methods=['POST'])
+@_track_ingest
+def agent_heartbeat_batch():
+    """Batch ingest of heartbeat samples replayed from an agent's offline spool
+
+    Body (optionally gzip-encoded): {asset_id, sent_at, heartbeats: [{spool_id,
+    recorded_at, cpu_usage, memory_usage, disk_usage, uptime, agent_status}]}.
+    recorded_at/sent_at are agent epoch seconds; the agent's clock offset is
+    removed using sent_at. Returns the spool ids stored. Backfill is deferrable,
+    so it is shed at the same pressure as TIER 2.
+
+    Requires the agent JWT issued at registration (Authorization: Bearer); the
+    asset it was issued for must be the asset_id in the body.
+    """
+    try:
+        try:
+            data = _agent_json_body()
+        except ValueError as e:
+            return current_app.response_manager.bad_request(str(e))
+        if not data:
+            return current_app.response_manager.bad_request('Request body required')
+
+        asset_id = data.get('asset_id')
+        heartbeats = data.get('heartbeats')
+        if not asset_id or not current_app.db_manager.validate_uuid(asset_id):
+            return current_app.response_manager.bad_request('Valid asset_id field required')
+
+        token_asset_id = _agent_token_asset_id()
+        if token_asset_id is None:
+            return current_app.response_manager.unauthorized('Valid agent token required')
+        if token_asset_id.lower() != str(asset_id).lower():
+            return current_app.response_manager.forbidden('Agent token does not belong to this asset')
+
+        if not isinstance(heartbeats, list):
+            return current_app.response_manager.bad_request('heartbeats must be a list')
+        if len(heartbeats) > MAX_BATCH_HEARTBEATS:
+            return current_app.response_manager.bad_request(
+                f'At most {MAX_BATCH_HEARTBEATS} heartbeats per batch'
+            )
+
+        retry_after = current_app.cadence.shed(asset_id, 'batch')
+        if retry_after is not None:
+            return _shed_response(retry_after)
+
+        asset = current_app.db_manager.execute_query(
+            "SELECT asset_id FROM assets WHERE asset_id = %s AND status = 'active'",
+            (asset_id,), fetch='one'
+        )
+        if not asset:
+            return current_app.response_manager.not_found('Asset not found')
+
+        now = datetime.now(timezone.utc)
+        try:
+            clock_offset = now.timestamp() - float(data['sent_at']) if data.get('sent_at') else 0.0
+        except (TypeError, ValueError):
+            clock_offset = 0.0
+
+        samples = []
+        for heartbeat in heartbeats:
+            try:
+                recorded_at = datetime.fromtimestamp(float(heartbeat['recorded_at']) + clock_offset, timezone.utc)
+                samples.append({
+                    'spool_id': heartbeat.get('spool_id'),
+                    'recorded_at': recorded_at,
+                    'cpu_usage': float(heartbeat.get('cpu_usage') or 0),
+                    'memory_usage': float(heartbeat.get('memory_usage') or 0),
+                    'disk_usage': float(heartbeat.get('disk_usage') or 0),
+                    'status': heartbeat.get('agent_status') or 'online',
+                    'system_uptime': int(heartbeat['uptime']) if heartbeat.get('uptime') is not None else None
+                })
+            except (KeyError, TypeError, ValueError, OverflowError, OSError):
+                continue
+
+        stored = current_app.heartbeat_store.record_batch(asset_id, samples)
+        current_app.logger.info(
+            f"Backfilled {len(stored)}/{len(heartbeats)} spooled heartbeats for asset {asset_id}"
+        )
+
+        return current_app.response_manager.success({
+            'accepted': [s['spool_id'] for s in stored if s.get('spool_id') is not None],
+            'stored': len(stored),
+            'received': len(heartbeats)
+        })
+
+    except Exception as e:
+        current_app.logger.error(f"Error processing heartbeat batch: {e}")
+        return current_app.response_manager.server_error('Failed to process heartbeat batch')
+
 @agents_bp.route('/inventory', methods=['POST'])
 def agent_inventory_update():
     """Agent inventory update endpoint"""
@@ -717,6 +890,18 @@ def create_ticket_from_agent():
         if not agent_info:
             return current_app.response_manager.bad_request('Agent not found or not associated with an asset')
 
+        # Tickets replayed from the agent's offline spool are idempotent on spool_id
+        spool_id = data.get('spool_id')
+        if spool_id:
+            if not current_app.db_manager.validate_uuid(spool_id):
+                return current_app.response_manager.bad_request('Invalid spool_id')
+            receipt = current_app.db_manager.execute_query(
+                "SELECT ticket_id, ticket_number FROM agent_ticket_receipts WHERE spool_id = %s",
+                (spool_id,), fetch='one'
+            )
+            if receipt:
+                return current_app.response_manager.success(receipt, 'Ticket already created from agent')
+
         # Validate required fields
         required_fields = ['subject', 'description', 'priority']
         for field in required_fields:
@@ -767,6 +952,16 @@ def create_ticket_from_agent():
 
         if result:
             current_app.logger.info(f"Automatic ticket created by agent {current_user_id}: {result.get('ticket_number')}")
+            if spool_id and result.get('ticket_id'):
+                current_app.db_manager.execute_query(
+                    """
+                    INSERT INTO agent_ticket_receipts (spool_id, asset_id, ticket_id, ticket_number)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (spool_id) DO NOTHING
+                    """,
+                    (spool_id, agent_info['asset_id'], result['ticket_id'], result.get('ticket_number')),
+                    fetch='none'
+                )
             return current_app.response_manager.success(result, 'Ticket created successfully from agent')
         else:
             return current_app.response_manager.server_error('Failed to create ticket from agent')
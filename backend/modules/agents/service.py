@@ -6,12 +6,15 @@ Handles business logic for agent installation tokens and agent registration
 """
 
 import logging
+import ipaddress
 import uuid
 import re
 import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from core.database import DatabaseManager
+from core.config_cache import get_config_cache
+from .identity import identity_components
 
 
 class AgentsService:
@@ -389,6 +392,11 @@ class AgentsService:
         """
         Register a new agent using an installation token
 
+        Token validation, matching against existing assets (asset_identities:
+        exact fingerprint, then name / MAC / serial components), the asset
+        insert or update and the token usage log run in one transaction via
+        ``register_agent_asset`` (see migrations/add_asset_identities.sql).
+
         Args:
             token_value: Installation token value
             hardware_info: Hardware information from agent
@@ -399,162 +407,82 @@ class AgentsService:
             Registration result with asset_id and JWT token
         """
         try:
-            # Validate token
-            validation_result = self.db.execute_query(
-                "SELECT * FROM validate_agent_token(%s)",
-                (token_value,),
-                fetch='one'
-            )
-
-            if not validation_result['is_valid']:
-                # Log failed attempt
-                self._log_token_usage(token_value, ip_address, user_agent,
-                                    hardware_info.get('computer_name'), hardware_info,
-                                    False, None, validation_result['error_message'])
-                raise ValueError(validation_result['error_message'])
-
-            client_id = str(validation_result['client_id'])
-            site_id = str(validation_result['site_id'])
-            computer_name = hardware_info.get('computer_name', 'Unknown')
+            computer_name, mac_addresses, serials = identity_components(hardware_info)
+            computer_name = computer_name or 'Unknown'
 
             # Generate hardware fingerprint for duplicate detection
             hardware_fingerprint = self._generate_hardware_fingerprint(hardware_info)
 
-            # Check for existing asset by hardware fingerprint first
-            existing_asset = self._check_existing_asset_by_fingerprint(
-                hardware_fingerprint, client_id, site_id
-            )
-
-            # If not found by fingerprint, check by computer name as fallback
-            if not existing_asset:
-                existing_asset = self._check_existing_asset_by_name(f"{computer_name} (Agent)")
-
-            # If existing asset found, update it instead of creating new one
-            if existing_asset:
-                self.logger.info(f"Found existing asset {existing_asset['asset_id']} for {computer_name}")
-
-                # Update existing asset with latest information
-                asset_id = str(existing_asset['asset_id'])
-                self._update_existing_asset(asset_id, hardware_info, hardware_fingerprint)
-
-                # Update token usage count
-                self.db.execute_query(
-                    """UPDATE agent_installation_tokens
-                       SET usage_count = usage_count + 1, last_used_at = NOW()
-                       WHERE token_value = %s""",
-                    (token_value,),
-                    fetch='none'
-                )
-
-                # Log successful usage
-                self._log_token_usage(token_value, ip_address, user_agent, computer_name,
-                                    hardware_info, True, asset_id, None)
-
-                # Generate JWT token for agent authentication
-                agent_token = self._generate_agent_jwt_token(asset_id, client_id, site_id)
-
-                self.logger.info(f"Successfully updated existing asset {asset_id} for {computer_name}")
-
-                return {
-                    'success': True,
-                    'asset_id': asset_id,
-                    'client_id': client_id,
-                    'site_id': site_id,
-                    'client_name': validation_result['client_name'],
-                    'site_name': validation_result['site_name'],
-                    'agent_token': agent_token,
-                    'config': self._get_agent_config(),
-                    'existing_asset': True
-                }
-
-            # Create new asset record
-            asset_data = {
-                'client_id': client_id,
-                'site_id': site_id,
-                'name': f"{computer_name} (Agent)",
-                'asset_type': 'desktop',
-                'status': 'active',
-                'agent_status': 'online',
-                'last_seen': datetime.now(),
-                'specifications': {
-                    'agent_version': hardware_info.get('agent_version', '1.0.0'),
-                    'hardware': hardware_info.get('hardware', {}),
-                    'software': hardware_info.get('software', []),
-                    'system_metrics': hardware_info.get('status', {}),
-                    'os': hardware_info.get('os', ''),
-                    'registration_date': datetime.now().isoformat(),
-                    'hardware_fingerprint': hardware_fingerprint,
-                    'network_interfaces': hardware_info.get('network_interfaces', []),
-                    'platform_details': hardware_info.get('platform_details', {})
-                }
+            specifications = {
+                'agent_version': hardware_info.get('agent_version', '1.0.0'),
+                'hardware': hardware_info.get('hardware', {}),
+                'software': hardware_info.get('software', []),
+                'system_metrics': hardware_info.get('status', {}),
+                'os': hardware_info.get('os', ''),
+                'hardware_fingerprint': hardware_fingerprint,
+                'network_interfaces': hardware_info.get('network_interfaces', []),
+                'platform_details': hardware_info.get('platform_details', {})
             }
 
-            # Insert asset
-            insert_asset_query = """
-            INSERT INTO assets (
-                client_id, site_id, name, asset_type, status,
-                agent_status, last_seen, specifications
-            ) VALUES (
-                %s, %s, %s, %s, %s, %s, %s, %s
-            ) RETURNING asset_id
-            """
+            # inet column: an unparsable address must not abort the registration transaction
+            client_ip = (ip_address or '').split(',')[0].strip()
+            try:
+                ipaddress.ip_address(client_ip)
+            except ValueError:
+                client_ip = None
 
-            asset_result = self.db.execute_query(
-                insert_asset_query,
+            result = self.db.execute_query(
+                "SELECT * FROM register_agent_asset(%s, %s, %s, %s, %s, %s::jsonb, %s, %s, %s::jsonb)",
                 (
-                    client_id, site_id, asset_data['name'], asset_data['asset_type'],
-                    asset_data['status'], asset_data['agent_status'], asset_data['last_seen'],
-                    json.dumps(asset_data['specifications'])
+                    token_value, computer_name, hardware_fingerprint, mac_addresses, serials,
+                    json.dumps(specifications), client_ip, user_agent, json.dumps(hardware_info)
                 ),
-                fetch='one'
+                fetch='one',
+                commit=True
             )
 
-            asset_id = str(asset_result['asset_id'])
+            if not result['is_valid']:
+                # Failed attempt already logged by register_agent_asset
+                self.logger.warning(f"Token validation error for {token_value}: {result['error_message']}")
+                raise ValueError(result['error_message'])
 
-            # Update token usage count
-            self.db.execute_query(
-                """UPDATE agent_installation_tokens
-                   SET usage_count = usage_count + 1, last_used_at = NOW()
-                   WHERE token_value = %s""",
-                (token_value,),
-                fetch='none'
-            )
-
-            # Log successful usage
-            self._log_token_usage(token_value, ip_address, user_agent, computer_name,
-                                hardware_info, True, asset_id, None)
+            asset_id = str(result['asset_id'])
+            client_id = str(result['client_id'])
+            site_id = str(result['site_id'])
 
             # Generate JWT token for agent authentication
             agent_token = self._generate_agent_jwt_token(asset_id, client_id, site_id)
 
-            self.logger.info(f"Successfully registered agent {computer_name} as asset {asset_id}")
-
-            return {
+            registration = {
                 'success': True,
                 'asset_id': asset_id,
                 'client_id': client_id,
                 'site_id': site_id,
-                'client_name': validation_result['client_name'],
-                'site_name': validation_result['site_name'],
+                'client_name': result['client_name'],
+                'site_name': result['site_name'],
                 'agent_token': agent_token,
                 'config': self._get_agent_config()
             }
 
-        except ValueError as ve:
+            if result['existing_asset']:
+                self.logger.info(
+                    f"Successfully updated existing asset {asset_id} for {computer_name} "
+                    f"(matched by {result['matched_by']})"
+                )
+                registration['existing_asset'] = True
+            else:
+                self.logger.info(f"Successfully registered agent {computer_name} as asset {asset_id}")
+
+            return registration
+
+        except ValueError:
             # Token validation errors - don't crash the backend
-            self.logger.warning(f"Token validation error for {token_value}: {ve}")
-            try:
-                self._log_token_usage(token_value, ip_address, user_agent,
-                                    hardware_info.get('computer_name', 'Unknown'), hardware_info,
-                                    False, None, str(ve))
-            except Exception as log_error:
-                self.logger.error(f"Failed to log token usage: {log_error}")
-            raise ve
+            raise
         except Exception as e:
             # Unexpected errors - log but don't crash backend
             self.logger.error(f"Unexpected error registering agent with token {token_value}: {e}", exc_info=True)
 
-            # Try to log failed attempt
+            # The transaction rolled back: log the failed attempt separately
             try:
                 self._log_token_usage(token_value, ip_address, user_agent,
                                     hardware_info.get('computer_name', 'Unknown'), hardware_info,
@@ -634,97 +562,6 @@ class AgentsService:
             fallback_data = hardware_info.get('computer_name', 'unknown')
             return hashlib.sha256(fallback_data.encode('utf-8')).hexdigest()[:16]
 
-    def _check_existing_asset_by_fingerprint(self, hardware_fingerprint: str,
-                                           client_id: str, site_id: str) -> Optional[Dict]:
-        """Check if asset already exists based on hardware fingerprint"""
-        try:
-            # Check by hardware fingerprint within the same client/site
-            existing_asset = self.db.execute_query(
-                """SELECT asset_id, name, client_id, site_id, specifications
-                   FROM assets
-                   WHERE client_id = %s
-                   AND site_id = %s
-                   AND status = 'active'
-                   AND specifications->>'hardware_fingerprint' = %s
-                   LIMIT 1""",
-                (client_id, site_id, hardware_fingerprint),
-                fetch='one'
-            )
-
-            if existing_asset:
-                self.logger.info(f"Found existing asset by hardware fingerprint: {hardware_fingerprint}")
-                return existing_asset
-
-            return None
-
-        except Exception as e:
-            self.logger.error(f"Error checking existing asset by fingerprint: {e}")
-            return None
-
-    def _check_existing_asset_by_name(self, asset_name: str) -> Optional[Dict]:
-        """Check if asset already exists based on computer name"""
-        try:
-            # Check by computer name
-            existing_asset = self.db.execute_query(
-                """SELECT asset_id, name, client_id, site_id
-                   FROM assets
-                   WHERE name = %s
-                   AND status = 'active'
-                   LIMIT 1""",
-                (asset_name,),
-                fetch='one'
-            )
-
-            if existing_asset:
-                self.logger.info(f"Found existing asset by name: {asset_name}")
-                return existing_asset
-
-            return None
-
-        except Exception as e:
-            self.logger.error(f"Error checking existing asset by name: {e}")
-            return None
-
-    def _update_existing_asset(self, asset_id: str, hardware_info: Dict[str, Any],
-                             hardware_fingerprint: str):
-        """Update existing asset with latest hardware information"""
-        try:
-            # Update asset with latest information
-            update_query = """
-            UPDATE assets
-            SET
-                agent_status = 'online',
-                last_seen = NOW(),
-                specifications = specifications || %s,
-                updated_at = NOW()
-            WHERE asset_id = %s
-            """
-
-            # Prepare updated specifications
-            updated_specs = {
-                'agent_version': hardware_info.get('agent_version', '1.0.0'),
-                'hardware': hardware_info.get('hardware', {}),
-                'software': hardware_info.get('software', []),
-                'system_metrics': hardware_info.get('status', {}),
-                'os': hardware_info.get('os', ''),
-                'last_registration_date': datetime.now().isoformat(),
-                'hardware_fingerprint': hardware_fingerprint,
-                'network_interfaces': hardware_info.get('network_interfaces', []),
-                'platform_details': hardware_info.get('platform_details', {})
-            }
-
-            self.db.execute_query(
-                update_query,
-                (json.dumps(updated_specs), asset_id),
-                fetch='none'
-            )
-
-            self.logger.info(f"Updated existing asset {asset_id} with latest hardware information")
-
-        except Exception as e:
-            self.logger.error(f"Error updating existing asset {asset_id}: {e}")
-            raise
-
     def _log_token_usage(self, token_value: str, ip_address: str, user_agent: str,
                         computer_name: str, hardware_info: Dict[str, Any],
                         success: bool, asset_id: Optional[str], error_message: Optional[str]):
@@ -784,18 +621,22 @@ class AgentsService:
     def _get_agent_config(self) -> Dict[str, Any]:
         """Get agent configuration from system_config"""
         try:
-            config_query = """
-            SELECT config_key, config_value
-            FROM system_config
-            WHERE config_key LIKE 'agent_%'
-            """
+            cache = get_config_cache()
+            if cache:
+                config = cache.get_system_prefix('agent_')
+            else:
+                config_query = """
+                SELECT config_key, config_value
+                FROM system_config
+                WHERE config_key LIKE 'agent_%'
+                """
 
-            config_rows = self.db.execute_query(config_query)
-            config = {}
+                config_rows = self.db.execute_query(config_query)
+                config = {}
 
-            for row in config_rows:
-                key = row['config_key'].replace('agent_', '')
-                config[key] = row['config_value']
+                for row in config_rows:
+                    key = row['config_key'].replace('agent_', '')
+                    config[key] = row['config_value']
 
             # Default configuration
             default_config = {
@@ -8,7 +8,10 @@ Endpoints for managing and viewing assets/equipment
 from flask import Blueprint, request, current_app, g
 from flask_jwt_extended import jwt_required
 from utils.security import require_role
-from datetime import datetime, timedelta
+from .service import FleetStatusService, SoftwareCatalogService
+from utils.validators import ValidationUtils
+from core.serialization import project_rows
+from datetime import datetime, timedelta, timezone
 
 assets_bp = Blueprint('assets', __name__)
 
@@ -139,86 +142,145 @@ def get_organization_inventory():
 @jwt_required()
 @require_role(['superadmin', 'technician'])
 def get_technician_dashboard():
-    """Get organized assets dashboard for technicians - grouped by client"""
+    """Get organized assets dashboard for technicians - grouped by client
+
+    Reads the precomputed per-client counters (O(clients)); the sweeper that
+    ages stale assets to warning/offline runs first when it is due.
+    """
     try:
-        # Get assets summary grouped by client with real-time status from heartbeats
-        client_summary_query = """
-        SELECT
-            c.client_id,
-            c.name as client_name,
-            COUNT(a.asset_id) as total_assets,
-            COUNT(CASE WHEN COALESCE(h.last_heartbeat, st.last_seen) > NOW() - INTERVAL '20 minutes' THEN 1 END) as online_assets,
-            COUNT(CASE WHEN COALESCE(h.last_heartbeat, st.last_seen) BETWEEN NOW() - INTERVAL '1 hour' AND NOW() - INTERVAL '20 minutes' THEN 1 END) as warning_assets,
-            COUNT(CASE WHEN COALESCE(h.last_heartbeat, st.last_seen) < NOW() - INTERVAL '1 hour' OR (h.last_heartbeat IS NULL AND st.last_seen IS NULL) THEN 1 END) as offline_assets,
-            MAX(COALESCE(st.last_seen, a.last_seen)) as last_update
-        FROM clients c
-        LEFT JOIN assets a ON c.client_id = a.client_id AND a.status = 'active'
-        LEFT JOIN assets_status_optimized st ON a.asset_id = st.asset_id
-        LEFT JOIN asset_latest_heartbeat h ON a.asset_id = h.asset_id
-        WHERE c.is_active = true
-        GROUP BY c.client_id, c.name
-        HAVING COUNT(a.asset_id) > 0
-        ORDER BY c.name
-        """
+        fleet = FleetStatusService(current_app.db_manager)
+        fleet.sweep_if_due()
+
+        client_summaries = fleet.get_client_summaries()
+        overall_summary = fleet.summarize(client_summaries)
+        alerts = fleet.get_alerts(limit=10)
+
+        return current_app.response_manager.success({
+            'overall_summary': overall_summary,
+            'client_summaries': client_summaries,
+            'alerts': alerts
+        })
+
+    except Exception as e:
+        current_app.logger.error(f"Error getting technician dashboard: {e}")
+        return current_app.response_manager.server_error('Failed to get technician dashboard')
+
+@assets_bp.route('/status-transitions', methods=['GET'])
+@jwt_required()
+@require_role(['superadmin', 'technician'])
+def get_status_transitions():
+    """Change feed of asset connection status transitions
+
+    Poll with ?since_id=<last transition_id seen>&limit=100[&client_id=...].
+    """
+    try:
+        since_id = max(request.args.get('since_id', 0, type=int), 0)
+        limit = max(min(request.args.get('limit', 100, type=int), 500), 1)
+        client_id = request.args.get('client_id')
+
+        if client_id and not current_app.db_manager.validate_uuid(client_id):
+            return current_app.response_manager.bad_request('Invalid client ID format')
 
-        client_summaries = current_app.db_manager.execute_query(
-            client_summary_query, fetch='all'
+        fleet = FleetStatusService(current_app.db_manager)
+        transitions = fleet.get_transitions(since_id=since_id, limit=limit, client_id=client_id)
+
+        return current_app.response_manager.success({
+            'transitions': transitions,
+            'last_id': transitions[-1]['transition_id'] if transitions else since_id
+        })
+
+    except Exception as e:
+        current_app.logger.error(f"Error getting status transitions: {e}")
+        return current_app.response_manager.server_error('Failed to get status transitions')
+
+def _pagination_payload(page: int, per_page: int, total: int) -> dict:
+    total_pages = (total + per_page - 1) // per_page
+    return {
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'total_pages': total_pages,
+        'has_next': page < total_pages,
+        'has_prev': page > 1
+    }
+
+@assets_bp.route('/software', methods=['GET'])
+@jwt_required()
+@require_role(['superadmin', 'technician'])
+def search_software():
+    """Fleet-wide software search and install report
+
+    ?search=<name>&vendor=<vendor>&version=<exact>&client_id=...&sort=installs|name
+    &page=&per_page= — served from the normalized software catalog.
+    """
+    try:
+        pagination = ValidationUtils.validate_pagination(
+            request.args.get('page'), request.args.get('per_page'),
+            default_per_page=50, max_per_page=500
+        )
+        client_id = request.args.get('client_id')
+        if client_id and not current_app.db_manager.validate_uuid(client_id):
+            return current_app.response_manager.bad_request('Invalid client ID format')
+
+        sort = request.args.get('sort', 'installs')
+        if sort not in SoftwareCatalogService.REPORT_SORTS:
+            return current_app.response_manager.bad_request(
+                f"Invalid sort. Use one of: {', '.join(SoftwareCatalogService.REPORT_SORTS)}"
+            )
+
+        catalog = SoftwareCatalogService(current_app.db_manager)
+        result = catalog.search_products(
+            search=(request.args.get('search') or '').strip() or None,
+            vendor=(request.args.get('vendor') or '').strip() or None,
+            version=(request.args.get('version') or '').strip() or None,
+            client_id=client_id,
+            sort=sort,
+            page=pagination['page'],
+            per_page=pagination['per_page']
         )
 
-        # Get overall summary with real-time status from heartbeats
-        overall_summary_query = """
-        SELECT
-            COUNT(a.asset_id) as total_assets,
-            COUNT(CASE WHEN COALESCE(h.last_heartbeat, st.last_seen) > NOW() - INTERVAL '20 minutes' THEN 1 END) as online_assets,
-            COUNT(CASE WHEN COALESCE(h.last_heartbeat, st.last_seen) BETWEEN NOW() - INTERVAL '1 hour' AND NOW() - INTERVAL '20 minutes' THEN 1 END) as warning_assets,
-            COUNT(CASE WHEN COALESCE(h.last_heartbeat, st.last_seen) < NOW() - INTERVAL '1 hour' OR (h.last_heartbeat IS NULL AND st.last_seen IS NULL) THEN 1 END) as offline_assets,
-            MAX(COALESCE(h.last_heartbeat, st.last_seen, a.last_seen)) as last_update
-        FROM assets a
-        LEFT JOIN assets_status_optimized st ON a.asset_id = st.asset_id
-        LEFT JOIN asset_latest_heartbeat h ON a.asset_id = h.asset_id
-        WHERE a.status = 'active'
-        """
+        return current_app.response_manager.success({
+            'products': result['products'],
+            'pagination': _pagination_payload(pagination['page'], pagination['per_page'], result['total'])
+        })
 
-        overall_summary = current_app.db_manager.execute_query(
-            overall_summary_query, fetch='one'
+    except Exception as e:
+        current_app.logger.error(f"Error searching software: {e}")
+        return current_app.response_manager.server_error('Failed to search software')
+
+@assets_bp.route('/software/<int:product_id>/assets', methods=['GET'])
+@jwt_required()
+@require_role(['superadmin', 'technician'])
+def get_software_assets(product_id):
+    """Assets that have a software product installed"""
+    try:
+        pagination = ValidationUtils.validate_pagination(
+            request.args.get('page'), request.args.get('per_page'),
+            default_per_page=50, max_per_page=500
         )
+        client_id = request.args.get('client_id')
+        if client_id and not current_app.db_manager.validate_uuid(client_id):
+            return current_app.response_manager.bad_request('Invalid client ID format')
 
-        # Get recent alerts (assets with issues) using calculated status
-        alerts_query = f"""
-        SELECT
-            a.name as asset_name,
-            {calculate_asset_status_sql()} as agent_status,
-            a.last_seen,
-            s.name as site_name,
-            c.name as client_name
-        FROM assets a
-        JOIN sites s ON a.site_id = s.site_id
-        JOIN clients c ON a.client_id = c.client_id
-        WHERE a.status = 'active'
-        AND ({calculate_asset_status_sql()} = 'offline' OR a.agent_status = 'error')
-        ORDER BY a.last_seen DESC NULLS LAST
-        LIMIT 10
-        """
+        catalog = SoftwareCatalogService(current_app.db_manager)
+        product = catalog.get_product(product_id)
+        if not product:
+            return current_app.response_manager.not_found('Software product')
 
-        alerts = current_app.db_manager.execute_query(
-            alerts_query, fetch='all'
+        result = catalog.get_product_assets(
+            product_id, client_id=client_id,
+            page=pagination['page'], per_page=pagination['per_page']
         )
 
         return current_app.response_manager.success({
-            'overall_summary': overall_summary or {
-                'total_assets': 0,
-                'online_assets': 0,
-                'warning_assets': 0,
-                'offline_assets': 0,
-                'last_update': None
-            },
-            'client_summaries': client_summaries or [],
-            'alerts': alerts or []
+            'product': product,
+            'assets': result['assets'],
+            'pagination': _pagination_payload(pagination['page'], pagination['per_page'], result['total'])
         })
 
     except Exception as e:
-        current_app.logger.error(f"Error getting technician dashboard: {e}")
-        return current_app.response_manager.server_error('Failed to get technician dashboard')
+        current_app.logger.error(f"Error getting assets for software product {product_id}: {e}")
+        return current_app.response_manager.server_error('Failed to get software assets')
 
 @assets_bp.route('/technician/filtered', methods=['GET'])
 @jwt_required()
@@ -305,9 +367,8 @@ def get_filtered_assets_for_technician():
         """
 
         params.extend([per_page, offset])
-        assets = current_app.db_manager.execute_query(
-            assets_query, params, fetch='all'
-        )
+        columns, rows = current_app.db_manager.execute_rows(assets_query, params)
+        assets = project_rows(columns, rows)
 
         # Calculate pagination info
         total_pages = (total_count + per_page - 1) // per_page
@@ -670,6 +731,82 @@ def force_inventory_update():
         current_app.logger.error(f"Error forcing inventory update: {e}")
         return current_app.response_manager.server_error('Failed to force inventory update')
 
+METRICS_RANGES = {
+    '1h': timedelta(hours=1),
+    '24h': timedelta(hours=24),
+    '7d': timedelta(days=7),
+    '30d': timedelta(days=30),
+    '90d': timedelta(days=90),
+    '1y': timedelta(days=365)
+}
+
+@assets_bp.route('/<asset_id>/metrics', methods=['GET'])
+@jwt_required()
+def get_asset_metrics(asset_id):
+    """Get CPU/memory/disk history for an asset
+
+    ?range=1h|24h|7d|30d|90d|1y (default 24h). Short ranges come from raw
+    heartbeats, longer ones from the 1-hour and 1-day rollups.
+    """
+    try:
+        if not current_app.db_manager.validate_uuid(asset_id):
+            return current_app.response_manager.bad_request('Invalid asset ID format')
+
+        range_key = request.args.get('range', '24h')
+        if range_key not in METRICS_RANGES:
+            return current_app.response_manager.bad_request(
+                f"Invalid range. Use one of: {', '.join(METRICS_RANGES)}"
+            )
+
+        asset = current_app.db_manager.execute_query(
+            "SELECT asset_id FROM assets WHERE asset_id = %s AND status = 'active'",
+            (asset_id,), fetch='one'
+        )
+        if not asset:
+            return current_app.response_manager.not_found('Asset')
+
+        end = datetime.utcnow().replace(tzinfo=timezone.utc)
+        start = end - METRICS_RANGES[range_key]
+        history = current_app.heartbeat_store.get_metrics_history(asset_id, start, end)
+
+        return current_app.response_manager.success({
+            'asset_id': asset_id,
+            'range': range_key,
+            'granularity': history['granularity'],
+            'points': history['points']
+        })
+
+    except Exception as e:
+        current_app.logger.error(f"Error getting asset metrics: {e}")
+        return current_app.response_manager.server_error('Failed to get asset metrics')
+
+@assets_bp.route('/<asset_id>/software', methods=['GET'])
+@jwt_required()
+def get_asset_software(asset_id):
+    """Software installed on an asset, from the normalized catalog"""
+    try:
+        if not current_app.db_manager.validate_uuid(asset_id):
+            return current_app.response_manager.bad_request('Invalid asset ID format')
+
+        asset = current_app.db_manager.execute_query(
+            "SELECT asset_id FROM assets WHERE asset_id = %s AND status = 'active'",
+            (asset_id,), fetch='one'
+        )
+        if not asset:
+            return current_app.response_manager.not_found('Asset')
+
+        software = SoftwareCatalogService(current_app.db_manager).get_asset_software(asset_id)
+
+        return current_app.response_manager.success({
+            'asset_id': asset_id,
+            'software': software,
+            'total': len(software)
+        })
+
+    except Exception as e:
+        current_app.logger.error(f"Error getting asset software: {e}")
+        return current_app.response_manager.server_error('Failed to get asset software')
+
 @assets_bp.route('/detail/<asset_id>', methods=['GET'])
 @jwt_required()
 def get_asset_detail_legacy(asset_id):
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Helpdesk V3 - Assets Service
+Fleet status counters and the normalized software catalog
+"""
+
+import json
+import time
+import threading
+import logging
+from typing import Dict, List, Any, Optional
+from utils.validators import ValidationUtils
+
+class FleetStatusService:
+    """Reads precomputed per-client online/warning/offline counters
+
+    Counters live in ``client_fleet_counters`` and are maintained by triggers
+    (see migrations/add_fleet_status_counters.sql): heartbeats move an asset to
+    'online', and ``sweep`` ages assets to 'warning' / 'offline' once their
+    last heartbeat crosses the thresholds. Every status change is appended to
+    ``asset_status_transitions``, which serves as the alert change feed.
+    """
+
+    WARNING_AFTER_MINUTES = 20
+    OFFLINE_AFTER_MINUTES = 60
+
+    # Dashboard reads sweep first if the last sweep in this process is older
+    SWEEP_MAX_AGE_SECONDS = 60
+
+    _sweep_lock = threading.Lock()
+    _last_sweep = 0.0
+
+    def __init__(self, db_manager):
+        self.db = db_manager
+        self.logger = logging.getLogger(__name__)
+
+    def sweep(self) -> int:
+        """Age online/warning assets whose heartbeats stopped; returns assets changed"""
+        result = self.db.execute_query(
+            "SELECT fleet_status_sweep(make_interval(mins => %s), make_interval(mins => %s)) as changed",
+            (self.WARNING_AFTER_MINUTES, self.OFFLINE_AFTER_MINUTES),
+            fetch='one',
+            commit=True
+        )
+        FleetStatusService._last_sweep = time.monotonic()
+        return result['changed'] if result else 0
+
+    def sweep_if_due(self) -> None:
+        """Sweep when no sweep ran in this process recently (one caller at a time)"""
+        if time.monotonic() - FleetStatusService._last_sweep < self.SWEEP_MAX_AGE_SECONDS:
+            return
+        if not FleetStatusService._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            self.sweep()
+        except Exception as e:
+            self.logger.warning(f"Fleet status sweep failed: {e}")
+        finally:
+            FleetStatusService._sweep_lock.release()
+
+    def rebuild(self) -> int:
+        """Recompute statuses and counters from source tables; returns assets tracked"""
+        result = self.db.execute_query(
+            "SELECT fleet_status_rebuild(make_interval(mins => %s), make_interval(mins => %s)) as assets",
+            (self.WARNING_AFTER_MINUTES, self.OFFLINE_AFTER_MINUTES),
+            fetch='one',
+            commit=True
+        )
+        return result['assets'] if result else 0
+
+    def get_client_summaries(self) -> List[Dict]:
+        """Per-client counters for active clients with at least one asset"""
+        query = """
+        SELECT
+            c.client_id,
+            c.name as client_name,
+            fc.total_assets,
+            fc.online_assets,
+            fc.warning_assets,
+            fc.offline_assets,
+            fc.last_update
+        FROM client_fleet_counters fc
+        JOIN clients c ON c.client_id = fc.client_id
+        WHERE c.is_active = true AND fc.total_assets > 0
+        ORDER BY c.name
+        """
+        return self.db.execute_query(query) or []
+
+    @staticmethod
+    def summarize(client_summaries: List[Dict]) -> Dict[str, Any]:
+        """Fold per-client counters into the fleet-wide summary"""
+        overall = {
+            'total_assets': 0,
+            'online_assets': 0,
+            'warning_assets': 0,
+            'offline_assets': 0,
+            'last_update': None
+        }
+        for summary in client_summaries:
+            for key in ('total_assets', 'online_assets', 'warning_assets', 'offline_assets'):
+                overall[key] += summary.get(key) or 0
+            last_update = summary.get('last_update')
+            if last_update and (overall['last_update'] is None or last_update > overall['last_update']):
+                overall['last_update'] = last_update
+        return overall
+
+    def get_alerts(self, limit: int = 10) -> List[Dict]:
+        """Most recently seen assets that are offline or report an agent error"""
+        query = """
+        SELECT asset_name, agent_status, last_seen, site_name, client_name
+        FROM (
+            SELECT a.name as asset_name, 'offline' as agent_status, f.last_seen,
+                   s.name as site_name, c.name as client_name
+            FROM asset_fleet_status f
+            JOIN assets a ON a.asset_id = f.asset_id
+            JOIN sites s ON a.site_id = s.site_id
+            JOIN clients c ON a.client_id = c.client_id
+            WHERE f.connection_status = 'offline'
+            ORDER BY f.last_seen DESC NULLS LAST
+            LIMIT %s
+        ) offline_assets
+        UNION
+        SELECT asset_name, agent_status, last_seen, site_name, client_name
+        FROM (
+            SELECT a.name as asset_name, a.agent_status::text as agent_status, a.last_seen,
+                   s.name as site_name, c.name as client_name
+            FROM assets a
+            JOIN sites s ON a.site_id = s.site_id
+            JOIN clients c ON a.client_id = c.client_id
+            WHERE a.status = 'active' AND a.agent_status = 'error'
+            ORDER BY a.last_seen DESC NULLS LAST
+            LIMIT %s
+        ) error_assets
+        ORDER BY last_seen DESC NULLS LAST
+        LIMIT %s
+        """
+        return self.db.execute_query(query, (limit, limit, limit)) or []
+
+    def get_transitions(self, since_id: int = 0, limit: int = 100, client_id: str = None) -> List[Dict]:
+        """Status transitions after since_id, oldest first (poll with the last id seen)"""
+        conditions = ["t.transition_id > %s"]
+        params: List[Any] = [since_id]
+
+        if client_id:
+            conditions.append("t.client_id = %s")
+            params.append(client_id)
+
+        params.append(limit)
+        query = f"""
+        SELECT t.transition_id, t.asset_id, a.name as asset_name, t.client_id,
+               c.name as client_name, t.from_status, t.to_status, t.last_seen, t.created_at
+        FROM asset_status_transitions t
+        LEFT JOIN assets a ON a.asset_id = t.asset_id
+        LEFT JOIN clients c ON c.client_id = t.client_id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY t.transition_id
+        LIMIT %s
+        """
+        return self.db.execute_query(query, tuple(params)) or []
+
+
+class SoftwareCatalogService:
+    """Fleet-wide software inventory backed by interned product ids
+
+    ``software_products`` holds one row per distinct name/vendor/version and
+    ``asset_software`` one (asset_id, product_id) pair per installed product.
+    Agent inventories are applied as deltas by ``software_sync_asset`` (see
+    migrations/add_software_catalog.sql), which skips unchanged reports by hash.
+    """
+
+    REPORT_SORTS = {
+        'installs': 'install_count DESC, name, version',
+        'name': 'name, version, product_id'
+    }
+
+    def __init__(self, db_manager):
+        self.db = db_manager
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def extract_programs(software_inventory: Any) -> Optional[List[Dict]]:
+        """installed_programs from an agent's software inventory (None if absent)"""
+        if isinstance(software_inventory, list):
+            programs = software_inventory
+        elif isinstance(software_inventory, dict):
+            programs = software_inventory.get('installed_programs')
+        else:
+            return None
+        if not isinstance(programs, list):
+            return None
+        return [p for p in programs if isinstance(p, dict) and p.get('name')]
+
+    def sync_asset(self, asset_id: str, software_inventory: Any) -> Optional[Dict]:
+        """Apply an asset's reported software to the catalog; None if nothing was reported"""
+        programs = self.extract_programs(software_inventory)
+        if programs is None:
+            return None
+
+        return self.db.execute_query(
+            "SELECT * FROM software_sync_asset(%s, %s::jsonb)",
+            (asset_id, json.dumps(programs, sort_keys=True)),
+            fetch='one',
+            commit=True
+        )
+
+    def prune(self) -> int:
+        """Delete products no asset reports any more; returns products removed"""
+        result = self.db.execute_query(
+            "SELECT software_prune_products() as pruned", fetch='one', commit=True
+        )
+        return result['pruned'] if result else 0
+
+    def search_products(self, search: str = None, vendor: str = None, version: str = None,
+                        client_id: str = None, sort: str = 'installs',
+                        page: int = 1, per_page: int = 50) -> Dict[str, Any]:
+        """Products with their active-asset install counts, one page at a time"""
+        conditions = ["x.status = 'active'"]
+        params: List[Any] = []
+
+        if search:
+            conditions.append("sp.normalized_name LIKE %s")
+            params.append(ValidationUtils.like_pattern(search.lower()))
+        if vendor:
+            conditions.append("lower(sp.vendor) LIKE %s")
+            params.append(ValidationUtils.like_pattern(vendor.lower()))
+        if version:
+            conditions.append("sp.version = %s")
+            params.append(version)
+        if client_id:
+            conditions.append("x.client_id = %s")
+            params.append(client_id)
+
+        order_by = self.REPORT_SORTS.get(sort, self.REPORT_SORTS['installs'])
+        offset = (page - 1) * per_page
+
+        query = f"""
+        SELECT sp.product_id, sp.name, sp.vendor, sp.version, sp.first_seen,
+               COUNT(*) as install_count,
+               COUNT(*) OVER () as total_count
+        FROM software_products sp
+        JOIN asset_software a ON a.product_id = sp.product_id
+        JOIN assets x ON x.asset_id = a.asset_id
+        WHERE {' AND '.join(conditions)}
+        GROUP BY sp.product_id
+        ORDER BY {order_by}
+        LIMIT %s OFFSET %s
+        """
+        products = self.db.execute_query(query, tuple(params + [per_page, offset])) or []
+
+        if products:
+            total = products[0]['total_count']
+        elif page > 1:
+            count_query = f"""
+            SELECT COUNT(DISTINCT sp.product_id) as total
+            FROM software_products sp
+            JOIN asset_software a ON a.product_id = sp.product_id
+            JOIN assets x ON x.asset_id = a.asset_id
+            WHERE {' AND '.join(conditions)}
+            """
+            total_result = self.db.execute_query(count_query, tuple(params), fetch='one')
+            total = total_result['total'] if total_result else 0
+        else:
+            total = 0
+
+        for product in products:
+            product.pop('total_count', None)
+
+        return {'products': products, 'total': total}
+
+    def get_product(self, product_id: int) -> Optional[Dict]:
+        return self.db.execute_query(
+            "SELECT product_id, name, vendor, version, first_seen FROM software_products WHERE product_id = %s",
+            (product_id,), fetch='one'
+        )
+
+    def get_product_assets(self, product_id: int, client_id: str = None,
+                           page: int = 1, per_page: int = 50) -> Dict[str, Any]:
+        """Active assets that have a product installed (product -> assets index)"""
+        conditions = ["a.product_id = %s", "x.status = 'active'"]
+        params: List[Any] = [product_id]
+
+        if client_id:
+            conditions.append("x.client_id = %s")
+            params.append(client_id)
+
+        offset = (page - 1) * per_page
+        query = f"""
+        SELECT x.asset_id, x.name as asset_name, x.agent_status, x.last_seen,
+               s.name as site_name, c.client_id, c.name as client_name,
+               a.first_seen as installed_since,
+               COUNT(*) OVER () as total_count
+        FROM asset_software a
+        JOIN assets x ON x.asset_id = a.asset_id
+        JOIN sites s ON s.site_id = x.site_id
+        JOIN clients c ON c.client_id = x.client_id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY c.name, x.name, x.asset_id
+        LIMIT %s OFFSET %s
+        """
+        assets = self.db.execute_query(query, tuple(params + [per_page, offset])) or []
+
+        total = assets[0]['total_count'] if assets else 0
+        for asset in assets:
+            asset.pop('total_count', None)
+
+        return {'assets': assets, 'total': total}
+
+    def get_asset_software(self, asset_id: str) -> List[Dict]:
+        """Products installed on one asset"""
+        query = """
+        SELECT sp.product_id, sp.name, sp.vendor, sp.version, a.first_seen as installed_since
+        FROM asset_software a
+        JOIN software_products sp ON sp.product_id = a.product_id
+        WHERE a.asset_id = %s
+        ORDER BY sp.normalized_name, sp.version
+        """
+        return self.db.execute_query(query, (asset_id,)) or []
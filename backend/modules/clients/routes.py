@@ -24,21 +24,11 @@ def get_clients():
     try:
         # Get user info
         claims = get_jwt()
-        user_id = get_jwt_identity()
         user_role = claims.get('role')
         user_client_id = claims.get('client_id')
 
-        current_app.logger.info(f"🔍 CLIENTS ENDPOINT - Role: {user_role}, Client ID: {user_client_id}")
-        current_app.logger.info(f"🔍 CLIENTS ENDPOINT - Full claims: {claims}")
-
-        # ✅ FIX: Set RLS context for database queries
-        current_app.logger.info(f"🔧 Setting RLS context - User: {user_id}, Role: {user_role}, Client: {user_client_id}")
-        current_app.db_manager.set_rls_context(
-            user_id=user_id,
-            user_role=user_role,
-            client_id=user_client_id
-        )
-        current_app.logger.info(f"✅ RLS context set successfully")
+        # Without page/per_page the full list is returned as a bare array, as before pagination
+        paginated = 'page' in request.args or 'per_page' in request.args
 
         # Role-based access control
         if user_role in ['client_admin', 'solicitante']:
@@ -57,51 +47,38 @@ def get_clients():
             for client in (clients or []):
                 formatted_client = current_app.response_manager.format_client_data(client)
                 formatted_clients.append(formatted_client)
-            return current_app.response_manager.success(formatted_clients)
+            if not paginated:
+                return current_app.response_manager.success(formatted_clients)
+            return current_app.response_manager.success({
+                'clients': formatted_clients,
+                'pagination': {
+                    'page': 1,
+                    'per_page': len(formatted_clients),
+                    'total': len(formatted_clients),
+                    'total_pages': 1,
+                    'has_next': False,
+                    'has_prev': False
+                }
+            })
 
         elif user_role not in ['superadmin', 'admin', 'technician']:
             return current_app.response_manager.forbidden('Insufficient permissions')
 
-        # For superadmin/admin/technician - show all clients
-        # Get search parameter
+        # For superadmin/admin/technician - paginated client directory
         search = request.args.get('search', '').strip()
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 10))
-
-        # Build query with statistics
-        base_query = """
-        SELECT
-            c.client_id, c.name, c.email, c.rfc, c.phone, c.address,
-            c.city, c.state, c.country, c.postal_code, c.is_active, c.created_at,
-            COUNT(DISTINCT s.site_id) as total_sites,
-            COUNT(DISTINCT u.user_id) as total_users,
-            COUNT(DISTINCT t.ticket_id) as total_tickets,
-            COUNT(DISTINCT CASE WHEN t.status IN ('nuevo', 'asignado', 'en_proceso', 'espera_cliente', 'reabierto') THEN t.ticket_id END) as open_tickets
-        FROM clients c
-        LEFT JOIN sites s ON c.client_id = s.client_id AND s.is_active = true
-        LEFT JOIN users u ON c.client_id = u.client_id AND u.is_active = true
-        LEFT JOIN tickets t ON c.client_id = t.client_id
-        WHERE c.is_active = true
-        """
-
-        params = []
-
-        # Add search filter
-        if search:
-            base_query += " AND (c.name ILIKE %s OR c.email ILIKE %s OR c.rfc ILIKE %s)"
-            search_param = f"%{search}%"
-            params.extend([search_param, search_param, search_param])
-
-        # Add GROUP BY and ORDER BY
-        base_query += " GROUP BY c.client_id, c.name, c.email, c.rfc, c.phone, c.address, c.city, c.state, c.country, c.postal_code, c.is_active, c.created_at"
-        base_query += " ORDER BY c.name"
+        pagination = ValidationUtils.validate_pagination(
+            request.args.get('page'), request.args.get('per_page'),
+            default_per_page=20, max_per_page=1000
+        )
+        page, per_page = pagination['page'], pagination['per_page'] if paginated else None
 
-        # Execute query
-        clients = current_app.db_manager.execute_query(base_query, tuple(params))
+        from .service import ClientService
+        clients_service = ClientService(current_app.db_manager, current_app.auth_manager)
+        result = clients_service.get_all_clients(page=page, per_page=per_page, search=search or None)
 
         # Format clients data
         formatted_clients = []
-        for client in clients:
+        for client in result['clients']:
             formatted_client = current_app.response_manager.format_client_data(client)
             # Add statistics
             formatted_client.update({
@@ -112,7 +89,20 @@ def get_clients():
             })
             formatted_clients.append(formatted_client)
 
-        return current_app.response_manager.success(formatted_clients)
+        if not paginated:
+            return current_app.response_manager.success(formatted_clients)
+
+        return current_app.response_manager.success({
+            'clients': formatted_clients,
+            'pagination': {
+                'page': page,
+                'per_page': per_page,
+                'total': result['total'],
+                'total_pages': result['total_pages'],
+                'has_next': page * per_page < result['total'],
+                'has_prev': page > 1
+            }
+        })
 
     except Exception as e:
         current_app.logger.error(f"Get clients error: {e}")
@@ -407,24 +397,9 @@ def get_client_stats(client_id):
             if current_user_client_id != client_id:
                 return current_app.response_manager.forbidden('Access denied')
 
-        stats_query = """
-        SELECT
-            c.name as client_name,
-            COUNT(DISTINCT s.site_id) as total_sites,
-            COUNT(DISTINCT u.user_id) as total_users,
-            COUNT(DISTINCT t.ticket_id) as total_tickets,
-            COUNT(DISTINCT CASE WHEN t.status IN ('nuevo', 'asignado', 'en_proceso') THEN t.ticket_id END) as open_tickets,
-            COUNT(DISTINCT CASE WHEN t.status = 'resuelto' THEN t.ticket_id END) as resolved_tickets,
-            COUNT(DISTINCT CASE WHEN t.created_at >= NOW() - INTERVAL '30 days' THEN t.ticket_id END) as tickets_last_30_days
-        FROM clients c
-        LEFT JOIN sites s ON c.client_id = s.client_id AND s.is_active = true
-        LEFT JOIN users u ON c.client_id = u.client_id AND u.is_active = true
-        LEFT JOIN tickets t ON c.client_id = t.client_id
-        WHERE c.client_id = %s
-        GROUP BY c.client_id, c.name
-        """
-
-        stats = current_app.db_manager.execute_query(stats_query, (client_id,), fetch='one')
+        from .service import ClientService
+        clients_service = ClientService(current_app.db_manager, current_app.auth_manager)
+        stats = clients_service.get_client_stats(client_id)
 
         if not stats:
             return current_app.response_manager.not_found('Client')
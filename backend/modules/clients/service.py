@@ -22,95 +22,116 @@ class ClientService:
         self.auth = auth_manager
         self.logger = logging.getLogger(__name__)
     
-    def get_all_clients(self, page: int = 1, per_page: int = 20, search: str = None) -> Dict[str, Any]:
-        """Get all clients with pagination and search"""
+    def get_all_clients(self, page: int = 1, per_page: Optional[int] = 20, search: str = None) -> Dict[str, Any]:
+        """Get one page of active clients with per-client statistics (all of them when per_page is None)
+
+        The page of clients is selected first (name order, trigram-indexed
+        search) and sites/users/tickets are then aggregated independently for
+        just those clients, so cost no longer grows with sites x users x tickets.
+        """
         try:
-            # Build search condition
-            search_condition = ""
+            search_condition = "c.is_active = true"
             search_params = []
-            
+
             if search:
-                search_condition = """
-                WHERE (c.name ILIKE %s OR c.email ILIKE %s OR c.rfc ILIKE %s) 
-                AND c.is_active = true
-                """
-                search_term = f"%{search}%"
+                search_condition += " AND (c.name ILIKE %s OR c.email ILIKE %s OR c.rfc ILIKE %s)"
+                search_term = ValidationUtils.like_pattern(search)
                 search_params = [search_term, search_term, search_term]
-            else:
-                search_condition = "WHERE c.is_active = true"
-            
-            # Get total count
-            count_query = f"SELECT COUNT(*) as total FROM clients c {search_condition}"
-            total_result = self.db.execute_query(count_query, tuple(search_params), fetch='one')
-            total = total_result['total'] if total_result else 0
-            
-            # Calculate offset
-            offset = (page - 1) * per_page
-            
-            # Get clients with pagination and related data
+
+            offset = (page - 1) * per_page if per_page else 0
+
             query = f"""
-            SELECT c.client_id, c.name, c.rfc, c.email, c.phone, c.address, c.city, 
-                   c.state, c.country, c.postal_code, c.is_active, c.created_at, c.updated_at,
-                   COUNT(DISTINCT s.site_id) as total_sites,
-                   COUNT(DISTINCT u.user_id) as total_users,
-                   COUNT(DISTINCT t.ticket_id) as total_tickets
-            FROM clients c
-            LEFT JOIN sites s ON c.client_id = s.client_id AND s.is_active = true
-            LEFT JOIN users u ON c.client_id = u.client_id AND u.is_active = true
-            LEFT JOIN tickets t ON c.client_id = t.client_id
-            {search_condition}
-            GROUP BY c.client_id, c.name, c.rfc, c.email, c.phone, c.address, 
-                     c.city, c.state, c.country, c.postal_code, c.is_active, 
-                     c.created_at, c.updated_at
-            ORDER BY c.name
-            LIMIT %s OFFSET %s
+            WITH page AS (
+                SELECT c.client_id, c.name, c.rfc, c.email, c.phone, c.address, c.city,
+                       c.state, c.country, c.postal_code, c.is_active, c.created_at, c.updated_at,
+                       COUNT(*) OVER () as total_count
+                FROM clients c
+                WHERE {search_condition}
+                ORDER BY c.name, c.client_id
+                LIMIT %s OFFSET %s
+            )
+            SELECT p.*,
+                   COALESCE(s.total_sites, 0) as total_sites,
+                   COALESCE(u.total_users, 0) as total_users,
+                   COALESCE(t.total_tickets, 0) as total_tickets,
+                   COALESCE(t.open_tickets, 0) as open_tickets
+            FROM page p
+            LEFT JOIN (
+                SELECT client_id, COUNT(*) as total_sites
+                FROM sites
+                WHERE is_active = true AND client_id IN (SELECT client_id FROM page)
+                GROUP BY client_id
+            ) s ON s.client_id = p.client_id
+            LEFT JOIN (
+                SELECT client_id, COUNT(*) as total_users
+                FROM users
+                WHERE is_active = true AND client_id IN (SELECT client_id FROM page)
+                GROUP BY client_id
+            ) u ON u.client_id = p.client_id
+            LEFT JOIN (
+                SELECT client_id,
+                       COUNT(*) as total_tickets,
+                       COUNT(*) FILTER (WHERE status IN ('nuevo', 'asignado', 'en_proceso', 'espera_cliente', 'reabierto')) as open_tickets
+                FROM tickets
+                WHERE client_id IN (SELECT client_id FROM page)
+                GROUP BY client_id
+            ) t ON t.client_id = p.client_id
+            ORDER BY p.name, p.client_id
             """
-            
+
             params = search_params + [per_page, offset]
-            clients = self.db.execute_query(query, tuple(params))
-            
+            clients = self.db.execute_query(query, tuple(params)) or []
+
+            if clients:
+                total = clients[0]['total_count']
+            elif page > 1:
+                # Past the last page: the window count is not available
+                count_query = f"SELECT COUNT(*) as total FROM clients c WHERE {search_condition}"
+                total_result = self.db.execute_query(count_query, tuple(search_params), fetch='one')
+                total = total_result['total'] if total_result else 0
+            else:
+                total = 0
+
+            for client in clients:
+                client.pop('total_count', None)
+
             return {
-                'clients': clients or [],
+                'clients': clients,
                 'total': total,
                 'page': page,
                 'per_page': per_page,
-                'total_pages': (total + per_page - 1) // per_page
+                'total_pages': (total + per_page - 1) // per_page if per_page else 1
             }
-            
+
         except Exception as e:
             self.logger.error(f"Error getting clients: {e}")
             raise
-    
+
     def get_client_by_id(self, client_id: str) -> Optional[Dict]:
         """Get client by ID with complete information"""
         try:
             if not self.db.validate_uuid(client_id):
                 return None
-                
+
             query = """
             SELECT c.client_id, c.name, c.rfc, c.email, c.phone, c.allowed_emails,
-                   c.address, c.city, c.state, c.country, c.postal_code, 
+                   c.address, c.city, c.state, c.country, c.postal_code,
                    c.is_active, c.created_at, c.updated_at,
-                   COUNT(DISTINCT s.site_id) as total_sites,
-                   COUNT(DISTINCT u.user_id) as total_users,
-                   COUNT(DISTINCT t.ticket_id) as total_tickets,
-                   COUNT(DISTINCT CASE WHEN t.status IN ('nuevo', 'asignado', 'en_proceso') THEN t.ticket_id END) as open_tickets
+                   (SELECT COUNT(*) FROM sites s WHERE s.client_id = c.client_id AND s.is_active = true) as total_sites,
+                   (SELECT COUNT(*) FROM users u WHERE u.client_id = c.client_id AND u.is_active = true) as total_users,
+                   (SELECT COUNT(*) FROM tickets t WHERE t.client_id = c.client_id) as total_tickets,
+                   (SELECT COUNT(*) FROM tickets t WHERE t.client_id = c.client_id
+                      AND t.status IN ('nuevo', 'asignado', 'en_proceso')) as open_tickets
             FROM clients c
-            LEFT JOIN sites s ON c.client_id = s.client_id AND s.is_active = true
-            LEFT JOIN users u ON c.client_id = u.client_id AND u.is_active = true
-            LEFT JOIN tickets t ON c.client_id = t.client_id
             WHERE c.client_id = %s
-            GROUP BY c.client_id, c.name, c.rfc, c.email, c.phone, c.allowed_emails,
-                     c.address, c.city, c.state, c.country, c.postal_code, 
-                     c.is_active, c.created_at, c.updated_at
             """
-            
+
             return self.db.execute_query(query, (client_id,), fetch='one')
-            
+
         except Exception as e:
             self.logger.error(f"Error getting client {client_id}: {e}")
             raise
-    
+
     def create_client(self, client_data: Dict[str, Any], created_by: str) -> Dict[str, Any]:
         """Create a new client with MSP workflow validation"""
         try:
@@ -520,18 +541,19 @@ class ClientService:
             stats_query = """
             SELECT
                 c.name as client_name,
-                COUNT(DISTINCT s.site_id) as total_sites,
-                COUNT(DISTINCT u.user_id) as total_users,
-                COUNT(DISTINCT t.ticket_id) as total_tickets,
-                COUNT(DISTINCT CASE WHEN t.status IN ('nuevo', 'asignado', 'en_proceso') THEN t.ticket_id END) as open_tickets,
-                COUNT(DISTINCT CASE WHEN t.status = 'resuelto' THEN t.ticket_id END) as resolved_tickets,
-                COUNT(DISTINCT CASE WHEN t.created_at >= NOW() - INTERVAL '30 days' THEN t.ticket_id END) as tickets_last_30_days
+                (SELECT COUNT(*) FROM sites s WHERE s.client_id = c.client_id AND s.is_active = true) as total_sites,
+                (SELECT COUNT(*) FROM users u WHERE u.client_id = c.client_id AND u.is_active = true) as total_users,
+                t.total_tickets, t.open_tickets, t.resolved_tickets, t.tickets_last_30_days
             FROM clients c
-            LEFT JOIN sites s ON c.client_id = s.client_id AND s.is_active = true
-            LEFT JOIN users u ON c.client_id = u.client_id AND u.is_active = true
-            LEFT JOIN tickets t ON c.client_id = t.client_id
+            CROSS JOIN LATERAL (
+                SELECT COUNT(*) as total_tickets,
+                       COUNT(*) FILTER (WHERE status IN ('nuevo', 'asignado', 'en_proceso')) as open_tickets,
+                       COUNT(*) FILTER (WHERE status = 'resuelto') as resolved_tickets,
+                       COUNT(*) FILTER (WHERE created_at >= NOW() - INTERVAL '30 days') as tickets_last_30_days
+                FROM tickets
+                WHERE client_id = c.client_id
+            ) t
             WHERE c.client_id = %s
-            GROUP BY c.client_id, c.name
             """
 
             return self.db.execute_query(stats_query, (client_id,), fetch='one') or {}
@@ -8,6 +8,7 @@ Real-time dashboard statistics and metrics
 from flask import Blueprint, request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from utils.security import require_role
+from core.conditional import conditional_get, change_version, RESPONSE_CACHE_TTL
 from datetime import datetime, timedelta
 import logging
 
@@ -16,6 +17,8 @@ logger = logging.getLogger(__name__)
 
 @dashboard_bp.route('/stats', methods=['GET'])
 @jwt_required()
+@conditional_get(lambda: change_version('tickets', 'clients', 'sites', 'users', bucket_seconds=60),
+                 cache_ttl=RESPONSE_CACHE_TTL)
 def get_dashboard_stats():
     """Get dashboard statistics based on user role"""
     try:
@@ -186,6 +189,7 @@ def _get_client_stats(client_id: str) -> dict:
 
 @dashboard_bp.route('/recent-activity', methods=['GET'])
 @jwt_required()
+@conditional_get(lambda: change_version('tickets', 'clients', 'users'))
 def get_recent_activity():
     """Get recent activity feed"""
     try:
@@ -250,6 +254,8 @@ def get_recent_activity():
 
 @dashboard_bp.route('/charts', methods=['GET'])
 @jwt_required()
+@conditional_get(lambda: change_version('tickets', 'users', bucket_seconds=300),
+                 cache_ttl=RESPONSE_CACHE_TTL)
 def get_dashboard_charts():
     """Get chart data for dashboard visualizations"""
     try:
@@ -224,6 +224,8 @@ def create_email_configuration():
         )
 
         if result:
+            current_app.config_cache.invalidate('email')
+
             # Get the created configuration
             created_config = current_app.db_manager.execute_query(
                 "SELECT * FROM email_configurations WHERE config_id = %s",
@@ -296,6 +298,7 @@ def update_email_configuration(config_id):
             'config_id = %s',
             (config_id,)
         )
+        current_app.config_cache.invalidate('email')
 
         # Get updated configuration
         updated_config = current_app.db_manager.execute_query(
@@ -339,6 +342,7 @@ def delete_email_configuration(config_id):
             (config_id,),
             fetch='none'
         )
+        current_app.config_cache.invalidate('email')
 
         return current_app.response_manager.success(None, 'Email configuration deleted successfully')
 
@@ -483,6 +487,7 @@ def set_default_email_configuration(config_id):
             (config_id,),
             fetch='none'
         )
+        current_app.config_cache.invalidate('email')
 
         return current_app.response_manager.success(None, 'Default email configuration updated')
 
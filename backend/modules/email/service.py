@@ -17,6 +17,7 @@ from email import encoders
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from flask import current_app
+from core.config_cache import get_config_cache
 
 class EmailService:
     def __init__(self):
@@ -26,6 +27,10 @@ class EmailService:
     def get_default_config(self):
         """Get default email configuration"""
         try:
+            cache = get_config_cache()
+            if cache:
+                return cache.get_email_config()
+
             query = """
             SELECT * FROM email_configurations 
             WHERE is_default = true AND is_active = true 
@@ -39,12 +44,25 @@ class EmailService:
     def get_config_by_id(self, config_id: str):
         """Get email configuration by ID"""
         try:
+            cache = get_config_cache()
+            if cache:
+                return cache.get_email_config(config_id)
+
             query = "SELECT * FROM email_configurations WHERE config_id = %s AND is_active = true"
             return current_app.db_manager.execute_query(query, (config_id,), fetch='one')
         except Exception as e:
             current_app.logger.error(f"Error getting email config: {e}")
             return None
     
+    def _decrypt_secret(self, encrypted_value: str) -> str:
+        """Decrypt a stored password, reusing the cached plaintext when available"""
+        cache = get_config_cache()
+        if cache:
+            return cache.get_secret(encrypted_value)
+
+        from utils.security import SecurityUtils
+        return SecurityUtils.decrypt_password(encrypted_value)
+
     def connect_smtp(self, config: Dict) -> bool:
         """Connect to SMTP server"""
         try:
@@ -55,9 +73,8 @@ class EmailService:
                 current_app.logger.error("SMTP password not encrypted or missing")
                 return False
 
-            # Decrypt password
-            from utils.security import SecurityUtils
-            smtp_password = SecurityUtils.decrypt_password(config['smtp_password_encrypted'])
+            # Decrypt password (memoized in process memory by the config cache)
+            smtp_password = self._decrypt_secret(config['smtp_password_encrypted'])
             current_app.logger.info(f"Password decrypted successfully, length: {len(smtp_password) if smtp_password else 0}")
 
             if config['smtp_use_ssl']:
@@ -80,8 +97,7 @@ class EmailService:
         """Connect to IMAP server"""
         try:
             # Decrypt password
-            from utils.security import SecurityUtils
-            imap_password = SecurityUtils.decrypt_password(config['imap_password_encrypted'])
+            imap_password = self._decrypt_secret(config['imap_password_encrypted'])
 
             if config['imap_use_ssl']:
                 self.imap_connection = imaplib.IMAP4_SSL(config['imap_host'], config['imap_port'])
@@ -590,17 +606,24 @@ LANET Helpdesk V3
 
             saved_attachments = []
 
-            # Get system configuration for file limits
-            max_size_query = "SELECT config_value FROM system_config WHERE config_key = 'max_attachment_size_mb'"
-            max_size_result = current_app.db_manager.execute_query(max_size_query, fetch='one')
-            max_size_mb = int(max_size_result['config_value']) if max_size_result else 10
+            default_extensions = ['.pdf', '.png', '.jpg', '.jpeg', '.docx', '.xlsx', '.txt']
+            cache = get_config_cache()
+            if cache:
+                # Get system configuration for file limits and allowed file types
+                max_size_mb = cache.get_system_int('max_attachment_size_mb', 10)
+                allowed_extensions = cache.get_system_list('allowed_attachment_types', default_extensions)
+            else:
+                # Get system configuration for file limits
+                max_size_query = "SELECT config_value FROM system_config WHERE config_key = 'max_attachment_size_mb'"
+                max_size_result = current_app.db_manager.execute_query(max_size_query, fetch='one')
+                max_size_mb = int(max_size_result['config_value']) if max_size_result else 10
+
+                # Get allowed file types
+                allowed_types_query = "SELECT config_value FROM system_config WHERE config_key = 'allowed_attachment_types'"
+                allowed_types_result = current_app.db_manager.execute_query(allowed_types_query, fetch='one')
+                allowed_extensions = allowed_types_result['config_value'].split(',') if allowed_types_result else default_extensions
             max_size_bytes = max_size_mb * 1024 * 1024
 
-            # Get allowed file types
-            allowed_types_query = "SELECT config_value FROM system_config WHERE config_key = 'allowed_attachment_types'"
-            allowed_types_result = current_app.db_manager.execute_query(allowed_types_query, fetch='one')
-            allowed_extensions = allowed_types_result['config_value'].split(',') if allowed_types_result else ['.pdf', '.png', '.jpg', '.jpeg', '.docx', '.xlsx', '.txt']
-
             for attachment in attachments:
                 try:
                     # Validate file size
@@ -615,25 +638,18 @@ LANET Helpdesk V3
                         current_app.logger.warning(f"Attachment {filename} has disallowed extension: {file_ext}")
                         continue
 
-                    # Generate unique filename
-                    unique_filename = f"{uuid.uuid4()}_{filename}"
-
-                    # Create upload directory if it doesn't exist
-                    upload_dir = os.path.join(os.getcwd(), 'uploads', 'tickets')
-                    os.makedirs(upload_dir, exist_ok=True)
-
-                    # Save file
-                    file_path = os.path.join(upload_dir, unique_filename)
-                    with open(file_path, 'wb') as f:
-                        f.write(attachment['content'])
+                    # Store content-addressed: signatures and logos repeated across a
+                    # thread are written to disk only once
+                    blob = current_app.blob_store.store_bytes(attachment['content'], max_size=max_size_bytes)
 
                     # Save attachment record to database
                     attachment_data = {
                         'attachment_id': str(uuid.uuid4()),
                         'ticket_id': ticket_id,
                         'filename': filename,
-                        'file_path': f"uploads/tickets/{unique_filename}",
-                        'file_size': attachment['size'],
+                        'file_path': blob['file_path'],
+                        'file_size': blob['file_size'],
+                        'file_hash': blob['file_hash'],
                         'content_type': attachment['content_type'],
                         'uploaded_by': None,  # Email system
                         'uploaded_via': 'email',
@@ -641,9 +657,12 @@ LANET Helpdesk V3
                     }
 
                     current_app.db_manager.execute_insert('file_attachments', attachment_data)
-                    saved_attachments.append(unique_filename)
+                    saved_attachments.append(blob['file_hash'])
 
-                    current_app.logger.info(f"Email attachment saved: {filename} -> {unique_filename}")
+                    current_app.logger.info(
+                        f"Email attachment saved: {filename} -> {blob['file_hash']}"
+                        f"{'' if blob['created'] else ' (deduplicated)'}"
+                    )
 
                 except Exception as e:
                     current_app.logger.error(f"Error processing attachment {attachment.get('filename', 'unknown')}: {e}")
@@ -901,7 +920,8 @@ LANET Helpdesk V3
                 'timestamp': datetime.now()
             }
 
-            current_app.db_manager.execute_insert('audit_log', audit_data)
+            from core.audit import write_audit_row
+            write_audit_row('audit_log', audit_data)
             current_app.logger.warning(f"Email rejected and logged: {email_data.get('from_email', 'unknown')} - {reason}")
 
         except Exception as e:
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Helpdesk V3 - Events Routes
+Server-Sent Events stream of ticket, SLA and asset changes
+"""
+
+import os
+import time
+from datetime import timedelta
+
+from flask import Blueprint, request, current_app, g
+from flask_jwt_extended import (
+    jwt_required, get_jwt_identity, get_jwt, get_jwt_request_location, create_access_token
+)
+
+from core.events import format_sse
+
+events_bp = Blueprint('events', __name__)
+
+# Streams end after this long and EventSource reconnects with Last-Event-ID,
+# so a stream never outlives a worker timeout
+STREAM_SECONDS = float(os.getenv('EVENTS_STREAM_SECONDS', '55'))
+KEEPALIVE_SECONDS = 15.0
+# Seconds a client refused for capacity waits before trying again
+STREAM_RETRY_SECONDS = 30
+STREAM_TOKEN_SECONDS = int(os.getenv('EVENTS_STREAM_TOKEN_SECONDS', '3600'))
+STREAM_TOKEN_CLAIMS = ('role', 'client_id', 'site_ids', 'name', 'email')
+STREAM_ENDPOINT = 'events.stream_events'
+
+def register_stream_token_scope(jwt_manager, response_manager):
+    """Make every endpoint except /stream refuse stream tokens
+
+    Stream tokens travel in URLs and end up in access logs, so a leaked one
+    must not be usable as a regular access token.
+    """
+    @jwt_manager.token_verification_loader
+    def verify_token_scope(jwt_header, jwt_payload):
+        return not jwt_payload.get('stream') or request.endpoint == STREAM_ENDPOINT
+
+    @jwt_manager.token_verification_failed_loader
+    def token_scope_failed(jwt_header, jwt_payload):
+        return response_manager.forbidden('Stream tokens are only valid for the event stream')
+
+@events_bp.route('/stream-token', methods=['POST'])
+@jwt_required()
+def create_stream_token():
+    """Token for ?jwt= on /stream (EventSource cannot send an Authorization header)
+
+    Expires after EVENTS_STREAM_TOKEN_SECONDS and is only accepted by the
+    stream endpoint (see register_stream_token_scope).
+    """
+    try:
+        claims = get_jwt()
+        additional_claims = {name: claims.get(name) for name in STREAM_TOKEN_CLAIMS}
+        additional_claims['stream'] = True
+
+        token = create_access_token(
+            identity=get_jwt_identity(),
+            additional_claims=additional_claims,
+            expires_delta=timedelta(seconds=STREAM_TOKEN_SECONDS)
+        )
+        return current_app.response_manager.success({'token': token, 'expires_in': STREAM_TOKEN_SECONDS})
+
+    except Exception as e:
+        current_app.logger.error(f"Create stream token error: {e}")
+        return current_app.response_manager.server_error('Failed to create stream token')
+
+@events_bp.route('/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_events():
+    """Live events as text/event-stream
+
+    Event types: ticket.created, ticket.updated, ticket.comment, sla.breach
+    (staff only) and asset.status. Staff get all clients; client users
+    their own client (solicitantes their sites) and no internal comments.
+    Reconnects resume after Last-Event-ID (or ?last_event_id=), repeating
+    the broker's look-back window so late commits are not lost; clients
+    skip event ids seen before. A ``reset`` event means the gap could not
+    be replayed and views should be reloaded. Answers 503 with Retry-After
+    when the worker already holds EVENTS_MAX_STREAMS streams.
+    """
+    try:
+        claims = get_jwt()
+        if get_jwt_request_location() == 'query_string' and not claims.get('stream'):
+            return current_app.response_manager.forbidden('Query string tokens must come from /stream-token')
+
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+        if last_event_id is not None:
+            try:
+                last_event_id = max(int(last_event_id), 0)
+            except ValueError:
+                return current_app.response_manager.bad_request('Invalid event ID')
+
+        principal = getattr(g, 'principal', None) or \
+            current_app.auth_manager.resolve_principal(get_jwt_identity(), claims)
+
+        broker = current_app.event_broker
+        # Subscribe before replaying so nothing committed in between is lost
+        subscription = broker.subscribe(principal)
+        if subscription is None:
+            current_app.logger.warning(f"Event stream refused: {broker.subscriber_count} streams open")
+            response, status_code = current_app.response_manager.error(
+                'Too many open event streams, retry later', 503, details={'retry_after': STREAM_RETRY_SECONDS}
+            )
+            response.headers['Retry-After'] = str(STREAM_RETRY_SECONDS)
+            return response, status_code
+        try:
+            replayed, complete, reset_id = [], True, None
+            if last_event_id is not None:
+                replayed, complete = broker.replay(principal, last_event_id)
+                if not complete:
+                    replayed, reset_id = [], broker.latest_event_id()
+        except Exception:
+            broker.unsubscribe(subscription)
+            raise
+
+    except Exception as e:
+        current_app.logger.error(f"Event stream error: {e}")
+        return current_app.response_manager.server_error('Failed to open event stream')
+
+    def generate():
+        try:
+            yield b'retry: 3000\n\n'
+            if reset_id is not None:
+                yield b'id: %d\nevent: reset\ndata: {}\n\n' % reset_id
+            for event in replayed:
+                yield format_sse(event)
+            if replayed and replayed[-1]['event_id'] < last_event_id:
+                # Only look-back events: move the client's id back up (no data, no event)
+                yield b'id: %d\n\n' % last_event_id
+
+            replayed_ids = {event['event_id'] for event in replayed}
+            deadline = time.monotonic() + STREAM_SECONDS
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or subscription.overflowed:
+                    # The client reconnects and resumes from its last id
+                    break
+                event = subscription.get(timeout=min(KEEPALIVE_SECONDS, remaining))
+                if event is None:
+                    yield b': keepalive\n\n'
+                elif event['event_id'] not in replayed_ids:
+                    yield format_sse(event)
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = current_app.response_class(generate(), mimetype='text/event-stream')
+    # Frees the slot also when the client leaves before the stream starts
+    response.call_on_close(lambda: broker.unsubscribe(subscription))
+    response.headers['Cache-Control'] = 'no-cache'
+    # Let nginx pass events through instead of buffering the response
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@events_bp.route('/recent', methods=['GET'])
+@jwt_required()
+def get_recent_events():
+    """Polling fallback: events after ?last_event_id= (same filtering as /stream)
+
+    Like the stream, the result may repeat recent events already returned;
+    skip event ids seen before.
+    """
+    try:
+        last_event_id = max(request.args.get('last_event_id', 0, type=int), 0)
+        principal = getattr(g, 'principal', None) or \
+            current_app.auth_manager.resolve_principal(get_jwt_identity(), get_jwt())
+
+        broker = current_app.event_broker
+        events, complete = broker.replay(principal, last_event_id)
+        return current_app.response_manager.success({
+            'events': [{
+                'event_id': event['event_id'],
+                'type': event['event_type'],
+                'client_id': event['client_id'],
+                'site_id': event['site_id'],
+                'payload': event['payload'],
+                'created_at': event['created_at']
+            } for event in events],
+            'complete': complete,
+            'last_event_id': max(last_event_id, events[-1]['event_id']) if events else (
+                last_event_id if complete else broker.latest_event_id())
+        })
+
+    except Exception as e:
+        current_app.logger.error(f"Get recent events error: {e}")
+        return current_app.response_manager.server_error('Failed to get events')
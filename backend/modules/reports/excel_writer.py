@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Helpdesk V3 - Excel Report Writer
+Column-at-a-time cell sanitization and a workbook writer with shared named styles
+"""
+
+import re
+from copy import copy
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+EXCEL_CELL_LIMIT = 32767
+
+# Leading characters Excel (or a CSV import) would evaluate as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@')
+
+# Characters replaced by a space: XML 1.0-invalid or garbage-rendering ones
+# (C0/C1 controls, DEL, lone surrogates, U+FFFE/U+FFFF) and every whitespace
+# character other than the plain space, so that collapsing runs of ' ' is
+# enough to normalize whitespace. NUL is kept out of the column pattern: it
+# separates the values of a column while they are cleaned as one string.
+_SPACED = (
+    r'\x01-\x1f\x7f-\x9f\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000'
+    r'\ud800-\udfff\ufffe\uffff'
+)
+_VALUE_UNSAFE = re.compile(f'[\\x00{_SPACED}]')
+_COLUMN_UNSAFE = re.compile(f'[{_SPACED}]')
+_SEPARATOR = '\x00'
+_SPACE_AT_SEPARATOR = re.compile(r' \x00 ?|\x00 ')
+
+
+def _collapse_spaces(text: str) -> str:
+    while '  ' in text:
+        text = text.replace('  ', ' ')
+    return text
+
+
+def _finish(text: str, max_length: int) -> str:
+    if not text:
+        return ''
+    if text.startswith(FORMULA_PREFIXES):
+        text = ' ' + text
+    if len(text) > max_length:
+        text = text[:max_length - 3] + '...'
+    return text
+
+
+def sanitize_value(value: Any, default: str = '', max_length: int = EXCEL_CELL_LIMIT) -> str:
+    """Excel-safe text for one cell
+
+    Unsafe characters become spaces, whitespace runs collapse to one space,
+    a leading formula character is neutralized with a space and text longer
+    than max_length is cut with '...'. Accented characters are kept.
+    None becomes ``default``.
+    """
+    if value is None:
+        return default
+    text = _collapse_spaces(_VALUE_UNSAFE.sub(' ', str(value))).strip(' ')
+    return _finish(text, max_length)
+
+
+def sanitize_column(values: Sequence[Any], default: str = '', max_length: int = EXCEL_CELL_LIMIT) -> List[str]:
+    """sanitize_value over a whole column
+
+    The column is joined into one string and cleaned with a handful of
+    C-level passes (regex substitution, replace, split) instead of one Python
+    call per value or per character.
+    """
+    texts = ['' if value is None else str(value) for value in values]
+    if not texts:
+        return []
+
+    joined = _SEPARATOR.join(texts)
+    if joined.count(_SEPARATOR) != len(texts) - 1:
+        # A value carries the separator itself: fall back to one value at a time
+        return [sanitize_value(value, default, max_length) for value in values]
+
+    joined = _collapse_spaces(_COLUMN_UNSAFE.sub(' ', joined)).strip(' ')
+    cleaned = _SPACE_AT_SEPARATOR.sub(_SEPARATOR, joined).split(_SEPARATOR)
+    return [
+        default if value is None else _finish(text, max_length)
+        for value, text in zip(values, cleaned)
+    ]
+
+
+def format_date(value: Any, default: str = 'N/A', fmt: str = '%d/%m/%Y %H:%M') -> str:
+    """dd/mm/yyyy hh:mm for dates, str() for anything else, default for None"""
+    if value is None:
+        return default
+    try:
+        if hasattr(value, 'strftime'):
+            return value.strftime(fmt)
+        return sanitize_value(value, default)
+    except Exception:
+        return default
+
+
+class ReportColumn:
+    """One table column: header, source key, width and how values are rendered"""
+
+    def __init__(self, header: str, key: str, width: int = 15, kind: str = 'text',
+                 default: str = None, max_length: int = EXCEL_CELL_LIMIT, centered: bool = False):
+        if kind not in ('text', 'date'):
+            raise ValueError(f"Unknown column kind: {kind}")
+        self.header = header
+        self.key = key
+        self.width = width
+        self.kind = kind
+        self.default = default if default is not None else ('N/A' if kind == 'date' else '')
+        self.max_length = max_length
+        self.centered = centered
+
+    def render(self, rows: Sequence[Dict[str, Any]]) -> List[str]:
+        values = [row.get(self.key) for row in rows]
+        if self.kind == 'date':
+            return [format_date(value, self.default) for value in values]
+        return sanitize_column(values, self.default, self.max_length)
+
+
+def _report_styles() -> list:
+    # openpyxl is imported on first use so importing the reports package stays cheap
+    from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+
+    thin = Side(style='thin')
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    center = Alignment(horizontal='center', vertical='center')
+
+    return [
+        NamedStyle(name='report_title', font=Font(name='Arial', size=16, bold=True, color='FFFFFF'),
+                   fill=PatternFill(start_color='2F5597', end_color='2F5597', fill_type='solid'),
+                   alignment=center, border=border),
+        NamedStyle(name='report_subtitle', font=Font(name='Arial', size=12, bold=True), alignment=center),
+        NamedStyle(name='report_info', font=Font(name='Arial', size=10), alignment=center),
+        NamedStyle(name='report_header', font=Font(name='Arial', size=11, bold=True, color='FFFFFF'),
+                   fill=PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid'),
+                   alignment=center, border=border),
+        NamedStyle(name='report_data', font=Font(name='Arial', size=10), border=border),
+        NamedStyle(name='report_data_center', font=Font(name='Arial', size=10), border=border, alignment=center),
+    ]
+
+
+class ExcelReportWriter:
+    """Single-sheet report: a merged banner, a header row and the data table
+
+    Styles are registered once per workbook as NamedStyles and assigned by
+    name per column range, so openpyxl does not build and deduplicate a
+    Font/Border/Alignment per cell.
+    """
+
+    def __init__(self, sheet_title: str, columns: List[ReportColumn]):
+        from openpyxl import Workbook
+
+        self.columns = columns
+        self.workbook = Workbook()
+        self.sheet = self.workbook.active
+        self.sheet.title = sheet_title
+        for style in _report_styles():
+            self.workbook.add_named_style(style)
+        self.next_row = 1
+
+    def _style_range(self, style: str, min_row: int, max_row: int, min_col: int, max_col: int):
+        # Resolve the named style once, then share its style array with the rest of the range
+        template = None
+        for row in self.sheet.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col):
+            for cell in row:
+                if template is None:
+                    cell.style = style
+                    template = cell._style
+                else:
+                    cell._style = copy(template)
+
+    def write_banner(self, lines: Iterable[Tuple[str, str]], height: Optional[Dict[str, int]] = None):
+        """Merged full-width rows of (text, style name), followed by one blank row"""
+        width = len(self.columns)
+        height = height or {'report_title': 25}
+        for text, style in lines:
+            row = self.next_row
+            self.sheet.cell(row=row, column=1, value=sanitize_value(text))
+            self.sheet.merge_cells(start_row=row, start_column=1, end_row=row, end_column=width)
+            self._style_range(style, row, row, 1, width if style == 'report_title' else 1)
+            self.sheet.row_dimensions[row].height = height.get(style, 18)
+            self.next_row += 1
+        self.next_row += 1
+
+    def write_table(self, rows: Sequence[Dict[str, Any]]) -> int:
+        """Header row plus one row per dict; returns the number of data rows"""
+        header_row = self.next_row
+        for index, column in enumerate(self.columns, 1):
+            self.sheet.cell(row=header_row, column=index, value=column.header)
+        self._style_range('report_header', header_row, header_row, 1, len(self.columns))
+        self.sheet.row_dimensions[header_row].height = 20
+
+        rendered = [column.render(rows) for column in self.columns]
+        for values in zip(*rendered):
+            self.sheet.append(values)
+
+        from openpyxl.utils import get_column_letter
+
+        first, last = header_row + 1, header_row + len(rows)
+        for index, column in enumerate(self.columns, 1):
+            self.sheet.column_dimensions[get_column_letter(index)].width = column.width
+            if rows:
+                style = 'report_data_center' if column.centered else 'report_data'
+                self._style_range(style, first, last, index, index)
+
+        self.next_row = last + 1
+        return len(rows)
+
+    def save(self, file_path: str):
+        self.workbook.save(file_path)
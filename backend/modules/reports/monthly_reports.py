@@ -13,8 +13,25 @@ from typing import Dict, List, Optional
 import pytz
 from flask import current_app
 
+from .excel_writer import ExcelReportWriter, ReportColumn, format_date, sanitize_value
+
 logger = logging.getLogger(__name__)
 
+# Consolidated ticket report layout (11 columns)
+CONSOLIDATED_REPORT_COLUMNS = [
+    ReportColumn('Número', 'ticket_number', 12, default='N/A', centered=True),
+    ReportColumn('Cliente', 'client_name', 25, default='Sin cliente', max_length=200),
+    ReportColumn('Asunto', 'subject', 35, default='Sin asunto', max_length=200),
+    ReportColumn('Estado', 'status', 12, default='N/A', centered=True),
+    ReportColumn('Prioridad', 'priority', 10, default='N/A', centered=True),
+    ReportColumn('Creado', 'created_at', 16, kind='date'),
+    ReportColumn('Resuelto', 'resolved_at', 16, kind='date', default='Pendiente'),
+    ReportColumn('Técnico', 'technician_name', 20, default='Sin asignar', max_length=200),
+    ReportColumn('Sitio', 'site_name', 20, default='Sin sitio', max_length=200),
+    ReportColumn('Fecha Resolución', 'resolved_at', 18, kind='date', default='Sin fecha'),
+    ReportColumn('Resolución', 'resolution_notes', 35, default='Sin resolución', max_length=200),
+]
+
 class MonthlyReportsService:
     """Simple service for automated monthly reports"""
     
@@ -235,26 +252,6 @@ class MonthlyReportsService:
             logger.error(f"Traceback: {traceback.format_exc()}")
             raise
 
-    def _clean_excel_value(self, value):
-        """Clean value for Excel to avoid XML corruption"""
-        if value is None:
-            return ""
-
-        # Convert to string
-        str_value = str(value)
-
-        # Remove or replace problematic characters
-        str_value = str_value.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
-
-        # Remove control characters (ASCII 0-31 except tab, newline, carriage return)
-        cleaned = ''.join(char for char in str_value if ord(char) >= 32 or char in '\t\n\r')
-
-        # Limit length to prevent Excel issues
-        if len(cleaned) > 32767:  # Excel cell limit
-            cleaned = cleaned[:32767]
-
-        return cleaned
-
     def _create_comprehensive_excel_report(self, tickets: List[Dict], file_path: str, start_date: datetime, end_date: datetime, report_title: str):
         """Create comprehensive Excel report with ALL tickets and client column - ULTRA SAFE VERSION"""
         try:
@@ -271,16 +268,16 @@ class MonthlyReportsService:
             for ticket in tickets:
                 # Ultra safe data cleaning
                 row = {
-                    'Número': self._ultra_clean_value(ticket.get('ticket_number', 'N/A')),
-                    'Cliente': self._ultra_clean_value(ticket.get('client_name', 'Sin cliente')),
-                    'Asunto': self._ultra_clean_value(ticket.get('subject', 'Sin asunto')),
-                    'Estado': self._ultra_clean_value(ticket.get('status', 'N/A')),
-                    'Prioridad': self._ultra_clean_value(ticket.get('priority', 'N/A')),
-                    'Creado': self._format_date_safe(ticket.get('created_at')),
-                    'Resuelto': self._format_date_safe(ticket.get('resolved_at'), 'Pendiente'),
-                    'Técnico': self._ultra_clean_value(ticket.get('technician_name', 'Sin asignar')),
-                    'Sitio': self._ultra_clean_value(ticket.get('site_name', 'Sin sitio')),
-                    'Solución': self._ultra_clean_value(ticket.get('resolution_notes', 'Pendiente'))
+                    'Número': sanitize_value(ticket.get('ticket_number', 'N/A')),
+                    'Cliente': sanitize_value(ticket.get('client_name', 'Sin cliente')),
+                    'Asunto': sanitize_value(ticket.get('subject', 'Sin asunto')),
+                    'Estado': sanitize_value(ticket.get('status', 'N/A')),
+                    'Prioridad': sanitize_value(ticket.get('priority', 'N/A')),
+                    'Creado': format_date(ticket.get('created_at')),
+                    'Resuelto': format_date(ticket.get('resolved_at'), 'Pendiente'),
+                    'Técnico': sanitize_value(ticket.get('technician_name', 'Sin asignar')),
+                    'Sitio': sanitize_value(ticket.get('site_name', 'Sin sitio')),
+                    'Solución': sanitize_value(ticket.get('resolution_notes', 'Pendiente'))
                 }
                 data_rows.append(row)
 
@@ -298,7 +295,7 @@ class MonthlyReportsService:
 
                 # Add custom headers
                 worksheet['A1'] = "LANET SYSTEMS - REPORTE CONSOLIDADO"
-                worksheet['A2'] = self._ultra_clean_value(report_title)
+                worksheet['A2'] = sanitize_value(report_title)
                 worksheet['A3'] = f"Período: {start_date.strftime('%d/%m/%Y')} - {end_date.strftime('%d/%m/%Y')}"
                 worksheet['A4'] = f"Generado: {datetime.now().strftime('%d/%m/%Y %H:%M')}"
                 worksheet['A5'] = f"Total de Tickets: {len(tickets)}"
@@ -329,41 +326,6 @@ class MonthlyReportsService:
             logger.error(f"Traceback: {traceback.format_exc()}")
             raise
 
-    def _ultra_clean_value(self, value):
-        """Ultra aggressive cleaning for Excel compatibility"""
-        if value is None:
-            return ""
-
-        # Convert to string
-        str_value = str(value)
-
-        # Remove ALL potentially problematic characters
-        # Keep only basic alphanumeric, spaces, and common punctuation
-        allowed_chars = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 .,;:!?()-_@#$%&*+=[]{}|\\/<>')
-        cleaned = ''.join(char if char in allowed_chars else ' ' for char in str_value)
-
-        # Remove multiple spaces
-        cleaned = ' '.join(cleaned.split())
-
-        # Limit length aggressively
-        if len(cleaned) > 255:  # Much shorter limit
-            cleaned = cleaned[:255]
-
-        return cleaned
-
-    def _format_date_safe(self, date_value, default='N/A'):
-        """Safely format dates for Excel"""
-        if date_value is None:
-            return default
-
-        try:
-            if hasattr(date_value, 'strftime'):
-                return date_value.strftime('%d/%m/%Y %H:%M')
-            else:
-                return str(date_value)
-        except:
-            return default
-
     def _create_csv_report(self, tickets: List[Dict], file_path: str, start_date: datetime, end_date: datetime, report_title: str):
         """Create CSV report - most compatible format"""
         try:
@@ -394,16 +356,16 @@ class MonthlyReportsService:
                 # Write data
                 for ticket in tickets:
                     row = {
-                        'Número': self._ultra_clean_value(ticket.get('ticket_number', 'N/A')),
-                        'Cliente': self._ultra_clean_value(ticket.get('client_name', 'Sin cliente')),
-                        'Asunto': self._ultra_clean_value(ticket.get('subject', 'Sin asunto')),
-                        'Estado': self._ultra_clean_value(ticket.get('status', 'N/A')),
-                        'Prioridad': self._ultra_clean_value(ticket.get('priority', 'N/A')),
-                        'Creado': self._format_date_safe(ticket.get('created_at')),
-                        'Resuelto': self._format_date_safe(ticket.get('resolved_at'), 'Pendiente'),
-                        'Técnico': self._ultra_clean_value(ticket.get('technician_name', 'Sin asignar')),
-                        'Sitio': self._ultra_clean_value(ticket.get('site_name', 'Sin sitio')),
-                        'Solución': self._ultra_clean_value(ticket.get('resolution_notes', 'Pendiente'))
+                        'Número': sanitize_value(ticket.get('ticket_number', 'N/A')),
+                        'Cliente': sanitize_value(ticket.get('client_name', 'Sin cliente')),
+                        'Asunto': sanitize_value(ticket.get('subject', 'Sin asunto')),
+                        'Estado': sanitize_value(ticket.get('status', 'N/A')),
+                        'Prioridad': sanitize_value(ticket.get('priority', 'N/A')),
+                        'Creado': format_date(ticket.get('created_at')),
+                        'Resuelto': format_date(ticket.get('resolved_at'), 'Pendiente'),
+                        'Técnico': sanitize_value(ticket.get('technician_name', 'Sin asignar')),
+                        'Sitio': sanitize_value(ticket.get('site_name', 'Sin sitio')),
+                        'Solución': sanitize_value(ticket.get('resolution_notes', 'Pendiente'))
                     }
                     writer.writerow(row)
 
@@ -418,108 +380,20 @@ class MonthlyReportsService:
     def _create_clean_excel_report(self, tickets: List[Dict], file_path: str, start_date: datetime, end_date: datetime, report_title: str):
         """Create professional Excel report with corruption protection"""
         try:
-            from openpyxl import Workbook
-            from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-
             logger.info(f"Creating professional Excel report with {len(tickets)} tickets")
 
             # Ensure directory exists
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
-            # Create workbook
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Reporte Consolidado"
-
-            # Define professional styles
-            title_font = Font(name='Arial', size=16, bold=True, color='FFFFFF')
-            title_fill = PatternFill(start_color='2F5597', end_color='2F5597', fill_type='solid')
-
-            subtitle_font = Font(name='Arial', size=12, bold=True)
-            header_font = Font(name='Arial', size=11, bold=True, color='FFFFFF')
-            header_fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
-
-            data_font = Font(name='Arial', size=10)
-            center_alignment = Alignment(horizontal='center', vertical='center')
-
-            thin_border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-
-            # Title section - Updated to span 11 columns for new structure
-            ws.merge_cells('A1:K1')
-            title_cell = ws['A1']
-            title_cell.value = 'LANET SYSTEMS - REPORTE CONSOLIDADO DE SOPORTE TÉCNICO'
-            title_cell.font = title_font
-            title_cell.fill = title_fill
-            title_cell.alignment = center_alignment
-            title_cell.border = thin_border
-
-            # Subtitle and info
-            ws.merge_cells('A2:K2')
-            ws['A2'].value = report_title
-            ws['A2'].font = subtitle_font
-            ws['A2'].alignment = center_alignment
-
-            ws.merge_cells('A3:K3')
-            ws['A3'].value = f"Período: {start_date.strftime('%d/%m/%Y')} - {end_date.strftime('%d/%m/%Y')}"
-            ws['A3'].font = data_font
-            ws['A3'].alignment = center_alignment
-
-            ws.merge_cells('A4:K4')
-            ws['A4'].value = f"Generado: {datetime.now().strftime('%d/%m/%Y %H:%M')} | Total de Tickets: {len(tickets)}"
-            ws['A4'].font = data_font
-            ws['A4'].alignment = center_alignment
-
-            # Column headers - Replace "Solución" with "Fecha Resolución" and "Resolución" (11 total)
-            headers = ['Número', 'Cliente', 'Asunto', 'Estado', 'Prioridad', 'Creado', 'Resuelto', 'Técnico', 'Sitio', 'Fecha Resolución', 'Resolución']
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=6, column=col, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = center_alignment
-                cell.border = thin_border
-
-            # Data rows - Replace "Solución" with "Fecha Resolución" and "Resolución" (11 columns)
-            for row_idx, ticket in enumerate(tickets, 7):
-                # Apply corruption-safe cleaning while preserving readability
-                row_data = [
-                    self._safe_clean_string(ticket.get('ticket_number', 'N/A')),                    # 1. Número
-                    self._safe_clean_string(ticket.get('client_name', 'Sin cliente')),             # 2. Cliente
-                    self._safe_clean_string(ticket.get('subject', 'Sin asunto')),                  # 3. Asunto
-                    self._safe_clean_string(ticket.get('status', 'N/A')),                          # 4. Estado
-                    self._safe_clean_string(ticket.get('priority', 'N/A')),                        # 5. Prioridad
-                    self._safe_date_format(ticket.get('created_at')),                              # 6. Creado
-                    self._safe_date_format(ticket.get('resolved_at'), 'Pendiente'),                # 7. Resuelto
-                    self._safe_clean_string(ticket.get('technician_name', 'Sin asignar')),         # 8. Técnico
-                    self._safe_clean_string(ticket.get('site_name', 'Sin sitio')),                 # 9. Sitio
-                    self._safe_date_format(ticket.get('resolved_at'), 'Sin fecha'),                # 10. Fecha Resolución
-                    self._safe_clean_string(ticket.get('resolution_notes') or 'Sin resolución')    # 11. Resolución
-                ]
-
-                for col, value in enumerate(row_data, 1):
-                    cell = ws.cell(row=row_idx, column=col, value=value)
-                    cell.font = data_font
-                    cell.border = thin_border
-                    if col in [1, 4, 5]:  # Center align ticket number, status, priority
-                        cell.alignment = center_alignment
-
-            # Set professional column widths - Updated for 11 columns
-            column_widths = [12, 25, 35, 12, 10, 16, 16, 20, 20, 18, 35]
-            for i, width in enumerate(column_widths, 1):
-                ws.column_dimensions[chr(64 + i)].width = width
-
-            # Set row heights
-            ws.row_dimensions[1].height = 25
-            for row in range(2, 5):
-                ws.row_dimensions[row].height = 18
-            ws.row_dimensions[6].height = 20
-
-            # Save workbook
-            wb.save(file_path)
+            writer = ExcelReportWriter('Reporte Consolidado', CONSOLIDATED_REPORT_COLUMNS)
+            writer.write_banner([
+                ('LANET SYSTEMS - REPORTE CONSOLIDADO DE SOPORTE TÉCNICO', 'report_title'),
+                (report_title, 'report_subtitle'),
+                (f"Período: {start_date.strftime('%d/%m/%Y')} - {end_date.strftime('%d/%m/%Y')}", 'report_info'),
+                (f"Generado: {datetime.now().strftime('%d/%m/%Y %H:%M')} | Total de Tickets: {len(tickets)}", 'report_info'),
+            ])
+            writer.write_table(tickets)
+            writer.save(file_path)
             logger.info(f"Professional Excel report saved to: {file_path}")
 
         except Exception as e:
@@ -528,151 +402,6 @@ class MonthlyReportsService:
             logger.error(f"Traceback: {traceback.format_exc()}")
             raise
 
-    def _ultra_clean_string(self, value):
-        """DEFINITIVE Excel-safe string cleaning - removes formula characters"""
-        if value is None:
-            return ""
-
-        # Convert to string
-        str_value = str(value).strip()
-
-        if not str_value:
-            return ""
-
-        # REMOVE FORMULA CHARACTERS THAT CAUSE CORRUPTION
-        # These are the exact characters causing the Excel XML corruption
-        if str_value.startswith('='):
-            str_value = str_value[1:]  # Remove leading =
-
-        # Remove other formula starters
-        if str_value.startswith(('+', '-', '@')):
-            str_value = ' ' + str_value  # Add space to prevent formula interpretation
-
-        # Keep ONLY basic ASCII letters, numbers, spaces, and safe punctuation
-        # NO special characters that can corrupt XML
-        allowed_chars = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 .,()-:')
-
-        cleaned = ''.join(char if char in allowed_chars else ' ' for char in str_value)
-
-        # Remove multiple spaces
-        cleaned = ' '.join(cleaned.split())
-
-        # Limit length aggressively to prevent Excel issues
-        if len(cleaned) > 50:
-            cleaned = cleaned[:50]
-
-        # Final safety check - ensure no formula start
-        if cleaned and cleaned[0] in '=+-@':
-            cleaned = ' ' + cleaned
-
-        return cleaned if cleaned else ""
-
-    def _safe_date_format(self, date_value, default='N/A'):
-        """Safe date formatting for Excel"""
-        if date_value is None:
-            return default
-
-        try:
-            if hasattr(date_value, 'strftime'):
-                return date_value.strftime('%d/%m/%Y %H:%M')
-            else:
-                return str(date_value)
-        except Exception:
-            return default
-
-    def _excel_safe_string(self, value):
-        """Excel-safe string cleaning - prevents XML corruption"""
-        if value is None:
-            return ""
-
-        # Convert to string and strip
-        str_value = str(value).strip()
-
-        if not str_value:
-            return ""
-
-        # Remove characters that cause Excel XML corruption
-        # Keep only safe characters: letters, numbers, basic punctuation, spaces
-        safe_chars = []
-        for char in str_value:
-            char_code = ord(char)
-            # Allow basic ASCII printable characters and common Spanish characters
-            if (32 <= char_code <= 126 or
-                char in 'áéíóúñüÁÉÍÓÚÑÜ¿¡' or
-                char_code in [160, 161, 191]):  # Non-breaking space, inverted punctuation
-                safe_chars.append(char)
-            elif char in '\t\n\r':
-                safe_chars.append(' ')  # Replace line breaks with spaces
-            # Skip all other characters that might cause XML issues
-
-        # Join and clean up spaces
-        cleaned = ''.join(safe_chars)
-        cleaned = ' '.join(cleaned.split())  # Remove multiple spaces
-
-        # Limit length to Excel's cell limit
-        if len(cleaned) > 32767:
-            cleaned = cleaned[:32767]
-
-        return cleaned if cleaned else ""
-
-    def _excel_safe_date(self, date_value, default='N/A'):
-        """Excel-safe date formatting"""
-        if date_value is None:
-            return default
-
-        try:
-            if hasattr(date_value, 'strftime'):
-                # Return simple date string - no complex formatting
-                return date_value.strftime('%d/%m/%Y %H:%M')
-            else:
-                return str(date_value)
-        except Exception:
-            return default
-
-    def _safe_clean_string(self, value):
-        """Safe cleaning that prevents corruption while maintaining readability"""
-        if value is None:
-            return "Sin información"
-
-        # Convert to string
-        str_value = str(value).strip()
-
-        if not str_value:
-            return ""
-
-        # Remove formula characters that cause corruption
-        if str_value.startswith('='):
-            str_value = str_value[1:]  # Remove leading =
-
-        if str_value.startswith(('+', '-', '@')):
-            str_value = ' ' + str_value  # Add space to prevent formula interpretation
-
-        # Keep readable characters including Spanish accents
-        safe_chars = []
-        for char in str_value:
-            char_code = ord(char)
-            if (32 <= char_code <= 126 or
-                char in 'áéíóúñüÁÉÍÓÚÑÜ¿¡'):
-                safe_chars.append(char)
-            elif char in '\t\n\r':
-                safe_chars.append(' ')
-            else:
-                safe_chars.append(' ')  # Replace problematic chars with space
-
-        # Join and clean up spaces
-        cleaned = ''.join(safe_chars)
-        cleaned = ' '.join(cleaned.split())
-
-        # Reasonable length limit
-        if len(cleaned) > 200:
-            cleaned = cleaned[:200] + '...'
-
-        # Final safety check
-        if cleaned and cleaned[0] in '=+-@':
-            cleaned = ' ' + cleaned
-
-        return cleaned if cleaned else ""
-
     def _create_excel_report(self, client_name: str, tickets: List[Dict], file_path: str, month: int, year: int):
         """Create Excel report file"""
         try:
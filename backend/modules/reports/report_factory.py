@@ -10,13 +10,17 @@ from typing import Dict, Any, Optional
 from .report_generators import (
     TicketStatisticsReport, 
     SLAComplianceReport, 
-    ClientSummaryReport,
-    PDFReportFormatter,
-    ExcelReportFormatter
+    ClientSummaryReport
 )
 
 logger = logging.getLogger(__name__)
 
+
+def _formatters():
+    # reportlab and pandas are loaded with the first generated file, not at app startup
+    from . import report_formatters
+    return report_formatters
+
 class ReportFactory:
     """Factory class for generating professional reports"""
     
@@ -157,7 +161,7 @@ class ReportFactory:
     
     def _generate_pdf_ticket_stats(self, data: Dict[str, Any], file_path: str) -> str:
         """Generate PDF ticket statistics report"""
-        formatter = PDFReportFormatter(file_path)
+        formatter = _formatters().PDFReportFormatter(file_path)
         
         # Header
         formatter.add_header(
@@ -180,7 +184,14 @@ class ReportFactory:
                 'Tiempo Promedio Resolución (min)': f"{stats.get('avg_resolution_time', 0):.1f}" if stats.get('avg_resolution_time') else 'N/A'
             }
             formatter.add_summary_table(summary_data, "Estadísticas Generales")
-        
+            formatter.add_pie_chart({
+                'Abiertos': stats.get('open_tickets', 0),
+                'En Progreso': stats.get('in_progress_tickets', 0),
+                'Pendientes': stats.get('pending_tickets', 0),
+                'Resueltos': stats.get('resolved_tickets', 0),
+                'Cerrados': stats.get('closed_tickets', 0)
+            }, "Distribución por Estado")
+
         # Client statistics (if available)
         if data['client_stats']:
             formatter.add_data_table(
@@ -207,7 +218,7 @@ class ReportFactory:
     
     def _generate_excel_ticket_stats(self, data: Dict[str, Any], file_path: str) -> str:
         """Generate Excel ticket statistics report"""
-        formatter = ExcelReportFormatter(file_path)
+        formatter = _formatters().ExcelReportFormatter(file_path)
         formatter.create_workbook()
         
         # Summary sheet
@@ -232,7 +243,7 @@ class ReportFactory:
     
     def _generate_pdf_sla_report(self, data: Dict[str, Any], file_path: str) -> str:
         """Generate PDF SLA compliance report"""
-        formatter = PDFReportFormatter(file_path)
+        formatter = _formatters().PDFReportFormatter(file_path)
         
         # Header
         formatter.add_header(
@@ -271,7 +282,7 @@ class ReportFactory:
     
     def _generate_excel_sla_report(self, data: Dict[str, Any], file_path: str) -> str:
         """Generate Excel SLA compliance report"""
-        formatter = ExcelReportFormatter(file_path)
+        formatter = _formatters().ExcelReportFormatter(file_path)
         formatter.create_workbook()
         
         # Summary sheet
@@ -288,7 +299,7 @@ class ReportFactory:
     
     def _generate_pdf_client_report(self, data: Dict[str, Any], file_path: str) -> str:
         """Generate PDF client summary report"""
-        formatter = PDFReportFormatter(file_path)
+        formatter = _formatters().PDFReportFormatter(file_path)
         
         # Header
         formatter.add_header(
@@ -314,7 +325,7 @@ class ReportFactory:
     
     def _generate_excel_client_report(self, data: Dict[str, Any], file_path: str) -> str:
         """Generate Excel client summary report"""
-        formatter = ExcelReportFormatter(file_path)
+        formatter = _formatters().ExcelReportFormatter(file_path)
         formatter.create_workbook()
         
         # Client data sheet
@@ -327,7 +338,7 @@ class ReportFactory:
     
     def _generate_pdf_quick_report(self, data: Dict[str, Any], file_path: str) -> str:
         """Generate PDF quick report"""
-        formatter = PDFReportFormatter(file_path)
+        formatter = _formatters().PDFReportFormatter(file_path)
         
         # Header
         formatter.add_header(
@@ -357,7 +368,7 @@ class ReportFactory:
     
     def _generate_excel_quick_report(self, data: Dict[str, Any], file_path: str) -> str:
         """Generate Excel quick report"""
-        formatter = ExcelReportFormatter(file_path)
+        formatter = _formatters().ExcelReportFormatter(file_path)
         formatter.create_workbook()
         
         # Summary sheet
@@ -371,13 +382,13 @@ class ReportFactory:
     def _generate_enterprise_pdf(self, report_data: Dict[str, Any], file_path: str) -> str:
         """Generate enterprise PDF report with dynamic columns and professional formatting."""
         try:
-            formatter = PDFReportFormatter(file_path)
+            formatter = _formatters().PDFReportFormatter(file_path)
 
             # Header with report configuration info
             config = report_data['config']
             formatter.add_header(
                 config['name'],
-                f"Generado: {datetime.now().strftime('%d/%m/%Y %H:%M')} | Total: {report_data['total_records']} registros"
+                f"Generado: {datetime.now().strftime('%d/%m/%Y %H:%M')}"
             )
 
             # Add summary statistics if available
@@ -403,36 +414,22 @@ class ReportFactory:
 
                 formatter.add_summary_table(summary_data, "Resumen Ejecutivo")
 
-            # Add data table with dynamic columns
-            if report_data.get('data') and report_data.get('columns'):
-                # Prepare table headers
-                headers = []
-                for col in report_data['columns']:
-                    label = col.get('custom_label') or col['display_name_es']
-                    headers.append(label)
-
-                # Prepare table data (limit to first 100 rows for PDF)
-                table_data = []
-                for row in report_data['data'][:100]:
-                    row_data = []
-                    for col in report_data['columns']:
-                        value = row.get(col['column_key'], '')
-                        # Format value based on column type
-                        if col['data_type'] == 'date' and value:
-                            if hasattr(value, 'strftime'):
-                                value = value.strftime('%d/%m/%Y %H:%M')
-                        elif col['data_type'] == 'number' and value is not None:
-                            value = str(value)
-                        elif value is None:
-                            value = 'N/A'
-                        row_data.append(str(value))
-                    table_data.append(row_data)
-
-                formatter.add_data_table(table_data, headers, "Datos del Reporte")
+            # Status and priority charts
+            if report_data.get('summary'):
+                formatter.add_pie_chart(report_data['summary'].get('status_distribution') or {}, "Distribución por Estado")
+                formatter.add_bar_chart(report_data['summary'].get('priority_distribution') or {}, "Distribución por Prioridad")
 
-                # Add note if data was truncated
-                if len(report_data['data']) > 100:
-                    formatter.add_text(f"Nota: Se muestran los primeros 100 registros de {len(report_data['data'])} totales.")
+            # Full data table with dynamic columns; rows stream from the cursor when a query is given
+            rows = report_data.get('data')
+            if rows is None and report_data.get('query'):
+                rows = self.db_manager.iter_query(report_data['query'], report_data.get('params'))
+            if rows and report_data.get('columns'):
+                columns = report_data['columns']
+                headers = [col.get('custom_label') or col['display_name_es'] for col in columns]
+                count = formatter.add_data_table(
+                    rows, "Datos del Reporte", [col['column_key'] for col in columns], headers=headers
+                )
+                formatter.add_text(f"Total de registros: {count}")
 
             # Footer
             formatter.add_footer(
@@ -452,7 +449,7 @@ class ReportFactory:
     def _generate_enterprise_excel(self, report_data: Dict[str, Any], file_path: str) -> str:
         """Generate enterprise Excel report with dynamic columns and professional formatting."""
         try:
-            formatter = ExcelReportFormatter(file_path)
+            formatter = _formatters().ExcelReportFormatter(file_path)
             formatter.create_workbook()
 
             # Summary sheet
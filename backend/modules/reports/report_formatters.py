@@ -0,0 +1,271 @@
+"""
+Professional Report Formatters for LANET Helpdesk V3
+PDF (reportlab) and Excel (pandas/openpyxl) output for the report generators
+
+Imported by ReportFactory on first use only: reportlab and pandas take longer
+to import than the rest of the application, so they are kept off the startup path.
+"""
+
+from functools import lru_cache
+from typing import Dict, Iterable, List, Any, Tuple
+import pandas as pd
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate, Table, LongTable, TableStyle, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.graphics.shapes import Drawing
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.lib.colors import HexColor
+
+
+# Rows per LongTable: reportlab lays out and splits a table as a whole, so one
+# table per chunk keeps rendering linear in the number of rows
+PDF_TABLE_CHUNK_ROWS = 500
+
+CHART_COLORS = ['#3498db', '#e74c3c', '#2ecc71', '#f39c12', '#9b59b6', '#1abc9c', '#34495e', '#e67e22']
+
+
+@lru_cache(maxsize=None)
+def _pdf_styles() -> Dict[str, Any]:
+    """Paragraph and table styles, built once per process and shared by every report"""
+    sample = getSampleStyleSheet()
+    return {
+        'normal': sample['Normal'],
+        'title': ParagraphStyle('CustomTitle', parent=sample['Heading1'], fontSize=18, spaceAfter=30,
+                                textColor=HexColor('#2c3e50'), alignment=1),
+        'header': ParagraphStyle('CustomHeader', parent=sample['Heading2'], fontSize=14, spaceAfter=12,
+                                 textColor=HexColor('#34495e')),
+        'company': ParagraphStyle('CompanyHeader', fontSize=12, textColor=HexColor('#7f8c8d'), alignment=1),
+        'footer': ParagraphStyle('Footer', fontSize=8, textColor=HexColor('#7f8c8d'), alignment=1),
+        'summary_table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), HexColor('#ecf0f1')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), HexColor('#2c3e50')),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), HexColor('#ffffff')),
+            ('GRID', (0, 0), (-1, -1), 1, HexColor('#bdc3c7'))
+        ]),
+        'data_table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), HexColor('#3498db')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), HexColor('#ecf0f1')),
+            ('GRID', (0, 0), (-1, -1), 1, HexColor('#bdc3c7')),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [HexColor('#ffffff'), HexColor('#f8f9fa')])
+        ]),
+    }
+
+
+def _cell_text(value: Any) -> str:
+    if value is None:
+        return 'N/A'
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    if hasattr(value, 'strftime'):
+        return value.strftime('%d/%m/%Y %H:%M')
+    return str(value)
+
+
+@lru_cache(maxsize=64)
+def bar_chart(items: Tuple[Tuple[str, float], ...], width: int = 450, height: int = 200) -> Drawing:
+    """Vertical bar chart of (label, value) pairs
+
+    Cached on the data: the same chart requested again, in the same report or
+    in a later one, reuses the Drawing instead of rebuilding it.
+    """
+    drawing = Drawing(width, height)
+    chart = VerticalBarChart()
+    chart.x, chart.y = 40, 30
+    chart.width, chart.height = width - 60, height - 50
+    chart.data = [[value for _, value in items]]
+    chart.categoryAxis.categoryNames = [label for label, _ in items]
+    chart.categoryAxis.labels.fontSize = 8
+    chart.valueAxis.valueMin = 0
+    chart.bars[0].fillColor = HexColor(CHART_COLORS[0])
+    drawing.add(chart)
+    return drawing
+
+
+@lru_cache(maxsize=64)
+def pie_chart(items: Tuple[Tuple[str, float], ...], width: int = 450, height: int = 200) -> Drawing:
+    """Pie chart of (label, value) pairs, cached like bar_chart"""
+    drawing = Drawing(width, height)
+    chart = Pie()
+    chart.x, chart.y = (width - 150) // 2, 25
+    chart.width = chart.height = 150
+    chart.data = [value for _, value in items]
+    chart.labels = [f"{label} ({value:g})" for label, value in items]
+    chart.slices.fontSize = 8
+    for index in range(len(items)):
+        chart.slices[index].fillColor = HexColor(CHART_COLORS[index % len(CHART_COLORS)])
+    drawing.add(chart)
+    return drawing
+
+
+def _chart_items(data: Dict[str, Any]) -> Tuple[Tuple[str, float], ...]:
+    return tuple((str(label), float(value)) for label, value in data.items() if value)
+
+
+class PDFReportFormatter:
+    """Professional PDF report formatter with charts and branding"""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.doc = SimpleDocTemplate(file_path, pagesize=A4)
+        self.styles = _pdf_styles()
+        self.story = []
+
+        # Custom styles
+        self.title_style = self.styles['title']
+        self.header_style = self.styles['header']
+
+    def add_header(self, title: str, subtitle: str = None):
+        """Add professional header with branding"""
+        # Company header
+        company_header = Paragraph(
+            "<b>LANET Helpdesk V3</b><br/>Sistema de Gestión de Tickets Empresarial",
+            self.styles['company']
+        )
+        self.story.append(company_header)
+        self.story.append(Spacer(1, 20))
+
+        # Report title
+        self.story.append(Paragraph(title, self.title_style))
+        if subtitle:
+            self.story.append(Paragraph(subtitle, self.styles['normal']))
+        self.story.append(Spacer(1, 20))
+
+    def add_summary_table(self, data: Dict[str, Any], title: str):
+        """Add a summary statistics table"""
+        self.story.append(Paragraph(title, self.header_style))
+
+        # Convert data to table format
+        table_data = []
+        for key, value in data.items():
+            if value is not None:
+                if isinstance(value, float):
+                    value = f"{value:.2f}"
+                table_data.append([key.replace('_', ' ').title(), str(value)])
+
+        if table_data:
+            table = Table(table_data, colWidths=[3*inch, 2*inch], style=self.styles['summary_table'])
+            self.story.append(table)
+            self.story.append(Spacer(1, 20))
+
+    def add_data_table(self, data: Iterable[Dict], title: str, columns: List[str],
+                       headers: List[str] = None, chunk_rows: int = PDF_TABLE_CHUNK_ROWS) -> int:
+        """Add a data table with proper formatting; returns the number of rows
+
+        ``data`` may be any iterable of dicts, e.g. a cursor from
+        DatabaseManager.iter_query: rows are consumed as they come and emitted
+        as LongTables of ``chunk_rows`` rows whose header repeats on every page.
+        """
+        headers = headers or [col.replace('_', ' ').title() for col in columns]
+        col_widths = [6.5 * inch / len(columns)] * len(columns)
+
+        count = 0
+        chunk = []
+        for row in data:
+            if not count:
+                self.story.append(Paragraph(title, self.header_style))
+            chunk.append([_cell_text(row.get(col)) for col in columns])
+            count += 1
+            if len(chunk) == chunk_rows:
+                self._add_table_chunk(headers, chunk, col_widths)
+                chunk = []
+
+        if chunk:
+            self._add_table_chunk(headers, chunk, col_widths)
+        if count:
+            self.story.append(Spacer(1, 20))
+        return count
+
+    def _add_table_chunk(self, headers: List[str], rows: List[List[str]], col_widths: List[float]):
+        self.story.append(LongTable([headers] + rows, colWidths=col_widths, repeatRows=1,
+                                    style=self.styles['data_table']))
+
+    def add_bar_chart(self, data: Dict[str, Any], title: str):
+        """Add a bar chart of {label: value}; zero values are left out"""
+        items = _chart_items(data)
+        if items:
+            self.story.append(Paragraph(title, self.header_style))
+            self.story.append(bar_chart(items))
+            self.story.append(Spacer(1, 20))
+
+    def add_pie_chart(self, data: Dict[str, Any], title: str):
+        """Add a pie chart of {label: value}; zero values are left out"""
+        items = _chart_items(data)
+        if items:
+            self.story.append(Paragraph(title, self.header_style))
+            self.story.append(pie_chart(items))
+            self.story.append(Spacer(1, 20))
+
+    def add_text(self, text: str):
+        """Add a plain paragraph"""
+        self.story.append(Paragraph(text, self.styles['normal']))
+        self.story.append(Spacer(1, 10))
+
+    def add_footer(self, generated_by: str, generated_at: str):
+        """Add report footer"""
+        footer_text = f"<i>Generado por: {generated_by}<br/>Fecha: {generated_at}</i>"
+        footer = Paragraph(footer_text, self.styles['footer'])
+        self.story.append(Spacer(1, 30))
+        self.story.append(footer)
+
+    def build(self):
+        """Build the PDF document"""
+        self.doc.build(self.story)
+
+class ExcelReportFormatter:
+    """Professional Excel report formatter with charts and formatting"""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.workbook = None
+        self.worksheets = {}
+
+    def create_workbook(self):
+        """Create Excel workbook with pandas"""
+        self.workbook = pd.ExcelWriter(self.file_path, engine='openpyxl')
+
+    def add_summary_sheet(self, data: Dict[str, Any], sheet_name: str = 'Resumen'):
+        """Add summary sheet with key metrics"""
+        if not self.workbook:
+            self.create_workbook()
+
+        # Create summary data
+        summary_data = []
+        for key, value in data.items():
+            if value is not None and key not in ['report_title', 'date_range', 'generated_at', 'generated_by', 'user_role']:
+                summary_data.append({
+                    'Métrica': key.replace('_', ' ').title(),
+                    'Valor': value
+                })
+
+        if summary_data:
+            df = pd.DataFrame(summary_data)
+            df.to_excel(self.workbook, sheet_name=sheet_name, index=False)
+
+    def add_data_sheet(self, data: List[Dict], sheet_name: str, title: str = None):
+        """Add data sheet with proper formatting"""
+        if not self.workbook:
+            self.create_workbook()
+
+        if data:
+            df = pd.DataFrame(data)
+            # Clean column names
+            df.columns = [col.replace('_', ' ').title() for col in df.columns]
+            df.to_excel(self.workbook, sheet_name=sheet_name, index=False)
+
+    def save(self):
+        """Save the Excel file"""
+        if self.workbook:
+            self.workbook.close()
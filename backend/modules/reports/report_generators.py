@@ -4,19 +4,9 @@ Enterprise-grade business intelligence reporting system
 """
 
 import os
-import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 import logging
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.graphics.shapes import Drawing
-from reportlab.graphics.charts.barcharts import VerticalBarChart
-from reportlab.graphics.charts.piecharts import Pie
-from reportlab.lib.colors import HexColor
 
 logger = logging.getLogger(__name__)
 
@@ -293,179 +283,3 @@ class ClientSummaryReport(BaseReportGenerator):
             'generated_by': self.user_claims.get('name', 'Usuario'),
             'user_role': self.user_role
         }
-
-class PDFReportFormatter:
-    """Professional PDF report formatter with charts and branding"""
-
-    def __init__(self, file_path: str):
-        self.file_path = file_path
-        self.doc = SimpleDocTemplate(file_path, pagesize=A4)
-        self.styles = getSampleStyleSheet()
-        self.story = []
-
-        # Custom styles
-        self.title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=18,
-            spaceAfter=30,
-            textColor=HexColor('#2c3e50'),
-            alignment=1  # Center
-        )
-
-        self.header_style = ParagraphStyle(
-            'CustomHeader',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            spaceAfter=12,
-            textColor=HexColor('#34495e')
-        )
-
-    def add_header(self, title: str, subtitle: str = None):
-        """Add professional header with branding"""
-        # Company header
-        company_header = Paragraph(
-            "<b>LANET Helpdesk V3</b><br/>Sistema de Gestión de Tickets Empresarial",
-            ParagraphStyle('CompanyHeader',
-                          fontSize=12,
-                          textColor=HexColor('#7f8c8d'),
-                          alignment=1)
-        )
-        self.story.append(company_header)
-        self.story.append(Spacer(1, 20))
-
-        # Report title
-        self.story.append(Paragraph(title, self.title_style))
-        if subtitle:
-            self.story.append(Paragraph(subtitle, self.styles['Normal']))
-        self.story.append(Spacer(1, 20))
-
-    def add_summary_table(self, data: Dict[str, Any], title: str):
-        """Add a summary statistics table"""
-        self.story.append(Paragraph(title, self.header_style))
-
-        # Convert data to table format
-        table_data = []
-        for key, value in data.items():
-            if value is not None:
-                if isinstance(value, float):
-                    value = f"{value:.2f}"
-                table_data.append([key.replace('_', ' ').title(), str(value)])
-
-        if table_data:
-            table = Table(table_data, colWidths=[3*inch, 2*inch])
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), HexColor('#ecf0f1')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), HexColor('#2c3e50')),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), HexColor('#ffffff')),
-                ('GRID', (0, 0), (-1, -1), 1, HexColor('#bdc3c7'))
-            ]))
-            self.story.append(table)
-            self.story.append(Spacer(1, 20))
-
-    def add_data_table(self, data: List[Dict], title: str, columns: List[str]):
-        """Add a data table with proper formatting"""
-        if not data:
-            return
-
-        self.story.append(Paragraph(title, self.header_style))
-
-        # Prepare table data
-        headers = [col.replace('_', ' ').title() for col in columns]
-        table_data = [headers]
-
-        for row in data:
-            row_data = []
-            for col in columns:
-                value = row.get(col, '')
-                if isinstance(value, float):
-                    value = f"{value:.2f}"
-                elif value is None:
-                    value = 'N/A'
-                row_data.append(str(value))
-            table_data.append(row_data)
-
-        # Create table
-        col_width = 6.5 * inch / len(columns)
-        table = Table(table_data, colWidths=[col_width] * len(columns))
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), HexColor('#3498db')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), HexColor('#ecf0f1')),
-            ('GRID', (0, 0), (-1, -1), 1, HexColor('#bdc3c7')),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [HexColor('#ffffff'), HexColor('#f8f9fa')])
-        ]))
-
-        self.story.append(table)
-        self.story.append(Spacer(1, 20))
-
-    def add_footer(self, generated_by: str, generated_at: str):
-        """Add report footer"""
-        footer_text = f"<i>Generado por: {generated_by}<br/>Fecha: {generated_at}</i>"
-        footer = Paragraph(footer_text,
-                          ParagraphStyle('Footer',
-                                        fontSize=8,
-                                        textColor=HexColor('#7f8c8d'),
-                                        alignment=1))
-        self.story.append(Spacer(1, 30))
-        self.story.append(footer)
-
-    def build(self):
-        """Build the PDF document"""
-        self.doc.build(self.story)
-
-class ExcelReportFormatter:
-    """Professional Excel report formatter with charts and formatting"""
-
-    def __init__(self, file_path: str):
-        self.file_path = file_path
-        self.workbook = None
-        self.worksheets = {}
-
-    def create_workbook(self):
-        """Create Excel workbook with pandas"""
-        import pandas as pd
-        self.workbook = pd.ExcelWriter(self.file_path, engine='openpyxl')
-
-    def add_summary_sheet(self, data: Dict[str, Any], sheet_name: str = 'Resumen'):
-        """Add summary sheet with key metrics"""
-        if not self.workbook:
-            self.create_workbook()
-
-        # Create summary data
-        summary_data = []
-        for key, value in data.items():
-            if value is not None and key not in ['report_title', 'date_range', 'generated_at', 'generated_by', 'user_role']:
-                summary_data.append({
-                    'Métrica': key.replace('_', ' ').title(),
-                    'Valor': value
-                })
-
-        if summary_data:
-            df = pd.DataFrame(summary_data)
-            df.to_excel(self.workbook, sheet_name=sheet_name, index=False)
-
-    def add_data_sheet(self, data: List[Dict], sheet_name: str, title: str = None):
-        """Add data sheet with proper formatting"""
-        if not self.workbook:
-            self.create_workbook()
-
-        if data:
-            df = pd.DataFrame(data)
-            # Clean column names
-            df.columns = [col.replace('_', ' ').title() for col in df.columns]
-            df.to_excel(self.workbook, sheet_name=sheet_name, index=False)
-
-    def save(self):
-        """Save the Excel file"""
-        if self.workbook:
-            self.workbook.close()
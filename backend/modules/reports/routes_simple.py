@@ -13,9 +13,6 @@ import pytz
 import logging
 import os
 import uuid
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment
-from openpyxl.utils import get_column_letter
 
 reports_bp = Blueprint('reports', __name__)
 logger = logging.getLogger(__name__)
@@ -101,6 +98,10 @@ def generate_friendly_filename(report_type, output_format='excel'):
 
 def generate_excel_report_lanet_format(data, filename, report_title="REPORTE CONSOLIDADO"):
     """Generate Excel report matching LANET format"""
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, PatternFill, Alignment
+    from openpyxl.utils import get_column_letter
+
     try:
         # Create reports directory if it doesn't exist
         reports_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'reports_files')
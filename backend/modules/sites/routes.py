@@ -8,6 +8,7 @@ Complete CRUD API endpoints for site management
 from flask import Blueprint, request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from utils.security import require_role
+from utils.validators import ValidationUtils
 from .service import SitesService
 import logging
 import uuid
@@ -27,13 +28,12 @@ def get_sites():
         user_role = claims.get('role')
         user_client_id = claims.get('client_id')
 
-        logger.info(f"🔍 SITES ENDPOINT - User: {current_user_id}, Role: {user_role}, Client: {user_client_id}")
-        logger.info(f"🔍 SITES ENDPOINT - Full claims: {claims}")
-        
         # Get query parameters
         client_id = request.args.get('client_id')
-        page = int(request.args.get('page', 1))
-        per_page = min(int(request.args.get('per_page', 50)), 100)
+        search = request.args.get('search', '').strip()
+        pagination = ValidationUtils.validate_pagination(
+            request.args.get('page'), request.args.get('per_page'), default_per_page=50
+        )
         
         sites_service = SitesService(current_app.db_manager)
         
@@ -43,39 +43,11 @@ def get_sites():
                 result = sites_service.get_sites_by_client(client_id, user_role, user_client_id)
             else:
                 # Get all sites across all clients
-                query = """
-                SELECT s.site_id, s.client_id, s.name, s.address, s.city, s.state, 
-                       s.country, s.postal_code, s.is_active, s.created_at,
-                       c.name as client_name,
-                       COUNT(DISTINCT usa.user_id) as assigned_users,
-                       COUNT(DISTINCT t.ticket_id) as total_tickets
-                FROM sites s
-                JOIN clients c ON s.client_id = c.client_id
-                LEFT JOIN user_site_assignments usa ON s.site_id = usa.site_id
-                LEFT JOIN tickets t ON s.site_id = t.site_id
-                WHERE s.is_active = true
-                GROUP BY s.site_id, s.client_id, s.name, s.address, s.city, s.state,
-                         s.country, s.postal_code, s.is_active, s.created_at, c.name
-                ORDER BY c.name, s.name
-                LIMIT %s OFFSET %s
-                """
-                
-                offset = (page - 1) * per_page
-                sites = current_app.db_manager.execute_query(query, (per_page, offset))
-                
-                # Get total count
-                count_query = "SELECT COUNT(*) as total FROM sites WHERE is_active = true"
-                total_result = current_app.db_manager.execute_query(count_query, fetch='one')
-                total = total_result['total'] if total_result else 0
-                
-                result = {
-                    'success': True,
-                    'sites': sites,
-                    'total': total,
-                    'page': page,
-                    'per_page': per_page,
-                    'pages': (total + per_page - 1) // per_page
-                }
+                result = sites_service.get_all_sites(
+                    page=pagination['page'],
+                    per_page=pagination['per_page'],
+                    search=search or None
+                )
                 
         elif user_role == 'client_admin':
             # Can only access their own client's sites
@@ -86,33 +58,7 @@ def get_sites():
 
         elif user_role == 'solicitante':
             # Can only access their assigned sites
-            query = """
-            SELECT s.site_id, s.client_id, s.name, s.address, s.city, s.state,
-                   s.country, s.postal_code, s.is_active, s.created_at,
-                   c.name as client_name,
-                   COUNT(DISTINCT usa.user_id) as assigned_users,
-                   COUNT(DISTINCT t.ticket_id) as total_tickets
-            FROM sites s
-            JOIN clients c ON s.client_id = c.client_id
-            LEFT JOIN user_site_assignments usa ON s.site_id = usa.site_id
-            LEFT JOIN tickets t ON s.site_id = t.site_id
-            INNER JOIN user_site_assignments usa2 ON s.site_id = usa2.site_id
-            WHERE s.is_active = true AND usa2.user_id = %s
-            GROUP BY s.site_id, s.client_id, s.name, s.address, s.city, s.state,
-                     s.country, s.postal_code, s.is_active, s.created_at, c.name
-            ORDER BY s.name
-            """
-
-            sites = current_app.db_manager.execute_query(query, (current_user_id,))
-
-            result = {
-                'success': True,
-                'sites': sites or [],
-                'total': len(sites or []),
-                'page': 1,
-                'per_page': len(sites or []),
-                'pages': 1
-            }
+            result = sites_service.get_sites_for_user(current_user_id)
 
         else:
             return current_app.response_manager.error('Insufficient permissions', 403)
@@ -15,6 +15,14 @@ import logging
 class SitesService:
     """Service class for site management operations"""
     
+    # Per-site counters as correlated subqueries (index lookups per site row)
+    # instead of COUNT(DISTINCT) over the assignments x tickets join
+    SITE_STATS_COLUMNS = """
+                   (SELECT COUNT(*) FROM user_site_assignments usa
+                     WHERE usa.site_id = s.site_id) as assigned_users,
+                   (SELECT COUNT(*) FROM tickets t
+                     WHERE t.site_id = s.site_id) as total_tickets"""
+
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
         self.logger = logging.getLogger(__name__)
@@ -26,25 +34,19 @@ class SitesService:
             if user_role == 'client_admin' and user_client_id != client_id:
                 return {'success': False, 'error': 'Access denied to this client'}
             
-            query = """
+            query = f"""
             SELECT s.site_id, s.client_id, s.name, s.address, s.city, s.state, s.country,
                    s.postal_code, s.latitude, s.longitude, s.authorized_emails, s.is_active,
                    s.created_at, s.updated_at,
                    c.name as client_name,
-                   COUNT(DISTINCT usa.user_id) as assigned_users,
-                   COUNT(DISTINCT t.ticket_id) as total_tickets
+                   {self.SITE_STATS_COLUMNS}
             FROM sites s
             LEFT JOIN clients c ON s.client_id = c.client_id
-            LEFT JOIN user_site_assignments usa ON s.site_id = usa.site_id
-            LEFT JOIN tickets t ON s.site_id = t.site_id
             WHERE s.client_id = %s AND s.is_active = true
-            GROUP BY s.site_id, s.client_id, s.name, s.address, s.city, s.state, s.country,
-                     s.postal_code, s.latitude, s.longitude, s.authorized_emails, s.is_active,
-                     s.created_at, s.updated_at, c.name
             ORDER BY s.name
             """
-            
-            sites = self.db.execute_query(query, (client_id,))
+
+            sites = self.db.execute_query(query, (client_id,)) or []
             
             return {
                 'success': True,
@@ -55,6 +57,93 @@ class SitesService:
         except Exception as e:
             self.logger.error(f"Error getting sites for client {client_id}: {e}")
             return {'success': False, 'error': 'Failed to retrieve sites'}
+
+    def get_all_sites(self, page: int = 1, per_page: int = 50, search: str = None) -> Dict[str, Any]:
+        """Get one page of active sites across all clients (trigram-indexed search)"""
+        try:
+            search_condition = "s.is_active = true"
+            search_params = []
+
+            if search:
+                search_condition += " AND (s.name ILIKE %s OR c.name ILIKE %s OR s.city ILIKE %s)"
+                search_term = ValidationUtils.like_pattern(search)
+                search_params = [search_term, search_term, search_term]
+
+            query = f"""
+            SELECT s.site_id, s.client_id, s.name, s.address, s.city, s.state,
+                   s.country, s.postal_code, s.is_active, s.created_at,
+                   c.name as client_name,
+                   {self.SITE_STATS_COLUMNS},
+                   COUNT(*) OVER () as total_count
+            FROM sites s
+            JOIN clients c ON s.client_id = c.client_id
+            WHERE {search_condition}
+            ORDER BY c.name, s.name, s.site_id
+            LIMIT %s OFFSET %s
+            """
+
+            offset = (page - 1) * per_page
+            sites = self.db.execute_query(query, tuple(search_params + [per_page, offset])) or []
+
+            if sites:
+                total = sites[0]['total_count']
+            elif page > 1:
+                count_query = f"""
+                SELECT COUNT(*) as total
+                FROM sites s
+                JOIN clients c ON s.client_id = c.client_id
+                WHERE {search_condition}
+                """
+                total_result = self.db.execute_query(count_query, tuple(search_params), fetch='one')
+                total = total_result['total'] if total_result else 0
+            else:
+                total = 0
+
+            for site in sites:
+                site.pop('total_count', None)
+
+            return {
+                'success': True,
+                'sites': sites,
+                'total': total,
+                'page': page,
+                'per_page': per_page,
+                'pages': (total + per_page - 1) // per_page
+            }
+
+        except Exception as e:
+            self.logger.error(f"Error getting sites: {e}")
+            return {'success': False, 'error': 'Failed to retrieve sites'}
+
+    def get_sites_for_user(self, user_id: str) -> Dict[str, Any]:
+        """Get the active sites a user (solicitante) is assigned to"""
+        try:
+            query = f"""
+            SELECT s.site_id, s.client_id, s.name, s.address, s.city, s.state,
+                   s.country, s.postal_code, s.is_active, s.created_at,
+                   c.name as client_name,
+                   {self.SITE_STATS_COLUMNS}
+            FROM user_site_assignments mine
+            JOIN sites s ON s.site_id = mine.site_id
+            JOIN clients c ON s.client_id = c.client_id
+            WHERE mine.user_id = %s AND s.is_active = true
+            ORDER BY s.name
+            """
+
+            sites = self.db.execute_query(query, (user_id,)) or []
+
+            return {
+                'success': True,
+                'sites': sites,
+                'total': len(sites),
+                'page': 1,
+                'per_page': len(sites),
+                'pages': 1
+            }
+
+        except Exception as e:
+            self.logger.error(f"Error getting sites for user {user_id}: {e}")
+            return {'success': False, 'error': 'Failed to retrieve sites'}
     
     def get_site_by_id(self, site_id: str, user_role: str = None, user_client_id: str = None) -> Dict[str, Any]:
         """Get a specific site by ID with RLS enforcement"""
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Helpdesk V3 - System Routes
+Superadmin diagnostics: slow queries, sampled plans and index suggestions
+"""
+
+from flask import Blueprint, request, current_app
+from utils.security import require_role
+
+system_bp = Blueprint('system', __name__)
+
+
+def _profiler():
+    return current_app.db_manager.profiler
+
+
+@system_bp.route('/slow-queries', methods=['GET'])
+@require_role(['superadmin'])
+def get_slow_queries():
+    """Slowest query fingerprints and the latest slow executions
+
+    Query params: limit (default 20), recent (default 50), plans=true to
+    include the EXPLAIN (ANALYZE, BUFFERS) plan of each fingerprint.
+    """
+    profiler = _profiler()
+    if profiler is None:
+        return current_app.response_manager.error(
+            'Query profiler is disabled (set QUERY_PROFILER_ENABLED=true)', 404)
+
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 200)
+        recent = min(max(int(request.args.get('recent', 50)), 0), 500)
+    except ValueError:
+        return current_app.response_manager.bad_request('limit and recent must be integers')
+
+    return current_app.response_manager.success({
+        'threshold_ms': profiler.threshold * 1000,
+        'explain_sample_rate': profiler.sample_rate,
+        'top': profiler.top(limit, include_plans=request.args.get('plans') == 'true'),
+        'recent': profiler.recent(recent)
+    })
+
+
+@system_bp.route('/slow-queries/index-suggestions', methods=['GET'])
+@require_role(['superadmin'])
+def get_index_suggestions():
+    """Index candidates from sequential scans in sampled plans, by slow time"""
+    profiler = _profiler()
+    if profiler is None:
+        return current_app.response_manager.error(
+            'Query profiler is disabled (set QUERY_PROFILER_ENABLED=true)', 404)
+
+    return current_app.response_manager.success({'suggestions': profiler.index_suggestions()})
+
+
+@system_bp.route('/slow-queries', methods=['DELETE'])
+@require_role(['superadmin'])
+def clear_slow_queries():
+    """Reset the slow-query buffer of this worker"""
+    profiler = _profiler()
+    if profiler is None:
+        return current_app.response_manager.error(
+            'Query profiler is disabled (set QUERY_PROFILER_ENABLED=true)', 404)
+
+    profiler.clear()
+    return current_app.response_manager.success(message='Slow-query buffer cleared')
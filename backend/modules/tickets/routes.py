@@ -8,11 +8,12 @@ Ticket management endpoints
 from flask import Blueprint, request, current_app, Response
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from utils.security import require_role
+from core.conditional import conditional_get, change_version
 from datetime import datetime
 import uuid
 import logging
 import os
-from .service import TicketService
+from .service import TicketService, TICKET_SECTIONS
 
 # Configure detailed logging for debugging
 import os
@@ -29,8 +30,34 @@ logging.basicConfig(
 
 tickets_bp = Blueprint('tickets', __name__)
 
+# Sections of /<ticket_id>/full that only staff can read, as with /activities and /api/sla
+STAFF_ONLY_SECTIONS = ('activities', 'sla')
+
+# Everything ticket reads join: ticket rows and their collections, plus client, site and user names
+TICKET_READ_RESOURCES = ('tickets', 'clients', 'sites', 'users')
+
+def _ticket_read_version(*args, **kwargs):
+    return change_version(*TICKET_READ_RESOURCES)
+
+def _format_resolution(resolution):
+    """Resolution row (cursor row or json_agg element) for API response"""
+    def iso(value):
+        return value.isoformat() if hasattr(value, 'isoformat') else value
+
+    return {
+        'resolution_id': str(resolution['resolution_id']),
+        'ticket_id': str(resolution['ticket_id']),
+        'resolution_notes': resolution['resolution_notes'],
+        'resolved_by': str(resolution['resolved_by']),
+        'resolved_by_name': resolution['resolved_by_name'],
+        'resolved_by_role': resolution['resolved_by_role'],
+        'resolved_at': iso(resolution['resolved_at']),
+        'created_at': iso(resolution['created_at'])
+    }
+
 @tickets_bp.route('/', methods=['GET'])
 @jwt_required()
+@conditional_get(_ticket_read_version)
 def get_tickets():
     """Get all tickets with sorting support"""
     try:
@@ -59,7 +86,7 @@ def get_tickets():
         result = ticket_service.get_all_tickets(page, per_page, filters)
 
         # Format tickets
-        formatted_tickets = [current_app.response_manager.format_ticket_data(ticket) for ticket in result['tickets']]
+        formatted_tickets = current_app.response_manager.format_ticket_rows(result['columns'], result['rows'])
 
         response_data = {
             'tickets': formatted_tickets,
@@ -79,6 +106,7 @@ def get_tickets():
 
 @tickets_bp.route('/<ticket_id>', methods=['GET'])
 @jwt_required()
+@conditional_get(_ticket_read_version)
 def get_ticket(ticket_id):
     """Get specific ticket"""
     try:
@@ -99,6 +127,63 @@ def get_ticket(ticket_id):
         current_app.logger.error(f"Get ticket error: {e}")
         return current_app.response_manager.server_error('Failed to get ticket')
 
+@tickets_bp.route('/<ticket_id>/full', methods=['GET'])
+@jwt_required()
+@conditional_get(_ticket_read_version)
+def get_ticket_full(ticket_id):
+    """Ticket with comments, attachments, activities, SLA tracking and resolutions
+
+    Loaded in one database round trip. ``fields`` picks sections (comma
+    separated, default all). Client users never get internal comments,
+    activities or SLA tracking, as with the per-collection endpoints.
+    Responses carry an ETag; If-None-Match while no ticket changed gets 304
+    without loading anything.
+    """
+    try:
+        if not current_app.db_manager.validate_uuid(ticket_id):
+            return current_app.response_manager.bad_request('Invalid ticket ID format')
+
+        claims = get_jwt()
+        current_user_role = claims.get('role')
+        current_user_client_id = claims.get('client_id')
+        is_client_user = current_user_role in ['client_admin', 'solicitante']
+
+        fields = request.args.get('fields')
+        sections = [name.strip() for name in fields.split(',') if name.strip()] if fields else list(TICKET_SECTIONS)
+        unknown = [name for name in sections if name not in TICKET_SECTIONS]
+        if unknown:
+            return current_app.response_manager.bad_request(f"Unknown fields: {', '.join(unknown)}")
+        if is_client_user:
+            sections = [name for name in sections if name not in STAFF_ONLY_SECTIONS]
+
+        ticket_service = TicketService(current_app.db_manager, current_app.auth_manager)
+        ticket = ticket_service.get_ticket_full(ticket_id, sections, include_internal=not is_client_user)
+
+        if not ticket:
+            return current_app.response_manager.not_found('Ticket')
+
+        if is_client_user and str(ticket['client_id']) != str(current_user_client_id):
+            return current_app.response_manager.forbidden('Access denied')
+
+        formatters = {
+            'comments': current_app.response_manager.format_comment_data,
+            'attachments': current_app.response_manager.format_attachment_data,
+            'activities': current_app.response_manager.format_activity_data,
+            'sla': current_app.response_manager.format_sla_tracking_data,
+            'resolutions': _format_resolution
+        }
+        data = {'ticket': current_app.response_manager.format_ticket_data(
+            {key: value for key, value in ticket.items() if key not in sections}
+        )}
+        for name in sections:
+            data[name] = [formatters[name](row) for row in (ticket[name] or [])]
+
+        return current_app.response_manager.success(data)
+
+    except Exception as e:
+        current_app.logger.error(f"Get full ticket error: {e}")
+        return current_app.response_manager.server_error('Failed to get ticket')
+
 @tickets_bp.route('/', methods=['POST'])
 @jwt_required()
 @require_role(['superadmin', 'admin', 'technician', 'client_admin', 'solicitante'])
@@ -302,47 +387,40 @@ def create_ticket():
                 ticket_id = ticket_data['ticket_id']
                 saved_files = []
 
-                import os
                 from werkzeug.utils import secure_filename
 
-                # Create uploads directory if it doesn't exist
-                upload_dir = os.path.join(current_app.root_path, 'uploads', 'tickets', str(ticket_id))
-                os.makedirs(upload_dir, exist_ok=True)
-
                 for file in files:
                     if file and file.filename:
                         # Secure the filename
                         filename = secure_filename(file.filename)
 
-                        # Add timestamp to avoid conflicts
-                        import time
-                        timestamp = str(int(time.time()))
-                        name, ext = os.path.splitext(filename)
-                        unique_filename = f"{name}_{timestamp}{ext}"
-
-                        # Save file
-                        file_path = os.path.join(upload_dir, unique_filename)
-                        file.save(file_path)
+                        # Store content-addressed: identical files share one blob on disk
+                        blob = current_app.blob_store.store_stream(
+                            file.stream,
+                            max_size=current_app.config['MAX_CONTENT_LENGTH']
+                        )
+                        if blob['file_size'] == 0:
+                            continue
 
                         # Save file info to database (using correct table and column names)
                         file_data = {
                             'ticket_id': ticket_id,
-                            'filename': unique_filename,  # stored filename
+                            'filename': filename,  # stored filename
                             'original_filename': filename,  # original filename
-                            'file_path': file_path,
-                            'file_size': os.path.getsize(file_path),
+                            'file_path': blob['file_path'],
+                            'file_size': blob['file_size'],
+                            'file_hash': blob['file_hash'],
                             'mime_type': file.content_type,  # correct column name
                             'uploaded_by': current_user_id,
                             'created_at': datetime.utcnow()
                         }
 
-                        file_result = current_app.db_manager.execute_insert('file_attachments', file_data)
-                        if file_result:
-                            saved_files.append({
-                                'filename': filename,
-                                'size': file_data['file_size'],
-                                'type': file_data['content_type']
-                            })
+                        current_app.db_manager.execute_insert('file_attachments', file_data)
+                        saved_files.append({
+                            'filename': filename,
+                            'size': file_data['file_size'],
+                            'type': file_data['mime_type']
+                        })
 
                 current_app.logger.info(f"Saved {len(saved_files)} attachments for ticket {ticket_id}")
 
@@ -560,7 +638,7 @@ def download_attachment(attachment_id):
         # Get attachment info and check access
         query = """
         SELECT fa.attachment_id, fa.ticket_id, fa.filename, fa.original_filename,
-               fa.file_path, fa.file_size, fa.mime_type,
+               fa.file_path, fa.file_hash, fa.file_size, fa.mime_type,
                t.client_id
         FROM file_attachments fa
         JOIN tickets t ON fa.ticket_id = t.ticket_id
@@ -580,9 +658,9 @@ def download_attachment(attachment_id):
             if attachment['client_id'] != current_user_client_id:
                 return current_app.response_manager.forbidden('Access denied')
 
-        # Check if file exists on disk
-        file_path = attachment['file_path']
-        if not os.path.exists(file_path):
+        # Check if file exists on disk (blob store first, then legacy per-ticket path)
+        file_path = current_app.blob_store.resolve_path(attachment['file_hash'], attachment['file_path'])
+        if not file_path or not os.path.exists(file_path):
             current_app.logger.error(f"File not found on disk: {file_path}")
             return current_app.response_manager.not_found('File not found on server')
 
@@ -759,7 +837,7 @@ def search_tickets():
         result = ticket_service.get_all_tickets(page, per_page, filters)
 
         # Format tickets
-        formatted_tickets = [current_app.response_manager.format_ticket_data(ticket) for ticket in result['tickets']]
+        formatted_tickets = current_app.response_manager.format_ticket_rows(result['columns'], result['rows'])
 
         response_data = {
             'tickets': formatted_tickets,
@@ -954,19 +1032,7 @@ def get_ticket_resolutions(ticket_id):
 
         resolutions = current_app.db_manager.execute_query(query, (ticket_id,))
 
-        # Format resolutions manually since format_resolution_data doesn't exist
-        formatted_resolutions = []
-        for resolution in (resolutions or []):
-            formatted_resolutions.append({
-                'resolution_id': str(resolution['resolution_id']),
-                'ticket_id': str(resolution['ticket_id']),
-                'resolution_notes': resolution['resolution_notes'],
-                'resolved_by': str(resolution['resolved_by']),
-                'resolved_by_name': resolution['resolved_by_name'],
-                'resolved_by_role': resolution['resolved_by_role'],
-                'resolved_at': resolution['resolved_at'].isoformat() if resolution['resolved_at'] else None,
-                'created_at': resolution['created_at'].isoformat() if resolution['created_at'] else None
-            })
+        formatted_resolutions = [_format_resolution(resolution) for resolution in (resolutions or [])]
 
         return current_app.response_manager.success(formatted_resolutions)
 
@@ -11,8 +11,82 @@ from datetime import datetime
 from typing import Dict, List, Optional, Any
 from core.database import DatabaseManager
 from core.auth import AuthManager
+from core.audit import write_audit_row
+from core.config_cache import get_config_cache
 import logging
 
+# Ticket columns and lookups shared by the detail and composite (/full) queries
+TICKET_DETAIL_COLUMNS = """
+    t.ticket_id, t.ticket_number, t.client_id, t.site_id, t.asset_id,
+    t.created_by, t.assigned_to, t.subject, t.description, t.affected_person,
+    t.affected_person_phone, t.affected_person_contact, t.notification_email, t.additional_emails, t.priority, t.category_id,
+    t.status, t.channel, t.is_email_originated, t.from_email,
+    t.email_message_id, t.email_thread_id, t.approval_status,
+    t.approved_by, t.approved_at, t.created_at, t.updated_at,
+    t.assigned_at, t.resolved_at, t.closed_at, t.resolution_notes,
+    c.name as client_name,
+    s.name as site_name, s.address as site_address,
+    cat.name as category_name,
+    creator.name as created_by_name, creator.email as created_by_email,
+    assignee.name as assigned_to_name, assignee.email as assigned_to_email
+"""
+TICKET_DETAIL_FROM = """
+FROM tickets t
+LEFT JOIN clients c ON t.client_id = c.client_id
+LEFT JOIN sites s ON t.site_id = s.site_id
+LEFT JOIN categories cat ON t.category_id = cat.category_id
+LEFT JOIN users creator ON t.created_by = creator.user_id
+LEFT JOIN users assignee ON t.assigned_to = assignee.user_id
+"""
+
+# Related collections of a ticket as json_agg subqueries over the outer ``t``;
+# same columns and order as the per-collection endpoints
+TICKET_SECTIONS = {
+    'comments': """
+        SELECT tc.comment_id, tc.ticket_id, tc.user_id, tc.comment_text as content,
+               tc.is_internal, tc.is_email_reply, tc.email_message_id,
+               tc.created_at, tc.updated_at,
+               u.name as user_name, u.role as user_role
+        FROM ticket_comments tc
+        LEFT JOIN users u ON tc.user_id = u.user_id
+        WHERE tc.ticket_id = t.ticket_id AND (%(include_internal)s OR NOT COALESCE(tc.is_internal, false))
+        ORDER BY tc.created_at ASC
+    """,
+    'attachments': """
+        SELECT fa.attachment_id, fa.ticket_id, fa.filename, fa.original_filename,
+               fa.file_size, fa.mime_type, fa.uploaded_by, fa.created_at,
+               u.name as uploaded_by_name, u.role as uploaded_by_role
+        FROM file_attachments fa
+        LEFT JOIN users u ON fa.uploaded_by = u.user_id
+        WHERE fa.ticket_id = t.ticket_id
+        ORDER BY fa.created_at ASC
+    """,
+    'activities': """
+        SELECT ta.activity_id, ta.ticket_id, ta.user_id, ta.action,
+               ta.description, ta.created_at,
+               u.name as user_name, u.role as user_role
+        FROM ticket_activities ta
+        LEFT JOIN users u ON ta.user_id = u.user_id
+        WHERE ta.ticket_id = t.ticket_id
+        ORDER BY ta.created_at DESC
+    """,
+    'sla': """
+        SELECT st.*
+        FROM sla_tracking st
+        WHERE st.ticket_id = t.ticket_id
+        ORDER BY st.created_at DESC
+    """,
+    'resolutions': """
+        SELECT tr.resolution_id, tr.ticket_id, tr.resolution_notes,
+               tr.resolved_by, tr.resolved_at, tr.created_at,
+               u.name as resolved_by_name, u.role as resolved_by_role
+        FROM ticket_resolutions tr
+        LEFT JOIN users u ON tr.resolved_by = u.user_id
+        WHERE tr.ticket_id = t.ticket_id
+        ORDER BY tr.resolved_at DESC
+    """
+}
+
 class TicketService:
     """Service class for complete ticket lifecycle management"""
     
@@ -24,6 +98,10 @@ class TicketService:
     def _get_system_config(self, config_key: str, default_value: str = None) -> str:
         """Get system configuration value"""
         try:
+            cache = get_config_cache()
+            if cache:
+                return cache.get_system_config(config_key, default_value)
+
             query = "SELECT config_value FROM system_config WHERE config_key = %s"
             result = self.db.execute_query(query, (config_key,), fetch='one')
             return result['config_value'] if result else default_value
@@ -125,10 +203,12 @@ class TicketService:
             """
             
             final_params = params + [per_page, offset]
-            tickets = self.db.execute_query(query, tuple(final_params))
-            
+            columns, rows = self.db.execute_rows(query, tuple(final_params))
+
+            # Row tuples; format with ResponseManager.format_ticket_rows
             return {
-                'tickets': tickets or [],
+                'columns': columns,
+                'rows': rows,
                 'total': total,
                 'page': page,
                 'per_page': per_page,
@@ -145,27 +225,7 @@ class TicketService:
             if not self.db.validate_uuid(ticket_id):
                 return None
                 
-            query = """
-            SELECT t.ticket_id, t.ticket_number, t.client_id, t.site_id, t.asset_id,
-                   t.created_by, t.assigned_to, t.subject, t.description, t.affected_person,
-                   t.affected_person_phone, t.affected_person_contact, t.notification_email, t.additional_emails, t.priority, t.category_id,
-                   t.status, t.channel, t.is_email_originated, t.from_email,
-                   t.email_message_id, t.email_thread_id, t.approval_status,
-                   t.approved_by, t.approved_at, t.created_at, t.updated_at,
-                   t.assigned_at, t.resolved_at, t.closed_at, t.resolution_notes,
-                   c.name as client_name,
-                   s.name as site_name, s.address as site_address,
-                   cat.name as category_name,
-                   creator.name as created_by_name, creator.email as created_by_email,
-                   assignee.name as assigned_to_name, assignee.email as assigned_to_email
-            FROM tickets t
-            LEFT JOIN clients c ON t.client_id = c.client_id
-            LEFT JOIN sites s ON t.site_id = s.site_id
-            LEFT JOIN categories cat ON t.category_id = cat.category_id
-            LEFT JOIN users creator ON t.created_by = creator.user_id
-            LEFT JOIN users assignee ON t.assigned_to = assignee.user_id
-            WHERE t.ticket_id = %s
-            """
+            query = f"SELECT {TICKET_DETAIL_COLUMNS} {TICKET_DETAIL_FROM} WHERE t.ticket_id = %s"
             
             return self.db.execute_query(query, (ticket_id,), fetch='one')
             
@@ -173,6 +233,32 @@ class TicketService:
             self.logger.error(f"Error getting ticket {ticket_id}: {e}")
             raise
     
+    def get_ticket_full(self, ticket_id: str, sections: List[str],
+                        include_internal: bool = False) -> Optional[Dict]:
+        """Ticket plus the requested related collections in one query
+
+        Each section in ``sections`` (keys of TICKET_SECTIONS) is loaded by a
+        json_agg subquery and returned as a list of dicts under its name;
+        internal comments are left out unless ``include_internal``.
+        """
+        try:
+            if not self.db.validate_uuid(ticket_id):
+                return None
+
+            subqueries = ''.join(
+                f",\n    (SELECT COALESCE(json_agg(x), '[]'::json) FROM ({TICKET_SECTIONS[name]}) x) AS {name}"
+                for name in sections
+            )
+            query = f"SELECT {TICKET_DETAIL_COLUMNS.rstrip()}{subqueries} {TICKET_DETAIL_FROM} WHERE t.ticket_id = %(ticket_id)s"
+
+            return self.db.execute_query(
+                query, {'ticket_id': ticket_id, 'include_internal': include_internal}, fetch='one'
+            )
+
+        except Exception as e:
+            self.logger.error(f"Error getting full ticket {ticket_id}: {e}")
+            raise
+    
     def create_ticket(self, ticket_data: Dict[str, Any], created_by: str) -> Dict[str, Any]:
         """Create a new ticket with MSP workflow validation"""
         try:
@@ -378,8 +464,9 @@ class TicketService:
                 'created_at': datetime.utcnow()
             }
             
-            self.db.execute_insert('ticket_activities', activity_data)
-            
+            # Written asynchronously in batches by the app's AuditWriter
+            write_audit_row('ticket_activities', activity_data, self.db)
+
         except Exception as e:
             self.logger.error(f"Error creating activity log: {e}")
             # Don't fail the main operation for logging errors
@@ -1012,13 +1099,15 @@ class TicketService:
             if ticket['status'] == 'cerrado':
                 return {'success': False, 'error': 'Cannot delete closed tickets'}
 
-            # Log activity before deletion
-            self._create_activity_log(
-                ticket['ticket_id'],
-                current_user_id,
-                'deleted',
-                f"Ticket eliminado (acción masiva)"
-            )
+            # Record the deletion in audit_log (ticket_activities rows are removed below)
+            write_audit_row('audit_log', {
+                'user_id': current_user_id,
+                'action': 'ticket_deleted',
+                'table_name': 'tickets',
+                'record_id': ticket['ticket_id'],
+                'details': f"Ticket {ticket.get('ticket_number', ticket['ticket_id'])} eliminado (acción masiva)",
+                'timestamp': datetime.utcnow()
+            }, self.db)
 
             # Delete related records first to avoid foreign key constraint violations
             # Delete in order to respect dependencies
@@ -1086,7 +1175,8 @@ class TicketService:
                 fetch='none'
             )
 
-            # Delete from file_attachments
+            # Delete from file_attachments (blob reference counts drop via trigger;
+            # unreferenced files are reclaimed later by BlobStore.collect_garbage)
             self.db.execute_query(
                 "DELETE FROM file_attachments WHERE ticket_id = %s",
                 (ticket['ticket_id'],),
@@ -30,8 +30,8 @@ def get_users():
         user_client_id = claims.get('client_id')
 
         # Get query parameters
-        page = request.args.get('page', 1, type=int)
-        per_page = min(request.args.get('per_page', 20, type=int), 100)
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = max(min(request.args.get('per_page', 20, type=int), 100), 1)
         search = request.args.get('search', '').strip()
         role = request.args.get('role', '').strip()
 
@@ -43,50 +43,18 @@ def get_users():
             # Force role to technician for clients
             role = 'technician'
 
-        # Build search condition
-        search_condition = "WHERE u.is_active = true"
-        search_params = []
-
-        if search:
-            search_condition += " AND (u.name ILIKE %s OR u.email ILIKE %s)"
-            search_term = f"%{search}%"
-            search_params.extend([search_term, search_term])
-
-        if role:
-            search_condition += " AND u.role = %s"
-            search_params.append(role)
-
-        # Get total count
-        count_query = f"SELECT COUNT(*) as total FROM users u {search_condition}"
-        total_result = current_app.db_manager.execute_query(count_query, tuple(search_params), fetch='one')
-        total = total_result['total'] if total_result else 0
-
-        # Calculate offset
-        offset = (page - 1) * per_page
-
-        # Get users with pagination
-        query = f"""
-        SELECT u.user_id, u.client_id, u.name, u.email, u.role, u.phone, u.is_active,
-               u.last_login, u.created_at, u.updated_at,
-               c.name as client_name
-        FROM users u
-        LEFT JOIN clients c ON u.client_id = c.client_id
-        {search_condition}
-        ORDER BY u.name
-        LIMIT %s OFFSET %s
-        """
-
-        params = search_params + [per_page, offset]
-        users = current_app.db_manager.execute_query(query, tuple(params))
+        users_service = UserService(current_app.db_manager, current_app.auth_manager)
+        page_result = users_service.get_all_users(page=page, per_page=per_page, search=search or None, role=role or None)
+        total = page_result['total']
 
         # Format response
         result = {
-            'users': [current_app.response_manager.format_user_data(user) for user in (users or [])],
+            'users': [current_app.response_manager.format_user_data(user) for user in page_result['users']],
             'pagination': {
                 'page': page,
                 'per_page': per_page,
                 'total': total,
-                'total_pages': (total + per_page - 1) // per_page,
+                'total_pages': page_result['total_pages'],
                 'has_next': page * per_page < total,
                 'has_prev': page > 1
             }
@@ -21,58 +21,64 @@ class UserService:
         self.auth = auth_manager
         self.logger = logging.getLogger(__name__)
     
-    def get_all_users(self, page: int = 1, per_page: int = 20, search: str = None) -> Dict[str, Any]:
-        """Get all users with pagination and search"""
+    def get_all_users(self, page: int = 1, per_page: int = 20, search: str = None,
+                      role: str = None) -> Dict[str, Any]:
+        """Get one page of active users with pagination and trigram-indexed search"""
         try:
-            # Build search condition
-            search_condition = ""
+            search_condition = "WHERE u.is_active = true"
             search_params = []
-            
+
             if search:
-                search_condition = """
-                WHERE (name ILIKE %s OR email ILIKE %s) 
-                AND is_active = true
-                """
-                search_term = f"%{search}%"
-                search_params = [search_term, search_term]
-            else:
-                search_condition = "WHERE is_active = true"
-            
-            # Get total count
-            count_query = f"SELECT COUNT(*) as total FROM users {search_condition}"
-            total_result = self.db.execute_query(count_query, tuple(search_params), fetch='one')
-            total = total_result['total'] if total_result else 0
-            
-            # Calculate offset
+                search_condition += " AND (u.name ILIKE %s OR u.email ILIKE %s)"
+                search_term = ValidationUtils.like_pattern(search)
+                search_params.extend([search_term, search_term])
+
+            if role:
+                search_condition += " AND u.role = %s"
+                search_params.append(role)
+
             offset = (page - 1) * per_page
-            
-            # Get users with pagination
+
+            # Total comes from the window count, no separate COUNT(*) round trip
             query = f"""
-            SELECT user_id, client_id, name, email, role, phone, is_active, 
-                   last_login, created_at, updated_at,
-                   c.name as client_name
+            SELECT u.user_id, u.client_id, u.name, u.email, u.role, u.phone, u.is_active,
+                   u.last_login, u.created_at, u.updated_at,
+                   c.name as client_name,
+                   COUNT(*) OVER () as total_count
             FROM users u
             LEFT JOIN clients c ON u.client_id = c.client_id
             {search_condition}
-            ORDER BY u.name
+            ORDER BY u.name, u.user_id
             LIMIT %s OFFSET %s
             """
-            
+
             params = search_params + [per_page, offset]
-            users = self.db.execute_query(query, tuple(params))
-            
+            users = self.db.execute_query(query, tuple(params)) or []
+
+            if users:
+                total = users[0]['total_count']
+            elif page > 1:
+                count_query = f"SELECT COUNT(*) as total FROM users u {search_condition}"
+                total_result = self.db.execute_query(count_query, tuple(search_params), fetch='one')
+                total = total_result['total'] if total_result else 0
+            else:
+                total = 0
+
+            for user in users:
+                user.pop('total_count', None)
+
             return {
-                'users': users or [],
+                'users': users,
                 'total': total,
                 'page': page,
                 'per_page': per_page,
                 'total_pages': (total + per_page - 1) // per_page
             }
-            
+
         except Exception as e:
             self.logger.error(f"Error getting users: {e}")
             raise
-    
+
     def get_user_by_id(self, user_id: str) -> Optional[Dict]:
         """Get user by ID with client information"""
         try:
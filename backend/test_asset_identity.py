@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test agent registration identity matching (asset_identities)
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.agents.identity import normalize_mac, normalize_serial, identity_components
+from modules.agents.service import AgentsService
+
+
+class RegistrationDB:
+    def __init__(self, result):
+        self.result = result
+        self.queries = []
+
+    def execute_query(self, query, params=None, fetch='all', commit=None):
+        self.queries.append((query, params, commit))
+        return self.result
+
+
+HARDWARE_INFO = {
+    'computer_name': ' PC-CONTA-01 ',
+    'network_interfaces': [
+        {'interface': 'Ethernet', 'mac_address': 'aa-bb-cc-dd-ee-01'},
+        {'interface': 'Wi-Fi', 'mac_address': 'AA:BB:CC:DD:EE:02'},
+        {'interface': 'Loopback', 'mac_address': '00:00:00:00:00:00'},
+        {'interface': 'Tunnel', 'mac_address': None}
+    ],
+    'serials': {'bios': 'pf2abc12', 'board': 'To be filled by O.E.M.', 'system_uuid': '00000000-0000-0000-0000-000000000000'}
+}
+
+
+def test_components_are_normalized():
+    assert normalize_mac('aabb.ccdd.ee01') == 'AA:BB:CC:DD:EE:01'
+    assert normalize_mac('not-a-mac') == ''
+    assert normalize_serial('board', 'Default string') == ''
+    assert normalize_serial('board', '0000000') == ''
+
+    name, macs, serials = identity_components(HARDWARE_INFO)
+    assert name == 'PC-CONTA-01'
+    assert macs == ['AA:BB:CC:DD:EE:01', 'AA:BB:CC:DD:EE:02']
+    assert serials == ['bios:PF2ABC12']
+
+    assert identity_components({'computer_name': 'OLD-AGENT'}) == ('OLD-AGENT', [], [])
+
+
+def test_registration_is_one_round_trip():
+    db = RegistrationDB({
+        'is_valid': True, 'error_message': None, 'asset_id': 'asset-1',
+        'client_id': 'client-1', 'site_id': 'site-1', 'client_name': 'Cliente',
+        'site_name': 'Matriz', 'existing_asset': True, 'matched_by': 'components'
+    })
+    service = AgentsService(db)
+    service._generate_agent_jwt_token = lambda *args: 'jwt'
+    service._get_agent_config = lambda: {}
+
+    result = service.register_agent_with_token('LANET-TOKEN', HARDWARE_INFO, '10.0.0.5, 172.16.0.1', 'agent')
+
+    assert len(db.queries) == 1
+    query, params, commit = db.queries[0]
+    assert 'register_agent_asset' in query and commit is True
+    assert params[1] == 'PC-CONTA-01'
+    assert params[3] == ['AA:BB:CC:DD:EE:01', 'AA:BB:CC:DD:EE:02']
+    assert params[4] == ['bios:PF2ABC12']
+    assert params[6] == '10.0.0.5'
+    assert result['asset_id'] == 'asset-1' and result['existing_asset'] is True
+
+
+def test_invalid_token_raises_without_extra_logging():
+    db = RegistrationDB({'is_valid': False, 'error_message': 'Token has expired'})
+    service = AgentsService(db)
+    try:
+        service.register_agent_with_token('LANET-OLD', HARDWARE_INFO, 'unknown', 'agent')
+        assert False, 'expected ValueError'
+    except ValueError as e:
+        assert str(e) == 'Token has expired'
+    assert len(db.queries) == 1
+    assert db.queries[0][1][6] is None
+
+
+if __name__ == '__main__':
+    print("🔧 Testing agent registration identities")
+    print("=" * 50)
+    test_components_are_normalized()
+    test_registration_is_one_round_trip()
+    test_invalid_token_raises_without_extra_logging()
+    print("✅ All asset identity tests passed")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test the asynchronous audit writer and the log_user_action decorator
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import psycopg2
+from flask import Flask, g
+
+from core.audit import AuditWriter
+from utils.security import log_user_action
+
+
+class RecordingWriter(AuditWriter):
+    """AuditWriter whose inserts are captured instead of sent to PostgreSQL"""
+
+    def __init__(self, spool_dir, fail_with=None):
+        super().__init__(db_manager=None, spool_dir=spool_dir, flush_interval=0.01)
+        self.inserted = []
+        self.insert_calls = 0
+        self.fail_with = fail_with
+
+    def _insert_rows(self, table, columns, rows):
+        self.insert_calls += 1
+        if self.fail_with:
+            raise self.fail_with
+        self.inserted.extend((table, row) for row in rows)
+        return len(rows)
+
+
+def test_rows_are_batched_per_table():
+    with tempfile.TemporaryDirectory() as spool_dir:
+        writer = RecordingWriter(spool_dir)
+        for i in range(5):
+            writer.enqueue('ticket_activities', {'ticket_id': str(i), 'action': 'updated'})
+        writer.enqueue('audit_log', {'action': 'login'})
+        writer.shutdown()
+
+        assert len(writer.inserted) == 6
+        assert writer.insert_calls <= 3
+
+
+def test_unknown_tables_are_rejected():
+    with tempfile.TemporaryDirectory() as spool_dir:
+        writer = RecordingWriter(spool_dir)
+        writer.enqueue('users; DROP TABLE users', {'x': 1})
+        writer.shutdown()
+        assert writer.inserted == []
+
+
+def test_database_outage_spools_and_replays():
+    with tempfile.TemporaryDirectory() as spool_dir:
+        writer = RecordingWriter(spool_dir, fail_with=psycopg2.OperationalError('down'))
+        writer._write([('audit_log', {'action': 'login'}), ('audit_log', {'action': 'logout'})])
+        assert os.path.exists(writer.spool_path)
+
+        writer.fail_with = None
+        writer._replay_spool()
+        assert [row['action'] for _, row in writer.inserted] == ['login', 'logout']
+        assert not os.path.exists(writer.spool_path)
+
+
+def test_replay_keeps_spool_until_rows_are_written():
+    with tempfile.TemporaryDirectory() as spool_dir:
+        writer = RecordingWriter(spool_dir)
+        writer._spool([('audit_log', {'action': f'a{i}'}) for i in range(5)])
+        writer.batch_size = 2
+
+        # The insert of the second batch raises (e.g. the process is killed)
+        original = writer._insert_rows
+
+        def fail_second_call(table, columns, rows):
+            if writer.insert_calls == 1:
+                writer.insert_calls += 1
+                raise RuntimeError('crash')
+            return original(table, columns, rows)
+
+        writer._insert_rows = fail_second_call
+        try:
+            writer._replay_spool()
+            assert False, 'replay did not fail'
+        except RuntimeError:
+            pass
+
+        # Only the written batch left the file
+        assert [row['action'] for _, row in writer.inserted] == ['a3', 'a4']
+        writer._insert_rows = original
+        writer._replay_spool()
+        assert sorted(row['action'] for _, row in writer.inserted) == ['a0', 'a1', 'a2', 'a3', 'a4']
+        assert not os.path.exists(writer.spool_path + '.replay')
+
+
+def test_log_user_action_never_reruns_handler():
+    app = Flask(__name__)
+    calls = []
+
+    @log_user_action('change_password', 'users')
+    def view():
+        calls.append(1)
+        return 'ok'
+
+    # No audit writer and no db_manager: logging fails, the view must run once
+    with app.test_request_context('/api/auth/change-password', method='POST'):
+        g.current_user_id = 'user-1'
+        assert view() == 'ok'
+
+    assert calls == [1]
+
+
+if __name__ == '__main__':
+    print("🔧 Testing AuditWriter")
+    print("=" * 50)
+    test_rows_are_batched_per_table()
+    test_unknown_tables_are_rejected()
+    test_database_outage_spools_and_replays()
+    test_replay_keeps_spool_until_rows_are_written()
+    test_log_user_action_never_reruns_handler()
+    print("✅ All AuditWriter tests passed")
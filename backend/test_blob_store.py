@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test content-addressed attachment storage (BlobStore)
+"""
+
+import io
+import os
+import sys
+import time
+import hashlib
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.storage import BlobStore
+
+
+class FakeDB:
+    """Minimal stand-in for DatabaseManager.execute_query used by the GC"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def execute_query(self, query, params=None, fetch='all'):
+        self.queries.append((query, params))
+        if 'DELETE FROM file_blobs' in query:
+            return [r for r in self.rows if r['blob_hash'] in params[0]]
+        if 'SELECT blob_hash, file_size FROM file_blobs' in query:
+            return self.rows
+        if 'SELECT blob_hash FROM file_blobs' in query:
+            return [{'blob_hash': h} for h in params[0] if h in {r['blob_hash'] for r in self.rows}]
+        return []
+
+
+def test_store_deduplicates_identical_content():
+    with tempfile.TemporaryDirectory() as root:
+        store = BlobStore(root)
+        payload = b'logo-firma' * 10000
+
+        first = store.store_stream(io.BytesIO(payload))
+        second = store.store_bytes(payload)
+
+        assert first['created'] is True
+        assert second['created'] is False
+        assert first['file_hash'] == hashlib.sha256(payload).hexdigest()
+        assert first['file_path'] == second['file_path']
+        assert first['file_size'] == len(payload)
+
+        # Sharded layout: <root>/<aa>/<bb>/<hash>
+        relative = os.path.relpath(first['file_path'], root).split(os.sep)
+        assert relative == [first['file_hash'][:2], first['file_hash'][2:4], first['file_hash']]
+
+        with store.open(first['file_hash']) as f:
+            assert f.read() == payload
+        assert os.listdir(store.tmp_dir) == []
+
+
+def test_store_rejects_oversized_stream():
+    with tempfile.TemporaryDirectory() as root:
+        store = BlobStore(root)
+        try:
+            store.store_bytes(b'x' * (BlobStore.CHUNK_SIZE * 3), max_size=BlobStore.CHUNK_SIZE)
+            assert False, 'expected ValueError'
+        except ValueError:
+            pass
+        assert os.listdir(store.tmp_dir) == []
+
+
+def test_resolve_path_falls_back_to_legacy_path():
+    with tempfile.TemporaryDirectory() as root:
+        store = BlobStore(root)
+        assert store.resolve_path(None, '/old/path.pdf') == '/old/path.pdf'
+        assert store.resolve_path('0' * 64, '/old/path.pdf') == '/old/path.pdf'
+
+        blob = store.store_bytes(b'contenido')
+        assert store.resolve_path(blob['file_hash'], '/old/path.pdf') == blob['file_path']
+
+
+def test_collect_garbage_removes_only_expired_blobs():
+    with tempfile.TemporaryDirectory() as root:
+        store = BlobStore(root)
+        old_blob = store.store_bytes(b'viejo')
+        fresh_blob = store.store_bytes(b'nuevo')
+
+        past = time.time() - 3 * 3600
+        os.utime(old_blob['file_path'], (past, past))
+
+        db = FakeDB([
+            {'blob_hash': old_blob['file_hash'], 'file_size': old_blob['file_size']},
+            {'blob_hash': fresh_blob['file_hash'], 'file_size': fresh_blob['file_size']},
+        ])
+        stats = store.collect_garbage(db, grace_period_minutes=60)
+
+        assert stats['blobs_deleted'] == 1
+        assert stats['bytes_freed'] == old_blob['file_size']
+        assert not store.exists(old_blob['file_hash'])
+        assert store.exists(fresh_blob['file_hash'])
+        # The fresh blob keeps its row, so it is reconsidered on a later run
+        deleted_hashes = [params[0] for query, params in db.queries if 'DELETE FROM file_blobs' in query][0]
+        assert deleted_hashes == [old_blob['file_hash']]
+
+
+def test_find_orphan_files():
+    with tempfile.TemporaryDirectory() as root:
+        store = BlobStore(root)
+        known = store.store_bytes(b'conocido')
+        orphan = store.store_bytes(b'huerfano')
+
+        db = FakeDB([{'blob_hash': known['file_hash'], 'file_size': known['file_size']}])
+        assert store.find_orphan_files(db) == [orphan['file_hash']]
+
+
+if __name__ == '__main__':
+    print("🔧 Testing BlobStore")
+    print("=" * 50)
+    test_store_deduplicates_identical_content()
+    test_store_rejects_oversized_stream()
+    test_resolve_path_falls_back_to_legacy_path()
+    test_collect_garbage_removes_only_expired_blobs()
+    test_find_orphan_files()
+    print("✅ All BlobStore tests passed")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test the server-driven agent heartbeat cadence and load shedding
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.agents.cadence import CadenceController
+
+
+class FleetDB:
+    def __init__(self, active=0):
+        self.active = active
+        self.queries = 0
+
+    def execute_query(self, query, params=None, fetch='all', commit=None):
+        self.queries += 1
+        return {'active': self.active}
+
+
+QUIET = {'cpu_usage': 10, 'memory_usage': 40, 'disk_usage': 50}
+BUSY = {'cpu_percent': 60, 'memory_percent': 80, 'disk_percent': 50}
+HOT = {'cpu_percent': 95, 'memory_percent': 40, 'disk_percent': 50}
+
+
+def test_plan_is_deterministic_and_jittered():
+    cadence = CadenceController(FleetDB())
+    first = cadence.plan('asset-1', BUSY)
+    assert first == cadence.plan('asset-1', BUSY)
+    assert 270 <= first['next_heartbeat'] <= 330
+    assert 0.9 * 86400 <= first['next_full_inventory'] <= 1.1 * 86400
+
+    intervals = {cadence.plan(f'asset-{i}', BUSY)['next_heartbeat'] for i in range(50)}
+    assert len(intervals) > 10
+
+
+def test_health_scales_interval():
+    cadence = CadenceController(FleetDB())
+    assert cadence.health(HOT) == 'alerting'
+    assert cadence.health(QUIET) == 'stable'
+    assert cadence.health({}) == 'normal'
+
+    assert cadence.plan('a', HOT)['next_heartbeat'] <= 132
+    assert cadence.plan('a', QUIET)['next_heartbeat'] >= 540
+
+
+def test_fleet_size_stretches_interval_and_is_cached():
+    db = FleetDB(active=20000)
+    cadence = CadenceController(db)
+    # 20000 assets at 20 heartbeats/s -> ~1000s, capped at the 1800s maximum when stable
+    assert 900 <= cadence.plan('a', BUSY)['next_heartbeat'] <= 1100
+    assert cadence.plan('a', QUIET)['next_heartbeat'] <= 1800 * 1.1
+    assert db.queries == 1
+
+
+def test_shedding_drops_full_before_status():
+    cadence = CadenceController(FleetDB())
+    assert cadence.shed('a', 'full') is None
+
+    contexts = [cadence.track() for _ in range(14)]
+    for context in contexts:
+        context.__enter__()
+    retry_after = cadence.shed('a', 'full')
+    assert 60 <= retry_after < 120
+    assert cadence.shed('a', 'status') is None
+
+    for _ in range(3):
+        contexts.append(cadence.track())
+        contexts[-1].__enter__()
+    assert cadence.shed('a', 'status') is not None
+
+    for context in contexts:
+        context.__exit__(None, None, None)
+    assert cadence.pressure() == 0
+
+
+if __name__ == '__main__':
+    print("🔧 Testing CadenceController")
+    print("=" * 50)
+    test_plan_is_deterministic_and_jittered()
+    test_health_scales_interval()
+    test_fleet_size_stretches_interval_and_is_cached()
+    test_shedding_drops_full_before_status()
+    print("✅ All CadenceController tests passed")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test conditional GET: 304 before the view runs, RBAC-scoped tags, Redis body cache and fallbacks
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, jsonify
+from flask_jwt_extended import JWTManager, create_access_token, jwt_required
+from werkzeug.http import http_date
+
+from core.conditional import conditional_get, change_version, RESPONSE_CACHE_PREFIX
+
+CLIENT_A = '11111111-2222-3333-4444-555555555555'
+CLIENT_B = '99999999-2222-3333-4444-555555555555'
+
+
+class FakeDB:
+    """change_counters with per-client rows, summed for staff like the real query"""
+
+    def __init__(self):
+        self.counters = {}
+        self.fail = False
+
+    def bump(self, resource, client_id, when):
+        version, _ = self.counters.get((resource, client_id), (0, None))
+        self.counters[(resource, client_id)] = (version + 1, when)
+
+    def execute_query(self, query, params=None, fetch='all', commit=None):
+        if self.fail:
+            raise RuntimeError('relation "change_counters" does not exist')
+        resources, client_id = params[0], (params[1] if len(params) > 1 else None)
+        rows = {}
+        for (resource, owner), (version, when) in self.counters.items():
+            if resource in resources and (client_id is None or owner == client_id):
+                row = rows.setdefault(resource, {'resource': resource, 'version': 0, 'updated_at': None})
+                row['version'] += version
+                row['updated_at'] = max(filter(None, (row['updated_at'], when)), default=None)
+        return list(rows.values())
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+
+def build_app(redis_client=None):
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = 'test-secret'
+    JWTManager(app)
+    app.db_manager = FakeDB()
+    app.redis_client = redis_client
+    app.view_calls = 0
+
+    @app.route('/tickets')
+    @jwt_required()
+    @conditional_get(lambda: change_version('tickets'), cache_ttl=60)
+    def tickets():
+        app.view_calls += 1
+        return jsonify({'success': True, 'data': {'calls': app.view_calls}})
+
+    @app.route('/clients/<client_id>/tickets')
+    @jwt_required()
+    @conditional_get(lambda client_id: change_version('tickets'), cache_ttl=60)
+    def client_tickets(client_id):
+        app.view_calls += 1
+        return jsonify({'success': True, 'data': {'client_id': client_id}})
+
+    @app.route('/tickets/<ticket_id>')
+    @jwt_required()
+    @conditional_get(lambda ticket_id: None)
+    def ticket(ticket_id):
+        app.view_calls += 1
+        return jsonify({'success': True, 'data': {'ticket_id': ticket_id}})
+
+    return app
+
+
+def headers(app, role, client_id=None, **extra):
+    with app.app_context():
+        token = create_access_token('u1', additional_claims={'role': role, 'client_id': client_id})
+    return dict({'Authorization': 'Bearer ' + token}, **extra)
+
+
+def test_not_modified_skips_view():
+    app = build_app()
+    client = app.test_client()
+    changed = datetime.now(timezone.utc) - timedelta(minutes=5)
+    app.db_manager.bump('tickets', CLIENT_A, changed)
+
+    first = client.get('/tickets', headers=headers(app, 'technician'))
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and app.view_calls == 1
+    assert first.headers['Cache-Control'] == 'private, no-cache' and 'Authorization' in first.headers['Vary']
+    assert first.last_modified == changed.replace(microsecond=0)
+
+    again = client.get('/tickets', headers=headers(app, 'technician', **{'If-None-Match': etag}))
+    assert again.status_code == 304 and again.data == b'' and app.view_calls == 1
+
+    since = client.get('/tickets', headers=headers(app, 'technician', **{'If-Modified-Since': http_date(changed)}))
+    assert since.status_code == 304 and app.view_calls == 1
+
+    # Query string is part of the tag
+    assert client.get('/tickets?status=open', headers=headers(
+        app, 'technician', **{'If-None-Match': etag})).status_code == 200
+
+    app.db_manager.bump('tickets', CLIENT_B, datetime.now(timezone.utc))
+    after = client.get('/tickets', headers=headers(app, 'technician', **{'If-None-Match': etag}))
+    assert after.status_code == 200 and after.headers['ETag'] != etag
+
+
+def test_scope_per_client():
+    app = build_app()
+    client = app.test_client()
+    app.db_manager.bump('tickets', CLIENT_A, datetime.now(timezone.utc))
+
+    user_a = client.get('/tickets', headers=headers(app, 'client_admin', CLIENT_A))
+    etag_a = user_a.headers['ETag']
+
+    # Another tenant presenting the same tag never gets a 304
+    assert client.get('/tickets', headers=headers(
+        app, 'client_admin', CLIENT_B, **{'If-None-Match': etag_a})).status_code == 200
+
+    # Changes of other clients leave client A's version alone
+    app.db_manager.bump('tickets', CLIENT_B, datetime.now(timezone.utc))
+    assert client.get('/tickets', headers=headers(
+        app, 'client_admin', CLIENT_A, **{'If-None-Match': etag_a})).status_code == 304
+
+
+def test_redis_body_cache():
+    redis_client = FakeRedis()
+    app = build_app(redis_client)
+    client = app.test_client()
+
+    first = client.get('/tickets', headers=headers(app, 'admin'))
+    assert first.status_code == 200 and 'X-Cache' not in first.headers
+    assert list(redis_client.store) == [RESPONSE_CACHE_PREFIX + first.headers['ETag'].strip('"')]
+
+    # A second admin without the tag is served from Redis
+    hit = client.get('/tickets', headers=headers(app, 'admin'))
+    assert hit.headers['X-Cache'] == 'HIT' and hit.get_json() == first.get_json()
+    assert app.view_calls == 1
+
+    # Different scope, different entry
+    client.get('/tickets', headers=headers(app, 'client_admin', CLIENT_A))
+    assert app.view_calls == 2 and len(redis_client.store) == 2
+
+    # Path arguments are part of the tag: one resource's body never answers another
+    first_a = client.get(f'/clients/{CLIENT_A}/tickets', headers=headers(app, 'admin'))
+    first_b = client.get(f'/clients/{CLIENT_B}/tickets', headers=headers(app, 'admin'))
+    assert first_a.headers['ETag'] != first_b.headers['ETag']
+    assert first_b.get_json()['data']['client_id'] == CLIENT_B and app.view_calls == 4
+
+
+def test_fallbacks():
+    app = build_app()
+    client = app.test_client()
+
+    # No version key: tag hashed from the rendered body
+    first = client.get('/tickets/t1', headers=headers(app, 'technician'))
+    etag = first.headers['ETag']
+    assert client.get('/tickets/t1', headers=headers(
+        app, 'technician', **{'If-None-Match': etag})).status_code == 304
+    assert app.view_calls == 2
+
+    # Counters missing (migration not applied): same, so a changed body gets a new tag
+    app.db_manager.fail = True
+    response = client.get('/tickets', headers=headers(app, 'technician'))
+    assert response.status_code == 200 and response.headers['ETag']
+    again = client.get('/tickets', headers=headers(app, 'technician', **{'If-None-Match': response.headers['ETag']}))
+    assert again.status_code == 200 and again.get_json()['data']['calls'] == 4
+
+
+if __name__ == '__main__':
+    print("🔧 Testing conditional GET")
+    print("=" * 50)
+    test_not_modified_skips_view()
+    test_scope_per_client()
+    test_redis_body_cache()
+    test_fallbacks()
+    print("✅ All conditional GET tests passed")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test the process-wide configuration cache
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.config_cache import ConfigCache
+
+
+class CountingDB:
+    """Stand-in DatabaseManager that counts round trips"""
+
+    def __init__(self):
+        self.calls = 0
+        self.system = {
+            'max_attachment_size_mb': '25',
+            'allowed_attachment_types': '.pdf, .png,.jpg',
+            'auto_close_resolved_tickets': 'true',
+            'agent_heartbeat_interval': '120',
+        }
+        self.email = {'config_id': 'cfg-1', 'smtp_password_encrypted': 'enc', 'is_default': True}
+
+    def execute_query(self, query, params=None, fetch='all'):
+        self.calls += 1
+        if 'system_config' in query:
+            return [{'config_key': k, 'config_value': v} for k, v in self.system.items()]
+        if 'email_configurations' in query:
+            return dict(self.email)
+        return None
+
+
+class FakeRedis:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+def test_system_config_is_loaded_once():
+    db = CountingDB()
+    cache = ConfigCache(db, ttl_seconds=60)
+
+    assert cache.get_system_int('max_attachment_size_mb', 10) == 25
+    assert cache.get_system_list('allowed_attachment_types') == ['.pdf', '.png', '.jpg']
+    assert cache.get_system_bool('auto_close_resolved_tickets') is True
+    assert cache.get_system_config('missing', 'x') == 'x'
+    assert cache.get_system_prefix('agent_') == {'heartbeat_interval': '120'}
+    assert db.calls == 1
+
+
+def test_ttl_expiry_reloads():
+    db = CountingDB()
+    cache = ConfigCache(db, ttl_seconds=0)
+    cache.get_system_config('max_attachment_size_mb')
+    cache.get_system_config('max_attachment_size_mb')
+    assert db.calls == 2
+
+
+def test_email_config_cached_and_invalidated():
+    db = CountingDB()
+    redis = FakeRedis()
+    cache = ConfigCache(db, ttl_seconds=60)
+    cache.redis = redis  # publish only; the listener thread is not needed here
+
+    first = cache.get_email_config()
+    first['smtp_host'] = 'mutated'
+    assert 'smtp_host' not in cache.get_email_config()
+    assert db.calls == 1
+
+    cache.invalidate('email')
+    cache.get_email_config()
+    assert db.calls == 2
+    assert redis.published == [('lanet:config:invalidate', 'email')]
+
+
+def test_secrets_are_decrypted_once():
+    from utils import security
+
+    calls = []
+    original = security.SecurityUtils.decrypt_password
+    security.SecurityUtils.decrypt_password = staticmethod(lambda value: calls.append(value) or 'secret')
+    try:
+        cache = ConfigCache(CountingDB())
+        assert cache.get_secret('enc') == 'secret'
+        assert cache.get_secret('enc') == 'secret'
+        assert calls == ['enc']
+
+        cache.invalidate('email', publish=False)
+        cache.get_secret('enc')
+        assert calls == ['enc', 'enc']
+    finally:
+        security.SecurityUtils.decrypt_password = original
+
+
+if __name__ == '__main__':
+    print("🔧 Testing ConfigCache")
+    print("=" * 50)
+    test_system_config_is_loaded_once()
+    test_ttl_expiry_reloads()
+    test_email_config_cached_and_invalidated()
+    test_secrets_are_decrypted_once()
+    print("✅ All ConfigCache tests passed")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test the paginated client/site/user directory queries
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.validators import ValidationUtils
+from modules.clients.service import ClientService
+from modules.sites.service import SitesService
+from modules.users.service import UserService
+
+
+class RecordingDB:
+    """Stand-in DatabaseManager returning canned rows and recording queries"""
+
+    def __init__(self, rows, total=None):
+        self.rows = rows
+        self.total = total
+        self.queries = []
+
+    def execute_query(self, query, params=None, fetch='all'):
+        self.queries.append((query, params))
+        if fetch == 'one':
+            return {'total': self.total}
+        return [dict(row) for row in self.rows]
+
+
+def test_like_pattern_escapes_wildcards():
+    assert ValidationUtils.like_pattern('50%_off') == '%50\\%\\_off%'
+
+
+def test_pagination_bounds():
+    assert ValidationUtils.validate_pagination('0', '5000', max_per_page=1000)['per_page'] == 1000
+    result = ValidationUtils.validate_pagination('x', None, default_per_page=50)
+    assert (result['page'], result['per_page']) == (1, 50)
+
+
+def test_clients_page_uses_single_query():
+    db = RecordingDB([{'client_id': 'c1', 'name': 'Acme', 'total_count': 42, 'total_sites': 3}])
+    result = ClientService(db, None).get_all_clients(page=2, per_page=10, search='ac')
+
+    assert len(db.queries) == 1
+    query, params = db.queries[0]
+    assert 'COUNT(DISTINCT' not in query
+    assert params == ('%ac%', '%ac%', '%ac%', 10, 10)
+    assert result['total'] == 42 and result['total_pages'] == 5
+    assert 'total_count' not in result['clients'][0]
+
+
+def test_unpaginated_clients_list_everything():
+    db = RecordingDB([{'client_id': 'c1', 'name': 'Acme', 'total_count': 1}])
+    result = ClientService(db, None).get_all_clients(per_page=None)
+
+    assert db.queries[0][1] == (None, 0)
+    assert result['total'] == 1 and result['total_pages'] == 1
+
+
+def test_page_past_the_end_falls_back_to_count():
+    db = RecordingDB([], total=7)
+    result = UserService(db, None).get_all_users(page=3, per_page=5, role='technician')
+
+    assert len(db.queries) == 2
+    assert result['users'] == [] and result['total'] == 7
+
+
+def test_sites_listing_without_cartesian_join():
+    db = RecordingDB([{'site_id': 's1', 'total_count': 1}])
+    result = SitesService(db).get_all_sites(page=1, per_page=50)
+
+    query, _ = db.queries[0]
+    assert 'COUNT(DISTINCT' not in query and 'GROUP BY' not in query
+    assert result['success'] and result['total'] == 1
+
+
+if __name__ == '__main__':
+    print("🔧 Testing directory listings")
+    print("=" * 50)
+    test_like_pattern_escapes_wildcards()
+    test_pagination_bounds()
+    test_clients_page_uses_single_query()
+    test_unpaginated_clients_list_everything()
+    test_page_past_the_end_falls_back_to_count()
+    test_sites_listing_without_cartesian_join()
+    print("✅ All directory listing tests passed")
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Test real-time events: RBAC filtering, fan-out, replay from an event id and the SSE endpoint
+"""
+
+import os
+import sys
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+
+from core.auth import AuthManager
+from core.events import EventBroker, Subscription, event_visible, format_sse
+from core.response import ResponseManager
+from modules.events import routes as events_routes
+
+CLIENT_A = '11111111-2222-3333-4444-555555555555'
+CLIENT_B = '99999999-2222-3333-4444-555555555555'
+SITE_1 = 'aaaaaaaa-0000-0000-0000-000000000001'
+SITE_2 = 'aaaaaaaa-0000-0000-0000-000000000002'
+
+
+def event(event_id, event_type='ticket.created', client_id=CLIENT_A, site_id=SITE_1, staff_only=False,
+          created_at=datetime(2026, 1, 5, 9, 0, tzinfo=timezone.utc)):
+    return {'event_id': event_id, 'event_type': event_type, 'client_id': client_id, 'site_id': site_id,
+            'staff_only': staff_only, 'payload': {'ticket_number': f'TKT-{event_id:06d}'},
+            'created_at': created_at}
+
+
+class FakeDB:
+    """realtime_events in memory, answering the replay queries"""
+
+    def __init__(self, events):
+        self.events = events
+        self.queries = []
+
+    def execute_query(self, query, params=None, fetch='all', commit=None):
+        self.queries.append((query, params))
+        oldest = min((e['event_id'] for e in self.events), default=None)
+        if 'MAX(event_id)' in query:
+            return {'last_id': max((e['event_id'] for e in self.events), default=0)}
+        if fetch == 'one':
+            return {'oldest_event_id': oldest}
+        since = datetime.now(timezone.utc) - timedelta(seconds=params[1])
+        rows = [dict(e, oldest_event_id=oldest) for e in sorted(self.events, key=lambda e: e['event_id'])
+                if e['event_id'] > params[0] or e['created_at'] > since]
+        if 'client_id = %s' in query:
+            rows = [e for e in rows if not e['staff_only'] and e['client_id'] == params[2]]
+        return rows[:params[-1]]
+
+
+def build_app(events=(), replay_limit=1000, max_subscribers=None):
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = 'test-secret'
+    app.response_manager = ResponseManager()
+    events_routes.register_stream_token_scope(JWTManager(app), app.response_manager)
+    app.db_manager = FakeDB(list(events))
+    app.auth_manager = AuthManager(app.db_manager)
+    app.event_broker = EventBroker('postgresql://unused', app.db_manager, replay_limit=replay_limit,
+                                   max_subscribers=max_subscribers)
+    # No LISTEN connection in tests; events are published by hand
+    app.event_broker._ensure_started = lambda: None
+    app.register_blueprint(events_routes.events_bp, url_prefix='/api/events')
+    return app
+
+
+def token(app, role, client_id=None, site_ids=None, **claims):
+    with app.app_context():
+        return create_access_token('u1', additional_claims=dict(
+            {'role': role, 'client_id': client_id, 'site_ids': site_ids or []}, **claims))
+
+
+def parse_stream(data):
+    messages = []
+    for block in data.decode('utf-8').split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.split('\n') if ': ' in line and not line.startswith(':'))
+        if 'event' in fields:
+            messages.append(fields)
+    return messages
+
+
+def test_visibility_rules():
+    tech = {'role': 'technician'}
+    client_admin = {'role': 'client_admin', 'client_id': CLIENT_A}
+    requester = {'role': 'solicitante', 'client_id': CLIENT_A, 'site_ids': [SITE_1]}
+
+    assert event_visible(event(1, 'sla.breach', staff_only=True), tech)
+    assert not event_visible(event(1, 'sla.breach', staff_only=True), client_admin)
+    assert event_visible(event(2), client_admin) and not event_visible(event(2, client_id=CLIENT_B), client_admin)
+    assert event_visible(event(3), requester) and not event_visible(event(3, site_id=SITE_2), requester)
+    assert not event_visible(event(4), {'role': 'agent'})
+
+    message = format_sse(event(7, 'asset.status'))
+    assert message.startswith(b'id: 7\nevent: asset.status\ndata: {') and message.endswith(b'}\n\n')
+    assert json.loads(message.split(b'data: ')[1])['created_at'] == '2026-01-05T09:00:00+00:00'
+
+
+def test_fan_out_and_overflow():
+    broker = EventBroker('postgresql://unused', FakeDB([]), max_queue_size=2)
+    broker._ensure_started = lambda: None
+    staff = broker.subscribe({'role': 'admin'})
+    client_b = broker.subscribe({'role': 'client_admin', 'client_id': CLIENT_B})
+
+    broker.publish([event(1), event(2, client_id=CLIENT_B)])
+    assert [staff.get(0.01)['event_id'], staff.get(0.01)['event_id']] == [1, 2]
+    assert client_b.get(0.01)['event_id'] == 2 and client_b.get(0.01) is None
+
+    broker.publish([event(3), event(4), event(5)])
+    assert staff.overflowed and not client_b.overflowed
+
+    broker.unsubscribe(staff)
+    assert broker.subscriber_count == 1
+    assert isinstance(client_b, Subscription)
+
+    # Catch-up re-reads the look-back window; ids already published are dropped
+    broker.publish([event(2, client_id=CLIENT_B), event(6, client_id=CLIENT_B)])
+    assert client_b.get(0.01)['event_id'] == 6 and client_b.get(0.01) is None
+
+
+def test_replay():
+    db = FakeDB([event(i, client_id=CLIENT_A if i % 2 else CLIENT_B) for i in range(10, 20)])
+    broker = EventBroker('postgresql://unused', db, replay_limit=3)
+
+    events, complete = broker.replay({'role': 'client_admin', 'client_id': CLIENT_A}, 14)
+    assert [e['event_id'] for e in events] == [15, 17, 19] and complete
+    assert db.queries[-1][1][:3] == (14, 300, CLIENT_A)
+
+    # More pending than the replay limit: not complete
+    assert broker.replay({'role': 'technician'}, 12)[1] is False
+    assert broker.replay({'role': 'technician'}, 19) == ([], True)
+
+    # Events right after the client's id were pruned: not complete
+    broker = EventBroker('postgresql://unused', db, replay_limit=100)
+    events, complete = broker.replay({'role': 'technician'}, 2)
+    assert len(events) == 10 and not complete
+    assert broker.replay({'role': 'technician'}, 9)[1] is True
+
+
+def test_replay_includes_late_commits():
+    # Event 14 committed after 15 had been streamed
+    late = event(14, created_at=datetime.now(timezone.utc))
+    db = FakeDB([event(i) for i in (10, 11, 12, 13, 15)] + [late])
+    events, complete = EventBroker('postgresql://unused', db).replay({'role': 'technician'}, 15)
+    assert [e['event_id'] for e in events] == [14] and complete
+
+    app = build_app(db.events)
+    events_routes.STREAM_SECONDS = 0.1
+    try:
+        staff = {'Authorization': 'Bearer ' + token(app, 'admin'), 'Last-Event-ID': '15'}
+        data = app.test_client().get('/api/events/stream', headers=staff).get_data()
+        assert [m['id'] for m in parse_stream(data)] == ['14']
+        # The client's id goes back to 15 after the look-back event
+        assert b'id: 14\nevent: ticket.created' in data and b'\n\nid: 15\n\n' in data
+    finally:
+        events_routes.STREAM_SECONDS = 55.0
+
+
+def test_stream_endpoint():
+    app = build_app([event(1), event(2, client_id=CLIENT_B), event(3, 'ticket.comment', staff_only=True)])
+    client = app.test_client()
+    events_routes.STREAM_SECONDS = 0.5
+    try:
+        # Long-lived tokens are not accepted in the query string
+        plain = token(app, 'client_admin', CLIENT_A)
+        assert client.get(f'/api/events/stream?jwt={plain}').status_code == 403
+
+        stream_token = client.post('/api/events/stream-token', headers={'Authorization': 'Bearer ' + plain},
+                                   json={}).get_json()['data']['token']
+
+        def publish_later():
+            while app.event_broker.subscriber_count == 0:
+                threading.Event().wait(0.01)
+            app.event_broker.publish([event(4), event(5, client_id=CLIENT_B)])
+
+        threading.Thread(target=publish_later).start()
+        response = client.get(f'/api/events/stream?jwt={stream_token}', headers={'Last-Event-ID': '0'})
+        assert response.mimetype == 'text/event-stream' and response.headers['X-Accel-Buffering'] == 'no'
+        messages = parse_stream(response.get_data())
+        assert [(m['id'], m['event']) for m in messages] == [('1', 'ticket.created'), ('4', 'ticket.created')]
+        assert app.event_broker.subscriber_count == 0
+
+        # A leaked stream URL grants nothing beyond the stream
+        stream_auth = {'Authorization': 'Bearer ' + stream_token}
+        assert client.get('/api/events/recent', headers=stream_auth).status_code == 403
+        assert client.post('/api/events/stream-token', headers=stream_auth, json={}).status_code == 403
+
+        # Staff over the Authorization header, resuming after event 1
+        staff = {'Authorization': 'Bearer ' + token(app, 'technician')}
+        messages = parse_stream(client.get('/api/events/stream?last_event_id=1', headers=staff).get_data())
+        assert [m['id'] for m in messages] == ['2', '3']
+
+        assert client.get('/api/events/stream', headers=dict(staff, **{'Last-Event-ID': 'x'})).status_code == 400
+
+        recent = client.get('/api/events/recent?last_event_id=1', headers=staff).get_json()['data']
+        assert [e['event_id'] for e in recent['events']] == [2, 3] and recent['last_event_id'] == 3
+    finally:
+        events_routes.STREAM_SECONDS = 55.0
+
+
+def test_stream_reset_when_gap_lost():
+    app = build_app([event(i) for i in range(50, 60)], replay_limit=5)
+    events_routes.STREAM_SECONDS = 0.1
+    try:
+        staff = {'Authorization': 'Bearer ' + token(app, 'admin'), 'Last-Event-ID': '10'}
+        messages = parse_stream(app.test_client().get('/api/events/stream', headers=staff).get_data())
+        assert messages == [{'id': '59', 'event': 'reset', 'data': '{}'}]
+    finally:
+        events_routes.STREAM_SECONDS = 55.0
+
+
+def test_stream_cap_per_worker():
+    app = build_app(max_subscribers=1)
+    events_routes.STREAM_SECONDS = 0.1
+    try:
+        staff = {'Authorization': 'Bearer ' + token(app, 'admin')}
+        client = app.test_client()
+
+        held = app.event_broker.subscribe({'role': 'admin'})
+        refused = client.get('/api/events/stream', headers=staff)
+        assert refused.status_code == 503 and refused.headers['Retry-After'] == '30'
+        assert app.event_broker.subscribe({'role': 'admin'}) is None
+
+        app.event_broker.unsubscribe(held)
+        assert client.get('/api/events/stream', headers=staff).status_code == 200
+        assert app.event_broker.subscriber_count == 0
+
+        # A stream the client drops gives its slot back
+        client.get('/api/events/stream', headers=staff, buffered=False).close()
+        assert app.event_broker.subscriber_count == 0
+    finally:
+        events_routes.STREAM_SECONDS = 55.0
+
+
+if __name__ == '__main__':
+    print("🔧 Testing real-time events")
+    print("=" * 50)
+    test_visibility_rules()
+    test_fan_out_and_overflow()
+    test_replay()
+    test_replay_includes_late_commits()
+    test_stream_endpoint()
+    test_stream_reset_when_gap_lost()
+    test_stream_cap_per_worker()
+    print("✅ All real-time event tests passed")
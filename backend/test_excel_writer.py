@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test Excel report sanitization and the named-style report writer
+"""
+
+import os
+import sys
+import random
+import tempfile
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from openpyxl import load_workbook
+
+from modules.reports.excel_writer import (
+    ExcelReportWriter, ReportColumn, format_date, sanitize_column, sanitize_value
+)
+
+
+def test_sanitize_value():
+    assert sanitize_value(None, 'Sin cliente') == 'Sin cliente'
+    assert sanitize_value('  Impresora\x00 de\r\n\trecepción\x0b ') == 'Impresora de recepción'
+    assert sanitize_value('=HYPERLINK("x")') == ' =HYPERLINK("x")'
+    assert sanitize_value('-5') == ' -5'
+    assert sanitize_value('¿Qué pasó?\ud800') == '¿Qué pasó?'
+    assert sanitize_value('x' * 300, max_length=200) == 'x' * 197 + '...'
+    assert sanitize_value(42) == '42'
+    assert sanitize_value('   ') == ''
+
+    # Every whitespace character collapses like str.split()
+    for codepoint in range(0x3001):
+        char = chr(codepoint)
+        if char.isspace():
+            assert sanitize_value(f'a{char}{char} b') == 'a b', hex(codepoint)
+
+
+def test_column_matches_value_by_value():
+    alphabet = 'aZ09 ñé=+-@\t\r\n\x00\x01\x1f\x7f\x85\xa0 \ud800￾'
+    rng = random.Random(7)
+    values = [None, '', '\x00', ' \x00 '] + [
+        ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 12))) for _ in range(500)
+    ]
+    expected = [sanitize_value(v, 'N/A', 8) for v in values]
+    assert sanitize_column(values, 'N/A', 8) == expected
+
+    # No NUL anywhere: exercises the single-pass path
+    clean = [v.replace('\x00', '') if v else v for v in values]
+    assert sanitize_column(clean, 'N/A', 8) == [sanitize_value(v, 'N/A', 8) for v in clean]
+    assert sanitize_column([]) == []
+
+
+def test_format_date():
+    assert format_date(datetime(2026, 10, 19, 8, 5)) == '19/10/2026 08:05'
+    assert format_date(None, 'Pendiente') == 'Pendiente'
+
+
+def test_writer_uses_named_styles():
+    columns = [
+        ReportColumn('Número', 'ticket_number', 12, default='N/A', centered=True),
+        ReportColumn('Asunto', 'subject', 35, default='Sin asunto'),
+        ReportColumn('Creado', 'created_at', 16, kind='date'),
+    ]
+    rows = [
+        {'ticket_number': 'TKT-000001', 'subject': '=cmd|x', 'created_at': datetime(2026, 10, 1, 9, 0)},
+        {'ticket_number': 'TKT-000002', 'subject': None, 'created_at': None},
+    ]
+    writer = ExcelReportWriter('Reporte', columns)
+    writer.write_banner([('TÍTULO', 'report_title'), ('Período', 'report_info')])
+    assert writer.write_table(rows) == 2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'reporte.xlsx')
+        writer.save(path)
+        ws = load_workbook(path)['Reporte']
+
+    assert ws['A1'].value == 'TÍTULO' and ws['A1'].style == 'report_title'
+    assert 'A1:C1' in ws.merged_cells
+    assert [c.value for c in ws[4]] == ['Número', 'Asunto', 'Creado']
+    assert ws['A4'].style == 'report_header'
+    assert [c.value for c in ws[5]] == ['TKT-000001', ' =cmd|x', '01/10/2026 09:00']
+    assert [c.value for c in ws[6]] == ['TKT-000002', 'Sin asunto', 'N/A']
+    assert ws['A5'].style == 'report_data_center' and ws['B5'].style == 'report_data'
+    assert ws['B5'].data_type == 's'
+    assert ws.column_dimensions['B'].width == 35
+
+
+if __name__ == '__main__':
+    print("🔧 Testing Excel report writer")
+    print("=" * 50)
+    test_sanitize_value()
+    test_column_matches_value_by_value()
+    test_format_date()
+    test_writer_uses_named_styles()
+    print("✅ All Excel report writer tests passed")
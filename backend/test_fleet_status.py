@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test the fleet status counter service used by the technician dashboard
+"""
+
+import os
+import sys
+from datetime import datetime, timezone
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.assets.service import FleetStatusService
+
+
+class CountingDB:
+    def __init__(self):
+        self.queries = []
+
+    def execute_query(self, query, params=None, fetch='all', commit=None):
+        self.queries.append((query, params, commit))
+        if 'fleet_status_sweep' in query:
+            return {'changed': 3}
+        return []
+
+
+def test_summary_folds_client_counters():
+    older = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    newer = datetime(2026, 10, 2, tzinfo=timezone.utc)
+    overall = FleetStatusService.summarize([
+        {'total_assets': 5, 'online_assets': 3, 'warning_assets': 1, 'offline_assets': 1, 'last_update': older},
+        {'total_assets': 2, 'online_assets': 0, 'warning_assets': 0, 'offline_assets': 2, 'last_update': newer},
+    ])
+    assert overall == {
+        'total_assets': 7, 'online_assets': 3, 'warning_assets': 1,
+        'offline_assets': 3, 'last_update': newer
+    }
+    assert FleetStatusService.summarize([])['total_assets'] == 0
+
+
+def test_sweep_commits_and_is_throttled():
+    db = CountingDB()
+    service = FleetStatusService(db)
+    FleetStatusService._last_sweep = 0.0
+
+    assert service.sweep() == 3
+    assert db.queries[-1][2] is True
+
+    service.sweep_if_due()
+    assert len(db.queries) == 1
+
+
+def test_transitions_feed_filters_by_client():
+    db = CountingDB()
+    FleetStatusService(db).get_transitions(since_id=42, limit=10, client_id='client-1')
+    query, params, _ = db.queries[0]
+    assert 't.client_id = %s' in query
+    assert params == (42, 'client-1', 10)
+
+
+if __name__ == '__main__':
+    print("🔧 Testing FleetStatusService")
+    print("=" * 50)
+    test_summary_folds_client_counters()
+    test_sweep_commits_and_is_throttled()
+    test_transitions_feed_filters_by_client()
+    print("✅ All FleetStatusService tests passed")
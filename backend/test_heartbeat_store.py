@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Test the heartbeat time-series store (write path, maintenance, granularity)
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import psycopg2
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+
+from core.response import ResponseManager
+from core.timeseries import HeartbeatStore
+from modules.agents.cadence import CadenceController
+from modules.agents import routes as agents_routes
+
+
+class ScriptedDB:
+    """Stand-in DatabaseManager recording statements"""
+
+    def __init__(self, fail_inserts=0):
+        self.statements = []
+        self.fail_inserts = fail_inserts
+
+    def execute_query(self, query, params=None, fetch='all', commit=None):
+        self.statements.append((' '.join(query.split()), params))
+        if 'INSERT INTO asset_heartbeats' in query and self.fail_inserts:
+            self.fail_inserts -= 1
+            raise psycopg2.errors.CheckViolation(
+                'no partition of relation "asset_heartbeats" found for row')
+        if 'heartbeat_ensure_partitions' in query:
+            return {'created': 2}
+        if 'heartbeat_rollup' in query:
+            return {'rollup_rows': 10}
+        if 'heartbeat_apply_retention' in query:
+            return {'dropped': 1}
+        return [] if fetch == 'all' else None
+
+    def count(self, fragment):
+        return sum(1 for q, _ in self.statements if fragment in q)
+
+
+class FixedConfig:
+    def get_system_int(self, key, default):
+        return {'heartbeat_raw_retention_days': 3}.get(key, default)
+
+
+def test_partitions_checked_once_per_day():
+    db = ScriptedDB()
+    store = HeartbeatStore(db)
+    for _ in range(3):
+        store.record('asset-1', cpu_usage=10, memory_usage=20, disk_usage=30)
+
+    assert db.count('heartbeat_ensure_partitions') == 1
+    assert db.count('INSERT INTO asset_heartbeats') == 3
+
+
+def test_missing_partition_is_created_and_insert_retried():
+    db = ScriptedDB(fail_inserts=1)
+    store = HeartbeatStore(db)
+    store._partitions_ensured_for = datetime.now(timezone.utc).date()
+
+    store.record('asset-1')
+    assert db.count('heartbeat_ensure_partitions') == 1
+    assert db.count('INSERT INTO asset_heartbeats') == 2
+
+
+def test_maintain_uses_configured_retention():
+    db = ScriptedDB()
+    stats = HeartbeatStore(db, config_cache=FixedConfig()).maintain()
+
+    assert stats == {'partitions_created': 2, 'rollup_rows': 10, 'partitions_dropped': 1}
+    retention_params = [p for q, p in db.statements if 'heartbeat_apply_retention' in q][0]
+    assert retention_params == (3, 90, 730)
+
+
+def test_granularity_follows_range():
+    end = datetime.now(timezone.utc)
+    assert HeartbeatStore.choose_granularity(end - timedelta(hours=24), end) == 'raw'
+    assert HeartbeatStore.choose_granularity(end - timedelta(days=7), end) == '1h'
+    assert HeartbeatStore.choose_granularity(end - timedelta(days=90), end) == '1d'
+
+    db = ScriptedDB()
+    history = HeartbeatStore(db).get_metrics_history('asset-1', end - timedelta(days=7), end)
+    assert history['granularity'] == '1h'
+    assert db.count('FROM asset_heartbeat_rollup_1h') == 1
+
+
+def test_spooled_batch_skips_expired_samples_and_rerolls_asset():
+    db = ScriptedDB()
+    now = datetime.now(timezone.utc)
+    samples = [
+        {'spool_id': 1, 'recorded_at': now - timedelta(hours=10), 'cpu_usage': 5},
+        {'spool_id': 2, 'recorded_at': now - timedelta(days=2), 'cpu_usage': 7},
+        {'spool_id': 3, 'recorded_at': now - timedelta(days=5), 'cpu_usage': 9},
+    ]
+    stored = HeartbeatStore(db, FixedConfig()).record_batch('asset-1', samples)
+
+    assert [s['spool_id'] for s in stored] == [1, 2]
+    ensure = next(p for q, p in db.statements if 'heartbeat_ensure_partitions' in q)
+    assert ensure[0] == (now - timedelta(days=2)).date()
+    # One multi-row insert, then the asset's closed buckets are recomputed
+    assert db.count('INSERT INTO asset_heartbeats') == 1
+    rollup = next(p for q, p in db.statements if 'heartbeat_rollup_asset' in q)
+    assert rollup == ('asset-1', now - timedelta(days=2))
+
+    assert HeartbeatStore(ScriptedDB()).record_batch('asset-1', []) == []
+
+
+class AssetDB(ScriptedDB):
+    """ScriptedDB in which every asset exists and is active"""
+
+    def validate_uuid(self, value):
+        return True
+
+    def execute_query(self, query, params=None, fetch='all', commit=None):
+        result = super().execute_query(query, params, fetch, commit)
+        if 'FROM assets' in query and fetch == 'one':
+            return {'asset_id': params[0]}
+        return result
+
+
+def test_batch_upload_requires_token_for_the_same_asset():
+    asset_id = '11111111-2222-3333-4444-555555555555'
+    other_asset_id = '99999999-2222-3333-4444-555555555555'
+    db = AssetDB()
+
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = 'test-secret'
+    JWTManager(app)
+    app.response_manager = ResponseManager()
+    app.db_manager = db
+    app.heartbeat_store = HeartbeatStore(db, FixedConfig())
+    app.cadence = CadenceController(db)
+    app.register_blueprint(agents_routes.agents_bp, url_prefix='/api/agents')
+
+    def agent_token(token_asset_id, expires_delta=None):
+        with app.app_context():
+            return create_access_token(
+                identity=f"agent_{token_asset_id}", expires_delta=expires_delta,
+                additional_claims={'asset_id': token_asset_id, 'type': 'agent'})
+
+    def post(token=None):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        return app.test_client().post('/api/agents/heartbeat/batch', headers=headers, json={
+            'asset_id': asset_id,
+            'heartbeats': [{'spool_id': 1, 'recorded_at': datetime.now(timezone.utc).timestamp()}]
+        })
+
+    with app.app_context():
+        user_token = create_access_token(identity='user-1')
+
+    assert post().status_code == 401
+    assert post('not-a-jwt').status_code == 401
+    assert post(user_token).status_code == 401
+    assert post(agent_token(other_asset_id)).status_code == 403
+    assert db.count('INSERT INTO asset_heartbeats') == 0
+
+    # Agents cannot renew their registration token, so expiry is not enforced
+    expired = agent_token(asset_id, expires_delta=timedelta(seconds=-1))
+    response = post(expired)
+    assert response.status_code == 200
+    assert response.get_json()['data']['accepted'] == [1]
+    assert db.count('INSERT INTO asset_heartbeats') == 1
+
+
+if __name__ == '__main__':
+    print("🔧 Testing HeartbeatStore")
+    print("=" * 50)
+    test_partitions_checked_once_per_day()
+    test_missing_partition_is_created_and_insert_retried()
+    test_maintain_uses_configured_retention()
+    test_granularity_follows_range()
+    test_spooled_batch_skips_expired_samples_and_rerolls_asset()
+    test_batch_upload_requires_token_for_the_same_asset()
+    print("✅ All HeartbeatStore tests passed")
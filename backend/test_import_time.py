@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test worker startup import budget
+
+Runs ``python -X importtime -c "import app"`` in a fresh interpreter and
+fails when the heavy reporting libraries are back on the startup path or the
+cumulative import time of the app module exceeds the budget.
+
+Override the budget with IMPORT_BUDGET_MS on slower machines.
+"""
+
+import os
+import sys
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Loaded by the reports module on first use only
+LAZY_MODULES = ('pandas', 'reportlab', 'openpyxl', 'numpy')
+
+IMPORT_BUDGET_MS = int(os.environ.get('IMPORT_BUDGET_MS', '800'))
+
+
+def import_times(module='app'):
+    """{module name: cumulative microseconds} from -X importtime for one import"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=BACKEND_DIR, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        # import time: self [us] | cumulative | imported package
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_reporting_libraries_are_lazy():
+    times = import_times()
+    loaded = sorted({name.split('.')[0] for name in times} & set(LAZY_MODULES))
+    assert not loaded, f"imported at startup: {loaded}"
+
+
+def test_app_import_within_budget():
+    times = import_times()
+    elapsed_ms = times['app'] / 1000
+    assert elapsed_ms < IMPORT_BUDGET_MS, f"import app took {elapsed_ms:.0f} ms (budget {IMPORT_BUDGET_MS} ms)"
+
+
+if __name__ == '__main__':
+    print("🔧 Testing worker startup import budget")
+    print("=" * 50)
+    test_reporting_libraries_are_lazy()
+    test_app_import_within_budget()
+    print(f"✅ All import budget tests passed (app: {import_times()['app'] / 1000:.0f} ms)")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test the per-section inventory sync protocol (diff apply, resync on divergence)
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+
+from core.response import ResponseManager
+from core.timeseries import HeartbeatStore
+from modules.agents.cadence import CadenceController
+from modules.agents import routes as agents_routes
+from modules.agents.inventory_sync import (
+    InventorySyncService, InventoryResyncRequired, apply_ops, merge_sections, section_hash,
+    canonical_json, PROTOCOL_VERSION
+)
+
+
+class SectionDB:
+    """Keeps asset_inventory_sections rows in memory"""
+
+    def __init__(self, sections=None):
+        self.rows = {
+            name: {'section': name, 'data': canonical_json(data), 'data_hash': section_hash(data)}
+            for name, data in (sections or {}).items()
+        }
+        self.writes = []
+
+    def execute_query(self, query, params=None, fetch='all', commit=None):
+        if query.lstrip().startswith('SELECT'):
+            return list(self.rows.values())
+        _, section, data, data_hash = params
+        self.writes.append(section)
+        self.rows[section] = {'section': section, 'data': data, 'data_hash': data_hash}
+        return None
+
+
+def test_apply_ops_set_delete_and_replace():
+    document = {'cpu': {'model': 'i5', 'cores': 4}, 'ram_gb': 8, 'gpu': 'Intel'}
+    ops = [['set', ['cpu', 'cores'], 8], ['del', ['gpu']], ['set', ['nics'], [{'mac': 'aa'}]]]
+    assert apply_ops(document, ops) == {'cpu': {'model': 'i5', 'cores': 8}, 'ram_gb': 8, 'nics': [{'mac': 'aa'}]}
+    assert document['cpu']['cores'] == 4
+    assert apply_ops(document, [['set', [], {'new': True}]]) == {'new': True}
+
+    for bad in ([['del', []]], [['move', ['cpu'], 1]], [['set', ['ram_gb', 'x'], 1]]):
+        try:
+            apply_ops(document, bad)
+            assert False, 'malformed diff accepted'
+        except ValueError:
+            pass
+
+
+def test_diff_upload_updates_only_changed_section():
+    hardware = {'cpu': {'model': 'i5', 'cores': 4}, 'ram_gb': 8}
+    software = {'installed_programs': [{'name': '7-Zip'}]}
+    db = SectionDB({'hardware': hardware, 'disks': [], 'bitlocker': {}, 'software': software})
+
+    new_hardware = {'cpu': {'model': 'i5', 'cores': 4}, 'ram_gb': 16}
+    result = InventorySyncService(db).apply('asset-1', {
+        'protocol': PROTOCOL_VERSION,
+        'hashes': {'hardware': section_hash(new_hardware), 'disks': section_hash([]),
+                   'bitlocker': section_hash({}), 'software': section_hash(software)},
+        'sections': {'hardware': {'mode': 'diff', 'base': section_hash(hardware),
+                                  'ops': [['set', ['ram_gb'], 16]]}}
+    })
+
+    assert result['changed'] == ['hardware'] and db.writes == ['hardware']
+    assert result['hashes']['hardware'] == section_hash(new_hardware)
+    assert result['hardware_inventory'] == dict(new_hardware, disks=[], bitlocker={})
+    assert result['software_inventory'] == software
+
+
+def test_divergent_base_or_hash_requests_resync_without_writing():
+    db = SectionDB({'hardware': {'ram_gb': 8}})
+    sync = {
+        'protocol': PROTOCOL_VERSION,
+        'hashes': {'software': section_hash({'installed_programs': []})},
+        'sections': {'hardware': {'mode': 'diff', 'base': section_hash({'ram_gb': 4}),
+                                  'ops': [['set', ['ram_gb'], 16]]},
+                     'disks': {'mode': 'full', 'data': []}}
+    }
+    try:
+        InventorySyncService(db).apply('asset-1', sync)
+        assert False, 'resync not requested'
+    except InventoryResyncRequired as e:
+        assert e.sections == ['hardware', 'software']
+    assert db.writes == []
+
+    try:
+        InventorySyncService(db).apply('asset-1', {'protocol': 99})
+        assert False, 'unknown protocol accepted'
+    except ValueError:
+        pass
+
+
+def test_merge_sections_rebuilds_legacy_payloads():
+    hardware, software = merge_sections({'hardware': {'ram_gb': 8}, 'disks': [{'device': 'C:'}],
+                                         'bitlocker': {'supported': False}})
+    assert hardware == {'ram_gb': 8, 'disks': [{'device': 'C:'}], 'bitlocker': {'supported': False}}
+    assert software == {}
+
+
+class HeartbeatDB(SectionDB):
+    """SectionDB that also records the other statements of a heartbeat"""
+
+    def __init__(self, sections=None):
+        super().__init__(sections)
+        self.statements = []
+
+    def execute_query(self, query, params=None, fetch='all', commit=None):
+        if 'asset_inventory_sections' in query:
+            return super().execute_query(query, params, fetch, commit)
+        self.statements.append(' '.join(query.split()))
+        return {'active': 1, 'created': 0} if fetch == 'one' else None
+
+
+def test_unchanged_sync_still_refreshes_asset_liveness():
+    hardware = {'ram_gb': 8}
+    software = {'installed_programs': []}
+    db = HeartbeatDB({'hardware': hardware, 'disks': [], 'bitlocker': {}, 'software': software})
+
+    app = Flask(__name__)
+    app.response_manager = ResponseManager()
+    app.db_manager = db
+    app.heartbeat_store = HeartbeatStore(db)
+    app.cadence = CadenceController(db)
+    app.register_blueprint(agents_routes.agents_bp, url_prefix='/api/agents')
+
+    response = app.test_client().post('/api/agents/heartbeat', json={
+        'asset_id': '11111111-2222-3333-4444-555555555555',
+        'heartbeat_type': 'full',
+        'status': {'cpu_usage': 12, 'memory_usage': 40, 'disk_usage': 55},
+        'inventory_sync': {
+            'protocol': PROTOCOL_VERSION,
+            'hashes': {'hardware': section_hash(hardware), 'disks': section_hash([]),
+                       'bitlocker': section_hash({}), 'software': section_hash(software)},
+            'sections': {}
+        }
+    })
+
+    assert response.status_code == 200
+    assert db.writes == []
+    assert not any('assets_inventory_snapshots' in statement for statement in db.statements)
+    assert any(statement.startswith('UPDATE assets SET last_seen = NOW()') for statement in db.statements)
+
+
+if __name__ == '__main__':
+    print("🔧 Testing InventorySyncService")
+    print("=" * 50)
+    test_apply_ops_set_delete_and_replace()
+    test_diff_upload_updates_only_changed_section()
+    test_divergent_base_or_hash_requests_resync_without_writing()
+    test_merge_sections_rebuilds_legacy_payloads()
+    test_unchanged_sync_still_refreshes_asset_liveness()
+    print("✅ All InventorySyncService tests passed")
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test the load test suite: statistics, run comparison, fake mail servers and the HTTP driver
+"""
+
+import os
+import sys
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+
+from loadtest.fake_mail import FakeIMAPServer, FakeSMTPServer
+from loadtest.load import run_http_load
+from loadtest.stats import LatencyRecorder, compare_reports, percentile
+from modules.email.service import EmailService
+from utils.security import SecurityUtils
+
+
+def test_percentiles_and_summary():
+    samples = sorted(i / 1000 for i in range(1, 101))
+    assert percentile(samples, 50) == 0.0505
+    assert round(percentile(samples, 99), 5) == 0.09901
+    assert percentile([], 95) == 0.0
+
+    recorder = LatencyRecorder()
+    for i in range(1, 101):
+        recorder.record('heartbeat.tier1', i / 1000)
+    recorder.record('heartbeat.tier1', 0.5, ok=False)
+    recorder.add_rows('seed.tickets', 50_000, 2.0)
+
+    summary = recorder.summary()
+    tier1 = summary['heartbeat.tier1']
+    assert tier1['requests'] == 101 and tier1['errors'] == 1 and tier1['rows'] == 100
+    assert tier1['p50_ms'] == 51.0 and tier1['max_ms'] == 500.0
+    assert summary['seed.tickets']['rows_per_sec'] == 25_000.0
+
+
+def test_compare_reports():
+    def entry(p95, rate, errors=0):
+        return {'p95_ms': p95, 'rows_per_sec': rate, 'errors': errors}
+
+    baseline = {'subsystems': {
+        'heartbeat.tier1': entry(20.0, 900.0), 'heartbeat.tier2': entry(80.0, 40.0),
+        'dashboard.stats': entry(150.0, 10.0), 'email.outbound': entry(30.0, 300.0)
+    }}
+    current = {'subsystems': {
+        'heartbeat.tier1': entry(21.0, 910.0), 'heartbeat.tier2': entry(120.0, 40.0),
+        'dashboard.stats': entry(140.0, 10.0, errors=3), 'email.to_ticket': entry(12.0, 60.0)
+    }}
+    rows = {row['subsystem']: row for row in compare_reports(baseline, current, tolerance=0.10)}
+    assert rows['heartbeat.tier1']['status'] == 'ok'
+    assert rows['heartbeat.tier2']['status'] == 'regressed' and rows['heartbeat.tier2']['p95_change'] == 0.5
+    assert rows['dashboard.stats']['status'] == 'regressed'
+    assert rows['email.to_ticket']['status'] == 'new'
+    assert rows['email.outbound']['status'] == 'missing'
+
+
+def test_email_service_against_fake_servers():
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = 'test-secret'
+
+    with FakeSMTPServer() as smtp, FakeIMAPServer() as imap, app.app_context():
+        password = SecurityUtils.encrypt_password('loadtest')
+        config = {
+            'config_id': 'cfg-1', 'enable_email_to_ticket': True,
+            'smtp_host': smtp.address[0], 'smtp_port': smtp.address[1], 'smtp_username': 'soporte@loadtest.example',
+            'smtp_password_encrypted': password, 'smtp_use_tls': False, 'smtp_use_ssl': False,
+            'imap_host': imap.address[0], 'imap_port': imap.address[1], 'imap_username': 'soporte@loadtest.example',
+            'imap_password_encrypted': password, 'imap_use_ssl': False, 'imap_folder': 'INBOX'
+        }
+        service = EmailService()
+        service.get_config_by_id = lambda config_id: config
+
+        for i in range(3):
+            assert service.send_email_with_attachment(f'destino{i}@loadtest.example', 'Ticket actualizado',
+                                                      '<p>Hola</p>', config_id='cfg-1')
+        assert smtp.count == 3
+        assert smtp.messages[0]['to'] == ['<destino0@loadtest.example>']
+
+        imap.deliver_many(12, from_email='cliente1@loadtest.example', subject_prefix='[LANET] ')
+        first = service.check_incoming_emails('cfg-1')
+        second = service.check_incoming_emails('cfg-1')
+        assert len(first) == 10 and len(second) == 2
+        assert first[0]['from_email'] == 'cliente1@loadtest.example'
+        assert first[0]['subject'] == '[LANET] Falla de red #2'
+        assert 'sin conexión' in first[0]['body_text']
+        assert service.check_incoming_emails('cfg-1') == []
+
+
+class _BackendStub(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    lock = threading.Lock()
+    heartbeats = {'status': 0, 'full': 0}
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        if self.path == '/api/auth/login':
+            self._send(200, {'success': True, 'data': {'access_token': 'tok'}})
+        else:
+            with self.lock:
+                self.heartbeats[body['heartbeat_type']] += 1
+            self._send(200, {'success': True, 'data': {'status': 'ok'}})
+
+    def do_GET(self):
+        ok = self.headers.get('Authorization') == 'Bearer tok'
+        self._send(200 if ok else 401, {'success': ok})
+
+    def log_message(self, *args):
+        pass
+
+
+def test_http_load_driver():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _BackendStub)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        recorder = LatencyRecorder()
+        params = run_http_load(
+            f'http://127.0.0.1:{server.server_address[1]}', ['a1', 'a2', 'a3'], ['tecnico1@loadtest.example'],
+            'pw', recorder, duration=0.5, agents=200, agent_threads=4, interval=0, tier2_ratio=0.2,
+            technician_count=2, think_time=0
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    summary = recorder.summary()
+    assert params['agents'] == 200 and params['technicians'] == 2
+    assert summary['auth.login']['requests'] == 2 and summary['auth.login']['errors'] == 0
+    assert summary['heartbeat.tier1']['requests'] == _BackendStub.heartbeats['status'] > 0
+    assert summary['heartbeat.tier2']['requests'] == _BackendStub.heartbeats['full'] > 0
+    assert summary['heartbeat.tier1']['errors'] == 0
+    assert any(name.startswith('dashboard.') or name == 'tickets.list' for name in summary)
+    assert all(entry['errors'] == 0 for entry in summary.values())
+
+
+if __name__ == '__main__':
+    print("🔧 Testing load test suite")
+    print("=" * 50)
+    test_percentiles_and_summary()
+    test_compare_reports()
+    test_email_service_against_fake_servers()
+    test_http_load_driver()
+    print("✅ All load test suite tests passed")
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Test the Prometheus metrics registry, DatabaseManager instrumentation and /metrics
+"""
+
+import os
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from psycopg2.pool import PoolError
+
+from core import metrics as metrics_module
+from core.database import DatabaseManager
+from core.metrics import (
+    metrics, MetricsRegistry, StageTimer, query_fingerprint, register_metrics,
+    publish_job_metrics, POOL_EXHAUSTED, POOL_WAIT, QUERY_DURATION, QUERY_ERRORS
+)
+from core.response import ResponseManager
+
+
+def reset():
+    metrics.enabled = False
+    metrics.clear_collectors()
+    for metric in metrics._metrics:
+        metric.clear()
+
+
+def test_histogram_and_counter_exposition():
+    registry = MetricsRegistry()
+    latency = registry.histogram('demo_seconds', 'Demo latency', ('route',), buckets=(0.1, 1.0))
+    errors = registry.counter('demo_errors_total', 'Demo errors', ('route',))
+    latency.observe(0.05, 'tickets.list')
+    latency.observe(0.5, 'tickets.list')
+    latency.observe(3.0, 'tickets.list')
+    errors.inc('say "hi"')
+
+    text = registry.render()
+    assert '# TYPE demo_seconds histogram' in text
+    assert 'demo_seconds_bucket{route="tickets.list",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{route="tickets.list",le="1"} 2' in text
+    assert 'demo_seconds_bucket{route="tickets.list",le="+Inf"} 3' in text
+    assert 'demo_seconds_sum{route="tickets.list"} 3.55' in text
+    assert 'demo_seconds_count{route="tickets.list"} 3' in text
+    assert 'demo_errors_total{route="say \\"hi\\""} 1' in text
+
+    # Label cardinality is capped
+    for i in range(metrics_module.MAX_SERIES + 10):
+        errors.inc(f'route-{i}')
+    assert len(errors._series) == metrics_module.MAX_SERIES + 1
+    assert ('other',) in errors._series
+
+
+def test_query_fingerprint():
+    a = query_fingerprint("SELECT * FROM tickets\n   WHERE status IN ('abierto', 'cerrado') AND priority = 3")
+    b = query_fingerprint("SELECT * FROM tickets WHERE status IN ('nuevo') AND priority = 12")
+    assert a == b == 'SELECT * FROM tickets WHERE status IN (?) AND priority = ?'
+    assert query_fingerprint('SELECT * FROM t1 WHERE id = %s') == 'SELECT * FROM t1 WHERE id = ?'
+    assert len(query_fingerprint('SELECT ' + ', '.join(f'col_{i}' for i in range(100)))) == 120
+
+
+class FakeCursor:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        if 'broken' in query:
+            raise RuntimeError('syntax error')
+
+    def fetchall(self):
+        return [{'ok': 1}]
+
+
+class FakeConnection:
+    def cursor(self):
+        return FakeCursor()
+
+    def rollback(self):
+        pass
+
+    def commit(self):
+        pass
+
+
+class FakePool:
+    maxconn = 20
+
+    def __init__(self, exhausted=False):
+        self.exhausted = exhausted
+        self._used = {}
+
+    def getconn(self):
+        if self.exhausted:
+            raise PoolError('connection pool exhausted')
+        conn = FakeConnection()
+        self._used[id(conn)] = conn
+        return conn
+
+    def putconn(self, conn):
+        self._used.pop(id(conn), None)
+
+
+def fake_db(pool):
+    db = DatabaseManager.__new__(DatabaseManager)
+    db.logger = metrics_module.logger
+    db._local = threading.local()
+    db._rls_applied = {}
+    db.pool = pool
+    return db
+
+
+def test_database_instrumentation():
+    reset()
+    db = fake_db(FakePool())
+    db.execute_query('SELECT 1 WHERE x = %s', (5,))
+    assert not QUERY_DURATION._series and not POOL_WAIT._series
+
+    metrics.enabled = True
+    try:
+        db.execute_query('SELECT 1 WHERE x = %s', (5,))
+        db.execute_query('SELECT 1 WHERE x = %s', (6,))
+        try:
+            db.execute_query('SELECT broken')
+        except RuntimeError:
+            pass
+        assert QUERY_DURATION._series[('SELECT ? WHERE x = ?',)][2] == 2
+        assert QUERY_ERRORS._series[('SELECT broken',)] == 1
+        assert POOL_WAIT._series[()][2] == 3
+
+        try:
+            fake_db(FakePool(exhausted=True)).execute_query('SELECT 1')
+        except PoolError:
+            pass
+        assert POOL_EXHAUSTED._series[()] == 1
+    finally:
+        reset()
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value.encode('utf-8')
+
+    def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+
+class FakeCadence:
+    in_flight = 3
+
+
+class FakeAudit:
+    backlog = 42
+
+
+class EmailQueueDB:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def execute_query(self, query, params=None, fetch='all', commit=None):
+        assert 'email_queue' in query
+        return {'count': 7}
+
+
+def test_metrics_endpoint():
+    reset()
+    os.environ['METRICS_ENABLED'] = 'true'
+    os.environ['METRICS_TOKEN'] = 'scrape-secret'
+    try:
+        redis_client = FakeRedis()
+        pool = FakePool()
+        pool.getconn()
+
+        # The SLA monitor process publishes its stage timings to Redis
+        metrics.enabled = True
+        stages = StageTimer('sla_monitor')
+        stages.start('breaches')
+        stages.start('email_queue')
+        stages.finish()
+        publish_job_metrics(redis_client, 'sla_monitor')
+        for metric in metrics._metrics:
+            metric.clear()
+
+        app = Flask(__name__)
+        app.response_manager = ResponseManager()
+        app.db_manager = EmailQueueDB(pool)
+        app.cadence = FakeCadence()
+        app.audit_writer = FakeAudit()
+        app.redis_client = redis_client
+        register_metrics(app)
+        client = app.test_client()
+
+        assert client.get('/metrics').status_code == 401
+        response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'})
+        text = response.get_data(as_text=True)
+        assert response.status_code == 200 and response.mimetype == 'text/plain'
+        assert 'lanet_db_pool_connections_in_use 1' in text
+        assert 'lanet_db_pool_connections_max 20' in text
+        assert 'lanet_queue_depth{queue="email_queue"} 7' in text
+        assert 'lanet_queue_depth{queue="heartbeat_ingest"} 3' in text
+        assert 'lanet_queue_depth{queue="audit_writer"} 42' in text
+        assert 'lanet_job_stage_duration_seconds_count{job="sla_monitor",stage="breaches"} 1' in text
+        assert 'lanet_job_runs_total{job="sla_monitor",result="success"} 1' in text
+
+        os.environ['METRICS_ENABLED'] = 'false'
+        disabled = Flask(__name__)
+        register_metrics(disabled)
+        assert metrics.enabled is False
+        assert disabled.test_client().get('/metrics').status_code == 404
+    finally:
+        os.environ.pop('METRICS_ENABLED', None)
+        os.environ.pop('METRICS_TOKEN', None)
+        reset()
+
+
+if __name__ == '__main__':
+    print("🔧 Testing metrics")
+    print("=" * 50)
+    test_histogram_and_counter_exposition()
+    test_query_fingerprint()
+    test_database_instrumentation()
+    test_metrics_endpoint()
+    print("✅ All metrics tests passed")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test chunked PDF tables, shared PDF styles/charts and streamed enterprise rows
+"""
+
+import os
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from reportlab.platypus import LongTable
+
+from core.database import DatabaseManager
+from modules.reports.report_factory import ReportFactory
+from modules.reports.report_formatters import PDFReportFormatter, bar_chart, pie_chart
+
+
+def ticket_rows(count):
+    for i in range(count):
+        yield {'ticket_number': f'TKT-{i:06d}', 'subject': f'Impresora {i}',
+               'created_at': datetime(2026, 10, 1, 9, 0), 'hours': i / 3, 'technician': None}
+
+
+def test_large_table_is_chunked_with_repeated_headers():
+    with tempfile.TemporaryDirectory() as tmp:
+        formatter = PDFReportFormatter(os.path.join(tmp, 'tickets.pdf'))
+        count = formatter.add_data_table(
+            ticket_rows(1200), 'Tickets', ['ticket_number', 'subject', 'created_at', 'hours', 'technician'],
+            chunk_rows=500
+        )
+        tables = [f for f in formatter.story if isinstance(f, LongTable)]
+        formatter.build()
+        with open(formatter.file_path, 'rb') as f:
+            pages = f.read().count(b'/Type /Page\n')
+
+    assert count == 1200
+    assert [t._nrows for t in tables] == [501, 501, 201]
+    assert all(t.repeatRows == 1 for t in tables)
+    assert tables[0]._cellvalues[0][0] == 'Ticket Number'
+    assert tables[0]._cellvalues[1] == ['TKT-000000', 'Impresora 0', '01/10/2026 09:00', '0.00', 'N/A']
+    assert pages > 10
+
+    empty = PDFReportFormatter(os.path.join(tempfile.gettempdir(), 'unused.pdf'))
+    assert empty.add_data_table(iter([]), 'Vacío', ['a']) == 0
+    assert empty.story == []
+
+
+def test_styles_and_charts_are_shared():
+    first = PDFReportFormatter('a.pdf')
+    second = PDFReportFormatter('b.pdf')
+    assert first.styles is second.styles
+
+    items = (('Alta', 3.0), ('Media', 5.0))
+    assert bar_chart(items) is bar_chart(items)
+    assert pie_chart(items) is pie_chart(items)
+
+    first.add_pie_chart({'Abiertos': 0, 'Cerrados': 0}, 'Sin datos')
+    assert first.story == []
+    first.add_bar_chart({'Alta': 3, 'Media': 5, 'Baja': 0}, 'Prioridad')
+    assert first.story[1] is bar_chart(items)
+
+
+class StreamingDB:
+    def __init__(self, count):
+        self.count = count
+        self.queries = []
+
+    def iter_query(self, query, params=None, batch_size=1000):
+        self.queries.append((query, params))
+        yield from ticket_rows(self.count)
+
+
+def test_enterprise_pdf_renders_every_streamed_row():
+    db = StreamingDB(2500)
+    with tempfile.TemporaryDirectory() as tmp:
+        factory = ReportFactory(db, tmp)
+        path = factory.generate_enterprise_report({
+            'config': {'name': 'Tickets Octubre'},
+            'query': 'SELECT * FROM tickets WHERE created_at >= %s', 'params': ('2026-10-01',),
+            'columns': [
+                {'column_key': 'ticket_number', 'display_name_es': 'Número', 'data_type': 'text'},
+                {'column_key': 'created_at', 'display_name_es': 'Creado', 'data_type': 'date',
+                 'custom_label': 'Fecha'}
+            ],
+            'summary': {'status_distribution': {'Abierto': 4, 'Cerrado': 6},
+                        'priority_distribution': {'Alta': 2, 'Baja': 8}}
+        }, 'pdf', 'exec-1')
+        assert os.path.getsize(path) > 0
+
+    assert db.queries == [('SELECT * FROM tickets WHERE created_at >= %s', ('2026-10-01',))]
+
+
+class FakeCursor:
+    def __init__(self, name, rows):
+        self.name = name
+        self.rows = rows
+        self.itersize = None
+        self.executed = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.executed = (query, params)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.cursors = []
+        self.rollbacks = 0
+
+    def cursor(self, name=None):
+        cursor = FakeCursor(name, self.rows)
+        self.cursors.append(cursor)
+        return cursor
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def test_iter_query_uses_a_server_side_cursor():
+    conn = FakeConnection([{'n': 1}, {'n': 2}, {'n': 3}])
+    released = []
+    db = DatabaseManager.__new__(DatabaseManager)
+    db._local = threading.local()
+
+    @contextmanager
+    def get_connection():
+        try:
+            yield conn
+        finally:
+            released.append(conn)
+    db.get_connection = get_connection
+
+    rows = db.iter_query('SELECT n FROM t', batch_size=2)
+    assert next(rows) == {'n': 1}
+    cursor = conn.cursors[0]
+    assert cursor.name.startswith('iter_') and cursor.itersize == 2
+    assert released == []
+
+    rows.close()
+    assert conn.rollbacks == 1 and released == [conn]
+    assert list(db.iter_query('SELECT n FROM t')) == [{'n': 1}, {'n': 2}, {'n': 3}]
+
+
+if __name__ == '__main__':
+    print("🔧 Testing PDF report rendering")
+    print("=" * 50)
+    test_large_table_is_chunked_with_repeated_headers()
+    test_styles_and_charts_are_shared()
+    test_enterprise_pdf_renders_every_streamed_row()
+    test_iter_query_uses_a_server_side_cursor()
+    print("✅ All PDF report tests passed")
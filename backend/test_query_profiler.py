@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Test slow-query capture, plan-based index suggestions and the superadmin endpoints
+"""
+
+import os
+import sys
+import logging
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+
+from core.database import DatabaseManager
+from core.query_profiler import QueryProfiler, filter_columns, redact_params, suggest_indexes
+from core.response import ResponseManager
+from modules.system.routes import system_bp
+
+SLA_PLAN = {
+    'Plan': {
+        'Node Type': 'Nested Loop', 'Actual Rows': 12, 'Actual Loops': 1,
+        'Plans': [
+            {'Node Type': 'Seq Scan', 'Relation Name': 'sla_tracking', 'Alias': 'st',
+             'Filter': "((response_breached = false) AND (response_deadline < now()))",
+             'Actual Rows': 12, 'Actual Loops': 1, 'Rows Removed by Filter': 48210},
+            {'Node Type': 'Seq Scan', 'Relation Name': 'sla_policies', 'Alias': 'sp',
+             'Filter': "(is_active = true)", 'Actual Rows': 4, 'Actual Loops': 12,
+             'Rows Removed by Filter': 1}
+        ]
+    }
+}
+
+EMAIL_PLAN = {
+    'Plan': {
+        'Node Type': 'Limit', 'Actual Rows': 20, 'Actual Loops': 1,
+        'Plans': [{
+            'Node Type': 'Seq Scan', 'Relation Name': 'email_queue',
+            'Filter': "(((status)::text = 'pending'::text) AND (next_attempt_at <= CURRENT_TIMESTAMP))",
+            'Actual Rows': 20, 'Actual Loops': 1, 'Rows Removed by Filter': 90000
+        }]
+    }
+}
+
+
+class StubProfiler(QueryProfiler):
+    """Runs the sampler inline and returns canned plans instead of querying PostgreSQL"""
+
+    def __init__(self, plans, **kwargs):
+        super().__init__('postgresql://unused', **kwargs)
+        self.plans = plans
+        self.explained = []
+
+    def _ensure_worker(self):
+        pass
+
+    def explain(self, query, params=None, rls_context=None):
+        self.explained.append((query, params, rls_context))
+        for marker, plan in self.plans.items():
+            if marker in query:
+                return plan
+        raise RuntimeError('permission denied for table secrets')
+
+    def drain(self):
+        self._jobs.put(None)
+        self._run()
+
+
+def test_filters_and_suggestions():
+    assert redact_params(('ana@example.com', 3, None)) == ['str', 'int', 'NoneType']
+    assert redact_params({'token': 'LANET-X'}) == {'token': 'str'}
+    assert filter_columns("(((status)::text = 'pending'::text) AND (next_attempt_at <= CURRENT_TIMESTAMP))") \
+        == ['status', 'next_attempt_at']
+    assert filter_columns("((t.due_at < now()) AND (t.client_id = ANY ('{a,b}'::uuid[])))") == ['client_id', 'due_at']
+
+    suggestions = suggest_indexes(SLA_PLAN)
+    assert len(suggestions) == 1
+    assert suggestions[0]['table'] == 'sla_tracking'
+    assert suggestions[0]['columns'] == ['response_breached', 'response_deadline']
+    assert suggestions[0]['statement'] == \
+        'CREATE INDEX CONCURRENTLY ON sla_tracking (response_breached, response_deadline);'
+
+
+def test_capture_threshold_ring_buffer_and_sampling():
+    profiler = StubProfiler({'sla_tracking': SLA_PLAN, 'email_queue': EMAIL_PLAN},
+                            threshold_ms=100, sample_rate=1.0, buffer_size=3)
+
+    profiler.observe("SELECT * FROM email_queue WHERE status = 'pending'", None, 0.05)
+    assert profiler.recent() == []
+
+    for days in (1, 2, 3, 4):
+        profiler.observe(f"SELECT * FROM sla_tracking WHERE created_at > now() - interval '{days} days'",
+                         ('secret@example.com',), 0.4, rls_context=('u1', 'technician', None, None))
+    profiler.observe("SELECT * FROM email_queue WHERE status = 'pending' LIMIT 20", None, 0.9)
+    profiler.observe("UPDATE email_queue SET status = 'sent' WHERE queue_id = %s", ('q',), 1.5)
+    profiler.observe("SELECT * FROM secrets", None, 0.3)
+    profiler.observe("SELECT register_agent_asset(%s)", ('t',), 2.0, explainable=False)
+
+    recent = profiler.recent()
+    assert len(recent) == 3
+    assert recent[0]['fingerprint'] == 'SELECT register_agent_asset(?)'
+    assert 'secret@example.com' not in repr(profiler.top(include_plans=True))
+
+    # One EXPLAIN per fingerprint within the cooldown, SELECTs only
+    profiler.drain()
+    assert [q.split(' FROM ')[1].split()[0] for q, _, _ in profiler.explained] == \
+        ['sla_tracking', 'email_queue', 'secrets']
+    assert profiler.explained[0][2] == ('u1', 'technician', None, None)
+
+    top = {row['fingerprint']: row for row in profiler.top()}
+    sla = top['SELECT * FROM sla_tracking WHERE created_at > now() - interval ?']
+    assert sla['count'] == 4 and sla['explained'] and sla['avg_ms'] == 400.0
+    assert top['SELECT * FROM secrets']['plan_error'] == 'permission denied for table secrets'
+
+    suggestions = profiler.index_suggestions()
+    assert [s['table'] for s in suggestions] == ['sla_tracking', 'email_queue']
+    assert suggestions[1]['columns'] == ['status', 'next_attempt_at']
+    assert suggestions[0]['slow_ms'] == 1600.0
+
+
+class FakeCursor:
+    rowcount = 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        pass
+
+    def fetchall(self):
+        return []
+
+
+class FakeConnection:
+    def cursor(self):
+        return FakeCursor()
+
+    def get_backend_pid(self):
+        return 4242
+
+    def rollback(self):
+        pass
+
+    def commit(self):
+        pass
+
+
+class FakePool:
+    def getconn(self):
+        return FakeConnection()
+
+    def putconn(self, conn):
+        pass
+
+
+def test_database_manager_feeds_profiler():
+    db = DatabaseManager.__new__(DatabaseManager)
+    db.logger = logging.getLogger('test')
+    db._local = threading.local()
+    db._rls_applied = {}
+    db.pool = FakePool()
+    db.profiler = StubProfiler({}, threshold_ms=0, sample_rate=1.0)
+
+    db.defer_rls_context('u1', 'superadmin')
+    db.execute_query("SELECT * FROM tickets WHERE ticket_id = %s", ('t1',))
+    db.execute_query("SELECT * FROM register_agent_asset(%s)", ('t1',), commit=True)
+    db.execute_update('tickets', {'status': 'cerrado'}, 'ticket_id = %s', ('t1',))
+
+    assert [row['count'] for row in db.profiler.top()] == [1, 1, 1]
+    assert db.profiler._jobs.qsize() == 1
+    fingerprint, query, params, rls_context = db.profiler._jobs.get_nowait()
+    assert query.startswith('SELECT * FROM tickets') and rls_context == ('u1', 'superadmin', None, None)
+
+
+def test_superadmin_endpoints():
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = 'test-secret'
+    JWTManager(app)
+    app.response_manager = ResponseManager()
+    app.db_manager = type('DB', (), {'profiler': None})()
+    app.register_blueprint(system_bp, url_prefix='/api/system')
+    client = app.test_client()
+
+    with app.app_context():
+        admin = {'Authorization': 'Bearer ' + create_access_token('u1', additional_claims={'role': 'superadmin'})}
+        tech = {'Authorization': 'Bearer ' + create_access_token('u2', additional_claims={'role': 'technician'})}
+
+    assert client.get('/api/system/slow-queries', headers=admin).status_code == 404
+
+    profiler = StubProfiler({'email_queue': EMAIL_PLAN}, threshold_ms=10, sample_rate=1.0)
+    profiler.observe("SELECT * FROM email_queue WHERE status = 'pending'", None, 0.5)
+    profiler.drain()
+    app.db_manager.profiler = profiler
+
+    assert client.get('/api/system/slow-queries', headers=tech).status_code == 403
+    data = client.get('/api/system/slow-queries?plans=true', headers=admin).get_json()['data']
+    assert data['top'][0]['plan'] == EMAIL_PLAN and len(data['recent']) == 1
+    assert 'plan' not in client.get('/api/system/slow-queries', headers=admin).get_json()['data']['top'][0]
+
+    suggestions = client.get('/api/system/slow-queries/index-suggestions', headers=admin).get_json()['data']
+    assert suggestions['suggestions'][0]['table'] == 'email_queue'
+
+    assert client.delete('/api/system/slow-queries', headers=admin).status_code == 200
+    assert profiler.top() == []
+
+
+if __name__ == '__main__':
+    print("🔧 Testing query profiler")
+    print("=" * 50)
+    test_filters_and_suggestions()
+    test_capture_threshold_ring_buffer_and_sampling()
+    test_database_manager_feeds_profiler()
+    test_superadmin_endpoints()
+    print("✅ All query profiler tests passed")
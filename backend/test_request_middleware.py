@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test the per-request JWT/principal caches and deferred RLS context
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, g
+from flask_jwt_extended import create_access_token, jwt_required
+
+from core.auth import AuthManager, CachingJWTManager, LRUCache
+from core.middleware import register_request_hooks
+from core.response import ResponseManager
+from utils.security import require_client_access
+
+
+class StubDatabase:
+    def __init__(self):
+        self.deferred = []
+        self.cleared = 0
+
+    def defer_rls_context(self, user_id, user_role, client_id=None, site_ids=None):
+        self.deferred.append((user_id, user_role, client_id, site_ids))
+
+    def clear_rls_context(self):
+        self.cleared += 1
+
+
+def build_app():
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = 'test-secret'
+    jwt = CachingJWTManager(app)
+    app.db_manager = StubDatabase()
+    app.auth_manager = AuthManager(app.db_manager)
+    app.response_manager = ResponseManager()
+    register_request_hooks(app)
+
+    @app.route('/clients/<client_id>')
+    @jwt_required()
+    @require_client_access('client_id')
+    def client_view(client_id):
+        return g.principal['role']
+
+    with app.app_context():
+        token = create_access_token(
+            identity='user-1',
+            additional_claims={'role': 'client_admin', 'client_id': 'client-1', 'site_ids': ['site-1']}
+        )
+    return app, jwt, token
+
+
+def test_lru_cache_evicts_and_expires():
+    cache = LRUCache(max_size=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+
+    expired = LRUCache(ttl_seconds=0)
+    expired.set('a', 1)
+    assert expired.get('a') is None
+
+
+def test_token_decoded_once_per_token():
+    app, jwt, token = build_app()
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    for _ in range(3):
+        response = client.get('/clients/client-1', headers=headers)
+        assert response.status_code == 200
+        assert response.data == b'client_admin'
+
+    assert len(jwt._token_cache) == 1
+    assert len(app.auth_manager.principal_cache) == 1
+    assert app.db_manager.deferred == [('user-1', 'client_admin', 'client-1', ['site-1'])] * 3
+    assert app.db_manager.cleared == 3
+
+
+def test_client_access_on_get_without_json_body():
+    app, _, token = build_app()
+    response = app.test_client().get('/clients/client-2', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 403
+
+
+def test_tampered_token_is_rejected():
+    app, _, token = build_app()
+    client = app.test_client()
+    client.get('/clients/client-1', headers={'Authorization': f'Bearer {token}'})
+
+    response = client.get('/clients/client-1', headers={'Authorization': f'Bearer {token[:-2]}xx'})
+    assert response.status_code in (401, 422)
+
+
+if __name__ == '__main__':
+    print("🔧 Testing request middleware caches")
+    print("=" * 50)
+    test_lru_cache_evicts_and_expires()
+    test_token_decoded_once_per_token()
+    test_client_access_on_get_without_json_body()
+    test_tampered_token_is_rejected()
+    print("✅ All request middleware tests passed")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test the fast JSON path: native types, stdlib fallback, row projection and ResponseManager output
+"""
+
+import os
+import sys
+import json
+import uuid
+from decimal import Decimal
+from datetime import date, datetime, timezone
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, jsonify
+
+from core import serialization
+from core.response import ResponseManager
+from core.serialization import FastJSONProvider, encode, project_rows, row_formatter
+
+TICKET_ID = uuid.UUID('6f1c2a4e-8d3b-4c5a-9e7f-0a1b2c3d4e5f')
+COLUMNS = ['ticket_id', 'ticket_number', 'affected_person_phone', 'affected_person_contact',
+           'created_at', 'resolved_at', 'subject']
+ROW = (TICKET_ID, 'TKT-000042', '', '5551234567', datetime(2026, 10, 1, 9, 30, 0, 123, tzinfo=timezone.utc),
+       None, 'Impresora sin conexión')
+
+
+def build_app(compact=True):
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.json.ensure_ascii = False
+    app.json.compact = compact
+    return app
+
+
+def test_native_types_and_fallback():
+    payload = {'id': TICKET_ID, 'at': datetime(2026, 10, 1, 9, 30, tzinfo=timezone.utc), 'day': date(2026, 10, 1),
+               'cost': Decimal('12.50'), 'name': 'Señal débil', 3: 'three'}
+    fast = json.loads(encode(payload))
+    assert fast == {'id': str(TICKET_ID), 'at': '2026-10-01T09:30:00+00:00', 'day': '2026-10-01',
+                    'cost': '12.50', 'name': 'Señal débil', '3': 'three'}
+
+    original = serialization.orjson
+    serialization.orjson = None
+    try:
+        slow = json.loads(encode({key: value for key, value in payload.items() if key != 3}))
+    finally:
+        serialization.orjson = original
+    assert slow == {key: value for key, value in fast.items() if key != '3'}
+
+    # orjson refuses big integers; the stdlib takes over
+    assert encode({'n': 2 ** 70}) == b'{"n":1180591620717411303424}'
+    assert b'\\u00f1' in encode({'name': 'ñ'}, ensure_ascii=True)
+
+
+def test_row_formatter_projection():
+    formatter = row_formatter(tuple(COLUMNS), ('ticket_number', 'subject'))
+    assert formatter is row_formatter(tuple(COLUMNS), ('ticket_number', 'subject'))
+    assert formatter(ROW) == {'ticket_number': 'TKT-000042', 'subject': 'Impresora sin conexión'}
+    assert project_rows(COLUMNS, [ROW], fields=['subject']) == [{'subject': 'Impresora sin conexión'}]
+    assert project_rows(COLUMNS, [ROW])[0]['created_at'] == ROW[4]
+
+    try:
+        project_rows(COLUMNS, [ROW], fields=['secret'])
+        assert False, 'unknown column accepted'
+    except ValueError as e:
+        assert 'secret' in str(e)
+
+
+def test_ticket_rows_match_dict_path():
+    app = build_app()
+    manager = ResponseManager()
+    with app.test_request_context():
+        from_tuples = manager.success({'tickets': manager.format_ticket_rows(COLUMNS, [ROW])})[0].get_data()
+        from_dicts = jsonify({'success': True, 'data': {
+            'tickets': [manager.format_ticket_data(dict(zip(COLUMNS, ROW)))]
+        }}).get_data()
+    assert from_tuples == from_dicts
+    ticket = json.loads(from_tuples)['data']['tickets'][0]
+    assert ticket['affected_person_phone'] == '5551234567'
+    assert ticket['created_at'] == '2026-10-01T09:30:00.000123+00:00'
+
+
+def test_response_manager_output():
+    manager = ResponseManager()
+    with build_app(compact=True).test_request_context():
+        response, status = manager.success({'name': 'Señal'}, 'ok')
+        assert status == 200 and response.mimetype == 'application/json'
+        assert response.get_data() == '{"data":{"name":"Señal"},"message":"ok","success":true}\n'.encode('utf-8')
+
+        response, status = manager.not_found('Ticket')
+        assert status == 404 and response.get_json() == {'success': False, 'error': 'Ticket not found'}
+
+    with build_app(compact=False).test_request_context():
+        assert b'\n  "data"' in manager.success({'a': 1})[0].get_data()
+
+    app = build_app()
+    assert app.json.loads(b'{"a": [1, 2]}') == {'a': [1, 2]}
+    assert app.json.dumps({'b': 1, 'a': date(2026, 1, 2)}) == '{"a":"2026-01-02","b":1}'
+
+
+if __name__ == '__main__':
+    print("🔧 Testing JSON serialization")
+    print("=" * 50)
+    test_native_types_and_fallback()
+    test_row_formatter_projection()
+    test_ticket_rows_match_dict_path()
+    test_response_manager_output()
+    print("✅ All JSON serialization tests passed")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test the normalized software catalog service (interned products, per-asset membership)
+"""
+
+import os
+import sys
+import json
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.assets.service import SoftwareCatalogService
+
+
+class RecordingDB:
+    def __init__(self, rows=None):
+        self.queries = []
+        self.rows = rows or []
+
+    def execute_query(self, query, params=None, fetch='all', commit=None):
+        self.queries.append((query, params, fetch, commit))
+        if 'software_sync_asset' in query:
+            return {'changed': True, 'added': 2, 'removed': 0, 'product_count': 2}
+        return self.rows
+
+
+def test_extract_programs_accepts_agent_shapes():
+    inventory = {
+        'installed_programs': [
+            {'name': 'Google Chrome', 'version': '120.0', 'publisher': 'Google'},
+            {'name': '', 'version': '1.0'},
+            'not a program'
+        ],
+        'windows_features': []
+    }
+    assert SoftwareCatalogService.extract_programs(inventory) == [
+        {'name': 'Google Chrome', 'version': '120.0', 'publisher': 'Google'}
+    ]
+    assert SoftwareCatalogService.extract_programs([{'name': '7-Zip'}]) == [{'name': '7-Zip'}]
+    assert SoftwareCatalogService.extract_programs({'windows_features': []}) is None
+    assert SoftwareCatalogService.extract_programs(None) is None
+
+
+def test_sync_sends_programs_in_one_committed_call():
+    db = RecordingDB()
+    service = SoftwareCatalogService(db)
+
+    assert service.sync_asset('asset-1', {'windows_features': []}) is None
+    assert db.queries == []
+
+    programs = [{'version': '23.0', 'name': 'Adobe Acrobat Reader', 'publisher': 'Adobe'}]
+    result = service.sync_asset('asset-1', {'installed_programs': programs})
+    query, params, fetch, commit = db.queries[0]
+
+    assert result['added'] == 2
+    assert len(db.queries) == 1
+    assert commit is True and fetch == 'one'
+    assert params[0] == 'asset-1'
+    assert json.loads(params[1]) == programs
+    # Stable serialization so the server-side hash only changes with the content
+    assert params[1] == json.dumps(programs, sort_keys=True)
+
+
+def test_search_filters_and_strips_window_count():
+    db = RecordingDB(rows=[
+        {'product_id': 7, 'name': 'Google Chrome', 'vendor': 'Google', 'version': '120.0',
+         'install_count': 40, 'total_count': 3}
+    ])
+    result = SoftwareCatalogService(db).search_products(
+        search='Chr_me', version='120.0', client_id='client-1', page=1, per_page=50
+    )
+
+    query, params, _, _ = db.queries[0]
+    assert 'sp.normalized_name LIKE %s' in query
+    assert 'sp.version = %s' in query
+    assert 'install_count DESC' in query
+    assert params == ('%chr\\_me%', '120.0', 'client-1', 50, 0)
+    assert result['total'] == 3
+    assert 'total_count' not in result['products'][0]
+
+
+if __name__ == '__main__':
+    print("🔧 Testing SoftwareCatalogService")
+    print("=" * 50)
+    test_extract_programs_accepts_agent_shapes()
+    test_sync_sends_programs_in_one_committed_call()
+    test_search_filters_and_strips_window_count()
+    print("✅ All SoftwareCatalogService tests passed")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test the composite ticket endpoint: one query, field selection, RBAC filtering and ETag/304
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('LOG_FOLDER', tempfile.gettempdir())
+
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+
+from core.response import ResponseManager
+from modules.tickets.routes import tickets_bp
+
+TICKET_ID = '6f1c2a4e-8d3b-4c5a-9e7f-0a1b2c3d4e5f'
+CLIENT_ID = '11111111-2222-3333-4444-555555555555'
+
+
+class FakeDB:
+    """Answers the composite query like PostgreSQL would, honoring include_internal"""
+
+    def __init__(self):
+        self.queries = []
+
+    def validate_uuid(self, value):
+        return len(value) == 36
+
+    def execute_query(self, query, params=None, fetch='all', commit=None):
+        if 'FROM change_counters' in query:
+            return [{'resource': 'tickets', 'version': 7, 'updated_at': None}]
+        self.queries.append((query, params))
+        row = {
+            'ticket_id': TICKET_ID, 'ticket_number': 'TKT-000042', 'client_id': CLIENT_ID,
+            'subject': 'Impresora sin conexión', 'affected_person_contact': '5551234567',
+            'created_at': datetime(2026, 10, 1, 9, 30, tzinfo=timezone.utc), 'updated_at': None
+        }
+        comments = [
+            {'comment_id': 'c1', 'content': 'Revisamos el equipo', 'is_internal': False,
+             'created_at': '2026-10-01T10:00:00+00:00', 'updated_at': '2026-10-01T10:00:00+00:00'},
+            {'comment_id': 'c2', 'content': 'Nota interna', 'is_internal': True,
+             'created_at': '2026-10-01T11:00:00+00:00', 'updated_at': None}
+        ]
+        sections = {
+            'comments': comments if params['include_internal'] else comments[:1],
+            'attachments': [{'attachment_id': 'a1', 'file_size': 2048, 'created_at': '2026-10-01T10:05:00+00:00'}],
+            'activities': [{'activity_id': 'x1', 'action': 'created', 'created_at': '2026-10-01T09:30:00+00:00'}],
+            'sla': [{'tracking_id': 's1', 'response_deadline': '2026-10-01T11:30:00+00:00'}],
+            'resolutions': [{'resolution_id': 'r1', 'ticket_id': TICKET_ID, 'resolution_notes': 'Cable cambiado',
+                             'resolved_by': 'u1', 'resolved_by_name': 'Ana', 'resolved_by_role': 'technician',
+                             'resolved_at': '2026-10-02T08:00:00+00:00', 'created_at': None}]
+        }
+        for name, rows in sections.items():
+            if f') AS {name}' in query:
+                row[name] = rows
+        return row
+
+
+def build_app():
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = 'test-secret'
+    JWTManager(app)
+    app.response_manager = ResponseManager()
+    app.db_manager = FakeDB()
+    app.auth_manager = None
+    app.register_blueprint(tickets_bp, url_prefix='/api/tickets')
+    return app
+
+
+def headers(app, role, client_id=None):
+    with app.app_context():
+        token = create_access_token('u1', additional_claims={'role': role, 'client_id': client_id})
+    return {'Authorization': 'Bearer ' + token}
+
+
+def test_single_query_with_all_sections():
+    app = build_app()
+    response = app.test_client().get(f'/api/tickets/{TICKET_ID}/full', headers=headers(app, 'technician'))
+    assert response.status_code == 200
+
+    assert len(app.db_manager.queries) == 1
+    query, params = app.db_manager.queries[0]
+    assert query.count('json_agg') == 5 and params['include_internal'] is True
+
+    data = response.get_json()['data']
+    assert data['ticket']['ticket_number'] == 'TKT-000042'
+    assert data['ticket']['created_at'] == '2026-10-01T09:30:00+00:00'
+    assert data['ticket']['affected_person_phone'] == '5551234567'
+    assert 'comments' not in data['ticket']
+    assert [c['comment_id'] for c in data['comments']] == ['c1', 'c2']
+    assert data['attachments'][0]['file_size_display'] == '2.0 KB'
+    assert data['resolutions'][0]['resolved_at'] == '2026-10-02T08:00:00+00:00'
+    assert data['activities'] and data['sla']
+
+
+def test_field_selection_and_client_filtering():
+    app = build_app()
+    client = app.test_client()
+
+    response = client.get(f'/api/tickets/{TICKET_ID}/full?fields=comments,attachments',
+                          headers=headers(app, 'admin'))
+    assert set(response.get_json()['data']) == {'ticket', 'comments', 'attachments'}
+    assert app.db_manager.queries[-1][0].count('json_agg') == 2
+
+    assert client.get(f'/api/tickets/{TICKET_ID}/full?fields=comments,secrets',
+                      headers=headers(app, 'admin')).status_code == 400
+    assert client.get('/api/tickets/not-a-uuid/full', headers=headers(app, 'admin')).status_code == 400
+
+    data = client.get(f'/api/tickets/{TICKET_ID}/full',
+                      headers=headers(app, 'client_admin', CLIENT_ID)).get_json()['data']
+    assert set(data) == {'ticket', 'comments', 'attachments', 'resolutions'}
+    assert [c['comment_id'] for c in data['comments']] == ['c1']
+    assert app.db_manager.queries[-1][1]['include_internal'] is False
+
+    other_client = headers(app, 'solicitante', '99999999-2222-3333-4444-555555555555')
+    assert client.get(f'/api/tickets/{TICKET_ID}/full', headers=other_client).status_code == 403
+
+
+def test_etag_and_not_modified():
+    app = build_app()
+    client = app.test_client()
+    tech = headers(app, 'technician')
+
+    first = client.get(f'/api/tickets/{TICKET_ID}/full', headers=tech)
+    etag = first.headers['ETag']
+    assert etag and 'Authorization' in first.headers['Vary']
+
+    cached = client.get(f'/api/tickets/{TICKET_ID}/full', headers=dict(tech, **{'If-None-Match': etag}))
+    assert cached.status_code == 304 and cached.data == b'' and cached.headers['ETag'] == etag
+    assert len(app.db_manager.queries) == 1
+
+    # Client users see a different (filtered) payload, hence a different tag
+    client_user = headers(app, 'client_admin', CLIENT_ID)
+    assert client.get(f'/api/tickets/{TICKET_ID}/full',
+                      headers=dict(client_user, **{'If-None-Match': etag})).status_code == 200
+
+
+if __name__ == '__main__':
+    print("🔧 Testing composite ticket endpoint")
+    print("=" * 50)
+    test_single_query_with_all_sections()
+    test_field_selection_and_client_filtering()
+    test_etag_and_not_modified()
+    print("✅ All composite ticket endpoint tests passed")
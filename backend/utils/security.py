@@ -11,11 +11,13 @@ import secrets
 import hashlib
 import base64
 import os
+from datetime import datetime
 from cryptography.fernet import Fernet
 from typing import Dict, List, Any, Optional
 from functools import wraps
 from flask import request, g, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from core.audit import write_audit_row
 
 class SecurityUtils:
     """Utility class for security operations"""
@@ -221,6 +223,30 @@ class SecurityUtils:
             'size': file_size
         }
 
+def _current_principal() -> Dict[str, Any]:
+    """Get the principal resolved by before_request, falling back to JWT claims"""
+    principal = getattr(g, 'principal', None)
+    if principal is not None:
+        return principal
+
+    claims = get_jwt()
+    return {
+        'role': claims.get('role'),
+        'client_id': claims.get('client_id'),
+        'site_ids': claims.get('site_ids', [])
+    }
+
+def _request_param(name: str, view_kwargs: Dict[str, Any]) -> Optional[str]:
+    """Look up an identifier in the URL, JSON body (parsed once) or query string"""
+    if name in view_kwargs:
+        return view_kwargs[name]
+
+    body = request.get_json(silent=True)
+    if isinstance(body, dict) and body.get(name):
+        return body[name]
+
+    return request.args.get(name)
+
 def require_role(allowed_roles: List[str]):
     """Decorator to require specific user roles"""
     def decorator(f):
@@ -251,18 +277,12 @@ def require_client_access(client_id_param: str = 'client_id'):
         @jwt_required()
         def decorated_function(*args, **kwargs):
             try:
-                claims = get_jwt()
-                user_role = claims.get('role')
-                user_client_id = claims.get('client_id')
+                principal = _current_principal()
+                user_role = principal.get('role')
+                user_client_id = principal.get('client_id')
                 
                 # Get target client ID from request
-                target_client_id = None
-                if client_id_param in kwargs:
-                    target_client_id = kwargs[client_id_param]
-                elif request.json and client_id_param in request.json:
-                    target_client_id = request.json[client_id_param]
-                elif request.args.get(client_id_param):
-                    target_client_id = request.args.get(client_id_param)
+                target_client_id = _request_param(client_id_param, kwargs)
                 
                 # Check access
                 if not current_app.auth_manager.can_access_client(
@@ -287,19 +307,13 @@ def require_site_access(site_id_param: str = 'site_id'):
         @jwt_required()
         def decorated_function(*args, **kwargs):
             try:
-                claims = get_jwt()
-                user_role = claims.get('role')
-                user_client_id = claims.get('client_id')
-                user_site_ids = claims.get('site_ids', [])
+                principal = _current_principal()
+                user_role = principal.get('role')
+                user_client_id = principal.get('client_id')
+                user_site_ids = principal.get('site_ids', [])
                 
                 # Get target site ID from request
-                target_site_id = None
-                if site_id_param in kwargs:
-                    target_site_id = kwargs[site_id_param]
-                elif request.json and site_id_param in request.json:
-                    target_site_id = request.json[site_id_param]
-                elif request.args.get(site_id_param):
-                    target_site_id = request.args.get(site_id_param)
+                target_site_id = _request_param(site_id_param, kwargs)
                 
                 # Check access
                 if not current_app.auth_manager.can_access_site(
@@ -322,10 +336,10 @@ def log_user_action(action: str, resource_type: str = None, resource_id: str = N
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
+            # Execute the function exactly once; audit failures must never re-run it
+            result = f(*args, **kwargs)
+
             try:
-                # Execute the function
-                result = f(*args, **kwargs)
-                
                 # Log the action if user is authenticated
                 if hasattr(g, 'current_user_id') and g.current_user_id:
                     audit_data = {
@@ -335,15 +349,16 @@ def log_user_action(action: str, resource_type: str = None, resource_id: str = N
                         'record_id': resource_id or kwargs.get('id'),
                         'ip_address': request.remote_addr,
                         'user_agent': request.headers.get('User-Agent', '')[:500],
-                        'details': f"{request.method} {request.path}"
+                        'details': f"{request.method} {request.path}",
+                        'timestamp': datetime.utcnow()
                     }
-                    
-                    current_app.db_manager.execute_insert('audit_log', audit_data)
-                
-                return result
+
+                    # Queued and written in batches off the request path
+                    write_audit_row('audit_log', audit_data)
             except Exception as e:
                 current_app.logger.error(f"Action logging failed: {e}")
-                return f(*args, **kwargs)  # Continue even if logging fails
-        
+
+            return result
+
         return decorated_function
     return decorator
@@ -228,7 +228,8 @@ class ValidationUtils:
         return sanitized
     
     @staticmethod
-    def validate_pagination(page: Any, per_page: Any) -> Dict[str, Any]:
+    def validate_pagination(page: Any, per_page: Any, default_per_page: int = 20,
+                            max_per_page: int = 100) -> Dict[str, Any]:
         """Validate pagination parameters"""
         errors = {}
         
@@ -241,13 +242,13 @@ class ValidationUtils:
             errors['page'] = 'Invalid page number'
         
         try:
-            per_page = int(per_page) if per_page else 20
+            per_page = int(per_page) if per_page else default_per_page
             if per_page < 1:
-                per_page = 20
-            elif per_page > 100:
-                per_page = 100
+                per_page = default_per_page
+            elif per_page > max_per_page:
+                per_page = max_per_page
         except (ValueError, TypeError):
-            per_page = 20
+            per_page = default_per_page
             errors['per_page'] = 'Invalid per_page value'
         
         return {
@@ -255,3 +256,9 @@ class ValidationUtils:
             'per_page': per_page,
             'errors': errors
         }
+
+    @staticmethod
+    def like_pattern(search: str) -> str:
+        """Build a substring ILIKE pattern, escaping LIKE wildcards in user input"""
+        escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return f"%{escaped}%"
@@ -96,6 +96,8 @@ SMTP_USERNAME=webmaster@compushop.com.mx
 SMTP_PASSWORD=Iyhnbsfg26
 FRONTEND_URL=https://$DOMAIN
 BACKEND_URL=https://api.$DOMAIN
+# Open /api/events/stream connections per gunicorn worker (below --threads 16)
+EVENTS_MAX_STREAMS=8
 EOF
 
 chown $APP_USER:$APP_USER .env.production
@@ -189,7 +191,7 @@ Group=$APP_USER
 WorkingDirectory=$APP_DIR/backend
 Environment=PATH=$APP_DIR/backend/venv/bin
 EnvironmentFile=$APP_DIR/backend/.env.production
-ExecStart=$APP_DIR/backend/venv/bin/gunicorn --workers 3 --bind 127.0.0.1:5001 --timeout 120 app:app
+ExecStart=$APP_DIR/backend/venv/bin/gunicorn --workers 3 --worker-class gthread --threads 16 --bind 127.0.0.1:5001 --timeout 120 app:app
 Restart=always
 RestartSec=10
 
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import {
   Monitor,
   Activity,
@@ -17,6 +17,7 @@ import {
   BarChart3
 } from 'lucide-react';
 import { assetsService } from '../../services/assetsService';
+import { useRealtimeEvents } from '../../hooks/useRealtimeEvents';
 import AssetFilters from './AssetFilters';
 import FilteredAssetsList from './FilteredAssetsList';
 import AssetDetailModal from './AssetDetailModal';
@@ -70,6 +71,24 @@ const TechnicianDashboard: React.FC = () => {
     loadDashboardData();
   }, []);
 
+  // Refresh in the background when assets go online/offline; bursts coalesce into one request
+  const refreshTimer = useRef<ReturnType<typeof setTimeout> | null>(null);
+  const refreshInBackground = () => {
+    if (refreshTimer.current) return;
+    refreshTimer.current = setTimeout(async () => {
+      refreshTimer.current = null;
+      try {
+        setDashboardData(await assetsService.getTechnicianDashboard());
+      } catch (err) {
+        console.error('Dashboard refresh error:', err);
+      }
+    }, 2000);
+  };
+  useEffect(() => () => {
+    if (refreshTimer.current) clearTimeout(refreshTimer.current);
+  }, []);
+  useRealtimeEvents(['asset.status'], refreshInBackground, refreshInBackground);
+
   const loadDashboardData = async (retryCount = 0) => {
     try {
       setLoading(true);
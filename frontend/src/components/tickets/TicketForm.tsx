@@ -108,10 +108,12 @@ const TicketForm: React.FC<TicketFormProps> = ({
         // Full access users: load all clients
         try {
           console.log('📡 TicketForm: Loading clients for admin user...');
-          const clientsResponse = await clientsService.getClients();
+          const clientsResponse = await clientsService.getClients({ per_page: 1000 });
           console.log('📦 TicketForm: Clients response:', clientsResponse);
 
-          const clientsData = clientsResponse.data;
+          const clientsData = Array.isArray(clientsResponse.data)
+            ? clientsResponse.data
+            : clientsResponse.data?.clients;
           if (Array.isArray(clientsData)) {
             console.log('✅ TicketForm: Setting clients:', clientsData.length, 'items');
             setClients(clientsData);
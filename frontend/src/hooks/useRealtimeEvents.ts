@@ -0,0 +1,86 @@
+import { useEffect, useRef } from 'react';
+import { apiService } from '@/services/api';
+
+export interface RealtimeEvent {
+  event_id: number;
+  type: string;
+  client_id: string | null;
+  site_id: string | null;
+  payload: Record<string, any>;
+  created_at: string;
+}
+
+/**
+ * Subscribe to server-pushed events (/api/events/stream)
+ * @param types - Event types to receive (ticket.created, ticket.updated, ticket.comment, sla.breach, asset.status)
+ * @param onEvent - Called for every event of those types
+ * @param onReset - Called when missed events could not be replayed; reload the view
+ */
+export function useRealtimeEvents(
+  types: string[],
+  onEvent: (event: RealtimeEvent) => void,
+  onReset?: () => void
+): void {
+  const onEventRef = useRef(onEvent);
+  const onResetRef = useRef(onReset);
+  onEventRef.current = onEvent;
+  onResetRef.current = onReset;
+  const typesKey = types.join(',');
+
+  useEffect(() => {
+    let source: EventSource | null = null;
+    let lastEventId: string | null = null;
+    let retryTimer: ReturnType<typeof setTimeout> | null = null;
+    let closed = false;
+    // Resumes repeat recent events (late commits can carry lower ids); skip ids seen before
+    const seenIds = new Set<number>();
+
+    const open = async () => {
+      try {
+        // EventSource cannot send the Authorization header; use a stream token
+        const response = await apiService.post<{ token: string }>('/events/stream-token', {});
+        if (closed || !response.success || !response.data) return;
+
+        const params = new URLSearchParams({ jwt: response.data.token });
+        if (lastEventId) params.set('last_event_id', lastEventId);
+        source = new EventSource(`/api/events/stream?${params.toString()}`);
+
+        typesKey.split(',').forEach((type) => {
+          source!.addEventListener(type, (message) => {
+            const event = message as MessageEvent;
+            lastEventId = event.lastEventId || lastEventId;
+            const data: RealtimeEvent = JSON.parse(event.data);
+            if (seenIds.has(data.event_id)) return;
+            seenIds.add(data.event_id);
+            if (seenIds.size > 1000) seenIds.delete(seenIds.values().next().value as number);
+            onEventRef.current(data);
+          });
+        });
+        source.addEventListener('reset', (message) => {
+          lastEventId = (message as MessageEvent).lastEventId || lastEventId;
+          onResetRef.current?.();
+        });
+
+        // The browser reconnects by itself (with Last-Event-ID); a closed
+        // source means the token was rejected or the server is at its stream
+        // limit (503), so get a new token after a spread-out delay
+        source.onerror = () => {
+          if (source?.readyState === EventSource.CLOSED && !closed) {
+            source.close();
+            retryTimer = setTimeout(open, 5000 + Math.random() * 25000);
+          }
+        };
+      } catch (error) {
+        if (!closed) retryTimer = setTimeout(open, 5000);
+      }
+    };
+
+    open();
+
+    return () => {
+      closed = true;
+      if (retryTimer) clearTimeout(retryTimer);
+      source?.close();
+    };
+  }, [typesKey]);
+}
@@ -84,9 +84,9 @@ const ReportConfigurationForm: React.FC<ReportConfigurationFormProps> = ({
 
   const loadClients = async () => {
     try {
-      const response = await apiService.get('/clients') as ApiResponse<Client[]>;
+      const response = await apiService.get('/clients?per_page=1000') as ApiResponse<{ clients: Client[] }>;
       if (response.success) {
-        setClients(response.data);
+        setClients(response.data?.clients || []);
       }
     } catch (error) {
       console.error('Error loading clients:', error);
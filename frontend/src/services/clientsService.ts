@@ -73,7 +73,9 @@ class ClientsService {
       console.log('getAllClients response:', response); // Debug
 
       // Handle different response structures
-      if (response?.data?.data) {
+      if (Array.isArray(response?.data?.clients)) {
+        return response.data.clients; // Client directory page
+      } else if (response?.data?.data) {
         return response.data.data; // Paginated response
       } else if (response?.data) {
         return Array.isArray(response.data) ? response.data : []; // Direct array
@@ -14,10 +14,13 @@ import os
 
 from .config_manager import ConfigManager
 from .database import DatabaseManager
+from .spool import OfflineSpool
+from .sampler import get_sampler
 from modules.registration import RegistrationModule
 from modules.heartbeat_simple import SimpleHeartbeatModule
 from modules.monitoring import MonitoringModule
 from modules.ticket_creator import TicketCreatorModule
+from modules.spool_replay import SpoolReplayModule
 
 class AgentCore:
     """Main agent core service that orchestrates all modules"""
@@ -31,13 +34,27 @@ class AgentCore:
         
         # Initialize database
         db_path = self.config.get('database.local_db_path', 'data/agent.db')
-        self.database = DatabaseManager(db_path)
+        self.database = DatabaseManager(
+            db_path,
+            metrics_flush_interval=self.config.get('database.metrics_flush_interval', 900),
+            retention_days=self.config.get('database.retention_days', 7)
+        )
+        
+        # Offline spool shared by heartbeat and ticket delivery
+        self.spool = OfflineSpool(self.database)
+        
+        # One psutil sampler for every module that reads CPU/memory/disk usage
+        self.sampler = get_sampler(
+            interval=self.config.get('agent.sample_interval', 60),
+            capacity=self.config.get('agent.sample_buffer_size', 60)
+        )
         
         # Initialize modules
         self.registration = RegistrationModule(self.config, self.database)
-        self.monitoring = MonitoringModule(self.config, self.database)
-        self.heartbeat = SimpleHeartbeatModule(self.config, self.database)
-        self.ticket_creator = TicketCreatorModule(self.config, self.database)
+        self.monitoring = MonitoringModule(self.config, self.database, sampler=self.sampler)
+        self.heartbeat = SimpleHeartbeatModule(self.config, self.database, spool=self.spool, sampler=self.sampler)
+        self.ticket_creator = TicketCreatorModule(self.config, self.database, spool=self.spool, sampler=self.sampler)
+        self.spool_replay = SpoolReplayModule(self.config, self.database, spool=self.spool)
         
         # System tray UI (initialized later if enabled)
         self.system_tray = None
@@ -57,6 +74,11 @@ class AgentCore:
                     self._show_registration_prompt()
                 return False
             
+            # Start the shared metric sampler before its readers
+            sampler_thread = threading.Thread(target=self.sampler.start, daemon=True)
+            sampler_thread.start()
+            self.threads.append(sampler_thread)
+            
             # Start monitoring module
             self.logger.info("Starting monitoring module...")
             monitoring_thread = threading.Thread(target=self.monitoring.start, daemon=True)
@@ -69,6 +91,12 @@ class AgentCore:
             heartbeat_thread.start()
             self.threads.append(heartbeat_thread)
             
+            # Start offline spool replay
+            self.logger.info("Starting spool replay module...")
+            replay_thread = threading.Thread(target=self.spool_replay.start, daemon=True)
+            replay_thread.start()
+            self.threads.append(replay_thread)
+            
             # Start system tray UI if enabled
             if self.ui_enabled:
                 self.logger.info("Starting system tray UI...")
@@ -96,6 +124,8 @@ class AgentCore:
                 self.heartbeat.stop()
             if hasattr(self.monitoring, 'stop'):
                 self.monitoring.stop()
+            self.sampler.stop()
+            self.spool_replay.stop()
             
             # Stop system tray
             if self.system_tray:
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Agent - Inventory Collectors
+Cached, concurrent inventory collection with per-collector volatility
+"""
+
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Any, Callable, Iterable, Optional
+
+import psutil
+
+# Volatility classes: how long a collector's result stays valid
+PER_BOOT = 'boot'            # BIOS, board, CPU model: until the next reboot
+DAILY = 'daily'              # SMART health, USB devices: a day, or until reboot
+HOURLY = 'hourly'            # installed software: an hour, or until reboot
+PER_HEARTBEAT = 'heartbeat'  # usage figures: never cached
+
+VOLATILITY_TTL = {PER_BOOT: None, DAILY: 86400, HOURLY: 3600, PER_HEARTBEAT: 0}
+
+# psutil.boot_time() jitters by a second or so on Windows
+BOOT_TIME_TOLERANCE = 5
+
+
+class Collector:
+    """One named piece of inventory and how long it can be reused"""
+
+    def __init__(self, name: str, func: Callable[[], Any], volatility: str = PER_HEARTBEAT, default: Any = None):
+        if volatility not in VOLATILITY_TTL:
+            raise ValueError(f"Unknown volatility class: {volatility}")
+        self.name = name
+        self.func = func
+        self.volatility = volatility
+        self.default = default
+
+
+class InventoryCollector:
+    """Runs registered collectors, reusing cached results while they are valid
+
+    Results are cached in the agent database under ``inventory_cache.<name>``
+    together with the boot time they were taken in; a reboot invalidates
+    everything. Collectors that must run are executed in a small thread pool
+    under one overall deadline. A collector that misses the deadline or fails
+    contributes its last cached value (from any boot) or its default.
+    """
+
+    CONFIG_PREFIX = 'inventory_cache.'
+
+    def __init__(self, database, max_workers: int = 4, deadline: float = 60, boot_time: float = None):
+        self.logger = logging.getLogger('lanet_agent.collectors')
+        self.database = database
+        self.max_workers = max_workers
+        self.deadline = deadline
+        self.boot_time = boot_time if boot_time is not None else psutil.boot_time()
+        self.collectors: Dict[str, Collector] = {}
+
+    def register(self, name: str, func: Callable[[], Any], volatility: str = PER_HEARTBEAT, default: Any = None):
+        self.collectors[name] = Collector(name, func, volatility, default)
+
+    def _cached(self, name: str) -> Optional[Dict[str, Any]]:
+        entry = self.database.get_config(self.CONFIG_PREFIX + name)
+        return entry if isinstance(entry, dict) and 'data' in entry else None
+
+    def _is_fresh(self, collector: Collector, entry: Optional[Dict[str, Any]], now: float) -> bool:
+        ttl = VOLATILITY_TTL[collector.volatility]
+        if entry is None or ttl == 0:
+            return False
+        if abs((entry.get('boot_time') or 0) - self.boot_time) > BOOT_TIME_TOLERANCE:
+            return False
+        return ttl is None or now - (entry.get('collected_at') or 0) < ttl
+
+    def collect(self, names: Iterable[str] = None, force: bool = False) -> Dict[str, Any]:
+        """Return {name: data} for the requested collectors (all by default)"""
+        started = time.monotonic()
+        now = time.time()
+        selected = [self.collectors[name] for name in (names or self.collectors)]
+        results = {}
+        pending = []
+
+        for collector in selected:
+            entry = self._cached(collector.name)
+            if not force and self._is_fresh(collector, entry, now):
+                results[collector.name] = entry['data']
+            else:
+                pending.append((collector, entry))
+
+        if pending:
+            executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending)),
+                                          thread_name_prefix='inventory')
+            futures = {executor.submit(collector.func): (collector, entry) for collector, entry in pending}
+            done, not_done = wait(futures, timeout=self.deadline)
+            # Stragglers keep running under their own subprocess timeouts; do not wait for them
+            executor.shutdown(wait=False, cancel_futures=True)
+
+            for future, (collector, entry) in futures.items():
+                fallback = entry['data'] if entry else collector.default
+                if future in not_done:
+                    self.logger.warning(f"Inventory collector '{collector.name}' missed the {self.deadline}s deadline")
+                    results[collector.name] = fallback
+                    continue
+                try:
+                    data = future.result()
+                except Exception as e:
+                    self.logger.warning(f"Inventory collector '{collector.name}' failed: {e}")
+                    results[collector.name] = fallback
+                    continue
+
+                results[collector.name] = data
+                if VOLATILITY_TTL[collector.volatility] != 0:
+                    self.database.set_config(self.CONFIG_PREFIX + collector.name, {
+                        'boot_time': self.boot_time,
+                        'collected_at': now,
+                        'data': data
+                    })
+
+        self.logger.info(
+            f"Inventory collected in {time.monotonic() - started:.1f}s "
+            f"({len(pending)} ran, {len(selected) - len(pending)} cached)"
+        )
+        return results
+
+    def invalidate(self, names: Iterable[str] = None):
+        for name in (names or self.collectors):
+            self.database.set_config(self.CONFIG_PREFIX + name, None)
@@ -120,6 +120,8 @@ class ConfigManager:
                 "heartbeat_interval": 60,
                 "inventory_interval": 3600,
                 "metrics_interval": 300,
+                "sample_interval": 60,
+                "sample_buffer_size": 60,
                 "log_level": "INFO",
                 "auto_start": True,
                 "version": "1.0.0"
@@ -135,7 +137,9 @@ class ConfigManager:
                 "memory_threshold": 85,
                 "disk_threshold": 90,
                 "collect_logs": True,
-                "max_log_entries": 100
+                "max_log_entries": 100,
+                "inventory_workers": 4,
+                "inventory_deadline": 60
             },
             "security": {
                 "require_approval_for_scripts": True,
@@ -144,6 +148,8 @@ class ConfigManager:
             },
             "database": {
                 "local_db_path": "data/agent.db",
+                "metrics_flush_interval": 900,
+                "retention_days": 7,
                 "backup_interval": 86400,
                 "max_backup_files": 7
             }
@@ -7,6 +7,7 @@ SQLite database for local caching and configuration
 
 import sqlite3
 import json
+import time
 import logging
 from pathlib import Path
 from typing import Dict, Any, Optional, List
@@ -14,20 +15,57 @@ from datetime import datetime
 import threading
 
 class DatabaseManager:
-    """Manages local SQLite database for agent data"""
+    """Manages local SQLite database for agent data
+
+    Each thread keeps one long-lived connection in WAL mode, so readers never
+    block the writer and SQLite's per-connection statement cache is reused.
+    Config values are cached in memory (write-through), and metrics are
+    buffered and inserted in batches every ``metrics_flush_interval`` seconds;
+    ``get_recent_metrics`` sees buffered samples too. Old metrics, heartbeat
+    history and logs are pruned by age at most once per ``prune_interval``.
+    """
     
-    def __init__(self, db_path: str = "data/agent.db"):
+    def __init__(self, db_path: str = "data/agent.db", metrics_flush_interval: int = 900,
+                 metrics_flush_size: int = 50, retention_days: int = 7, max_metrics: int = 1000,
+                 prune_interval: int = 3600):
         self.logger = logging.getLogger('lanet_agent.database')
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._lock = threading.Lock()
+        self.metrics_flush_interval = metrics_flush_interval
+        self.metrics_flush_size = metrics_flush_size
+        self.retention_seconds = retention_days * 86400
+        self.max_metrics = max_metrics
+        self.prune_interval = prune_interval
+
+        # Guards the metrics buffer, the config cache and the connection list
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._connections = []
+        self._config_cache = None
+        self._metrics_buffer = []
+        self._last_flush = time.monotonic()
+        self._last_prune = 0.0
         self.init_database()
     
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # check_same_thread=False only so close() can run from the shutdown thread
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False, cached_statements=64)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=10000')
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+    
     def init_database(self):
         """Initialize database tables"""
         try:
-            with self._lock:
-                conn = sqlite3.connect(self.db_path)
+            conn = self._connection()
+            with conn:
                 cursor = conn.cursor()
                 
                 # Agent configuration table
@@ -52,6 +90,10 @@ class DatabaseManager:
                         metrics_json TEXT
                     )
                 ''')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_metrics_history_timestamp
+                    ON metrics_history (timestamp)
+                ''')
                 
                 # Ticket cache
                 cursor.execute('''
@@ -90,31 +132,53 @@ class DatabaseManager:
                     )
                 ''')
                 
-                conn.commit()
-                conn.close()
+                # Offline spool: heartbeat samples and tickets awaiting delivery
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS spool (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        kind TEXT NOT NULL,
+                        created_at REAL NOT NULL,
+                        payload TEXT NOT NULL,
+                        attempts INTEGER NOT NULL DEFAULT 0
+                    )
+                ''')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_spool_kind_created
+                    ON spool (kind, created_at)
+                ''')
                 
-                self.logger.info(f"Database initialized at {self.db_path}")
+            self.logger.info(f"Database initialized at {self.db_path}")
                 
         except Exception as e:
             self.logger.error(f"Error initializing database: {e}")
             raise
     
+    # ------------------------------------------------------------------
+    # Configuration (cached, write-through)
+    # ------------------------------------------------------------------
+
+    def _load_config_cache(self) -> Dict[str, str]:
+        if self._config_cache is None:
+            cursor = self._connection().execute('SELECT key, value FROM agent_config')
+            self._config_cache = {row[0]: row[1] for row in cursor.fetchall()}
+        return self._config_cache
+    
     def set_config(self, key: str, value: Any):
-        """Store configuration value"""
+        """Store configuration value (no disk write when it is unchanged)"""
         try:
+            value_str = json.dumps(value) if not isinstance(value, str) else value
             with self._lock:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
+                cache = self._load_config_cache()
+                if cache.get(key) == value_str:
+                    return
                 
-                value_str = json.dumps(value) if not isinstance(value, str) else value
-                
-                cursor.execute('''
-                    INSERT OR REPLACE INTO agent_config (key, value, updated_at)
-                    VALUES (?, ?, ?)
-                ''', (key, value_str, datetime.now()))
-                
-                conn.commit()
-                conn.close()
+                conn = self._connection()
+                with conn:
+                    conn.execute('''
+                        INSERT OR REPLACE INTO agent_config (key, value, updated_at)
+                        VALUES (?, ?, ?)
+                    ''', (key, value_str, datetime.now()))
+                cache[key] = value_str
                 
         except Exception as e:
             self.logger.error(f"Error setting config {key}: {e}")
@@ -123,106 +187,262 @@ class DatabaseManager:
         """Retrieve configuration value"""
         try:
             with self._lock:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
-                cursor.execute('SELECT value FROM agent_config WHERE key = ?', (key,))
-                result = cursor.fetchone()
-                
-                conn.close()
-                
-                if result:
-                    try:
-                        return json.loads(result[0])
-                    except json.JSONDecodeError:
-                        return result[0]
-                
+                value = self._load_config_cache().get(key)
+            
+            if value is None:
                 return default
+            try:
+                return json.loads(value)
+            except json.JSONDecodeError:
+                return value
                 
         except Exception as e:
             self.logger.error(f"Error getting config {key}: {e}")
             return default
     
+    # ------------------------------------------------------------------
+    # Metrics (write-behind)
+    # ------------------------------------------------------------------
+
     def store_metrics(self, metrics: Dict[str, Any]):
-        """Store system metrics"""
+        """Buffer system metrics; they reach disk with the next batch"""
         try:
+            row = (
+                datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
+                metrics.get('cpu_usage'),
+                metrics.get('memory_usage'),
+                metrics.get('disk_usage'),
+                metrics.get('network_status'),
+                metrics.get('uptime'),
+                json.dumps(metrics)
+            )
             with self._lock:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    INSERT INTO metrics_history 
-                    (cpu_usage, memory_usage, disk_usage, network_status, uptime, metrics_json)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    metrics.get('cpu_usage'),
-                    metrics.get('memory_usage'),
-                    metrics.get('disk_usage'),
-                    metrics.get('network_status'),
-                    metrics.get('uptime'),
-                    json.dumps(metrics)
-                ))
-                
-                conn.commit()
-                conn.close()
-                
-                # Clean old metrics (keep last 1000 entries)
-                self._cleanup_metrics()
+                self._metrics_buffer.append(row)
+                due = (len(self._metrics_buffer) >= self.metrics_flush_size or
+                       time.monotonic() - self._last_flush >= self.metrics_flush_interval)
+            if due:
+                self.flush()
                 
         except Exception as e:
             self.logger.error(f"Error storing metrics: {e}")
     
+    def flush(self):
+        """Write buffered metrics in one transaction and prune when due"""
+        with self._lock:
+            rows, self._metrics_buffer = self._metrics_buffer, []
+            self._last_flush = time.monotonic()
+        try:
+            if rows:
+                conn = self._connection()
+                with conn:
+                    conn.executemany('''
+                        INSERT INTO metrics_history
+                        (timestamp, cpu_usage, memory_usage, disk_usage, network_status, uptime, metrics_json)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ''', rows)
+        except Exception as e:
+            self.logger.error(f"Error flushing {len(rows)} buffered metrics: {e}")
+            with self._lock:
+                # Keep them for the next flush, bounded by the retention cap
+                self._metrics_buffer = (rows + self._metrics_buffer)[-self.max_metrics:]
+            return
+        
+        if time.monotonic() - self._last_prune >= self.prune_interval:
+            self.prune()
+    
     def get_recent_metrics(self, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get recent system metrics"""
+        """Get recent system metrics, buffered samples included"""
         try:
             with self._lock:
-                conn = sqlite3.connect(self.db_path)
+                buffered = list(reversed(self._metrics_buffer[-limit:]))
+            results = [(row[0], row[6]) for row in buffered]
+            
+            if len(results) < limit:
+                cursor = self._connection().execute('''
+                    SELECT timestamp, metrics_json FROM metrics_history
+                    ORDER BY id DESC LIMIT ?
+                ''', (limit - len(results),))
+                results.extend(cursor.fetchall())
+            
+            metrics = []
+            for row in results:
+                try:
+                    metric_data = json.loads(row[1])
+                    metric_data['timestamp'] = row[0]
+                    metrics.append(metric_data)
+                except json.JSONDecodeError:
+                    continue
+            
+            return metrics
+                
+        except Exception as e:
+            self.logger.error(f"Error getting recent metrics: {e}")
+            return []
+    
+    def log_heartbeat(self, status: str, response_time: Optional[float], error_message: str = None):
+        """Record a heartbeat attempt in heartbeat_history"""
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    'INSERT INTO heartbeat_history (status, response_time, error_message) VALUES (?, ?, ?)',
+                    (status, response_time, error_message)
+                )
+        except Exception as e:
+            self.logger.error(f"Error logging heartbeat: {e}")
+    
+    def prune(self):
+        """Drop history older than the retention window and cap the metrics table"""
+        self._last_prune = time.monotonic()
+        try:
+            cutoff = f'-{self.retention_seconds} seconds'
+            conn = self._connection()
+            with conn:
+                for table in ('metrics_history', 'heartbeat_history', 'agent_logs'):
+                    conn.execute(f"DELETE FROM {table} WHERE timestamp < datetime('now', ?)", (cutoff,))
+                conn.execute('''
+                    DELETE FROM metrics_history WHERE id <= (
+                        SELECT id FROM metrics_history ORDER BY id DESC LIMIT 1 OFFSET ?
+                    )
+                ''', (self.max_metrics,))
+                
+        except Exception as e:
+            self.logger.error(f"Error pruning history: {e}")
+    
+    # ------------------------------------------------------------------
+    # Offline spool
+    # ------------------------------------------------------------------
+
+    def spool_append(self, kind: str, payload: Dict[str, Any], created_at: float) -> Optional[int]:
+        """Queue an item for delivery once the server is reachable again"""
+        try:
+            conn = self._connection()
+            with conn:
                 cursor = conn.cursor()
                 
-                cursor.execute('''
-                    SELECT timestamp, metrics_json FROM metrics_history
-                    ORDER BY timestamp DESC LIMIT ?
-                ''', (limit,))
+                cursor.execute(
+                    'INSERT INTO spool (kind, created_at, payload) VALUES (?, ?, ?)',
+                    (kind, created_at, json.dumps(payload, separators=(',', ':')))
+                )
+                spool_id = cursor.lastrowid
+                return spool_id
                 
-                results = cursor.fetchall()
-                conn.close()
+        except Exception as e:
+            self.logger.error(f"Error spooling {kind}: {e}")
+            return None
+    
+    def spool_fetch(self, kind: str, limit: int, newest_first: bool = True) -> List[Dict[str, Any]]:
+        """Pending spool items of one kind"""
+        try:
+            conn = self._connection()
+            with conn:
+                cursor = conn.cursor()
+                
+                order = 'DESC' if newest_first else 'ASC'
+                cursor.execute(f'''
+                    SELECT id, created_at, payload, attempts FROM spool
+                    WHERE kind = ? ORDER BY created_at {order}, id {order} LIMIT ?
+                ''', (kind, limit))
                 
-                metrics = []
-                for row in results:
+                rows = cursor.fetchall()
+                
+                items = []
+                for row in rows:
                     try:
-                        metric_data = json.loads(row[1])
-                        metric_data['timestamp'] = row[0]
-                        metrics.append(metric_data)
+                        items.append({
+                            'id': row[0],
+                            'created_at': row[1],
+                            'payload': json.loads(row[2]),
+                            'attempts': row[3]
+                        })
                     except json.JSONDecodeError:
                         continue
-                
-                return metrics
+                return items
                 
         except Exception as e:
-            self.logger.error(f"Error getting recent metrics: {e}")
+            self.logger.error(f"Error reading spool: {e}")
             return []
     
-    def _cleanup_metrics(self):
-        """Clean up old metrics to prevent database growth"""
+    def spool_delete(self, ids: List[int]):
+        """Remove delivered (or abandoned) spool items"""
+        if not ids:
+            return
         try:
-            with self._lock:
-                conn = sqlite3.connect(self.db_path)
+            conn = self._connection()
+            with conn:
+                conn.executemany('DELETE FROM spool WHERE id = ?', [(i,) for i in ids])
+                
+        except Exception as e:
+            self.logger.error(f"Error deleting spool items: {e}")
+    
+    def spool_mark_attempt(self, ids: List[int]):
+        """Count a failed delivery attempt"""
+        if not ids:
+            return
+        try:
+            conn = self._connection()
+            with conn:
+                conn.executemany('UPDATE spool SET attempts = attempts + 1 WHERE id = ?', [(i,) for i in ids])
+                
+        except Exception as e:
+            self.logger.error(f"Error updating spool attempts: {e}")
+    
+    def spool_counts(self) -> Dict[str, int]:
+        """Pending items per kind"""
+        try:
+            conn = self._connection()
+            with conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT kind, COUNT(*) FROM spool GROUP BY kind')
+                counts = {row[0]: row[1] for row in cursor.fetchall()}
+                return counts
+                
+        except Exception as e:
+            self.logger.error(f"Error counting spool: {e}")
+            return {}
+    
+    def spool_coalesce(self, kind: str, before: float, bucket_seconds: int, max_items: int) -> int:
+        """Thin out old items to one per time bucket (newest wins) and cap the backlog"""
+        try:
+            conn = self._connection()
+            with conn:
                 cursor = conn.cursor()
                 
                 cursor.execute('''
-                    DELETE FROM metrics_history 
-                    WHERE id NOT IN (
-                        SELECT id FROM metrics_history 
-                        ORDER BY timestamp DESC LIMIT 1000
-                    )
-                ''')
+                    DELETE FROM spool
+                    WHERE kind = ? AND created_at < ?
+                      AND id NOT IN (
+                          SELECT MAX(id) FROM spool
+                          WHERE kind = ? AND created_at < ?
+                          GROUP BY CAST(created_at / ? AS INTEGER)
+                      )
+                ''', (kind, before, kind, before, bucket_seconds))
+                removed = cursor.rowcount
                 
-                conn.commit()
-                conn.close()
+                # Hard cap: oldest items go first
+                cursor.execute('''
+                    DELETE FROM spool
+                    WHERE kind = ? AND id NOT IN (
+                        SELECT id FROM spool WHERE kind = ?
+                        ORDER BY created_at DESC, id DESC LIMIT ?
+                    )
+                ''', (kind, kind, max_items))
+                removed += cursor.rowcount
+                return removed
                 
         except Exception as e:
-            self.logger.error(f"Error cleaning up metrics: {e}")
+            self.logger.error(f"Error coalescing spool: {e}")
+            return 0
     
     def close(self):
-        """Close database connections"""
+        """Flush buffered metrics and close database connections"""
+        self.flush()
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
         self.logger.info("Database manager closed")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Agent - Inventory Sync
+Upload only changed inventory sections, as JSON diffs, gzip-compressed
+"""
+
+import gzip
+import json
+import hashlib
+import logging
+from typing import Dict, Any, List, Tuple, Optional
+
+# Must match backend/modules/agents/inventory_sync.py
+SECTIONS = ('hardware', 'disks', 'bitlocker', 'software')
+PROTOCOL_VERSION = 1
+
+
+def canonical_json(data: Any) -> str:
+    return json.dumps(data, sort_keys=True, separators=(',', ':'))
+
+
+def section_hash(data: Any) -> str:
+    return hashlib.md5(canonical_json(data).encode('utf-8')).hexdigest()
+
+
+def diff_ops(old: Any, new: Any, path: Tuple = ()) -> List[List[Any]]:
+    """['set', path, value] / ['del', path] operations turning old into new
+
+    Objects are compared key by key; any other value (lists included) is
+    replaced whole when it differs.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append(['del', list(path + (key,))])
+        for key, value in new.items():
+            if key not in old:
+                ops.append(['set', list(path + (key,)), value])
+            elif canonical_json(old[key]) != canonical_json(value):
+                ops.extend(diff_ops(old[key], value, path + (key,)))
+        return ops
+    if canonical_json(old) == canonical_json(new):
+        return []
+    return [['set', list(path), new]]
+
+
+def split_sections(hardware_inventory: Dict[str, Any], software_inventory: Dict[str, Any]) -> Dict[str, Any]:
+    """Cut the heartbeat inventories into independently hashed sections"""
+    hardware = dict(hardware_inventory or {})
+    disks = hardware.pop('disks', None)
+    bitlocker = hardware.pop('bitlocker', None)
+    return {
+        'hardware': hardware,
+        'disks': disks if disks is not None else [],
+        'bitlocker': bitlocker if bitlocker is not None else {},
+        'software': software_inventory or {}
+    }
+
+
+def gzip_json(payload: Dict[str, Any]) -> Tuple[bytes, Dict[str, str]]:
+    """Compressed request body plus the headers announcing it"""
+    body = gzip.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+    return body, {'Content-Type': 'application/json', 'Content-Encoding': 'gzip'}
+
+
+class InventorySync:
+    """Tracks the last inventory the server acknowledged, per section
+
+    ``build`` returns the ``inventory_sync`` payload for a TIER 2 heartbeat:
+    unchanged sections are left out, changed ones go as a diff against the
+    acknowledged copy (or in full when the diff would not be smaller).
+    ``acknowledge`` is called after a 200; ``reset`` after a 409 resync.
+    """
+
+    CONFIG_PREFIX = 'inventory_sync.'
+
+    def __init__(self, database):
+        self.logger = logging.getLogger('lanet_agent.inventory_sync')
+        self.database = database
+
+    def _acked(self, section: str) -> Optional[Dict[str, Any]]:
+        acked = self.database.get_config(self.CONFIG_PREFIX + section)
+        return acked if isinstance(acked, dict) and 'hash' in acked else None
+
+    def build(self, hardware_inventory: Dict[str, Any], software_inventory: Dict[str, Any],
+              force_full: Tuple[str, ...] = ()) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Return (inventory_sync payload, pending state to acknowledge)"""
+        sections = split_sections(hardware_inventory, software_inventory)
+        payload = {'protocol': PROTOCOL_VERSION, 'hashes': {}, 'sections': {}}
+        pending = {}
+
+        for section, data in sections.items():
+            data_hash = section_hash(data)
+            payload['hashes'][section] = data_hash
+            acked = None if section in force_full else self._acked(section)
+
+            if acked and acked['hash'] == data_hash:
+                continue
+
+            pending[section] = {'hash': data_hash, 'data': data}
+            full = {'mode': 'full', 'data': data}
+            if acked is not None:
+                ops = diff_ops(acked.get('data'), data)
+                if len(canonical_json(ops)) < len(canonical_json(data)):
+                    payload['sections'][section] = {'mode': 'diff', 'base': acked['hash'], 'ops': ops}
+                    continue
+            payload['sections'][section] = full
+
+        return payload, pending
+
+    def acknowledge(self, pending: Dict[str, Any], server_hashes: Dict[str, str] = None):
+        """Remember what the server now holds"""
+        for section, entry in pending.items():
+            if server_hashes and server_hashes.get(section) not in (None, entry['hash']):
+                # Server holds something else: forget our copy, next upload is full
+                self.reset([section])
+                continue
+            self.database.set_config(self.CONFIG_PREFIX + section, entry)
+
+    def reset(self, sections: List[str]):
+        for section in sections:
+            if section in SECTIONS:
+                self.database.set_config(self.CONFIG_PREFIX + section, None)
+        self.logger.info(f"Inventory resync requested for: {', '.join(sections)}")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Agent - Metric Sampler
+One non-blocking psutil sampler shared by monitoring, heartbeat and tickets
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+import psutil
+
+# Fields kept per sample and summarized over a window
+SAMPLE_FIELDS = ('cpu_usage', 'memory_usage', 'disk_usage')
+
+
+class MetricSampler:
+    """Samples CPU, memory and disk on one schedule into a ring buffer
+
+    CPU is measured with ``psutil.cpu_percent(interval=None)``, i.e. the delta
+    since the previous sample, so nothing ever sleeps to take a reading. That
+    counter is process-wide state in psutil: every CPU reading in the agent
+    must come from this sampler, or the deltas interleave.
+    """
+
+    def __init__(self, interval: float = 60, capacity: int = 60, disk_path: str = None):
+        self.logger = logging.getLogger('lanet_agent.sampler')
+        self.interval = interval
+        self.disk_path = disk_path or ('C:\\' if os.name == 'nt' else '/')
+        self._samples = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._boot_time = psutil.boot_time()
+
+        # Prime the CPU counter; the first interval=None reading is meaningless
+        psutil.cpu_percent(interval=None)
+
+    def start(self):
+        """Sample every ``interval`` seconds until stop() (blocking, run in a thread)"""
+        self.logger.info(f"Metric sampler started ({self.interval}s interval, {self._samples.maxlen} samples)")
+        self._stop.clear()
+        while not self._stop.is_set():
+            self.sample()
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+
+    def sample(self) -> Dict[str, Any]:
+        """Take one sample now and append it to the buffer"""
+        now = time.time()
+        try:
+            sample = {
+                'timestamp': now,
+                'cpu_usage': round(psutil.cpu_percent(interval=None), 1),
+                'memory_usage': round(psutil.virtual_memory().percent, 1),
+                'disk_usage': round(psutil.disk_usage(self.disk_path).percent, 1),
+                'uptime': now - self._boot_time
+            }
+        except Exception as e:
+            self.logger.warning(f"Error sampling system metrics: {e}")
+            return self.latest() or {}
+
+        with self._lock:
+            self._samples.append(sample)
+        return sample
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return dict(self._samples[-1]) if self._samples else None
+
+    def current(self, max_age: float = None) -> Dict[str, Any]:
+        """Newest sample, taken on the spot if the buffer is empty or older than max_age"""
+        max_age = self.interval if max_age is None else max_age
+        latest = self.latest()
+        if latest and time.time() - latest['timestamp'] <= max_age:
+            return latest
+        return self.sample()
+
+    def samples(self, window: float = None) -> List[Dict[str, Any]]:
+        """Buffered samples, oldest first, optionally only the last ``window`` seconds"""
+        with self._lock:
+            samples = list(self._samples)
+        if window is not None:
+            cutoff = time.time() - window
+            samples = [s for s in samples if s['timestamp'] >= cutoff]
+        return samples
+
+    def summary(self, window: float = None) -> Dict[str, Any]:
+        """min / avg / max of each field over the window"""
+        samples = self.samples(window)
+        summary = {'samples': len(samples)}
+        for field in SAMPLE_FIELDS:
+            values = [s[field] for s in samples if s.get(field) is not None]
+            if values:
+                summary[field] = {
+                    'min': min(values),
+                    'avg': round(sum(values) / len(values), 1),
+                    'max': max(values)
+                }
+        return summary
+
+
+_shared_sampler = None
+_shared_lock = threading.Lock()
+
+
+def get_sampler(interval: float = 60, capacity: int = 60) -> MetricSampler:
+    """The process-wide sampler; the arguments only apply on first use"""
+    global _shared_sampler
+    with _shared_lock:
+        if _shared_sampler is None:
+            _shared_sampler = MetricSampler(interval=interval, capacity=capacity)
+        return _shared_sampler
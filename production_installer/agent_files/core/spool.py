@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Agent - Offline Spool
+Durable queue for heartbeat samples and tickets while the server is unreachable
+"""
+
+import gzip
+import json
+import time
+import uuid
+import random
+import logging
+from typing import Dict, Any, Callable, List, Optional
+
+
+class ReplayBackoff:
+    """Exponential backoff with full jitter
+
+    Every agent at a site loses the WAN at the same moment; full jitter
+    spreads their reconnects over the whole window instead of a burst.
+    """
+
+    def __init__(self, base: float = 30, cap: float = 1800, rng: random.Random = None):
+        self.base = base
+        self.cap = cap
+        self.failures = 0
+        self.rng = rng or random.Random()
+
+    def next_delay(self, retry_after: Optional[float] = None) -> float:
+        """Register a failure and return the seconds to wait before the next attempt"""
+        self.failures += 1
+        window = min(self.cap, self.base * (2 ** (self.failures - 1)))
+        delay = self.rng.uniform(0, window)
+        if retry_after:
+            delay = max(delay, retry_after)
+        return delay
+
+    def reset(self):
+        self.failures = 0
+
+    def jitter(self, seconds: float) -> float:
+        """Random pause in [0, seconds) between replay batches"""
+        return self.rng.uniform(0, seconds)
+
+
+class OfflineSpool:
+    """Append undeliverable heartbeats and tickets locally and replay them later
+
+    Heartbeat samples are replayed newest first in gzip-compressed batches, so
+    the server's view of the asset recovers before older history arrives.
+    Samples older than ``coalesce_after`` are thinned to one per
+    ``coalesce_bucket`` seconds; full inventories are never spooled because
+    they are collected fresh on the next TIER 2 heartbeat.
+    """
+
+    HEARTBEAT = 'heartbeat'
+    TICKET = 'ticket'
+
+    def __init__(self, database, batch_size: int = 200, coalesce_after: int = 3600,
+                 coalesce_bucket: int = 900, max_heartbeats: int = 5000, max_ticket_attempts: int = 20):
+        self.logger = logging.getLogger('lanet_agent.spool')
+        self.database = database
+        self.batch_size = batch_size
+        self.coalesce_after = coalesce_after
+        self.coalesce_bucket = coalesce_bucket
+        self.max_heartbeats = max_heartbeats
+        self.max_ticket_attempts = max_ticket_attempts
+
+    # ------------------------------------------------------------------
+    # Append
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def heartbeat_sample(heartbeat_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Status sample from a heartbeat payload (TIER 1 and TIER 2 key styles)"""
+        status = heartbeat_data.get('status') or {}
+
+        def metric(*keys):
+            for key in keys:
+                if status.get(key) is not None:
+                    return status[key]
+            return 0
+
+        return {
+            'cpu_usage': metric('cpu_usage', 'cpu_percent'),
+            'memory_usage': metric('memory_usage', 'memory_percent'),
+            'disk_usage': metric('disk_usage', 'disk_percent'),
+            'uptime': status.get('uptime'),
+            'agent_status': status.get('agent_status') or status.get('status') or 'online'
+        }
+
+    def spool_heartbeat(self, heartbeat_data: Dict[str, Any]) -> Optional[int]:
+        """Keep the status sample of a heartbeat that could not be delivered"""
+        sample = self.heartbeat_sample(heartbeat_data)
+        spool_id = self.database.spool_append(self.HEARTBEAT, sample, time.time())
+        if spool_id:
+            self.logger.info(f"📥 Heartbeat spooled for later delivery (#{spool_id})")
+        return spool_id
+
+    def spool_ticket(self, ticket_data: Dict[str, Any]) -> Optional[str]:
+        """Queue a ticket; the spool_id doubles as the server-side idempotency key"""
+        payload = dict(ticket_data)
+        payload.setdefault('spool_id', str(uuid.uuid4()))
+        if self.database.spool_append(self.TICKET, payload, time.time()):
+            self.logger.info(f"📥 Ticket '{payload.get('subject')}' spooled for later delivery")
+            return payload['spool_id']
+        return None
+
+    def pending(self) -> Dict[str, int]:
+        return self.database.spool_counts()
+
+    def has_pending(self) -> bool:
+        return any(self.pending().values())
+
+    # ------------------------------------------------------------------
+    # Replay
+    # ------------------------------------------------------------------
+
+    def coalesce(self) -> int:
+        removed = self.database.spool_coalesce(
+            self.HEARTBEAT, time.time() - self.coalesce_after,
+            self.coalesce_bucket, self.max_heartbeats
+        )
+        if removed:
+            self.logger.info(f"Coalesced {removed} stale spooled heartbeat samples")
+        return removed
+
+    @staticmethod
+    def encode_batch(asset_id: str, items: List[Dict[str, Any]]) -> bytes:
+        """gzip-compressed JSON body for the batch-ingest endpoint"""
+        body = {
+            'asset_id': asset_id,
+            # Lets the server correct recorded_at for agent clock skew
+            'sent_at': time.time(),
+            'heartbeats': [
+                dict(item['payload'], spool_id=item['id'], recorded_at=item['created_at'])
+                for item in items
+            ]
+        }
+        return gzip.compress(json.dumps(body, separators=(',', ':')).encode('utf-8'))
+
+    def replay_heartbeats(self, send_batch: Callable[[List[Dict[str, Any]]], Optional[List[int]]]) -> bool:
+        """Deliver one batch of samples, newest first
+
+        ``send_batch`` receives the spool items and returns the spool ids the
+        server accepted, or None when delivery failed. Returns False on failure.
+        """
+        self.coalesce()
+        items = self.database.spool_fetch(self.HEARTBEAT, self.batch_size, newest_first=True)
+        if not items:
+            return True
+
+        accepted = send_batch(items)
+        if accepted is None:
+            self.database.spool_mark_attempt([item['id'] for item in items])
+            return False
+
+        # Samples the server rejected (e.g. past raw retention) will never be accepted
+        self.database.spool_delete([item['id'] for item in items])
+        self.logger.info(f"📤 Replayed {len(accepted)}/{len(items)} spooled heartbeat samples")
+        return True
+
+    def replay_tickets(self, send_ticket: Callable[[Dict[str, Any]], Optional[bool]]) -> bool:
+        """Deliver spooled tickets oldest first
+
+        ``send_ticket`` returns True when delivered, False when the server
+        rejected the ticket for good, and None when it could not be reached.
+        """
+        for item in self.database.spool_fetch(self.TICKET, self.batch_size, newest_first=False):
+            result = send_ticket(item['payload'])
+            if result is None:
+                self.database.spool_mark_attempt([item['id']])
+                if item['attempts'] + 1 >= self.max_ticket_attempts:
+                    self.logger.error(f"Dropping spooled ticket after {item['attempts'] + 1} attempts")
+                    self.database.spool_delete([item['id']])
+                return False
+            if not result:
+                self.logger.error(f"Server rejected spooled ticket '{item['payload'].get('subject')}'")
+            self.database.spool_delete([item['id']])
+        return True
@@ -13,19 +13,34 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 import json
 
+from core.spool import OfflineSpool
+from core.inventory_sync import InventorySync, gzip_json
+from core.sampler import MetricSampler, get_sampler
+
 class HeartbeatModule:
     """Handles periodic heartbeat communication with backend"""
+
+    # Bounds on server-driven cadence (next_heartbeat / next_full_inventory / Retry-After)
+    MIN_HEARTBEAT_INTERVAL = 60
+    MAX_HEARTBEAT_INTERVAL = 3600
+    MIN_INVENTORY_INTERVAL = 3600
+    MAX_INVENTORY_INTERVAL = 7 * 86400
     
-    def __init__(self, config_manager, database_manager, monitoring_module=None):
+    def __init__(self, config_manager, database_manager, monitoring_module=None, spool: OfflineSpool = None,
+                 sampler: MetricSampler = None):
         self.logger = logging.getLogger('lanet_agent.heartbeat')
         self.config = config_manager
         self.database = database_manager
         self.monitoring = monitoring_module  # Reference to monitoring module
+        self.spool = spool or OfflineSpool(database_manager)
+        self.inventory_sync = InventorySync(database_manager)
+        self.sampler = sampler or get_sampler()
         self.running = False
         self.last_heartbeat = None
         self.last_full_inventory = None
         self.consecutive_failures = 0
         self.max_failures = 5
+        self.retry_after = None  # Server-requested back-off after a 503/429
         
         # HTTP session for requests
         self.session = requests.Session()
@@ -75,8 +90,10 @@ class HeartbeatModule:
                         self.logger.error("Too many heartbeat failures - agent may need re-registration")
                         self._handle_connection_failure()
                 
-                # Wait for next heartbeat (with responsive stopping)
-                self._sleep_with_stop_check(self.heartbeat_interval)
+                # Wait for next heartbeat (with responsive stopping); a server back-off wins
+                delay = self.retry_after if self.retry_after is not None else self.heartbeat_interval
+                self.retry_after = None
+                self._sleep_with_stop_check(delay)
                 
             except Exception as e:
                 self.logger.error(f"Error in heartbeat loop: {e}", exc_info=True)
@@ -88,7 +105,8 @@ class HeartbeatModule:
         self.running = False
     
     def send_heartbeat(self) -> bool:
-        """Send heartbeat to backend"""
+        """Send heartbeat to backend (spooled for later replay when undeliverable)"""
+        heartbeat_data = None
         try:
             # Get registration info
             asset_id = self.database.get_config('asset_id')
@@ -125,29 +143,32 @@ class HeartbeatModule:
                 }
 
             # Add inventory data only for TIER 2 (full) heartbeats
+            hardware_inventory = software_inventory = None
+            pending_inventory = None
             if should_send_full:
                 try:
                     self.logger.info("Getting hardware inventory...")
-                    heartbeat_data['hardware_inventory'] = self._get_hardware_inventory()
+                    hardware_inventory = self._get_hardware_inventory()
                     self.logger.info("✅ Hardware inventory obtained")
                 except Exception as e:
                     self.logger.error(f"❌ Hardware inventory failed: {e}")
-                    heartbeat_data['hardware_inventory'] = {}
+                    hardware_inventory = {}
 
                 try:
                     self.logger.info("Getting software inventory...")
-                    heartbeat_data['software_inventory'] = self._get_software_inventory()
+                    software_inventory = self._get_software_inventory()
                     self.logger.info("✅ Software inventory obtained")
                 except Exception as e:
                     self.logger.error(f"❌ Software inventory failed: {e}")
-                    heartbeat_data['software_inventory'] = {}
-
-                # Update last inventory timestamp
-                self.logger.info("📝 Skipping database update to prevent hanging...")
-                # TODO: Fix database hanging issue
-                # self.database.set_config('last_inventory_sent', datetime.now().isoformat())
-                self.last_full_inventory = datetime.now()
-                self.logger.info("✅ Continuing with heartbeat...")
+                    software_inventory = {}
+
+                # Only sections that changed since the server's last ack are uploaded
+                heartbeat_data['inventory_sync'], pending_inventory = self.inventory_sync.build(
+                    hardware_inventory, software_inventory
+                )
+                changed = ', '.join(heartbeat_data['inventory_sync']['sections']) or 'none'
+                self.logger.info(f"📦 Inventory sections to upload: {changed}")
+
             
             # Get server URL
             server_url = self.config.get_server_url()
@@ -167,17 +188,18 @@ class HeartbeatModule:
             self.logger.info("📡 Starting HTTP POST request...")
 
             try:
-                response = self.session.post(
-                    heartbeat_url,
-                    json=heartbeat_data,
-                    headers={
-                        'Authorization': f'Bearer {agent_token}',
-                        'Content-Type': 'application/json',
-                        'User-Agent': f"LANET-Agent/{self.config.get('agent.version', '1.0.0')}"
-                    },
-                    timeout=30  # Reduced timeout to 30 seconds
-                )
+                response = self._post_heartbeat(heartbeat_url, heartbeat_data, agent_token)
                 self.logger.info("📡 HTTP POST request completed")
+
+                resync = self._resync_sections(response) if pending_inventory is not None else None
+                if resync:
+                    # Server copy diverged from our acked state: resend those sections in full
+                    self.inventory_sync.reset(resync)
+                    heartbeat_data['inventory_sync'], pending_inventory = self.inventory_sync.build(
+                        hardware_inventory, software_inventory, force_full=tuple(resync)
+                    )
+                    response = self._post_heartbeat(heartbeat_url, heartbeat_data, agent_token)
+                    self.logger.info("📡 Inventory resync request completed")
             except requests.exceptions.Timeout:
                 self.logger.error("❌ HTTP request timed out after 30 seconds")
                 raise
@@ -194,9 +216,10 @@ class HeartbeatModule:
                 self.logger.info("✅ Heartbeat sent successfully!")
                 self.last_heartbeat = datetime.now()
 
-                # Store heartbeat success in database (skip to prevent hanging)
-                # TODO: Fix database hanging issue
-                # self.database.set_config('last_heartbeat', self.last_heartbeat.isoformat())
+                if should_send_full:
+                    # Only a delivered inventory resets the TIER 2 schedule
+                    self.last_full_inventory = self.last_heartbeat
+                    self.database.set_config('last_inventory_sent', self.last_full_inventory.isoformat())
                 
                 # Log heartbeat history
                 self._log_heartbeat_history('success', response.elapsed.total_seconds())
@@ -207,7 +230,12 @@ class HeartbeatModule:
                     if 'data' in result:
                         self._process_server_response(result['data'])
                 except json.JSONDecodeError:
-                    pass  # Response might not be JSON
+                    result = {}  # Response might not be JSON
+
+                if pending_inventory is not None:
+                    self.inventory_sync.acknowledge(
+                        pending_inventory, (result.get('data') or {}).get('inventory_hashes')
+                    )
                 
                 return True
             else:
@@ -220,17 +248,26 @@ class HeartbeatModule:
                 
                 self.logger.error(error_msg)
                 self._log_heartbeat_history('failed', None, error_msg)
+                if response.status_code >= 500 or response.status_code == 429:
+                    self.spool.spool_heartbeat(heartbeat_data)
+                    self.retry_after = self._retry_after(response)
+                    if self.retry_after is not None:
+                        self.logger.info(f"Server asked to retry in {self.retry_after}s")
                 return False
                 
         except requests.exceptions.ConnectionError as e:
             error_msg = f"Connection error during heartbeat: {e}"
             self.logger.error(error_msg)
             self._log_heartbeat_history('connection_error', None, error_msg)
+            if heartbeat_data:
+                self.spool.spool_heartbeat(heartbeat_data)
             return False
         except requests.exceptions.Timeout as e:
             error_msg = f"Timeout during heartbeat: {e}"
             self.logger.error(error_msg)
             self._log_heartbeat_history('timeout', None, error_msg)
+            if heartbeat_data:
+                self.spool.spool_heartbeat(heartbeat_data)
             return False
         except Exception as e:
             error_msg = f"Unexpected error during heartbeat: {e}"
@@ -238,6 +275,39 @@ class HeartbeatModule:
             self._log_heartbeat_history('error', None, error_msg)
             return False
     
+    def _post_heartbeat(self, heartbeat_url: str, heartbeat_data: Dict[str, Any], agent_token: str):
+        """POST a heartbeat; TIER 2 bodies are gzip-compressed"""
+        headers = {
+            'Authorization': f'Bearer {agent_token}',
+            'User-Agent': f"LANET-Agent/{self.config.get('agent.version', '1.0.0')}"
+        }
+        if heartbeat_data.get('heartbeat_type') == 'full':
+            body, encoding_headers = gzip_json(heartbeat_data)
+            headers.update(encoding_headers)
+            self.logger.info(f"📦 Compressed body: {len(body)/1024:.1f} KB")
+            return self.session.post(heartbeat_url, data=body, headers=headers, timeout=30)
+
+        headers['Content-Type'] = 'application/json'
+        return self.session.post(heartbeat_url, json=heartbeat_data, headers=headers, timeout=30)
+
+    def _resync_sections(self, response) -> Optional[list]:
+        """Inventory sections the server asked to be resent in full (409 response)"""
+        if response.status_code != 409:
+            return None
+        try:
+            details = response.json().get('details') or {}
+        except ValueError:
+            return None
+        return details.get('resync') or None
+
+    def _retry_after(self, response) -> Optional[int]:
+        """Seconds from a Retry-After header (delta-seconds form), capped at the heartbeat interval"""
+        try:
+            seconds = int(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return None
+        return max(1, min(seconds, self.MAX_HEARTBEAT_INTERVAL))
+
     def _get_system_status(self) -> Dict[str, Any]:
         """Get current system status for heartbeat"""
         try:
@@ -261,14 +331,14 @@ class HeartbeatModule:
                 }
             else:
                 # Fallback to basic status
-                import psutil
-                disk_usage = psutil.disk_usage('C:')
+                sample = self.sampler.current()
                 return {
-                    'cpu_usage': round(psutil.cpu_percent(interval=1), 1),
-                    'memory_usage': round(psutil.virtual_memory().percent, 1),
-                    'disk_usage': round((disk_usage.used / disk_usage.total) * 100, 1),
-                    'uptime': time.time() - psutil.boot_time(),
+                    'cpu_usage': sample.get('cpu_usage', 0),
+                    'memory_usage': sample.get('memory_usage', 0),
+                    'disk_usage': sample.get('disk_usage', 0),
+                    'uptime': sample.get('uptime', 0),
                     'network_status': 'connected',  # Simplified
+                    'usage_window': self.sampler.summary(self.heartbeat_interval),
                     'agent_status': 'online'
                 }
                 
@@ -395,34 +465,37 @@ class HeartbeatModule:
                 self.logger.info(f"Received {len(commands)} commands from server")
                 # TODO: Implement command processing
             
-            # Update next heartbeat interval if specified
+            # Server-driven cadence: the server spreads the fleet and backs it off under load.
+            # Not persisted; a restarted agent uses its configured interval until the next reply.
             if 'next_heartbeat' in response_data:
-                next_interval = response_data['next_heartbeat']
-                if next_interval != self.heartbeat_interval:
+                next_interval = self._bounded(response_data['next_heartbeat'],
+                                              self.MIN_HEARTBEAT_INTERVAL, self.MAX_HEARTBEAT_INTERVAL)
+                if next_interval is not None and next_interval != self.heartbeat_interval:
                     self.logger.info(f"Updating heartbeat interval to {next_interval} seconds")
                     self.heartbeat_interval = next_interval
-                    # Skip config save to prevent hanging
-                    # TODO: Fix config save hanging issue
-                    # self.config.set('agent.heartbeat_interval', next_interval)
+
+            if 'next_full_inventory' in response_data:
+                next_inventory = self._bounded(response_data['next_full_inventory'],
+                                               self.MIN_INVENTORY_INTERVAL, self.MAX_INVENTORY_INTERVAL)
+                if next_inventory is not None and next_inventory != self.inventory_interval:
+                    self.logger.info(f"Updating full inventory interval to {next_inventory} seconds")
+                    self.inventory_interval = next_inventory
             
         except Exception as e:
             self.logger.error(f"Error processing server response: {e}")
     
+    @staticmethod
+    def _bounded(value, lower: int, upper: int) -> Optional[int]:
+        try:
+            return max(lower, min(int(value), upper))
+        except (TypeError, ValueError):
+            return None
+
     def _log_heartbeat_history(self, status: str, response_time: Optional[float], error_message: str = None):
         """Log heartbeat attempt to database"""
         try:
-            # Store in database for history tracking
-            history_entry = {
-                'timestamp': datetime.now().isoformat(),
-                'status': status,
-                'response_time': response_time,
-                'error_message': error_message
-            }
-            
-            # Store with timestamp key to avoid conflicts (skip to prevent hanging)
-            # TODO: Fix database hanging issue
-            # key = f'heartbeat_history_{int(time.time())}'
-            # self.database.set_config(key, history_entry)
+            # Store in database for history tracking (pruned with the metrics retention)
+            self.database.log_heartbeat(status, response_time, error_message)
             
         except Exception as e:
             self.logger.error(f"Error logging heartbeat history: {e}")
@@ -467,15 +540,15 @@ class HeartbeatModule:
     def _get_minimal_status(self) -> Dict[str, Any]:
         """Get minimal system status for TIER 1 heartbeat (lightweight)"""
         try:
-            import psutil
-            import os
+            sample = self.sampler.current()
 
-            # Only essential metrics - ~200 bytes total
+            # Only essential metrics plus the min/avg/max since the last heartbeat
             status = {
                 'agent_status': 'online',
-                'cpu_percent': round(psutil.cpu_percent(interval=0.1), 1),  # Quick sample
-                'memory_percent': round(psutil.virtual_memory().percent, 1),
-                'disk_percent': round(psutil.disk_usage('C:' if os.name == 'nt' else '/').percent, 1),
+                'cpu_percent': sample.get('cpu_usage', 0),
+                'memory_percent': sample.get('memory_usage', 0),
+                'disk_percent': sample.get('disk_usage', 0),
+                'usage_window': self.sampler.summary(self.heartbeat_interval),
                 'timestamp': datetime.now().isoformat()
             }
 
@@ -14,6 +14,11 @@ import psutil
 from datetime import datetime
 from typing import Optional
 
+from core.spool import OfflineSpool
+from core.inventory_sync import InventorySync, gzip_json
+from core.sampler import MetricSampler, get_sampler
+from core.collectors import InventoryCollector, PER_BOOT, DAILY, HOURLY
+
 # BitLocker module
 try:
     from .bitlocker import BitLockerCollector
@@ -24,14 +29,34 @@ except ImportError:
 
 class SimpleHeartbeatModule:
     """Módulo de heartbeat ultra-simple"""
+
+    # Límites para el intervalo que manda el servidor
+    MIN_INTERVAL = 60
+    MAX_INTERVAL = 3600
     
-    def __init__(self, config, database):
+    def __init__(self, config, database, spool: OfflineSpool = None, sampler: MetricSampler = None):
         self.logger = logging.getLogger('lanet_agent.simple_heartbeat')
         self.config = config
         self.database = database
+        self.spool = spool or OfflineSpool(database)  # Cola local si el servidor no responde
+        self.inventory_sync = InventorySync(database)  # Solo secciones de inventario que cambiaron
+        self.sampler = sampler or get_sampler()  # Muestreo compartido, sin bloquear
+
+        # Inventario en caché según volatilidad; los colectores corren en paralelo
+        self.inventory = InventoryCollector(
+            database,
+            max_workers=self.config.get('monitoring.inventory_workers', 4),
+            deadline=self.config.get('monitoring.inventory_deadline', 60)
+        )
+        self.inventory.register('domain', self._get_domain_info, PER_BOOT, {})
+        self.inventory.register('smart', self._get_smart_info, DAILY, {'supported': False, 'disks': []})
+        self.inventory.register('bitlocker', self._get_bitlocker_info, HOURLY,
+                                {'supported': False, 'reason': 'Collection timeout', 'volumes': []})
+        self.inventory.register('software', self._get_software_inventory, HOURLY, {})
 
         # Configuración simple
-        self.heartbeat_interval = 300  # 5 minutos fijo
+        self.heartbeat_interval = 300  # 5 minutos hasta que el servidor indique otro (next_heartbeat)
+        self.retry_after = None  # Espera pedida por el servidor tras un 503/429
         self.server_url = self.config.get_server_url()  # ✅ Use config manager
         self.running = False
         self.thread = None
@@ -101,20 +126,24 @@ class SimpleHeartbeatModule:
                 else:
                     self.logger.warning("⚠️ Simple heartbeat failed")
                 
-                # Esperar con verificación de parada
-                self._simple_sleep(self.heartbeat_interval)
+                # Esperar con verificación de parada (el Retry-After del servidor tiene prioridad)
+                delay = self.retry_after if self.retry_after is not None else self.heartbeat_interval
+                self.retry_after = None
+                self._simple_sleep(delay)
                 
             except Exception as e:
                 self.logger.error(f"❌ Error in simple heartbeat loop: {e}")
                 self._simple_sleep(60)  # Esperar 1 minuto en caso de error
     
     def _send_simple_heartbeat(self) -> bool:
-        """Enviar heartbeat simple CON inventarios"""
+        """Enviar heartbeat simple CON inventarios (se encola si el servidor no responde)"""
+        heartbeat_data = None
         try:
             # Datos básicos + inventarios (estructura correcta para backend)
-            hardware_inventory = self._get_hardware_inventory()
-            bitlocker_info = self._get_bitlocker_info()
-            smart_info = self._get_smart_info()
+            inventory = self.inventory.collect()
+            hardware_inventory = self._get_hardware_inventory(inventory['domain'])
+            bitlocker_info = inventory['bitlocker']
+            smart_info = inventory['smart']
 
             # Integrar SMART y BitLocker en hardware_inventory como espera el backend
             # Formatear discos para frontend CON información de uso
@@ -154,68 +183,112 @@ class SimpleHeartbeatModule:
             hardware_inventory['disks'] = formatted_disks
             hardware_inventory['bitlocker'] = bitlocker_info
 
+            software_inventory = inventory['software']
+
+            # Solo se suben las secciones que cambiaron desde el último ack del servidor
+            inventory_sync, pending = self.inventory_sync.build(hardware_inventory, software_inventory)
             heartbeat_data = {
                 'asset_id': self.asset_id,
                 'heartbeat_type': 'full',  # Cambiar a full para incluir inventarios
                 'timestamp': datetime.now().isoformat(),
                 'status': self._get_simple_status(),
-                'hardware_inventory': hardware_inventory,
-                'software_inventory': self._get_software_inventory()
+                'inventory_sync': inventory_sync
             }
             
             # URL del endpoint
             heartbeat_url = f"{self.server_url}/agents/heartbeat"
             
             self.logger.info(f"📤 POST to: {heartbeat_url}")
-            self.logger.info(f"📊 Data size: {len(str(heartbeat_data))} chars")
+            self.logger.info(f"📦 Secciones de inventario: {', '.join(inventory_sync['sections']) or 'ninguna'}")
             
-            # Enviar petición HTTP simple
-            response = requests.post(
-                heartbeat_url,
-                json=heartbeat_data,
-                headers={
-                    'Authorization': f'Bearer {self.agent_token}',
-                    'Content-Type': 'application/json'
-                },
-                timeout=15  # Timeout corto
-            )
+            response = self._post_heartbeat(heartbeat_url, heartbeat_data)
             
             self.logger.info(f"📥 Response: {response.status_code}")
+
+            resync = self._resync_sections(response)
+            if resync:
+                # El servidor perdió nuestra copia: reenviar esas secciones completas una vez
+                self.inventory_sync.reset(resync)
+                heartbeat_data['inventory_sync'], pending = self.inventory_sync.build(
+                    hardware_inventory, software_inventory, force_full=tuple(resync)
+                )
+                response = self._post_heartbeat(heartbeat_url, heartbeat_data)
+                self.logger.info(f"📥 Resync response: {response.status_code}")
             
             if response.status_code == 200:
                 self.logger.info("🎉 Simple heartbeat SUCCESS!")
+                try:
+                    result = response.json().get('data') or {}
+                except ValueError:
+                    result = {}
+                self.inventory_sync.acknowledge(pending, result.get('inventory_hashes'))
+                self._apply_cadence(result.get('next_heartbeat'))
                 return True
             else:
                 self.logger.warning(f"⚠️ Server responded: {response.status_code}")
+                if response.status_code >= 500 or response.status_code == 429:
+                    self.spool.spool_heartbeat(heartbeat_data)
+                    self.retry_after = self._retry_after(response)
                 return False
                 
         except requests.exceptions.Timeout:
             self.logger.error("⏰ Request timeout")
+            if heartbeat_data:
+                self.spool.spool_heartbeat(heartbeat_data)
             return False
         except requests.exceptions.ConnectionError:
             self.logger.error("🔌 Connection error")
+            if heartbeat_data:
+                self.spool.spool_heartbeat(heartbeat_data)
             return False
         except Exception as e:
             self.logger.error(f"💥 Unexpected error: {e}")
             return False
     
+    def _post_heartbeat(self, heartbeat_url: str, heartbeat_data: dict):
+        """Enviar heartbeat comprimido con gzip"""
+        body, headers = gzip_json(heartbeat_data)
+        headers['Authorization'] = f'Bearer {self.agent_token}'
+        self.logger.info(f"📊 Data size: {len(body)/1024:.1f} KB (gzip)")
+        return requests.post(heartbeat_url, data=body, headers=headers, timeout=15)  # Timeout corto
+
+    def _resync_sections(self, response) -> Optional[list]:
+        """Secciones que el servidor pide reenviar completas (respuesta 409)"""
+        if response.status_code != 409:
+            return None
+        try:
+            return (response.json().get('details') or {}).get('resync') or None
+        except ValueError:
+            return None
+
+    def _apply_cadence(self, next_heartbeat):
+        """Intervalo que decide el servidor (reparte la flota y la frena bajo carga), acotado"""
+        try:
+            interval = max(self.MIN_INTERVAL, min(int(next_heartbeat), self.MAX_INTERVAL))
+        except (TypeError, ValueError):
+            return
+        if interval != self.heartbeat_interval:
+            self.logger.info(f"⏱️ Heartbeat interval set by server: {interval}s")
+            self.heartbeat_interval = interval
+
+    def _retry_after(self, response) -> Optional[int]:
+        """Segundos del header Retry-After, o None si no viene"""
+        try:
+            seconds = int(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return None
+        self.logger.info(f"⏳ Server asked to retry in {seconds}s")
+        return max(1, min(seconds, self.MAX_INTERVAL))
+
     def _get_simple_status(self) -> dict:
         """Obtener estado básico del sistema CON métricas de disco"""
         try:
-            # Agregar métricas de disco principal
-            disk_usage_percent = 0
-            try:
-                import platform
-                disk_path = 'C:\\' if platform.system() == 'Windows' else '/'
-                disk_usage = psutil.disk_usage(disk_path)
-                disk_usage_percent = round((disk_usage.used / disk_usage.total) * 100, 1)
-            except Exception as e:
-                self.logger.warning(f"Error getting disk metrics: {e}")
-
+            sample = self.sampler.current()
             return {
-                'cpu_usage': round(psutil.cpu_percent(interval=1), 1),
-                'memory_usage': round(psutil.virtual_memory().percent, 1),
-                'disk_usage': disk_usage_percent,  # 🆕 Métrica de disco
+                'cpu_usage': sample.get('cpu_usage', 0.0),
+                'memory_usage': sample.get('memory_usage', 0.0),
+                'disk_usage': sample.get('disk_usage', 0.0),  # 🆕 Métrica de disco
+                'usage_window': self.sampler.summary(self.heartbeat_interval),  # min/avg/max del intervalo
                 'status': 'online'
             }
         except Exception as e:
@@ -233,7 +306,33 @@ class SimpleHeartbeatModule:
         while time.time() < end_time and self.running:
             time.sleep(min(1, end_time - time.time()))
     
-    def _get_hardware_inventory(self) -> dict:
+    def _get_domain_info(self) -> dict:
+        """Dominio o grupo de trabajo del equipo (no cambia sin reiniciar)"""
+        import platform
+
+        if platform.system() != 'Windows':
+            return {'domain': 'N/A', 'workgroup': 'N/A'}
+
+        try:
+            import subprocess
+            # Obtener información del dominio/grupo de trabajo
+            result = subprocess.run([
+                'powershell', '-Command',
+                '(Get-WmiObject -Class Win32_ComputerSystem).Domain'
+            ], capture_output=True, text=True, timeout=10)
+
+            if result.returncode == 0 and result.stdout.strip():
+                domain = result.stdout.strip()
+                if '.' in domain:
+                    return {'domain': domain, 'workgroup': None}
+                return {'domain': None, 'workgroup': domain}
+            return {'domain': 'Unknown', 'workgroup': 'Unknown'}
+
+        except Exception as e:
+            self.logger.warning(f"Error getting domain/workgroup: {e}")
+            return {'domain': 'Error', 'workgroup': 'Error'}
+
+    def _get_hardware_inventory(self, domain_info: dict = None) -> dict:
         """Obtener inventario de hardware simple"""
         try:
             import platform
@@ -251,35 +350,8 @@ class SimpleHeartbeatModule:
                 'version': platform.version()
             }
 
-            # Agregar dominio/grupo de trabajo en Windows
-            if platform.system() == 'Windows':
-                try:
-                    import subprocess
-                    # Obtener información del dominio/grupo de trabajo
-                    result = subprocess.run([
-                        'powershell', '-Command',
-                        '(Get-WmiObject -Class Win32_ComputerSystem).Domain'
-                    ], capture_output=True, text=True, timeout=10)
-
-                    if result.returncode == 0 and result.stdout.strip():
-                        domain = result.stdout.strip()
-                        if '.' in domain:
-                            system_info['domain'] = domain
-                            system_info['workgroup'] = None
-                        else:
-                            system_info['domain'] = None
-                            system_info['workgroup'] = domain
-                    else:
-                        system_info['domain'] = 'Unknown'
-                        system_info['workgroup'] = 'Unknown'
-
-                except Exception as e:
-                    self.logger.warning(f"Error getting domain/workgroup: {e}")
-                    system_info['domain'] = 'Error'
-                    system_info['workgroup'] = 'Error'
-            else:
-                system_info['domain'] = 'N/A'
-                system_info['workgroup'] = 'N/A'
+            # Agregar dominio/grupo de trabajo (en caché hasta el próximo reinicio)
+            system_info.update(domain_info if domain_info is not None else self._get_domain_info())
 
             hardware = {'system': system_info}
 
@@ -14,6 +14,9 @@ from datetime import datetime
 from typing import Dict, Any, List
 import json
 
+from core.sampler import MetricSampler, get_sampler
+from core.collectors import InventoryCollector, PER_BOOT, DAILY, PER_HEARTBEAT
+
 # Windows-specific imports
 try:
     import wmi
@@ -30,13 +33,30 @@ except ImportError:
     BITLOCKER_AVAILABLE = False
     logging.warning("BitLocker module not available")
 
+DMI_PATH = '/sys/class/dmi/id'
+
+
+def _read_dmi(fields: Dict[str, str]) -> Dict[str, Any]:
+    """Read Linux DMI attributes ({output_key: dmi_file}); unreadable ones are skipped"""
+    info = {}
+    for key, filename in fields.items():
+        try:
+            with open(f'{DMI_PATH}/{filename}') as f:
+                value = f.read().strip()
+            if value:
+                info[key] = value
+        except OSError:
+            continue
+    return info
+
 class MonitoringModule:
     """Handles system monitoring and metrics collection"""
     
-    def __init__(self, config_manager, database_manager):
+    def __init__(self, config_manager, database_manager, sampler: MetricSampler = None):
         self.logger = logging.getLogger('lanet_agent.monitoring')
         self.config = config_manager
         self.database = database_manager
+        self.sampler = sampler or get_sampler()
         self.running = False
         self.current_metrics = {}
         
@@ -77,6 +97,30 @@ class MonitoringModule:
 
         # Track last ticket creation to avoid spam
         self.last_ticket_times = {}
+
+        # Hardware inventory: cached per volatility class, collected concurrently
+        self.inventory = InventoryCollector(
+            database_manager,
+            max_workers=self.config.get('monitoring.inventory_workers', 4),
+            deadline=self.config.get('monitoring.inventory_deadline', 60)
+        )
+        self._register_inventory_collectors()
+
+    def _register_inventory_collectors(self):
+        """Hardware inventory pieces and how long each stays valid"""
+        register = self.inventory.register
+        register('system', self._get_detailed_system_info, PER_BOOT, {})
+        register('cpu', self._get_detailed_cpu_info, PER_BOOT, {})
+        register('memory', self._get_detailed_memory_info, PER_HEARTBEAT, {})
+        register('memory_modules', self._get_memory_modules, PER_BOOT, [])
+        register('disks', self._get_detailed_disk_info, PER_HEARTBEAT, [])
+        register('disk_health', self._get_windows_disk_smart_info, DAILY, {})
+        register('network_interfaces', self._get_detailed_network_info, PER_HEARTBEAT, [])
+        register('network_adapters', self._get_windows_network_adapters, DAILY, [])
+        register('motherboard', self._get_motherboard_info, PER_BOOT, {})
+        register('bios', self._get_bios_info, PER_BOOT, {})
+        register('graphics', self._get_graphics_info, PER_BOOT, [])
+        register('usb_devices', self._get_usb_devices, DAILY, [])
     
     def start(self):
         """Start monitoring in background"""
@@ -114,8 +158,13 @@ class MonitoringModule:
                 'collection_time': time.time()
             }
             
+            # CPU/memory/disk usage come from the shared sampler (non-blocking)
+            sample = self.sampler.current()
+            window = self.sampler.summary(self.metrics_interval)
+            metrics['usage_window'] = window
+
             # CPU metrics
-            cpu_percent = psutil.cpu_percent(interval=1)
+            cpu_percent = sample.get('cpu_usage', 0)
             cpu_count = psutil.cpu_count()
             cpu_freq = psutil.cpu_freq()
 
@@ -251,13 +300,17 @@ class MonitoringModule:
         """Check if any metrics exceed thresholds and log alerts"""
         alerts = []
         
+        # CPU and memory are judged on the average over the sampling window,
+        # so a single spike does not raise an alert
+        window = metrics.get('usage_window') or {}
+
         # CPU threshold
-        cpu_usage = metrics.get('cpu_usage', 0)
+        cpu_usage = (window.get('cpu_usage') or {}).get('avg', metrics.get('cpu_usage', 0))
         if cpu_usage > self.cpu_threshold:
             alerts.append(f"High CPU usage: {cpu_usage:.1f}%")
         
         # Memory threshold
-        memory_usage = metrics.get('memory_usage', 0)
+        memory_usage = (window.get('memory_usage') or {}).get('avg', metrics.get('memory_usage', 0))
         if memory_usage > self.memory_threshold:
             alerts.append(f"High memory usage: {memory_usage:.1f}%")
         
@@ -312,19 +365,32 @@ class MonitoringModule:
     def get_hardware_inventory(self) -> Dict[str, Any]:
         """Get detailed hardware inventory"""
         try:
-            import subprocess
+            results = self.inventory.collect()
+
+            cpu = dict(results['cpu'] or {})
+            cpu['current_usage'] = self.sampler.current().get('cpu_usage', 0)
+
+            memory = dict(results['memory'] or {})
+            if results['memory_modules']:
+                memory['modules'] = results['memory_modules']
+
+            # SMART health is per machine for now (first physical disk), as before
+            disk_health = results['disk_health'] or {}
+            disks = [dict(disk, **disk_health) for disk in results['disks'] or []]
 
             hardware_info = {
                 'timestamp': datetime.now().isoformat(),
-                'system': self._get_detailed_system_info(),
-                'cpu': self._get_detailed_cpu_info(),
-                'memory': self._get_detailed_memory_info(),
-                'disks': self._get_detailed_disk_info(),
-                'network_interfaces': self._get_detailed_network_info(),
-                'motherboard': self._get_motherboard_info(),
-                'bios': self._get_bios_info(),
-                'graphics': self._get_graphics_info(),
-                'usb_devices': self._get_usb_devices()
+                'system': results['system'],
+                'cpu': cpu,
+                'memory': memory,
+                'disks': disks,
+                'network_interfaces': self._annotate_network_adapters(
+                    results['network_interfaces'] or [], results['network_adapters'] or []
+                ),
+                'motherboard': results['motherboard'],
+                'bios': results['bios'],
+                'graphics': results['graphics'],
+                'usb_devices': results['usb_devices']
             }
 
             return hardware_info
@@ -690,7 +756,6 @@ class MonitoringModule:
                 'name': platform.processor(),
                 'cores_physical': psutil.cpu_count(logical=False),
                 'cores_logical': psutil.cpu_count(logical=True),
-                'current_usage': round(psutil.cpu_percent(interval=1), 1),
                 'architecture': platform.machine()
             }
 
@@ -730,8 +795,6 @@ class MonitoringModule:
     def _get_detailed_memory_info(self) -> Dict[str, Any]:
         """Get detailed memory information"""
         try:
-            import subprocess
-
             memory = psutil.virtual_memory()
             swap = psutil.swap_memory()
 
@@ -748,38 +811,42 @@ class MonitoringModule:
                 'swap_usage_percent': round(swap.percent, 1)
             }
 
-            # Windows-specific memory info
-            if platform.system() == 'Windows':
-                try:
-                    result = subprocess.run(['wmic', 'memorychip', 'get', 'capacity,speed,manufacturer,partnumber'],
-                                          capture_output=True, text=True, timeout=10)
-                    if result.returncode == 0:
-                        lines = result.stdout.strip().split('\n')
-                        memory_modules = []
-                        for line in lines[1:]:  # Skip header
-                            parts = line.split()
-                            if len(parts) >= 4:
-                                memory_modules.append({
-                                    'capacity_gb': round(int(parts[0]) / (1024**3), 2) if parts[0].isdigit() else 'Unknown',
-                                    'manufacturer': parts[1] if len(parts) > 1 else 'Unknown',
-                                    'part_number': parts[2] if len(parts) > 2 else 'Unknown',
-                                    'speed_mhz': parts[3] if len(parts) > 3 else 'Unknown'
-                                })
-                        memory_info['modules'] = memory_modules
-                except Exception as e:
-                    self.logger.warning(f"Could not get Windows memory info: {e}")
-
             return memory_info
 
         except Exception as e:
             self.logger.error(f"Error getting detailed memory info: {e}")
             return {}
 
-    def _get_detailed_disk_info(self) -> List[Dict[str, Any]]:
-        """Get detailed disk information including S.M.A.R.T data"""
+    def _get_memory_modules(self) -> List[Dict[str, Any]]:
+        """Get installed memory modules (Windows only)"""
+        memory_modules = []
+        if platform.system() != 'Windows':
+            return memory_modules
+
         try:
             import subprocess
 
+            result = subprocess.run(['wmic', 'memorychip', 'get', 'capacity,speed,manufacturer,partnumber'],
+                                  capture_output=True, text=True, timeout=10)
+            if result.returncode == 0:
+                lines = result.stdout.strip().split('\n')
+                for line in lines[1:]:  # Skip header
+                    parts = line.split()
+                    if len(parts) >= 4:
+                        memory_modules.append({
+                            'capacity_gb': round(int(parts[0]) / (1024**3), 2) if parts[0].isdigit() else 'Unknown',
+                            'manufacturer': parts[1] if len(parts) > 1 else 'Unknown',
+                            'part_number': parts[2] if len(parts) > 2 else 'Unknown',
+                            'speed_mhz': parts[3] if len(parts) > 3 else 'Unknown'
+                        })
+        except Exception as e:
+            self.logger.warning(f"Could not get Windows memory info: {e}")
+
+        return memory_modules
+
+    def _get_detailed_disk_info(self) -> List[Dict[str, Any]]:
+        """Get disk usage per partition (S.M.A.R.T data is the disk_health collector)"""
+        try:
             disks = []
 
             # Get basic disk information
@@ -800,18 +867,6 @@ class MonitoringModule:
                         'usage_percent': round((usage.used / usage.total) * 100, 1)
                     }
 
-                    # Windows-specific disk info with S.M.A.R.T
-                    if platform.system() == 'Windows':
-                        try:
-                            # Get enhanced disk information using PowerShell
-                            smart_data = self._get_windows_disk_smart_info(partition.device)
-                            self.logger.info(f"SMART data for {partition.device}: {smart_data}")
-                            disk_info.update(smart_data)
-                            self.logger.info(f"Final disk_info for {partition.device}: health_status='{disk_info.get('health_status')}', smart_status='{disk_info.get('smart_status')}'")
-
-                        except Exception as e:
-                            self.logger.warning(f"Could not get Windows disk info for {partition.device}: {e}")
-
                     disks.append(disk_info)
 
                 except PermissionError:
@@ -826,8 +881,11 @@ class MonitoringModule:
             self.logger.error(f"Error getting detailed disk info: {e}")
             return []
 
-    def _get_windows_disk_smart_info(self, device_path: str) -> Dict[str, Any]:
+    def _get_windows_disk_smart_info(self, device_path: str = 'all') -> Dict[str, Any]:
         """Get detailed SMART information for Windows disks using simpler commands"""
+        if platform.system() != 'Windows':
+            return {}
+
         smart_info = {
             'model': 'Unknown',
             'serial_number': 'Unknown',
@@ -965,23 +1023,6 @@ class MonitoringModule:
 
                     interface_info['addresses'].append(addr_info)
 
-                # Windows-specific network info
-                if platform.system() == 'Windows':
-                    try:
-                        result = subprocess.run(['wmic', 'path', 'win32_networkadapter', 'get', 'name,speed,adaptertype'],
-                                              capture_output=True, text=True, timeout=10)
-                        if result.returncode == 0:
-                            lines = result.stdout.strip().split('\n')
-                            for line in lines[1:]:  # Skip header
-                                if interface.lower() in line.lower():
-                                    parts = line.split()
-                                    if len(parts) >= 3:
-                                        interface_info['adapter_type'] = parts[0] if len(parts) > 0 else 'Unknown'
-                                        interface_info['description'] = parts[1] if len(parts) > 1 else 'Unknown'
-                                    break
-                    except Exception as e:
-                        self.logger.warning(f"Could not get Windows network info for {interface}: {e}")
-
                 interfaces.append(interface_info)
 
             return interfaces
@@ -990,6 +1031,36 @@ class MonitoringModule:
             self.logger.error(f"Error getting detailed network info: {e}")
             return []
 
+    def _get_windows_network_adapters(self) -> List[str]:
+        """Raw win32_networkadapter rows, fetched once for all interfaces (Windows only)"""
+        if platform.system() != 'Windows':
+            return []
+        try:
+            import subprocess
+
+            result = subprocess.run(['wmic', 'path', 'win32_networkadapter', 'get', 'name,speed,adaptertype'],
+                                  capture_output=True, text=True, timeout=10)
+            if result.returncode == 0:
+                return [line for line in result.stdout.strip().split('\n')[1:] if line.strip()]  # Skip header
+        except Exception as e:
+            self.logger.warning(f"Could not get Windows network adapters: {e}")
+        return []
+
+    def _annotate_network_adapters(self, interfaces: List[Dict[str, Any]], adapter_lines: List[str]) -> List[Dict[str, Any]]:
+        """Add adapter type/description from the win32_networkadapter rows"""
+        annotated = []
+        for interface_info in interfaces:
+            interface_info = dict(interface_info)
+            for line in adapter_lines:
+                if interface_info['name'].lower() in line.lower():
+                    parts = line.split()
+                    if len(parts) >= 3:
+                        interface_info['adapter_type'] = parts[0] if len(parts) > 0 else 'Unknown'
+                        interface_info['description'] = parts[1] if len(parts) > 1 else 'Unknown'
+                    break
+            annotated.append(interface_info)
+        return annotated
+
     def _get_motherboard_info(self) -> Dict[str, Any]:
         """Get motherboard information"""
         try:
@@ -1012,6 +1083,13 @@ class MonitoringModule:
                                 motherboard_info['version'] = parts[3] if len(parts) > 3 else 'Unknown'
                 except Exception as e:
                     self.logger.warning(f"Could not get motherboard info: {e}")
+            elif platform.system() == 'Linux':
+                motherboard_info = _read_dmi({
+                    'manufacturer': 'board_vendor',
+                    'product': 'board_name',
+                    'serial_number': 'board_serial',
+                    'version': 'board_version'
+                })
 
             return motherboard_info
 
@@ -1041,6 +1119,12 @@ class MonitoringModule:
                                 bios_info['version'] = parts[3] if len(parts) > 3 else 'Unknown'
                 except Exception as e:
                     self.logger.warning(f"Could not get BIOS info: {e}")
+            elif platform.system() == 'Linux':
+                bios_info = _read_dmi({
+                    'manufacturer': 'bios_vendor',
+                    'release_date': 'bios_date',
+                    'version': 'bios_version'
+                })
 
             return bios_info
 
@@ -179,6 +179,7 @@ class RegistrationModule:
                     }
                 },
                 'network_interfaces': network_interfaces,
+                'serials': self._collect_serials(),
                 'agent_version': self.config.get('agent.version', '1.0.0'),
                 'python_version': platform.python_version(),
                 'platform_details': {
@@ -207,6 +208,40 @@ class RegistrationModule:
                 'error': str(e)
             }
     
+    def _collect_serials(self) -> Dict[str, str]:
+        """BIOS / board serials and system UUID, used by the server to recognise reinstalls"""
+        serials = {}
+        try:
+            if platform.system() == 'Windows':
+                import subprocess
+                queries = {
+                    'bios': ['wmic', 'bios', 'get', 'serialnumber'],
+                    'board': ['wmic', 'baseboard', 'get', 'serialnumber'],
+                    'system_uuid': ['wmic', 'csproduct', 'get', 'uuid']
+                }
+                for kind, command in queries.items():
+                    try:
+                        result = subprocess.run(command, capture_output=True, text=True, timeout=10)
+                        lines = [line.strip() for line in result.stdout.splitlines() if line.strip()]
+                        if result.returncode == 0 and len(lines) > 1:
+                            serials[kind] = lines[1]
+                    except Exception as e:
+                        self.logger.debug(f"Could not read {kind} serial: {e}")
+            elif platform.system() == 'Linux':
+                # product_serial / board_serial are root-only; unreadable ones are skipped
+                for kind, filename in (('bios', 'product_serial'), ('board', 'board_serial'),
+                                       ('system_uuid', 'product_uuid')):
+                    try:
+                        with open(f'/sys/class/dmi/id/{filename}') as f:
+                            value = f.read().strip()
+                        if value:
+                            serials[kind] = value
+                    except OSError:
+                        continue
+        except Exception as e:
+            self.logger.warning(f"Error collecting hardware serials: {e}")
+        return serials
+
     def _get_local_ip(self) -> str:
         """Get local IP address"""
         try:
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Agent - Spool Replay Module
+Delivers spooled heartbeats and tickets once the backend is reachable again
+"""
+
+import time
+import logging
+import requests
+from typing import Dict, Any, List, Optional
+
+from core.spool import OfflineSpool, ReplayBackoff
+
+class SpoolReplayModule:
+    """Background replay of the offline spool with jittered exponential backoff"""
+
+    def __init__(self, config_manager, database_manager, spool: OfflineSpool = None):
+        self.logger = logging.getLogger('lanet_agent.spool_replay')
+        self.config = config_manager
+        self.database = database_manager
+        self.spool = spool or OfflineSpool(database_manager)
+        self.running = False
+
+        self.poll_interval = self.config.get('agent.spool_poll_interval', 60)
+        self.batch_pause = self.config.get('agent.spool_batch_pause', 5)
+        self.backoff = ReplayBackoff(
+            base=self.config.get('agent.spool_backoff_base', 30),
+            cap=self.config.get('agent.spool_backoff_cap', 1800)
+        )
+        self._retry_after = None
+
+        # HTTP session for requests
+        self.session = requests.Session()
+
+        # Configure SSL verification
+        verify_ssl = self.config.get('server.verify_ssl', True)
+        if not verify_ssl:
+            self.session.verify = False
+            import urllib3
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+        self.logger.info("Spool replay module initialized")
+
+    def start(self):
+        """Replay loop: idle-poll while empty, back off while the server is unreachable"""
+        self.logger.info("Starting spool replay module...")
+        self.running = True
+
+        while self.running:
+            try:
+                if not self.spool.has_pending():
+                    self.backoff.reset()
+                    self._sleep_with_stop_check(self.poll_interval)
+                    continue
+
+                # First attempt after an outage is jittered too, so a site's
+                # agents do not all replay the moment the link comes back
+                if self.backoff.failures == 0:
+                    self._sleep_with_stop_check(self.backoff.jitter(self.poll_interval))
+
+                if self.replay_once():
+                    self.backoff.reset()
+                    self._sleep_with_stop_check(self.backoff.jitter(self.batch_pause))
+                else:
+                    delay = self.backoff.next_delay(self._retry_after)
+                    self._retry_after = None
+                    self.logger.info(f"Spool replay deferred {delay:.0f}s (attempt {self.backoff.failures})")
+                    self._sleep_with_stop_check(delay)
+
+            except Exception as e:
+                self.logger.error(f"Error in spool replay loop: {e}", exc_info=True)
+                self._sleep_with_stop_check(60)
+
+    def stop(self):
+        """Stop replay"""
+        self.logger.info("Stopping spool replay module...")
+        self.running = False
+
+    def replay_once(self) -> bool:
+        """One pass: newest heartbeat batch first, then tickets"""
+        if not self.spool.replay_heartbeats(self._send_heartbeat_batch):
+            return False
+        return self.spool.replay_tickets(self._send_ticket)
+
+    def _headers(self, agent_token: str) -> Dict[str, str]:
+        return {
+            'Authorization': f'Bearer {agent_token}',
+            'Content-Type': 'application/json',
+            'User-Agent': f"LANET-Agent/{self.config.get('agent.version', '1.0.0')}"
+        }
+
+    def _remember_retry_after(self, response):
+        try:
+            self._retry_after = float(response.headers.get('Retry-After', 0)) or None
+        except (TypeError, ValueError):
+            self._retry_after = None
+
+    def _send_heartbeat_batch(self, items: List[Dict[str, Any]]) -> Optional[List[int]]:
+        """POST a gzip-compressed batch; returns accepted spool ids or None to retry"""
+        asset_id = self.database.get_config('asset_id')
+        agent_token = self.database.get_config('agent_token')
+        if not asset_id or not agent_token:
+            return None
+
+        headers = self._headers(agent_token)
+        headers['Content-Encoding'] = 'gzip'
+
+        try:
+            response = self.session.post(
+                f"{self.config.get_server_url()}/agents/heartbeat/batch",
+                data=OfflineSpool.encode_batch(asset_id, items),
+                headers=headers,
+                timeout=30
+            )
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            self.logger.debug(f"Spool replay: server unreachable ({e})")
+            return None
+
+        if response.status_code == 200:
+            try:
+                return response.json().get('data', {}).get('accepted', [])
+            except ValueError:
+                return [item['id'] for item in items]
+
+        if response.status_code in (429, 503):
+            self._remember_retry_after(response)
+            return None
+        if response.status_code == 400:
+            self.logger.error(f"Server rejected spooled heartbeat batch: {response.text[:200]}")
+            return []
+
+        self.logger.warning(f"Spool replay: heartbeat batch failed with status {response.status_code}")
+        return None
+
+    def _send_ticket(self, ticket_data: Dict[str, Any]) -> Optional[bool]:
+        """POST one spooled ticket; True delivered, False rejected, None retry"""
+        agent_token = self.database.get_config('agent_token')
+        if not agent_token:
+            return None
+
+        try:
+            response = self.session.post(
+                f"{self.config.get_server_url()}/agents/create-ticket",
+                json=ticket_data,
+                headers=self._headers(agent_token),
+                timeout=30
+            )
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            self.logger.debug(f"Spool replay: server unreachable ({e})")
+            return None
+
+        if response.status_code == 200:
+            self.logger.info(f"📤 Spooled ticket delivered: {ticket_data.get('subject')}")
+            return True
+        if response.status_code in (429, 503):
+            self._remember_retry_after(response)
+            return None
+        if response.status_code == 400:
+            return False
+        return None
+
+    def _sleep_with_stop_check(self, seconds):
+        """Sleep with periodic checks for stop signal"""
+        end_time = time.time() + seconds
+        while time.time() < end_time and self.running:
+            time.sleep(min(1, end_time - time.time()))
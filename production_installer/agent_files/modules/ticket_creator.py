@@ -13,13 +13,19 @@ from typing import Dict, Any, Optional
 import platform
 import getpass
 
+from core.spool import OfflineSpool
+from core.sampler import MetricSampler, get_sampler
+
 class TicketCreatorModule:
     """Handles ticket creation through the agent"""
     
-    def __init__(self, config_manager, database_manager):
+    def __init__(self, config_manager, database_manager, spool: OfflineSpool = None,
+                 sampler: MetricSampler = None):
         self.logger = logging.getLogger('lanet_agent.ticket_creator')
         self.config = config_manager
         self.database = database_manager
+        self.spool = spool or OfflineSpool(database_manager)
+        self.sampler = sampler or get_sampler()
         
         # HTTP session for requests
         self.session = requests.Session()
@@ -36,7 +42,12 @@ class TicketCreatorModule:
     
     def create_ticket(self, subject: str, description: str, priority: str = 'media', 
                      include_system_info: bool = True) -> bool:
-        """Create a ticket through the agent"""
+        """Create a ticket through the agent
+
+        When the server cannot be reached the ticket is spooled and delivered
+        by the replay module later; that also counts as success.
+        """
+        ticket_data = None
         try:
             self.logger.info(f"Creating ticket: {subject}")
             
@@ -112,18 +123,26 @@ class TicketCreatorModule:
                     error_msg += f": {response.text}"
                 
                 self.logger.error(error_msg)
+                if response.status_code >= 500 or response.status_code == 429:
+                    return self._spool_ticket(ticket_data)
                 return False
                 
         except requests.exceptions.ConnectionError as e:
             self.logger.error(f"Connection error during ticket creation: {e}")
-            return False
+            return self._spool_ticket(ticket_data)
         except requests.exceptions.Timeout as e:
             self.logger.error(f"Timeout during ticket creation: {e}")
-            return False
+            return self._spool_ticket(ticket_data)
         except Exception as e:
             self.logger.error(f"Unexpected error during ticket creation: {e}", exc_info=True)
             return False
     
+    def _spool_ticket(self, ticket_data: Optional[Dict[str, Any]]) -> bool:
+        """Queue the ticket for replay; False if there was nothing to queue"""
+        if not ticket_data:
+            return False
+        return self.spool.spool_ticket(ticket_data) is not None
+    
     def _create_ticket_fallback(self, ticket_data: Dict[str, Any], agent_token: str) -> bool:
         """Fallback to regular ticket creation endpoint"""
         try:
@@ -170,16 +189,19 @@ class TicketCreatorModule:
                 'collection_timestamp': datetime.now().isoformat()
             }
             
-            # Get current system metrics
-            recent_metrics = self.database.get_recent_metrics(1)
-            if recent_metrics:
-                metrics = recent_metrics[0]
+            # Get current system metrics from the shared sampler
+            sample = self.sampler.current()
+            if sample:
+                recent_metrics = self.database.get_recent_metrics(1)
+                network_status = recent_metrics[0].get('network_status', 'unknown') if recent_metrics else 'unknown'
                 auto_info['system_metrics'] = {
-                    'cpu_usage': metrics.get('cpu_usage', 0),
-                    'memory_usage': metrics.get('memory_usage', 0),
-                    'disk_usage': metrics.get('disk_usage', 0),
-                    'uptime_hours': round(metrics.get('uptime', 0) / 3600, 1),
-                    'network_status': metrics.get('network_status', 'unknown')
+                    'cpu_usage': sample.get('cpu_usage', 0),
+                    'memory_usage': sample.get('memory_usage', 0),
+                    'disk_usage': sample.get('disk_usage', 0),
+                    'uptime_hours': round(sample.get('uptime', 0) / 3600, 1),
+                    'network_status': network_status,
+                    # What the machine looked like over the last 15 minutes
+                    'usage_window': self.sampler.summary(900)
                 }
             
             # Get recent system events/logs if available
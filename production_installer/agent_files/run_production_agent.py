@@ -9,6 +9,7 @@ Based on the successful run_fixed_agent.py implementation
 import sys
 import os
 import time
+import threading
 import logging
 from pathlib import Path
 
@@ -58,7 +59,6 @@ def run_agent():
         
         # Import and initialize components
         from core.config_manager import ConfigManager
-        from core.database import DatabaseManager
         from modules.monitoring import MonitoringModule
         from modules.heartbeat import HeartbeatModule
         from core.agent_core import AgentCore
@@ -73,14 +73,14 @@ def run_agent():
         config_manager = ConfigManager(str(config_path))
         logger.info("Configuration loaded successfully")
         
-        # Initialize database
-        database = DatabaseManager(str(install_dir / "data" / "agent.db"))
-        logger.info("Database initialized")
-        
         # Initialize agent core for registration
         agent_core = AgentCore(config_manager, ui_enabled=False)
         logger.info("Agent core initialized")
         
+        # Share the core's database: one connection per thread and one config cache
+        database = agent_core.database
+        logger.info("Database initialized")
+        
         # Check and perform registration if needed
         if not agent_core.is_registered():
             logger.info("Agent not registered, attempting registration...")
@@ -99,9 +99,12 @@ def run_agent():
         else:
             logger.info("✅ Agent already registered")
         
+        # Shared CPU/memory/disk sampler (heartbeats report min/avg/max from it)
+        threading.Thread(target=agent_core.sampler.start, daemon=True).start()
+        
         # Initialize monitoring module with BitLocker support
         logger.info("Initializing monitoring module...")
-        monitoring = MonitoringModule(config_manager, database)
+        monitoring = MonitoringModule(config_manager, database, sampler=agent_core.sampler)
         logger.info("Monitoring module initialized")
         
         # Test BitLocker collection
@@ -118,9 +121,14 @@ def run_agent():
         
         # Initialize heartbeat module WITH monitoring
         logger.info("Initializing heartbeat module...")
-        heartbeat = HeartbeatModule(config_manager, database, monitoring)
+        heartbeat = HeartbeatModule(config_manager, database, monitoring, sampler=agent_core.sampler)
         logger.info("Heartbeat module initialized")
         
+        # Replay heartbeats/tickets spooled while the server was unreachable
+        from modules.spool_replay import SpoolReplayModule
+        spool_replay = SpoolReplayModule(config_manager, database, spool=heartbeat.spool)
+        threading.Thread(target=spool_replay.start, daemon=True).start()
+        
         # Send initial heartbeat with BitLocker data
         logger.info("Sending initial heartbeat with BitLocker data...")
         success = heartbeat.send_heartbeat()
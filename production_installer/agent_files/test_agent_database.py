@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Agent - Local Database Test
+Connection reuse, config cache, write-behind metrics and retention
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import threading
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.database import DatabaseManager
+
+
+def _rows(db, query):
+    conn = sqlite3.connect(db.db_path)
+    try:
+        return conn.execute(query).fetchall()
+    finally:
+        conn.close()
+
+
+def test_wal_mode_and_one_connection_per_thread():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = DatabaseManager(os.path.join(tmpdir, 'agent.db'))
+        assert db._connection() is db._connection()
+        assert db._connection().execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(db._connection()))
+        thread.start()
+        thread.join()
+        assert other[0] is not db._connection()
+        db.close()
+
+
+def test_config_cache_round_trip_and_skips_unchanged_writes():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'agent.db')
+        db = DatabaseManager(path)
+        db.set_config('asset_id', 'abc')
+        db.set_config('inventory_sync.disks', {'hash': 'h', 'data': []})
+        assert db.get_config('asset_id') == 'abc'
+        assert db.get_config('inventory_sync.disks') == {'hash': 'h', 'data': []}
+        assert db.get_config('missing', 'default') == 'default'
+
+        written = _rows(db, "SELECT updated_at FROM agent_config WHERE key = 'asset_id'")
+        db.set_config('asset_id', 'abc')
+        assert _rows(db, "SELECT updated_at FROM agent_config WHERE key = 'asset_id'") == written
+        db.close()
+
+        assert DatabaseManager(path).get_config('inventory_sync.disks') == {'hash': 'h', 'data': []}
+
+
+def test_metrics_are_buffered_visible_and_flushed_in_batches():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = DatabaseManager(os.path.join(tmpdir, 'agent.db'), metrics_flush_interval=3600, metrics_flush_size=3)
+        db.store_metrics({'cpu_usage': 1})
+        db.store_metrics({'cpu_usage': 2})
+        assert _rows(db, 'SELECT COUNT(*) FROM metrics_history') == [(0,)]
+        assert [m['cpu_usage'] for m in db.get_recent_metrics(5)] == [2, 1]
+
+        db.store_metrics({'cpu_usage': 3})
+        assert _rows(db, 'SELECT COUNT(*) FROM metrics_history') == [(3,)]
+
+        db.store_metrics({'cpu_usage': 4})
+        assert [m['cpu_usage'] for m in db.get_recent_metrics(3)] == [4, 3, 2]
+        db.close()
+        assert _rows(db, 'SELECT COUNT(*) FROM metrics_history') == [(4,)]
+
+
+def test_prune_applies_age_and_size_limits():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = DatabaseManager(os.path.join(tmpdir, 'agent.db'), metrics_flush_size=1000, max_metrics=5)
+        conn = db._connection()
+        with conn:
+            conn.execute("INSERT INTO metrics_history (timestamp, metrics_json) VALUES (datetime('now', '-30 days'), '{}')")
+            conn.execute("INSERT INTO heartbeat_history (timestamp, status) VALUES (datetime('now', '-30 days'), 'success')")
+        for i in range(8):
+            db.store_metrics({'cpu_usage': i})
+        db.log_heartbeat('success', 0.2)
+        db.flush()
+        db.prune()
+
+        assert _rows(db, 'SELECT COUNT(*) FROM metrics_history') == [(5,)]
+        assert _rows(db, 'SELECT status FROM heartbeat_history') == [('success',)]
+        assert db.get_recent_metrics(1)[0]['cpu_usage'] == 7
+        db.close()
+
+
+if __name__ == "__main__":
+    print("🧪 Testing agent database...")
+    test_wal_mode_and_one_connection_per_thread()
+    test_config_cache_round_trip_and_skips_unchanged_writes()
+    test_metrics_are_buffered_visible_and_flushed_in_batches()
+    test_prune_applies_age_and_size_limits()
+    print("✅ All agent database tests passed")
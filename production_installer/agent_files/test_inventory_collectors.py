@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Agent - Inventory Collectors Test
+Volatility caching, boot invalidation, concurrency and the overall deadline
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.database import DatabaseManager
+from core.collectors import InventoryCollector, PER_BOOT, DAILY, PER_HEARTBEAT
+
+
+class Counter:
+    def __init__(self, value=None, delay=0.0, error=None):
+        self.calls = 0
+        self.value = value
+        self.delay = delay
+        self.error = error
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.value if self.value is not None else {'call': self.calls}
+
+
+def test_results_are_cached_by_volatility_and_reboot_invalidates():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database = DatabaseManager(os.path.join(tmpdir, 'agent.db'))
+        bios, smart, usage = Counter(), Counter(), Counter()
+
+        def collector(boot_time):
+            inventory = InventoryCollector(database, boot_time=boot_time)
+            inventory.register('bios', bios, PER_BOOT)
+            inventory.register('smart', smart, DAILY)
+            inventory.register('usage', usage, PER_HEARTBEAT)
+            return inventory
+
+        inventory = collector(1000.0)
+        assert inventory.collect() == {'bios': {'call': 1}, 'smart': {'call': 1}, 'usage': {'call': 1}}
+        assert inventory.collect() == {'bios': {'call': 1}, 'smart': {'call': 1}, 'usage': {'call': 2}}
+
+        # Same boot (within jitter) keeps the cache; a reboot drops it
+        assert collector(1001.5).collect()['bios'] == {'call': 1}
+        assert collector(90000.0).collect(['bios', 'smart']) == {'bios': {'call': 2}, 'smart': {'call': 2}}
+
+        # A day later the daily collector runs again, the per-boot one does not
+        entry = database.get_config('inventory_cache.smart')
+        entry['collected_at'] -= 86401
+        database.set_config('inventory_cache.smart', entry)
+        again = collector(90000.0).collect(['bios', 'smart'])
+        assert again == {'bios': {'call': 2}, 'smart': {'call': 3}}
+        assert database.get_config('inventory_cache.usage') is None
+
+
+def test_collectors_run_concurrently_under_a_deadline():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database = DatabaseManager(os.path.join(tmpdir, 'agent.db'))
+        inventory = InventoryCollector(database, max_workers=4, deadline=1.0, boot_time=1000.0)
+        for name in ('a', 'b', 'c'):
+            inventory.register(name, Counter(value=name, delay=0.3), PER_BOOT)
+        inventory.register('slow', Counter(value='late', delay=3), PER_BOOT, default='default')
+        inventory.register('broken', Counter(error=RuntimeError('wmic missing')), PER_BOOT, default=[])
+
+        started = time.monotonic()
+        results = inventory.collect()
+        assert time.monotonic() - started < 2.0
+        assert results == {'a': 'a', 'b': 'b', 'c': 'c', 'slow': 'default', 'broken': []}
+        assert database.get_config('inventory_cache.broken') is None
+
+
+def test_failure_falls_back_to_last_cached_value():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database = DatabaseManager(os.path.join(tmpdir, 'agent.db'))
+        inventory = InventoryCollector(database, boot_time=1000.0)
+        flaky = Counter(value={'model': 'X1'})
+        inventory.register('board', flaky, PER_BOOT, default={})
+        inventory.collect()
+
+        flaky.error = RuntimeError('timeout')
+        assert inventory.collect(force=True) == {'board': {'model': 'X1'}}
+        assert flaky.calls == 2
+
+
+if __name__ == "__main__":
+    print("🧪 Testing inventory collectors...")
+    test_results_are_cached_by_volatility_and_reboot_invalidates()
+    test_collectors_run_concurrently_under_a_deadline()
+    test_failure_falls_back_to_last_cached_value()
+    print("✅ All inventory collector tests passed")
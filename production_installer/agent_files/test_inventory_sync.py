@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Agent - Inventory Sync Test
+Section hashing, diff building and acknowledgement against a temporary SQLite store
+"""
+
+import os
+import sys
+import gzip
+import json
+import tempfile
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.database import DatabaseManager
+from core.inventory_sync import InventorySync, diff_ops, split_sections, gzip_json, section_hash
+
+
+HARDWARE = {
+    'cpu': {'model': 'Intel i5', 'cores': 4},
+    'memory': {'total_gb': 8},
+    'disks': [{'device': 'C:\\', 'usage_percent': 40}],
+    'bitlocker': {'supported': True, 'volumes': []}
+}
+SOFTWARE = {'installed_programs': [{'name': 'Program %d' % i, 'version': '1.0'} for i in range(50)]}
+
+
+def test_diff_ops_walks_objects_and_replaces_lists():
+    old = {'cpu': {'model': 'i5', 'cores': 4}, 'gpu': 'Intel', 'nics': [1, 2]}
+    new = {'cpu': {'model': 'i5', 'cores': 8}, 'nics': [1, 2, 3], 'tpm': True}
+    ops = diff_ops(old, new)
+    assert ['del', ['gpu']] in ops
+    assert ['set', ['cpu', 'cores'], 8] in ops
+    assert ['set', ['nics'], [1, 2, 3]] in ops
+    assert ['set', ['tpm'], True] in ops
+    assert diff_ops({'a': 1}, {'a': 1.0}) == [['set', ['a'], 1.0]]
+    assert diff_ops(old, dict(old)) == []
+
+
+def test_split_sections_separates_disks_and_bitlocker():
+    sections = split_sections(HARDWARE, SOFTWARE)
+    assert set(sections) == {'hardware', 'disks', 'bitlocker', 'software'}
+    assert 'disks' not in sections['hardware'] and sections['disks'] == HARDWARE['disks']
+    assert 'disks' in HARDWARE
+    assert split_sections({}, None)['bitlocker'] == {}
+
+
+def test_build_sends_full_then_diff_then_nothing():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sync = InventorySync(DatabaseManager(os.path.join(tmpdir, 'agent.db')))
+
+        payload, pending = sync.build(HARDWARE, SOFTWARE)
+        assert {s['mode'] for s in payload['sections'].values()} == {'full'}
+        assert len(payload['sections']) == 4
+        sync.acknowledge(pending, payload['hashes'])
+
+        changed = dict(SOFTWARE, installed_programs=SOFTWARE['installed_programs'] + [{'name': 'New'}])
+        payload, pending = sync.build(HARDWARE, changed)
+        assert list(payload['sections']) == ['software']
+        # The program list is replaced whole, so the full section is no larger than a diff
+        assert payload['sections']['software']['mode'] == 'full'
+
+        hardware = dict(HARDWARE, memory={'total_gb': 16})
+        payload, pending = sync.build(hardware, SOFTWARE)
+        assert payload['sections']['hardware'] == {
+            'mode': 'diff', 'base': section_hash(split_sections(HARDWARE, SOFTWARE)['hardware']),
+            'ops': [['set', ['memory', 'total_gb'], 16]]
+        }
+        sync.acknowledge(pending, {'hardware': payload['hashes']['hardware']})
+
+        payload, pending = sync.build(hardware, SOFTWARE)
+        assert payload['sections'] == {} and pending == {}
+        assert set(payload['hashes']) == {'hardware', 'disks', 'bitlocker', 'software'}
+
+
+def test_reset_and_hash_mismatch_force_full_upload():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sync = InventorySync(DatabaseManager(os.path.join(tmpdir, 'agent.db')))
+        payload, pending = sync.build(HARDWARE, SOFTWARE)
+        sync.acknowledge(pending, dict(payload['hashes'], disks='something-else'))
+
+        payload, _ = sync.build(HARDWARE, SOFTWARE)
+        assert list(payload['sections']) == ['disks']
+
+        payload, _ = sync.build(HARDWARE, SOFTWARE, force_full=('hardware',))
+        assert payload['sections']['hardware']['mode'] == 'full'
+
+
+def test_gzip_json_round_trip():
+    body, headers = gzip_json({'inventory_sync': {'sections': {}}})
+    assert headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(body)) == {'inventory_sync': {'sections': {}}}
+
+
+if __name__ == "__main__":
+    print("🧪 Testing inventory sync...")
+    test_diff_ops_walks_objects_and_replaces_lists()
+    test_split_sections_separates_disks_and_bitlocker()
+    test_build_sends_full_then_diff_then_nothing()
+    test_reset_and_hash_mismatch_force_full_upload()
+    test_gzip_json_round_trip()
+    print("✅ All inventory sync tests passed")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Agent - Metric Sampler Test
+Non-blocking samples, ring buffer bounds and window summaries
+"""
+
+import os
+import sys
+import time
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.sampler import MetricSampler, get_sampler
+
+
+def test_sample_is_non_blocking_and_buffer_is_bounded():
+    sampler = MetricSampler(interval=60, capacity=3)
+    started = time.monotonic()
+    for _ in range(5):
+        sample = sampler.sample()
+    assert time.monotonic() - started < 0.5
+    assert {'cpu_usage', 'memory_usage', 'disk_usage', 'uptime', 'timestamp'} <= set(sample)
+    assert len(sampler.samples()) == 3
+    assert sampler.latest() == sample
+
+
+def test_current_reuses_fresh_sample_and_resamples_stale_one():
+    sampler = MetricSampler(interval=60, capacity=10)
+    first = sampler.current()
+    assert sampler.current() == first and len(sampler.samples()) == 1
+
+    sampler._samples[-1]['timestamp'] -= 120
+    assert sampler.current()['timestamp'] > first['timestamp']
+    assert len(sampler.samples()) == 2
+
+
+def test_summary_reports_min_avg_max_over_window():
+    sampler = MetricSampler(interval=60, capacity=10)
+    now = time.time()
+    for age, cpu in ((600, 90.0), (120, 10.0), (60, 20.0), (0, 30.0)):
+        sampler._samples.append({'timestamp': now - age, 'cpu_usage': cpu, 'memory_usage': 50.0, 'disk_usage': 70.0})
+
+    window = sampler.summary(300)
+    assert window['samples'] == 3
+    assert window['cpu_usage'] == {'min': 10.0, 'avg': 20.0, 'max': 30.0}
+    assert sampler.summary()['cpu_usage']['max'] == 90.0
+    assert MetricSampler(capacity=1).summary(60) == {'samples': 0}
+
+
+def test_shared_sampler_is_process_wide():
+    assert get_sampler() is get_sampler(interval=5)
+
+
+if __name__ == "__main__":
+    print("🧪 Testing metric sampler...")
+    test_sample_is_non_blocking_and_buffer_is_bounded()
+    test_current_reuses_fresh_sample_and_resamples_stale_one()
+    test_summary_reports_min_avg_max_over_window()
+    test_shared_sampler_is_process_wide()
+    print("✅ All metric sampler tests passed")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LANET Agent - Offline Spool Test
+Spooling, coalescing and replay ordering against a temporary SQLite store
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import random
+import tempfile
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.database import DatabaseManager
+from core.spool import OfflineSpool, ReplayBackoff
+
+
+def _spool(tmpdir, **kwargs):
+    return OfflineSpool(DatabaseManager(os.path.join(tmpdir, 'agent.db')), **kwargs)
+
+
+def test_heartbeat_sample_accepts_both_tiers():
+    tier1 = OfflineSpool.heartbeat_sample({'status': {'cpu_percent': 12.5, 'memory_percent': 40, 'disk_percent': 70}})
+    tier2 = OfflineSpool.heartbeat_sample({'status': {'cpu_usage': 3, 'memory_usage': 4, 'disk_usage': 5, 'uptime': 60}})
+    assert (tier1['cpu_usage'], tier1['memory_usage'], tier1['disk_usage']) == (12.5, 40, 70)
+    assert (tier2['cpu_usage'], tier2['uptime']) == (3, 60)
+
+
+def test_replay_sends_newest_first_and_coalesces_stale_samples():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        spool = _spool(tmpdir, batch_size=10, coalesce_after=3600, coalesce_bucket=900)
+        now = time.time()
+        # Two hours of 5-minute samples
+        for minutes_ago in range(120, 0, -5):
+            spool.database.spool_append(OfflineSpool.HEARTBEAT, {'cpu_usage': minutes_ago}, now - minutes_ago * 60)
+
+        sent = []
+        def send_batch(items):
+            sent.append(items)
+            return [item['id'] for item in items]
+
+        assert spool.replay_heartbeats(send_batch)
+        first = [item['payload']['cpu_usage'] for item in sent[0]]
+        assert first[0] == 5 and first == sorted(first)
+
+        while spool.pending().get(OfflineSpool.HEARTBEAT):
+            assert spool.replay_heartbeats(send_batch)
+        delivered = sum(len(batch) for batch in sent)
+        # 12 recent samples kept as-is, the older hour thinned to one per 15 minutes
+        assert 12 < delivered < 24
+
+
+def test_failed_replay_keeps_items_and_batch_is_gzip_json():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        spool = _spool(tmpdir)
+        spool.spool_heartbeat({'status': {'cpu_usage': 50}})
+
+        assert not spool.replay_heartbeats(lambda items: None)
+        items = spool.database.spool_fetch(OfflineSpool.HEARTBEAT, 10)
+        assert len(items) == 1 and items[0]['attempts'] == 1
+
+        body = json.loads(gzip.decompress(OfflineSpool.encode_batch('asset-1', items)))
+        assert body['asset_id'] == 'asset-1'
+        assert body['heartbeats'][0]['spool_id'] == items[0]['id']
+        assert body['heartbeats'][0]['recorded_at'] == items[0]['created_at']
+
+
+def test_tickets_replay_in_order_with_idempotency_key():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        spool = _spool(tmpdir)
+        first = spool.spool_ticket({'subject': 'Disco lleno'})
+        spool.spool_ticket({'subject': 'Sin red'})
+
+        delivered = []
+        assert spool.replay_tickets(lambda payload: delivered.append(payload) or True)
+        assert [t['subject'] for t in delivered] == ['Disco lleno', 'Sin red']
+        assert delivered[0]['spool_id'] == first
+        assert not spool.has_pending()
+
+
+def test_backoff_is_jittered_and_capped():
+    backoff = ReplayBackoff(base=30, cap=300, rng=random.Random(7))
+    delays = [backoff.next_delay() for _ in range(10)]
+    assert all(0 <= d <= 300 for d in delays)
+    assert len(set(delays)) == len(delays)
+    assert backoff.next_delay(retry_after=600) >= 600
+    backoff.reset()
+    assert backoff.failures == 0
+
+
+if __name__ == "__main__":
+    print("🧪 Testing offline spool...")
+    test_heartbeat_sample_accepts_both_tiers()
+    test_replay_sends_newest_first_and_coalesces_stale_samples()
+    test_failed_replay_keeps_items_and_batch_is_gzip_json()
+    test_tickets_replay_in_order_with_idempotency_key()
+    test_backoff_is_jittered_and_capped()
+    print("✅ All offline spool tests passed")